@@ -2,14 +2,81 @@
 Agente Coordinador - Maneja el enrutamiento y la toma de decisiones
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from rich.console import Console
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 from rich.panel import Panel
+from ..tools_base.output import console
+from ..manifest import AGENT_OFFENSIVE, get_manifest_registry
+from .intent_matcher import IntentMatcher, IntentRule
+from .semantic_router import SemanticRouter, literals
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Catálogo de intenciones: (herramienta, prioridad, patrones), construido al
+# arrancar a partir de los manifiestos de las herramientas (ver agentesai.manifest).
+# Una consulta que contiene alguno de los patrones se enruta a su herramienta; si
+# aparecen patrones de varias herramientas gana la de menor prioridad (ver
+# IntentMatcher). Cada patrón pertenece a una sola herramienta.
+INTENCIONES: List[IntentRule] = get_manifest_registry().intent_rules()
+
+# Decisiones de enrutamiento cacheadas como máximo (AGENTESAI_ROUTING_CACHE_SIZE)
+DEFAULT_ROUTING_CACHE_SIZE = 1024
+
+# Puntuación y espacios que se colapsan; el guion entre letras o dígitos se conserva
+# porque distingue nombres como "ldap-search" (script NSE) de "ldap search"
+_NO_PALABRA = re.compile(r"(?!(?<=[^\W_])-(?=[^\W_]))[\W_]+")
+
+
+def normalizar_consulta(consulta: str) -> str:
+    """
+    Forma canónica de una consulta para enrutarla y cachear la decisión.
+    
+    Aplica NFKD, elimina acentos y diacríticos, pasa a minúsculas y colapsa
+    puntuación y espacios en un único espacio: "¿Quién  soy?" → "quien soy".
+    Un guion entre letras o dígitos se conserva ("ldap-rootdse" no es "ldap rootdse").
+    
+    Args:
+        consulta (str): Consulta del usuario
+        
+    Returns:
+        str: Consulta normalizada
+    """
+    descompuesta = unicodedata.normalize("NFKD", consulta)
+    sin_acentos = "".join(c for c in descompuesta if not unicodedata.combining(c))
+    return _NO_PALABRA.sub(" ", sin_acentos.casefold()).strip()
+
+
+def huella_consulta(consulta: str) -> str:
+    """
+    Hash estable de una consulta normalizada (identifica sus herramientas generadas).
+    
+    Args:
+        consulta (str): Consulta del usuario
+        
+    Returns:
+        str: md5 hexadecimal de normalizar_consulta(consulta)
+    """
+    return hashlib.md5(normalizar_consulta(consulta).encode("utf-8")).hexdigest()
+
+
+def routing_cache_size() -> int:
+    """Tamaño de la caché de decisiones (variable AGENTESAI_ROUTING_CACHE_SIZE, por defecto 1024)."""
+    return int(os.getenv("AGENTESAI_ROUTING_CACHE_SIZE", DEFAULT_ROUTING_CACHE_SIZE))
+
+
+# Compilado una vez al importar el módulo sobre los patrones normalizados (las
+# consultas se comparan normalizadas); lo comparten todos los coordinadores
+_MATCHER = IntentMatcher(
+    (herramienta, prioridad, [normalizar_consulta(patron) for patron in patrones])
+    for herramienta, prioridad, patrones in INTENCIONES
+)
+
 class AgenteCoordinador:
     """
     Agente que coordina entre el ejecutor y el generador.
@@ -21,13 +88,22 @@ class AgenteCoordinador:
     1. Usar herramientas existentes (enviar al AgenteEjecutor)
     2. Generar nuevas herramientas (enviar al AgenteGenerador)
     
+    Las consultas sin ningún patrón conocido pasan por el enrutador semántico
+    local antes de decidir generar: una paráfrasis de una herramienta del
+    ejecutor (o de la consulta de una herramienta ya generada) no llega a
+    Gemini. Las herramientas ofensivas nunca se eligen por similitud.
+    
     Atributos:
         herramientas_disponibles (set): Conjunto de nombres de herramientas disponibles
         historial_consultas (list): Lista de consultas procesadas para auditoría
+        max_decisiones (int): Decisiones de enrutamiento cacheadas como máximo (LRU)
+        router (SemanticRouter): Índice de ejemplos por herramienta para las consultas sin patrón
         
     Métodos principales:
         - analizar_consulta(): Analiza una consulta y toma una decisión
         - registrar_herramienta(): Registra una nueva herramienta disponible
+        - reset_herramientas(): Olvida las herramientas registradas
+        - invalidar_decisiones(): Vacía la caché de decisiones de enrutamiento
         - registrar_consulta(): Registra una consulta procesada
         - obtener_estadisticas(): Obtiene estadísticas del coordinador
         
@@ -38,9 +114,36 @@ class AgenteCoordinador:
         >>> print(decision["agente"])  # "ejecutor"
     """
     
-    def __init__(self):
+    def __init__(self, max_decisiones: Optional[int] = None, umbral_semantico: Optional[float] = None):
+        """
+        Args:
+            max_decisiones (int, optional): Tamaño de la caché de decisiones
+                                            (por defecto AGENTESAI_ROUTING_CACHE_SIZE; 0 la desactiva)
+            umbral_semantico (float, optional): Similitud mínima del enrutamiento semántico
+                                                (por defecto AGENTESAI_SEMANTIC_THRESHOLD; 1 lo desactiva)
+        """
         self.herramientas_disponibles = set()
         self.historial_consultas = []
+        self.matcher = _MATCHER
+        
+        # Ejemplos de cada herramienta declarada: sus patrones y su descripción, que
+        # aporta a todos sus literales (tipo de objeto, cuenta propia). Las ofensivas
+        # quedan fuera: solo se ejecutan cuando la consulta contiene sus patrones
+        self.router = SemanticRouter(umbral_semantico)
+        for manifest in get_manifest_registry():
+            if manifest.agent == AGENT_OFFENSIVE:
+                continue
+            descripcion = normalizar_consulta(manifest.description)
+            self.router.add(manifest.name,
+                            [normalizar_consulta(texto) for texto in manifest.patterns] + [descripcion],
+                            literals(descripcion))
+        self._enrutadas_semanticamente = 0
+        
+        # Caché LRU: consulta normalizada → decisión (sin la consulta original)
+        self.max_decisiones = routing_cache_size() if max_decisiones is None else max(0, max_decisiones)
+        self._decisiones: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._decisiones_lock = threading.Lock()
+        self._decisiones_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
         
     def analizar_consulta(self, consulta: str) -> Dict[str, Any]:
         """
@@ -48,7 +151,8 @@ class AgenteCoordinador:
         
         Esta función es el cerebro del sistema de coordinación. Analiza el texto de la consulta
         y determina si puede ser respondida con herramientas existentes o si necesita
-        generar una nueva herramienta.
+        generar una nueva herramienta. Las consultas que se normalizan igual comparten
+        la decisión, que se cachea hasta que se registra una herramienta nueva.
         
         Args:
             consulta (str): La consulta del usuario (ej: "¿quién soy?", "¿qué grupos tengo?")
@@ -58,108 +162,107 @@ class AgenteCoordinador:
                 - accion: "ejecutar" o "generar"
                 - agente: "ejecutor" o "generador"
                 - herramienta: nombre de la herramienta (si accion="ejecutar")
+                - similitud: similitud con la herramienta (si se eligió por enrutamiento semántico)
                 - tipo_herramienta: tipo de herramienta a generar (si accion="generar")
                 - consulta: la consulta original
         """
         console.print(Panel(f"🧠 Analizando consulta: {consulta}", style="blue"))
         
-        # Lógica de análisis basada en patrones de texto
-        # TODO: En el futuro, esto se puede mejorar usando IA para análisis semántico
-        if self._puede_responder_directamente(consulta):
+        clave = normalizar_consulta(consulta)
+        
+        decision = self._decision_cacheada(clave)
+        if decision is None:
+            decision = self._enrutar(clave)
+            self._cachear_decision(clave, decision)
+        
+        # Copia por llamada: la decisión cacheada no se comparte con el llamador
+        return {**decision, "consulta": consulta}
+    
+    def _enrutar(self, clave: str) -> Dict[str, Any]:
+        """
+        Calcula la decisión de enrutamiento de una consulta normalizada.
+        
+        Args:
+            clave (str): Consulta normalizada (ver normalizar_consulta)
+            
+        Returns:
+            Dict[str, Any]: Decisión sin la consulta original
+        """
+        # Lógica de análisis basada en patrones de texto (una sola pasada)
+        herramienta = self.matcher.match(clave)
+        if herramienta is not None:
+            return {
+                "accion": "ejecutar",
+                "agente": "ejecutor",
+                "herramienta": herramienta
+            }
+        
+        # Sin patrones: herramienta más parecida si supera el umbral de confianza
+        semantica = self.router.route(clave)
+        if semantica is not None:
+            with self._decisiones_lock:
+                self._enrutadas_semanticamente += 1
             return {
                 "accion": "ejecutar",
                 "agente": "ejecutor",
-                "herramienta": self._identificar_herramienta(consulta),
-                "consulta": consulta
+                "herramienta": semantica[0],
+                "similitud": round(semantica[1], 3)
             }
         else:
             return {
                 "accion": "generar",
                 "agente": "generador",
-                "consulta": consulta,
-                "tipo_herramienta": self._determinar_tipo_herramienta(consulta)
+                "tipo_herramienta": self._determinar_tipo_herramienta(clave)
             }
     
+    def _decision_cacheada(self, clave: str) -> Optional[Dict[str, Any]]:
+        """Decisión cacheada para la consulta normalizada (o None)."""
+        with self._decisiones_lock:
+            decision = self._decisiones.get(clave)
+            if decision is None:
+                self._decisiones_stats["misses"] += 1
+                return None
+            self._decisiones.move_to_end(clave)
+            self._decisiones_stats["hits"] += 1
+            return decision
+    
+    def _cachear_decision(self, clave: str, decision: Dict[str, Any]):
+        """Guarda una decisión expulsando la usada hace más tiempo si se supera el límite."""
+        if not self.max_decisiones:
+            return
+        with self._decisiones_lock:
+            self._decisiones[clave] = decision
+            self._decisiones.move_to_end(clave)
+            while len(self._decisiones) > self.max_decisiones:
+                self._decisiones.popitem(last=False)
+                self._decisiones_stats["evictions"] += 1
+    
+    def invalidar_decisiones(self):
+        """Vacía la caché de decisiones (p. ej. al cambiar las herramientas disponibles)."""
+        with self._decisiones_lock:
+            self._decisiones.clear()
+            self._decisiones_stats["invalidations"] += 1
+    
     def _puede_responder_directamente(self, consulta: str) -> bool:
         """
         Determina si la consulta puede ser respondida con herramientas existentes.
         
-        Esta función implementa un sistema de reconocimiento de patrones para identificar
-        consultas que el sistema ya sabe manejar. Utiliza una lista predefinida de
-        patrones de texto para hacer la comparación.
-        
         Args:
             consulta (str): La consulta del usuario en texto plano
             
         Returns:
             bool: True si la consulta puede ser respondida directamente, False si necesita
                   generación de nueva herramienta
-                  
-        Note:
-            Los patrones incluyen variaciones en español e inglés para mayor flexibilidad.
-            En el futuro, esto se puede mejorar con NLP o embeddings semánticos.
         """
-        consulta_lower = consulta.lower()
-        
-        # Lista de patrones de consultas que el sistema ya sabe manejar
-        # Cada patrón representa una funcionalidad implementada
-        patrones_conocidos = [
-            # Herramientas obligatorias
-            "quién soy", "quien soy", "who am i",        # get_current_user_info
-            "qué grupos tengo", "que grupos tengo", "what groups",  # get_user_groups
-            "reset", "reseteo", "reiniciar",             # reset_system
-            
-            # Herramientas adicionales de seguridad ofensiva
-            "listar usuarios", "lista usuarios", "todos los usuarios", "list users", "all users",  # list_all_users
-            "buscar usuarios", "usuarios por departamento", "search users", "users by department",  # search_users_by_department
-            "estructura ldap", "estructura del directorio", "ldap structure", "directory structure",  # analyze_ldap_structure
-            
-            # Herramientas ofensivas
-            "rootdse", "root dse", "rootdse info", "root dse info",  # tool_rootdse_info
-            "análisis rootdse", "analisis rootdse", "rootdse analysis",  # tool_rootdse_info
-            "información servidor", "server info", "ldap info", "ldap server info",  # tool_rootdse_info
-            
-            # Enumeración anónima
-            "enumeración anónima", "enumeracion anonima", "anonymous enum",  # tool_anonymous_enum
-            "bind anónimo", "bind anonimo", "anonymous bind",  # tool_anonymous_enum
-            "usuarios anónimos", "usuarios anonimos", "anonymous users",  # tool_anonymous_enum
-            "enumerar usuarios", "enumerar grupos", "list users groups",  # tool_anonymous_enum
-            
-            # Test STARTTLS
-            "starttls", "start tls", "tls test", "test tls",  # tool_starttls_test
-            "test seguridad", "seguridad tls", "tls security",  # tool_starttls_test
-            "downgrade tls", "tls downgrade", "handshake tls",  # tool_starttls_test
-            
-            # Comparación Simple vs SASL
-            "simple vs sasl", "simple vs sasl bind", "simple sasl",  # tool_simple_vs_sasl_bind
-            "ldapwhoami", "whoami ldap", "bind simple", "bind sasl",  # tool_simple_vs_sasl_bind
-            "comparar bind", "comparar autenticacion", "fallback bind",  # tool_simple_vs_sasl_bind
-            
-            # Comparación ACLs
-            "acl diff", "acls", "comparar acls", "comparar permisos",  # tool_acl_diff
-            "anonimo vs admin", "anonimo admin", "permisos anonimo",  # tool_acl_diff
-            "diferencia permisos", "control acceso", "escalacion privilegios",  # tool_acl_diff
-            
-            # Test de Cambio de Contraseña
-            "self password change", "cambiar contraseña", "password change",  # tool_self_password_change
-            "by self write", "self write", "cambio contraseña",  # tool_self_password_change
-            "escalacion privilegios", "privilege escalation", "low priv",  # tool_self_password_change
-            
-            # Fingerprint NSE
-            "ldap nmap nse", "nmap nse", "fingerprint nmap",  # tool_ldap_nmap_nse
-            "nse scripts", "ldap-rootdse", "ldap-search",  # tool_ldap_nmap_nse
-            "reconocimiento externo", "fingerprint externo"  # tool_ldap_nmap_nse
-        ]
-        
-        # Verifica si alguno de los patrones está presente en la consulta
-        return any(patron in consulta_lower for patron in patrones_conocidos)
+        return self._identificar_herramienta(consulta) is not None
     
     def _identificar_herramienta(self, consulta: str) -> Optional[str]:
         """
         Identifica qué herramienta usar para la consulta.
         
-        Esta función mapea consultas de texto a herramientas específicas disponibles
-        en el sistema. Incluye tanto herramientas obligatorias como adicionales.
+        Usa el matcher compilado a partir de INTENCIONES: una sola pasada sobre la
+        consulta, con prioridades explícitas cuando aparecen patrones de varias
+        herramientas.
         
         Args:
             consulta (str): La consulta del usuario
@@ -167,41 +270,7 @@ class AgenteCoordinador:
         Returns:
             Optional[str]: Nombre de la herramienta a usar, o None si no encuentra match
         """
-        consulta_lower = consulta.lower()
-        
-        # Herramientas obligatorias
-        if any(palabra in consulta_lower for palabra in ["quién soy", "quien soy", "who am i"]):
-            return "get_current_user_info"
-        elif any(palabra in consulta_lower for palabra in ["qué grupos", "que grupos", "what groups"]):
-            return "get_user_groups"
-        elif any(palabra in consulta_lower for palabra in ["reset", "reseteo", "reiniciar"]):
-            return "reset_system"
-        
-        # Herramientas adicionales de seguridad ofensiva
-        elif any(palabra in consulta_lower for palabra in ["listar usuarios", "lista usuarios", "todos los usuarios", "list users", "all users"]):
-            return "list_all_users"
-        elif any(palabra in consulta_lower for palabra in ["buscar usuarios", "usuarios por departamento", "search users", "users by department"]):
-            return "search_users_by_department"
-        elif any(palabra in consulta_lower for palabra in ["estructura ldap", "estructura del directorio", "ldap structure", "directory structure"]):
-            return "analyze_ldap_structure"
-        
-        # Herramientas ofensivas
-        elif any(palabra in consulta_lower for palabra in ["rootdse", "root dse", "rootdse info", "root dse info", "análisis rootdse", "analisis rootdse", "rootdse analysis", "información servidor", "server info", "ldap info", "ldap server info"]):
-            return "tool_rootdse_info"
-        elif any(palabra in consulta_lower for palabra in ["enumeración anónima", "enumeracion anonima", "anonymous enum", "bind anónimo", "bind anonimo", "anonymous bind", "usuarios anónimos", "usuarios anonimos", "anonymous users", "enumerar usuarios", "enumerar grupos", "list users groups"]):
-            return "tool_anonymous_enum"
-        elif any(palabra in consulta_lower for palabra in ["starttls", "start tls", "tls test", "test tls", "test seguridad", "seguridad tls", "tls security", "downgrade tls", "tls downgrade", "handshake tls"]):
-            return "tool_starttls_test"
-        elif any(palabra in consulta_lower for palabra in ["simple vs sasl", "simple vs sasl bind", "simple sasl", "ldapwhoami", "whoami ldap", "bind simple", "bind sasl", "comparar bind", "comparar autenticacion", "fallback bind"]):
-            return "tool_simple_vs_sasl_bind"
-        elif any(palabra in consulta_lower for palabra in ["acl diff", "acls", "comparar acls", "comparar permisos", "anonimo vs admin", "anonimo admin", "permisos anonimo", "diferencia permisos", "control acceso", "escalacion privilegios"]):
-            return "tool_acl_diff"
-        elif any(palabra in consulta_lower for palabra in ["self password change", "cambiar contraseña", "password change", "by self write", "self write", "cambio contraseña", "escalacion privilegios", "privilege escalation", "low priv"]):
-            return "tool_self_password_change"
-        elif any(palabra in consulta_lower for palabra in ["ldap nmap nse", "nmap nse", "fingerprint nmap", "nse scripts", "ldap-rootdse", "ldap-search", "reconocimiento externo", "fingerprint externo"]):
-            return "tool_ldap_nmap_nse"
-        
-        return None
+        return self.matcher.match(normalizar_consulta(consulta))
     
     def _determinar_tipo_herramienta(self, consulta: str) -> str:
         """Determina qué tipo de herramienta generar"""
@@ -216,11 +285,56 @@ class AgenteCoordinador:
         
         return "generic_query"
     
-    def registrar_herramienta(self, nombre: str):
-        """Registra una nueva herramienta disponible"""
+    def registrar_herramienta(self, nombre: str, consulta: Optional[str] = None):
+        """
+        Registra una nueva herramienta disponible (invalida las decisiones cacheadas).
+        
+        Args:
+            nombre (str): Nombre de la herramienta
+            consulta (str, optional): Consulta que originó la herramienta; se agrega como
+                                      ejemplo para enrutar sus paráfrasis sin generar otra
+        """
         self.herramientas_disponibles.add(nombre)
+        if consulta:
+            self.router.add(nombre, [normalizar_consulta(consulta)])
+        self.invalidar_decisiones()
         console.print(Panel(f"✅ Nueva herramienta registrada: {nombre}", style="green"))
     
+    def cargar_herramientas_generadas(self, consultas: Dict[str, str]) -> int:
+        """
+        Registra herramientas generadas en ejecuciones anteriores (p. ej. desde el registry).
+        
+        Sus consultas se agregan como ejemplos del enrutamiento semántico, así que las
+        paráfrasis se ejecutan con la herramienta guardada en lugar de generar otra.
+        
+        Args:
+            consultas (Dict[str, str]): Nombre de herramienta → consulta que la originó
+            
+        Returns:
+            int: Número de herramientas registradas
+        """
+        for nombre, consulta in consultas.items():
+            self.herramientas_disponibles.add(nombre)
+            self.router.add(nombre, [normalizar_consulta(consulta)])
+        if consultas:
+            self.invalidar_decisiones()
+            console.print(Panel(f"♻️ {len(consultas)} herramientas generadas disponibles para reutilizar", style="green"))
+        return len(consultas)
+    
+    def reset_herramientas(self) -> int:
+        """
+        Olvida las herramientas registradas y sus ejemplos de enrutamiento.
+        
+        Returns:
+            int: Número de herramientas olvidadas
+        """
+        herramientas = list(self.herramientas_disponibles)
+        for nombre in herramientas:
+            self.router.discard(nombre)
+        self.herramientas_disponibles.clear()
+        self.invalidar_decisiones()
+        return len(herramientas)
+    
     def registrar_consulta(self, consulta: str, resultado: str):
         """Registra una consulta y su resultado"""
         self.historial_consultas.append({
@@ -230,9 +344,21 @@ class AgenteCoordinador:
         })
     
     def obtener_estadisticas(self) -> Dict[str, Any]:
-        """Obtiene estadísticas del sistema"""
+        """Obtiene estadísticas del sistema (incluida la caché de decisiones)"""
+        with self._decisiones_lock:
+            cache = {**self._decisiones_stats, "entradas": len(self._decisiones), "max_entradas": self.max_decisiones}
+            enrutadas = self._enrutadas_semanticamente
+        consultas = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = round(cache["hits"] / consultas, 4) if consultas else 0.0
+        
         return {
             "herramientas_disponibles": len(self.herramientas_disponibles),
             "consultas_procesadas": len(self.historial_consultas),
-            "herramientas": list(self.herramientas_disponibles)
+            "herramientas": list(self.herramientas_disponibles),
+            "cache_decisiones": cache,
+            "enrutamiento_semantico": {
+                "enrutadas": enrutadas,
+                "umbral": self.router.threshold,
+                "ejemplos": len(self.router)
+            }
         } 
\ No newline at end of file
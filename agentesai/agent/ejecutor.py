@@ -4,11 +4,11 @@ Agente Ejecutor - Maneja y ejecuta las herramientas existentes
 
 import logging
 from typing import Dict, Any, Optional, Callable
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from ..manifest import AGENT_EXECUTOR, get_manifest_registry
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 class AgenteEjecutor:
@@ -21,26 +21,11 @@ class AgenteEjecutor:
         self._inicializar_herramientas_base()
     
     def _inicializar_herramientas_base(self):
-        """Inicializa las herramientas base y adicionales del sistema"""
-        from ..tools_base import (
-            get_current_user_info, 
-            get_user_groups, 
-            reset_system,
-            list_all_users,
-            search_users_by_department,
-            analyze_ldap_structure
-        )
-        
+        """Inicializa las herramientas base declaradas en los manifiestos"""
+        # Las herramientas base viven en tools_base, que ya está importado: se resuelven al arrancar
         self.herramientas_base = {
-            # Herramientas obligatorias (requeridas por el challenge)
-            "get_current_user_info": get_current_user_info,
-            "get_user_groups": get_user_groups,
-            "reset_system": reset_system,
-            
-            # Herramientas adicionales de seguridad ofensiva (datos reales del LDAP)
-            "list_all_users": list_all_users,
-            "search_users_by_department": search_users_by_department,
-            "analyze_ldap_structure": analyze_ldap_structure
+            nombre: manifest.load()
+            for nombre, manifest in get_manifest_registry().by_agent(AGENT_EXECUTOR).items()
         }
         
         # Registrar en herramientas generales
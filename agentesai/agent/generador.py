@@ -2,19 +2,25 @@
 Agente Generador - Crea nuevas herramientas dinámicamente usando IA
 """
 
+import hashlib
 import logging
 import os
-from typing import Dict, Any, Optional
-from rich.console import Console
+import threading
+from typing import Dict, Any, Callable, Optional
 from rich.panel import Panel
+from ..tools_base.output import console
+from .coordinador import huella_consulta, normalizar_consulta
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Herramientas ya compiladas (md5 del código → función), compartidas por los generadores del proceso
+_funciones_compiladas: Dict[str, Callable] = {}
+_funciones_lock = threading.Lock()
+
 class AgenteGenerador:
     """Agente que genera nuevas herramientas usando IA"""
     
@@ -183,6 +189,7 @@ class AgenteGenerador:
                - ldap_conn.list_all_users() -> list[dict] (usuarios con atributos completos)
                - ldap_conn.list_all_groups() -> list[dict] (grupos con atributos completos)
                - ldap_conn.get_user_info(username) -> dict o None
+               - ldap_conn.get_users_info(usernames) -> dict {username: dict o None} (varios usuarios en pocas búsquedas; usar en lugar de get_user_info en bucles)
                - ldap_conn.get_user_groups(username) -> list o None
             
             4. ATRIBUTOS DISPONIBLES EN USUARIOS:
@@ -349,17 +356,44 @@ class AgenteGenerador:
             logger.error(f"Error creando función dinámica: {e}")
             return None
     
+    def cargar_herramienta(self, codigo: str, consulta: str) -> Optional[Callable]:
+        """
+        Función ejecutable de una herramienta generada previamente (sin llamar a Gemini).
+        
+        El código se compila una sola vez por proceso; las cargas siguientes del
+        mismo código devuelven la función ya creada.
+        
+        Args:
+            codigo (str): Código fuente guardado en el registry
+            consulta (str): Consulta que originó la herramienta
+            
+        Returns:
+            Optional[Callable]: Función de la herramienta o None si el código no es válido
+        """
+        clave = hashlib.md5(codigo.encode("utf-8")).hexdigest()
+        with _funciones_lock:
+            funcion = _funciones_compiladas.get(clave)
+        if funcion is not None:
+            return funcion
+        
+        funcion = self._crear_funcion_dinamica(codigo, consulta)
+        if funcion is not None:
+            with _funciones_lock:
+                funcion = _funciones_compiladas.setdefault(clave, funcion)
+        return funcion
+    
     def _generar_nombre_herramienta(self, consulta: str) -> str:
         """
         Genera un nombre único para la herramienta
-        """
-        import hashlib
         
+        El hash se calcula sobre la consulta normalizada: las consultas equivalentes
+        producen el mismo nombre.
+        """
         # Crear hash de la consulta para nombre único
-        hash_consulta = hashlib.md5(consulta.encode()).hexdigest()[:8]
+        hash_consulta = huella_consulta(consulta)[:8]
         
         # Generar nombre descriptivo
-        palabras = consulta.lower().split()[:3]
+        palabras = normalizar_consulta(consulta).replace("-", "_").split()[:3]
         nombre_base = "_".join(palabras)
         
         return f"get_{nombre_base}_{hash_consulta}"
@@ -0,0 +1,170 @@
+"""
+Enrutamiento de consultas a herramientas en una sola pasada.
+
+Todos los patrones de texto del catálogo se compilan una vez en un autómata
+Aho-Corasick. Analizar una consulta recorre su texto una sola vez y devuelve
+todas las apariciones de patrones, así que el coste depende de la longitud de
+la consulta y no del número de herramientas o patrones del catálogo.
+
+Resolución cuando aparecen varios patrones:
+1. Un patrón contenido en otro más largo que también aparece se descarta
+   (p. ej. "list users" dentro de "list users groups").
+2. Entre los restantes gana la herramienta de mayor prioridad (número menor);
+   a igual prioridad, el patrón que aparece antes en la consulta.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Aparición de un patrón: (inicio, fin, prioridad, herramienta)
+Match = Tuple[int, int, int, str]
+
+# Entrada del catálogo: (herramienta, prioridad, patrones)
+IntentRule = Tuple[str, int, Iterable[str]]
+
+
+class IntentMatcher:
+    """
+    Autómata Aho-Corasick que asigna consultas a herramientas.
+
+    Atributos:
+        patterns (Dict[str, Tuple[str, int]]): Patrón → (herramienta, prioridad)
+
+    Métodos principales:
+        - add(): Agrega los patrones de una herramienta
+        - match(): Herramienta que corresponde a una consulta (o None)
+        - find_all(): Todas las apariciones de patrones en una consulta
+    """
+
+    def __init__(self, rules: Iterable[IntentRule] = ()):
+        """
+        Inicializa el autómata con un catálogo de reglas.
+
+        Args:
+            rules (Iterable[IntentRule], optional): (herramienta, prioridad, patrones)
+
+        Raises:
+            ValueError: Si un mismo patrón se asigna a dos herramientas
+        """
+        self.patterns: Dict[str, Tuple[str, int]] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._delta: List[Dict[str, int]] = [{}]
+        self._compiled = True
+
+        for tool, priority, patterns in rules:
+            self.add(tool, priority, patterns)
+        self.compile()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def add(self, tool: str, priority: int, patterns: Iterable[str]):
+        """
+        Agrega patrones de una herramienta (el autómata se recompila en el siguiente uso).
+
+        Args:
+            tool (str): Nombre de la herramienta
+            priority (int): Prioridad (menor número = más prioritaria)
+            patterns (Iterable[str]): Textos que, contenidos en la consulta, la enrutan a la herramienta
+
+        Raises:
+            ValueError: Si un patrón ya pertenece a otra herramienta
+        """
+        for pattern in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            anterior = self.patterns.get(pattern)
+            if anterior and anterior[0] != tool:
+                raise ValueError(f"El patrón {pattern!r} ya enruta a {anterior[0]} (no a {tool})")
+            self.patterns[pattern] = (tool, priority)
+
+            state = 0
+            for char in pattern:
+                siguiente = self._goto[state].get(char)
+                if siguiente is None:
+                    siguiente = len(self._goto)
+                    self._goto[state][char] = siguiente
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = siguiente
+            if pattern not in self._output[state]:
+                self._output[state].append(pattern)
+            self._compiled = False
+
+    def compile(self):
+        """
+        Calcula los enlaces de fallo y la tabla de transiciones completa.
+
+        Con la tabla (un DFA) cada carácter de la consulta cuesta una sola
+        búsqueda en un diccionario, sin recorrer cadenas de fallo.
+        """
+        if self._compiled:
+            return
+        cola = list(self._goto[0].values())
+        for state in cola:
+            self._fail[state] = 0
+        delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        i = 0
+        while i < len(cola):
+            state = cola[i]
+            i += 1
+            for char, siguiente in self._goto[state].items():
+                cola.append(siguiente)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                destino = self._goto[fallback].get(char, 0)
+                self._fail[siguiente] = destino if destino != siguiente else 0
+                # Salidas de los sufijos: se heredan una vez y la búsqueda no sigue la cadena de fallos
+                self._output[siguiente] = self._output[siguiente] + [
+                    p for p in self._output[self._fail[siguiente]] if p not in self._output[siguiente]
+                ]
+            if state:
+                delta[state] = {**delta[self._fail[state]], **self._goto[state]}
+        self._delta = delta
+        self._compiled = True
+
+    def find_all(self, text: str) -> List[Match]:
+        """
+        Busca todas las apariciones (incluso solapadas) de patrones en una pasada.
+
+        Args:
+            text (str): Consulta (se compara en minúsculas)
+
+        Returns:
+            List[Match]: (inicio, fin, prioridad, herramienta) por aparición
+        """
+        self.compile()
+        delta, output = self._delta, self._output
+        matches = []
+        state = 0
+        for end, char in enumerate(text.lower(), 1):
+            state = delta[state].get(char, 0)
+            for pattern in output[state]:
+                tool, priority = self.patterns[pattern]
+                matches.append((end - len(pattern), end, priority, tool))
+        return matches
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Herramienta a la que se enruta una consulta.
+
+        Args:
+            text (str): Consulta del usuario
+
+        Returns:
+            Optional[str]: Herramienta ganadora o None si ningún patrón aparece
+        """
+        matches = self.find_all(text)
+        if not matches:
+            return None
+
+        # Descartar apariciones contenidas en otra más larga
+        candidatas = [
+            m for m in matches
+            if not any(o[0] <= m[0] and m[1] <= o[1] and o[1] - o[0] > m[1] - m[0] for o in matches)
+        ]
+        return min(candidatas, key=lambda m: (m[2], m[0]))[3]
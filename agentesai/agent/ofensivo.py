@@ -4,11 +4,11 @@ Agente Ofensivo - Especializado en análisis de seguridad ofensiva y herramienta
 
 import logging
 from typing import Dict, Any, Optional
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from ..manifest import AGENT_OFFENSIVE, get_manifest_registry
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 class AgenteOfensivo:
@@ -35,27 +35,9 @@ class AgenteOfensivo:
         self._inicializar_herramientas_ofensivas()
         
     def _inicializar_herramientas_ofensivas(self):
-        """Inicializa las herramientas ofensivas del sistema"""
-        from ..tools_offensive import (
-            tool_rootdse_info,
-            tool_anonymous_enum,
-            tool_starttls_test,
-            tool_simple_vs_sasl_bind,
-            tool_acl_diff,
-            tool_self_password_change,
-            tool_ldap_nmap_nse,
-            # Futuras herramientas ofensivas se agregarán aquí
-        )
-        
-        self.herramientas_ofensivas = {
-            "tool_rootdse_info": tool_rootdse_info,
-            "tool_anonymous_enum": tool_anonymous_enum,
-            "tool_starttls_test": tool_starttls_test,
-            "tool_simple_vs_sasl_bind": tool_simple_vs_sasl_bind,
-            "tool_acl_diff": tool_acl_diff,
-            "tool_self_password_change": tool_self_password_change,
-            "tool_ldap_nmap_nse": tool_ldap_nmap_nse,
-        }
+        """Inicializa las herramientas ofensivas declaradas en los manifiestos"""
+        # Los manifiestos son invocables: cada módulo se importa la primera vez que se ejecuta su herramienta
+        self.herramientas_ofensivas = dict(get_manifest_registry().by_agent(AGENT_OFFENSIVE))
         
         console.print(Panel(f"🔴 {len(self.herramientas_ofensivas)} herramientas ofensivas inicializadas", style="red"))
     
@@ -123,6 +105,10 @@ class AgenteOfensivo:
         Returns:
             Dict[str, Any]: Información de las herramientas ofensivas
         """
+        costes = {}
+        for nombre, herramienta in self.herramientas_ofensivas.items():
+            costes.setdefault(getattr(herramienta, "cost", "desconocido"), []).append(nombre)
+        
         return {
             "total": len(self.herramientas_ofensivas),
             "herramientas": list(self.herramientas_ofensivas.keys()),
@@ -130,7 +116,8 @@ class AgenteOfensivo:
                 "ldap_analysis": ["tool_rootdse_info"],
                 "enumeration": ["tool_anonymous_enum"],
                 # Futuras categorías se agregarán aquí
-            }
+            },
+            "costes": costes
         }
     
     def obtener_estadisticas(self) -> Dict[str, Any]:
@@ -7,20 +7,27 @@ import json
 import os
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from .coordinador import huella_consulta
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 class RegistryTools:
-    """Sistema de registro y gestión de herramientas"""
+    """
+    Sistema de registro y gestión de herramientas.
+    
+    Además del inventario persistido mantiene un índice huella de la consulta
+    normalizada → herramienta activa, para reutilizar una herramienta generada
+    cuando se repite su consulta (ver buscar_por_consulta).
+    """
     
     def __init__(self, archivo_registro: str = "tools_registry.json"):
         self.archivo_registro = archivo_registro
         self.herramientas_registradas = {}
         self.historial_herramientas = []
+        self._por_huella: Dict[str, str] = {}
         self.cargar_registro()
     
     def cargar_registro(self):
@@ -31,6 +38,7 @@ class RegistryTools:
                     datos = json.load(f)
                     self.herramientas_registradas = datos.get('herramientas', {})
                     self.historial_herramientas = datos.get('historial', [])
+                self._indexar_consultas()
                 
                 console.print(Panel(f"📚 Registry cargado: {len(self.herramientas_registradas)} herramientas", style="green"))
             else:
@@ -108,6 +116,8 @@ class RegistryTools:
             
             # Registrar en el diccionario principal de herramientas
             self.herramientas_registradas[nombre] = metadata_completa
+            if metadata.get('consulta_original'):
+                self._por_huella[huella_consulta(metadata['consulta_original'])] = nombre
             
             # Registrar en el historial para auditoría
             self.historial_herramientas.append({
@@ -137,6 +147,7 @@ class RegistryTools:
             # Marcar como inactiva
             self.herramientas_registradas[nombre]['estado'] = 'inactiva'
             self.herramientas_registradas[nombre]['fecha_desregistro'] = datetime.now().isoformat()
+            self._por_huella = {h: n for h, n in self._por_huella.items() if n != nombre}
             
             # Registrar en historial
             self.historial_herramientas.append({
@@ -160,6 +171,41 @@ class RegistryTools:
         """
         return self.herramientas_registradas.get(nombre)
     
+    def buscar_por_consulta(self, consulta: str) -> Optional[str]:
+        """
+        Herramienta activa generada para una consulta equivalente.
+        
+        Dos consultas son equivalentes si se normalizan igual (acentos, mayúsculas,
+        puntuación y espacios no cuentan): "¿Cuántos grupos hay?" reutiliza la
+        herramienta de "cuantos grupos hay".
+        
+        Args:
+            consulta (str): Consulta del usuario
+            
+        Returns:
+            Optional[str]: Nombre de la herramienta o None si no hay ninguna
+        """
+        return self._por_huella.get(huella_consulta(consulta))
+    
+    def consultas_activas(self) -> Dict[str, str]:
+        """
+        Consultas originales de las herramientas activas.
+        
+        Returns:
+            Dict[str, str]: Nombre de herramienta → consulta que la originó
+        """
+        return {
+            nombre: datos['consulta_original']
+            for nombre, datos in self.herramientas_registradas.items()
+            if datos.get('estado') == 'activa' and datos.get('consulta_original') and datos.get('codigo_generado')
+        }
+    
+    def _indexar_consultas(self):
+        """Reconstruye el índice huella → herramienta a partir de las herramientas activas."""
+        self._por_huella = {
+            huella_consulta(consulta): nombre for nombre, consulta in self.consultas_activas().items()
+        }
+    
     def listar_herramientas(self, filtro_estado: str = None) -> Dict[str, Any]:
         """
         Lista todas las herramientas con filtros opcionales
@@ -227,6 +273,7 @@ class RegistryTools:
         """
         self.herramientas_registradas = {}
         self.historial_herramientas = []
+        self._por_huella = {}
         
         # Eliminar archivo de registro
         if os.path.exists(self.archivo_registro):
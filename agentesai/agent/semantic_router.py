@@ -0,0 +1,252 @@
+"""
+Enrutamiento semántico local para consultas que no contienen ningún patrón.
+
+Cada herramienta aporta ejemplos de texto (sus patrones, su descripción y las
+consultas que originaron herramientas generadas). Los ejemplos se representan
+como vectores TF-IDF dispersos de trigramas de caracteres por palabra, lo que
+tolera flexiones, errores de tipeo y paráfrasis cercanas ("show me every
+account" ≈ "list every user account"). Una consulta se compara contra todos los
+ejemplos en una sola pasada por el índice invertido (solo se puntúan los
+ejemplos que comparten algún trigrama) y gana la herramienta del ejemplo más
+similar si supera el umbral de confianza.
+
+Los números, las negaciones, el tipo de objeto del directorio (usuarios,
+grupos, departamentos) y la restricción a la propia cuenta son literales: una
+consulta solo puede enrutarse por un ejemplo que contiene exactamente los
+mismos ("sede 3" no reutiliza "sede 5", "usuarios sin departamento" no es
+"usuarios por departamento", "todos los grupos" no es "todos los usuarios" y
+"list groups" no es "mis grupos").
+Además la herramienta ganadora debe superar a la segunda por un margen mínimo;
+las consultas ambiguas se tratan como nuevas.
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Similitud coseno mínima para enrutar sin generar (AGENTESAI_SEMANTIC_THRESHOLD)
+DEFAULT_SEMANTIC_THRESHOLD = 0.55
+
+# Ventaja mínima de la herramienta ganadora sobre la segunda
+DEFAULT_SEMANTIC_MARGIN = 0.1
+
+# Longitud de los n-gramas de caracteres
+NGRAM = 3
+
+# Palabras vacías (español e inglés) que no aportan al parecido entre consultas
+STOPWORDS = frozenset(
+    "de la el los las del un una unos unas y o en a al que es son hay por para con se lo le les "
+    "the an of to in is are do does on for and or with".split()
+)
+
+# Palabras que invierten el sentido de una consulta
+NEGATIONS = frozenset("sin no ni nunca excepto salvo without not never except".split())
+
+# Tipos de objeto del directorio: prefijo de palabra → tipo
+ENTITIES = {
+    "usuari": "@usuario", "user": "@usuario", "cuenta": "@usuario", "account": "@usuario",
+    "grup": "@grupo", "group": "@grupo", "membres": "@grupo", "membership": "@grupo",
+    "departament": "@departamento", "department": "@departamento",
+}
+
+# Palabras que restringen la consulta a la propia cuenta ("mis grupos" no es "todos los grupos")
+SELF_SCOPE = frozenset("mi mis yo soy tengo pertenezco my mine i am".split())
+
+_NUMERO = re.compile(r"\d+")
+_ENTIDAD = re.compile(r"\b(" + "|".join(sorted(ENTITIES, key=len, reverse=True)) + r")")
+
+# Vector disperso: n-grama → peso
+Vector = Dict[str, float]
+
+
+def semantic_threshold() -> float:
+    """Umbral de similitud (variable AGENTESAI_SEMANTIC_THRESHOLD, por defecto 0.55; 1 o más lo desactiva)."""
+    try:
+        return float(os.getenv("AGENTESAI_SEMANTIC_THRESHOLD", DEFAULT_SEMANTIC_THRESHOLD))
+    except ValueError:
+        return DEFAULT_SEMANTIC_THRESHOLD
+
+
+def literals(text: str) -> FrozenSet[str]:
+    """Números, negaciones y tipos de objeto de un texto normalizado (deben coincidir para enrutar)."""
+    palabras = text.split()
+    return (frozenset(_NUMERO.findall(text)) | NEGATIONS.intersection(palabras)
+            | {ENTITIES[prefijo] for prefijo in _ENTIDAD.findall(text)}
+            | ({"@propio"} if SELF_SCOPE.intersection(palabras) else set()))
+
+
+def ngrams(text: str, n: int = NGRAM) -> Counter:
+    """
+    Trigramas de caracteres de cada palabra (sin palabras vacías), con un espacio de relleno a cada lado.
+
+    Args:
+        text (str): Texto normalizado (minúsculas, sin acentos ni puntuación)
+        n (int, optional): Longitud de los n-gramas
+
+    Returns:
+        Counter: Frecuencia de cada n-grama
+    """
+    conteo = Counter()
+    for palabra in text.split():
+        if palabra in STOPWORDS:
+            continue
+        palabra = f" {palabra} "
+        if len(palabra) <= n:
+            conteo[palabra] += 1
+            continue
+        for i in range(len(palabra) - n + 1):
+            conteo[palabra[i:i + n]] += 1
+    return conteo
+
+
+class SemanticRouter:
+    """
+    Índice de ejemplos por herramienta y búsqueda del más similar.
+
+    Atributos:
+        threshold (float): Similitud coseno mínima para devolver una herramienta
+        margin (float): Ventaja mínima sobre la segunda herramienta más similar
+
+    Métodos principales:
+        - add(): Agrega ejemplos de una herramienta
+        - discard(): Elimina los ejemplos de una herramienta
+        - nearest(): Herramienta del ejemplo más similar y su similitud
+        - route(): Herramienta si la similitud supera el umbral (o None)
+    """
+
+    def __init__(self, threshold: Optional[float] = None, margin: float = DEFAULT_SEMANTIC_MARGIN):
+        """
+        Args:
+            threshold (float, optional): Umbral de similitud (por defecto AGENTESAI_SEMANTIC_THRESHOLD)
+            margin (float, optional): Ventaja mínima sobre la segunda herramienta
+        """
+        self.threshold = semantic_threshold() if threshold is None else threshold
+        self.margin = margin
+        self._examples: List[Tuple[str, str, FrozenSet[str]]] = []
+        self._lock = threading.Lock()
+        self._index: Optional[Tuple[Dict[str, float], Dict[str, List[Tuple[int, float]]], List[Tuple[str, FrozenSet[str]]]]] = None
+
+    def __len__(self) -> int:
+        return len(self._examples)
+
+    def add(self, tool: str, texts: Iterable[str], shared_literals: FrozenSet[str] = frozenset()):
+        """
+        Agrega ejemplos de una herramienta (el índice se reconstruye en la siguiente búsqueda).
+
+        Args:
+            tool (str): Nombre de la herramienta
+            texts (Iterable[str]): Textos normalizados que describen la herramienta
+            shared_literals (FrozenSet[str], optional): Literales que se suman a los de cada
+                ejemplo (p. ej. los de la descripción, para que el patrón "what groups" de
+                una herramienta de grupos propios no atienda "list groups")
+        """
+        nuevos = [(tool, texto, shared_literals) for texto in texts if texto and texto.strip()]
+        if not nuevos:
+            return
+        with self._lock:
+            self._examples.extend(nuevos)
+            self._index = None
+
+    def discard(self, tool: str) -> int:
+        """
+        Elimina los ejemplos de una herramienta.
+
+        Args:
+            tool (str): Nombre de la herramienta
+
+        Returns:
+            int: Ejemplos eliminados
+        """
+        with self._lock:
+            antes = len(self._examples)
+            self._examples = [ejemplo for ejemplo in self._examples if ejemplo[0] != tool]
+            if len(self._examples) != antes:
+                self._index = None
+            return antes - len(self._examples)
+
+    def nearest(self, text: str, k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Herramientas más similares a una consulta (por su mejor ejemplo).
+
+        Args:
+            text (str): Consulta normalizada
+            k (int, optional): Número de herramientas a devolver
+
+        Returns:
+            List[Tuple[str, float]]: (herramienta, similitud coseno) de mayor a menor;
+                vacía si ningún ejemplo comparte trigramas y literales con la consulta
+        """
+        idf, postings, examples = self._build()
+        # Los n-gramas que no aparecen en ningún ejemplo cuentan con el IDF máximo:
+        # no suman similitud pero sí reducen la de consultas con mucho texto desconocido
+        vector = self._vectorize(ngrams(text), idf, default=math.log(1 + len(examples)) + 1)
+        if not vector:
+            return []
+
+        # Producto escalar disperso: solo los ejemplos que comparten algún n-grama
+        scores: Dict[int, float] = {}
+        for gram, peso in vector.items():
+            for idx, peso_ejemplo in postings.get(gram, ()):
+                scores[idx] = scores.get(idx, 0.0) + peso * peso_ejemplo
+
+        literales = literals(text)
+        por_herramienta: Dict[str, float] = {}
+        for idx, score in scores.items():
+            tool, literales_ejemplo = examples[idx]
+            if literales_ejemplo == literales and score > por_herramienta.get(tool, 0.0):
+                por_herramienta[tool] = score
+        return sorted(por_herramienta.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def route(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Herramienta a la que se enruta una consulta si la similitud alcanza el umbral.
+
+        Args:
+            text (str): Consulta normalizada
+
+        Returns:
+            Optional[Tuple[str, float]]: (herramienta, similitud) o None
+        """
+        if self.threshold >= 1:
+            return None
+        candidatas = self.nearest(text, k=2)
+        if not candidatas or candidatas[0][1] < self.threshold:
+            return None
+        if len(candidatas) > 1 and candidatas[0][1] - candidatas[1][1] < self.margin:
+            return None
+        return candidatas[0]
+
+    def _build(self):
+        """Calcula IDF, vectores normalizados e índice invertido de los ejemplos."""
+        with self._lock:
+            if self._index is not None:
+                return self._index
+
+            conteos = [ngrams(texto) for _, texto, _ in self._examples]
+            df = Counter(gram for conteo in conteos for gram in conteo)
+            total = len(conteos)
+            idf = {gram: math.log((1 + total) / (1 + n)) + 1 for gram, n in df.items()}
+
+            postings: Dict[str, List[Tuple[int, float]]] = {}
+            for idx, conteo in enumerate(conteos):
+                for gram, peso in self._vectorize(conteo, idf).items():
+                    postings.setdefault(gram, []).append((idx, peso))
+
+            examples = [(tool, literals(texto) | compartidos) for tool, texto, compartidos in self._examples]
+            self._index = (idf, postings, examples)
+            return self._index
+
+    @staticmethod
+    def _vectorize(conteo: Counter, idf: Dict[str, float], default: Optional[float] = None) -> Vector:
+        """TF sublineal por IDF, normalizado a norma 1 (sin default se ignoran los n-gramas sin IDF)."""
+        vector = {
+            gram: (1 + math.log(n)) * idf.get(gram, default)
+            for gram, n in conteo.items() if default is not None or gram in idf
+        }
+        norma = math.sqrt(sum(peso * peso for peso in vector.values()))
+        if not norma:
+            return {}
+        return {gram: peso / norma for gram, peso in vector.items()}
@@ -3,10 +3,12 @@ Sistema Principal - Coordina todos los agentes y maneja el flujo de trabajo
 """
 
 import logging
+import os
 from typing import Dict, Any, Optional
-from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
+from ..tools_base.output import console, is_rich_output, set_output_mode
+from ..manifest import AGENT_OFFENSIVE, get_manifest_registry
 
 from .coordinador import AgenteCoordinador
 from .ejecutor import AgenteEjecutor
@@ -14,19 +16,55 @@ from .generador import AgenteGenerador
 from .registry import RegistryTools
 from .ofensivo import AgenteOfensivo
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Reutilización de herramientas generadas (AGENTESAI_TOOL_REUSE):
+# - off: cada consulta desconocida se genera de nuevo
+# - exact: se reutiliza la herramienta de una consulta equivalente (misma forma normalizada)
+# - similar: además, las paráfrasis se enrutan a ella por similitud (ver SemanticRouter)
+TOOL_REUSE_MODES = ("off", "exact", "similar")
+DEFAULT_TOOL_REUSE = "similar"
+
+
+def tool_reuse_mode() -> str:
+    """Modo de reutilización de herramientas generadas (variable AGENTESAI_TOOL_REUSE)."""
+    modo = os.getenv("AGENTESAI_TOOL_REUSE", DEFAULT_TOOL_REUSE).strip().lower()
+    return modo if modo in TOOL_REUSE_MODES else DEFAULT_TOOL_REUSE
+
+
 class SistemaAgentes:
     """Sistema principal que coordina todos los agentes"""
     
-    def __init__(self):
+    def __init__(self, output_mode: Optional[str] = None, archivo_registro: Optional[str] = None,
+                 reutilizacion: Optional[str] = None):
+        """
+        Args:
+            output_mode (str, optional): Modo de salida del proceso ("rich", "plain",
+                                         "json" o "none"). Si no se indica se usa
+                                         AGENTESAI_OUTPUT o "rich".
+            archivo_registro (str, optional): Fichero del registry de herramientas
+                                              (por defecto tools_registry.json)
+            reutilizacion (str, optional): Reutilización de herramientas generadas
+                                           ("off", "exact" o "similar"; por defecto
+                                           AGENTESAI_TOOL_REUSE o "similar")
+        """
+        if output_mode:
+            set_output_mode(output_mode)
+        
         self.coordinador = AgenteCoordinador()
         self.ejecutor = AgenteEjecutor()
         self.generador = AgenteGenerador()
-        self.registry = RegistryTools()
+        self.registry = RegistryTools(archivo_registro) if archivo_registro else RegistryTools()
         self.ofensivo = AgenteOfensivo()
         
+        self.reutilizacion = reutilizacion if reutilizacion in TOOL_REUSE_MODES else tool_reuse_mode()
+        if self.reutilizacion == "similar":
+            # Las herramientas de ejecuciones anteriores se compilan al usarlas por primera vez
+            self.coordinador.cargar_herramientas_generadas(self.registry.consultas_activas())
+        
+        # Tabla de despacho: nombre de herramienta → manifiesto
+        self.manifests = get_manifest_registry()
+        
         # Estado del sistema
         self.estado = "inicializado"
         self.consultas_procesadas = 0
@@ -83,29 +121,21 @@ class SistemaAgentes:
             
             # Paso 2: Ejecutar la decisión tomada
             if decision["accion"] == "ejecutar":
-                # Verificar si es una herramienta ofensiva
-                if decision["herramienta"] == "tool_rootdse_info":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_rootdse_info")
-                elif decision["herramienta"] == "tool_anonymous_enum":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_anonymous_enum")
-                elif decision["herramienta"] == "tool_starttls_test":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_starttls_test")
-                elif decision["herramienta"] == "tool_simple_vs_sasl_bind":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_simple_vs_sasl_bind")
-                elif decision["herramienta"] == "tool_acl_diff":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_acl_diff")
-                elif decision["herramienta"] == "tool_self_password_change":
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_self_password_change")
-                elif decision["herramienta"] == "tool_ldap_nmap_nse":
-                    # Extraer parámetros adicionales de la consulta CLI
-                    parametros = self._extraer_parametros_nmap_nse(consulta)
-                    resultado = self.ejecutar_herramienta_ofensiva("tool_ldap_nmap_nse", **parametros)
+                # Despacho por manifiesto: las herramientas ofensivas van a su agente
+                # con los parámetros que su extractor obtiene de la consulta
+                manifest = self.manifests.get(decision["herramienta"])
+                if manifest is not None and manifest.agent == AGENT_OFFENSIVE:
+                    parametros = manifest.extract_params(consulta)
+                    resultado = self.ejecutar_herramienta_ofensiva(manifest.name, **parametros)
                 else:
                     # La consulta puede ser respondida con herramientas existentes
                     resultado = self._ejecutar_herramienta_existente(decision)
             else:
-                # La consulta requiere generar una nueva herramienta
-                resultado = self._generar_y_ejecutar_herramienta(decision)
+                # Antes de generar: herramienta ya generada para una consulta equivalente
+                resultado = self._reutilizar_herramienta(decision)
+                if resultado is None:
+                    # La consulta requiere generar una nueva herramienta
+                    resultado = self._generar_y_ejecutar_herramienta(decision)
             
             # Paso 3: Registrar la consulta y su resultado para auditoría
             self.coordinador.registrar_consulta(consulta, str(resultado))
@@ -133,6 +163,10 @@ class SistemaAgentes:
         
         console.print(Panel(f"⚡ Ejecutando herramienta existente: {nombre_herramienta}", style="yellow"))
         
+        # Herramienta generada en una ejecución anterior: se carga desde el registry
+        if nombre_herramienta not in self.ejecutor.herramientas:
+            self._cargar_herramienta_generada(nombre_herramienta)
+        
         # Ejecutar la herramienta
         resultado = self.ejecutor.ejecutar_herramienta(nombre_herramienta)
         
@@ -147,6 +181,65 @@ class SistemaAgentes:
             "decision": decision
         }
     
+    def _reutilizar_herramienta(self, decision: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Ejecuta la herramienta ya generada para una consulta equivalente, si existe.
+        
+        Consulta → huella normalizada → entrada del registry → función compilada:
+        una consulta repetida no vuelve a llamar a Gemini, ni siquiera entre ejecuciones.
+        
+        Args:
+            decision (Dict[str, Any]): Decisión "generar" del coordinador
+            
+        Returns:
+            Optional[Dict[str, Any]]: Resultado con tipo "herramienta_reutilizada", o None
+                si hay que generar una herramienta nueva
+        """
+        if self.reutilizacion == "off":
+            return None
+        
+        nombre_herramienta = self.registry.buscar_por_consulta(decision["consulta"])
+        if not nombre_herramienta or not self._cargar_herramienta_generada(nombre_herramienta):
+            return None
+        
+        console.print(Panel(f"♻️ Reutilizando herramienta generada: {nombre_herramienta}", style="green"))
+        
+        resultado = self.ejecutor.ejecutar_herramienta(nombre_herramienta)
+        if not resultado.get("error"):
+            self.registry.incrementar_uso(nombre_herramienta)
+        
+        return {
+            "tipo": "herramienta_reutilizada",
+            "herramienta": nombre_herramienta,
+            "resultado": resultado,
+            "decision": decision
+        }
+    
+    def _cargar_herramienta_generada(self, nombre: str) -> bool:
+        """
+        Agrega al ejecutor una herramienta generada guardada en el registry.
+        
+        Args:
+            nombre (str): Nombre de la herramienta
+            
+        Returns:
+            bool: True si la herramienta está disponible en el ejecutor
+        """
+        if nombre in self.ejecutor.herramientas:
+            return True
+        
+        datos = self.registry.obtener_herramienta(nombre)
+        if not datos or datos.get("estado") != "activa" or not datos.get("codigo_generado"):
+            return False
+        
+        funcion = self.generador.cargar_herramienta(datos["codigo_generado"], datos.get("consulta_original", ""))
+        if funcion is None:
+            logger.warning(f"No se pudo compilar la herramienta guardada {nombre}")
+            return False
+        
+        self.ejecutor.agregar_herramienta_generada(nombre, funcion)
+        return True
+    
     def _generar_y_ejecutar_herramienta(self, decision: Dict[str, Any]) -> Dict[str, Any]:
         """
         Genera una nueva herramienta y la ejecuta
@@ -183,8 +276,9 @@ class SistemaAgentes:
         
         self.registry.registrar_herramienta(nombre_herramienta, metadata)
         
-        # Registrar en coordinador
-        self.coordinador.registrar_herramienta(nombre_herramienta)
+        # Registrar en coordinador (con reutilización por similitud, la consulta enruta sus paráfrasis aquí)
+        self.coordinador.registrar_herramienta(nombre_herramienta,
+                                               consulta if self.reutilizacion == "similar" else None)
         
         # Ejecutar la nueva herramienta
         resultado_ejecucion = self.ejecutor.ejecutar_herramienta(nombre_herramienta)
@@ -211,7 +305,7 @@ class SistemaAgentes:
             self.registry.reset_completo()
             
             # Reset del coordinador
-            self.coordinador.herramientas_disponibles.clear()
+            self.coordinador.reset_herramientas()
             self.coordinador.historial_consultas.clear()
             
             # Reset del estado del sistema
@@ -290,48 +384,10 @@ class SistemaAgentes:
             
             resultado = self.ofensivo.ejecutar_herramienta_ofensiva(nombre, **kwargs)
             
-            # Mostrar resultado formateado para herramientas específicas
-            if nombre == "tool_starttls_test" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.starttls_test import mostrar_resultado_starttls
-                    mostrar_resultado_starttls(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_rootdse_info" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.rootdse_info import mostrar_resultado_rootdse
-                    mostrar_resultado_rootdse(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_anonymous_enum" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.anonymous_enum import mostrar_resultado_enum
-                    mostrar_resultado_enum(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_simple_vs_sasl_bind" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.simple_vs_sasl_bind import mostrar_resultado_simple_vs_sasl
-                    mostrar_resultado_simple_vs_sasl(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_acl_diff" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.acl_diff import mostrar_resultado_acl_diff
-                    mostrar_resultado_acl_diff(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_self_password_change" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.self_password_change import mostrar_resultado_self_password_change
-                    mostrar_resultado_self_password_change(resultado)
-                except ImportError:
-                    console.print("⚠️ No se pudo importar la función de visualización")
-            elif nombre == "tool_ldap_nmap_nse" and not resultado.get("error"):
-                try:
-                    from .tools_offensive.ldap_nmap_nse import mostrar_resultado_ldap_nmap_nse
-                    mostrar_resultado_ldap_nmap_nse(resultado)
-                except ImportError:
+            # Mostrar resultado formateado con la visualización del manifiesto (solo en modo interactivo)
+            manifest = self.manifests.get(nombre)
+            if manifest is not None and is_rich_output() and not resultado.get("error"):
+                if not manifest.render(resultado["resultado"]):
                     console.print("⚠️ No se pudo importar la función de visualización")
             
             # Registrar la operación ofensiva
@@ -347,86 +403,6 @@ class SistemaAgentes:
                 "herramienta": nombre
             }
     
-    def _extraer_parametros_nmap_nse(self, consulta: str) -> Dict[str, Any]:
-        """
-        Extrae parámetros para tool_ldap_nmap_nse desde la consulta CLI.
-        
-        Args:
-            consulta (str): Consulta del usuario
-            
-        Returns:
-            Dict[str, Any]: Parámetros extraídos
-        """
-        parametros = {}
-        
-        try:
-            # Buscar IP o hostname en la consulta
-            import re
-            
-            # Patrones para detectar IPs
-            ip_patterns = [
-                r'\b(?:\d{1,3}\.){3}\d{1,3}\b',  # IPv4
-                r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b',  # IPv6
-            ]
-            
-            # Patrones para detectar hostnames
-            hostname_patterns = [
-                r'\b(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}\b',  # Dominio
-                r'\b[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\b',  # Hostname simple
-            ]
-            
-            # Buscar IPs primero
-            for pattern in ip_patterns:
-                matches = re.findall(pattern, consulta)
-                if matches:
-                    parametros["target"] = matches[0]
-                    break
-            
-            # Si no se encontró IP, buscar hostname
-            if "target" not in parametros:
-                for pattern in hostname_patterns:
-                    matches = re.findall(pattern, consulta)
-                    if matches:
-                        # Filtrar palabras comunes que no son hostnames
-                        palabras_comunes = ["nmap", "nse", "ldap", "fingerprint", "scripts", "reconocimiento", "externo"]
-                        for match in matches:
-                            if match.lower() not in palabras_comunes and len(match) > 2:
-                                parametros["target"] = match
-                                break
-                        if "target" in parametros:
-                            break
-            
-            # Buscar puerto específico
-            puerto_match = re.search(r'\b(\d{3,5})\b', consulta)
-            if puerto_match:
-                puerto = int(puerto_match.group(1))
-                if puerto != 389:  # Solo cambiar si no es el puerto por defecto
-                    parametros["port"] = puerto
-            
-            # Buscar scripts específicos
-            if "ldap-rootdse" in consulta or "rootdse" in consulta:
-                parametros["scripts"] = "ldap-rootdse"
-            elif "ldap-search" in consulta or "search" in consulta:
-                parametros["scripts"] = "ldap-search"
-            elif "ldap-brute" in consulta or "brute" in consulta:
-                parametros["scripts"] = "ldap-brute"
-            
-            # Buscar modo verbose
-            if "verbose" in consulta.lower() or "detallado" in consulta.lower():
-                parametros["verbose"] = True
-            
-            # Buscar timeout personalizado
-            timeout_match = re.search(r'timeout\s*(\d+)', consulta.lower())
-            if timeout_match:
-                parametros["timeout"] = int(timeout_match.group(1))
-            
-            console.print(f"   🔍 Parámetros extraídos: {parametros}")
-            
-        except Exception as e:
-            console.print(f"   ⚠️ Error extrayendo parámetros: {e}")
-        
-        return parametros
-    
     def modo_interactivo(self):
         """
         Activa el modo interactivo del sistema
@@ -3,21 +3,43 @@
 CLI principal para el sistema de agentes AI
 """
 
+import re
 import click
 from dotenv import load_dotenv
-from rich.console import Console
 from rich.panel import Panel
 
-console = Console()
+from agentesai.tools_base.output import OUTPUT_MODES, console, emit_ndjson, emit_result, set_output_mode
 
 @click.command()
 @click.argument('query', required=False)
 @click.option('--reset', is_flag=True, help='Reset del sistema a estado original')
-def main(query, reset):
+@click.option('--dump-snapshot', 'snapshot_path', type=click.Path(dir_okay=False),
+              help='Vuelca el directorio LDAP a un snapshot offline (LDIF + índice)')
+@click.option('--sync-snapshot', 'sync_path', type=click.Path(dir_okay=False),
+              help='Sincroniza un snapshot offline de forma incremental (lo crea si no existe)')
+@click.option('--snapshot-base', default=None, help='DN raíz del subárbol a volcar (por defecto LDAP_BASE_DN)')
+@click.option('--output', 'output', type=click.Choice(OUTPUT_MODES, case_sensitive=False), default=None,
+              help='Modo de salida: rich (tablas), plain (texto), json (solo el resultado) o none '
+                   '(por defecto AGENTESAI_OUTPUT o rich)')
+@click.option('--format', 'fmt', type=click.Choice(['text', 'ndjson'], case_sensitive=False), default='text',
+              show_default=True,
+              help='ndjson: emite un objeto JSON por línea en cuanto se obtiene (para jq y otros scripts)')
+def main(query, reset, snapshot_path, sync_path, snapshot_base, output, fmt):
     """Sistema de Agentes AI Auto-Adaptativos para Offensive Security"""
     
     # Cargar variables de entorno
     load_dotenv()
+    
+    if output:
+        set_output_mode(output)
+
+    if snapshot_path:
+        _dump_snapshot(snapshot_path, snapshot_base)
+        return
+
+    if sync_path:
+        _sync_snapshot(sync_path, snapshot_base)
+        return
 
     if reset:
         console.print(Panel("🔄 Reseteando sistema...", style="blue"))
@@ -31,6 +53,7 @@ def main(query, reset):
             
             # Ejecutar reset completo
             resultado_reset = sistema.reset_sistema()
+            emit_result(resultado_reset)
             
             if resultado_reset.get("error"):
                 console.print(Panel(f"❌ Error en reset: {resultado_reset.get('mensaje', 'Error desconocido')}", style="red"))
@@ -66,6 +89,7 @@ def main(query, reset):
             
             # Ejecutar reset completo
             resultado_reset = sistema.reset_sistema()
+            emit_result(resultado_reset)
             
             if resultado_reset.get("error"):
                 console.print(Panel(f"❌ Error en reset: {resultado_reset.get('mensaje', 'Error desconocido')}", style="red"))
@@ -86,6 +110,10 @@ def main(query, reset):
         
         return
 
+    if fmt.lower() == "ndjson":
+        _stream_ndjson(query)
+        return
+
     console.print(Panel(f"🎯 Procesando consulta: {query}", style="yellow"))
     
     try:
@@ -97,6 +125,7 @@ def main(query, reset):
         
         # Procesar la consulta
         resultado = sistema.procesar_consulta(query)
+        emit_result(resultado)
         
         # Mostrar resultado de manera organizada
         if resultado.get("error"):
@@ -154,7 +183,99 @@ def main(query, reset):
                 console.print(Panel(f"📊 Resultado: {resultado}", style="green"))
             
     except Exception as e:
+        emit_result({"error": True, "mensaje": f"Error procesando consulta: {str(e)}"})
         console.print(Panel(f"❌ Error procesando consulta: {str(e)}", style="red"))
 
+def _stream_ndjson(query):
+    """
+    Emite el resultado de la consulta como NDJSON.
+    
+    Las herramientas con variante en streaming (STREAMING_TOOLS) escriben un
+    usuario por línea a medida que el conector los entrega; el resto emite su
+    resultado completo en una sola línea. Por stdout solo sale NDJSON.
+    """
+    set_output_mode("none")
+    
+    try:
+        from agentesai.agent.sistema import SistemaAgentes
+        from agentesai.tools_base.tools import STREAMING_TOOLS
+        
+        sistema = SistemaAgentes()
+        decision = sistema.coordinador.analizar_consulta(query)
+        herramienta = decision.get("herramienta") if decision.get("accion") == "ejecutar" else None
+        
+        kwargs = {}
+        if herramienta == "search_users_by_department":
+            department = _extraer_departamento(query)
+            if department:
+                kwargs["department"] = department
+            else:
+                herramienta = None
+        
+        if herramienta in STREAMING_TOOLS:
+            total = emit_ndjson(STREAMING_TOOLS[herramienta](**kwargs))
+            sistema.coordinador.registrar_consulta(query, f"{total} registros emitidos en NDJSON")
+        else:
+            emit_ndjson([sistema.procesar_consulta(query)])
+        
+    except Exception as e:
+        emit_ndjson([{"error": True, "mensaje": f"Error procesando consulta: {str(e)}"}])
+
+def _extraer_departamento(query):
+    """Extrae el departamento de consultas como 'usuarios por departamento Development'."""
+    match = re.search(r"(?:departamento|department)\s+(?:de\s+)?([\w-]+)", query, re.IGNORECASE)
+    return match.group(1) if match else None
+
+def _dump_snapshot(snapshot_path, base_dn):
+    """Vuelca el directorio LDAP real a un snapshot local."""
+    console.print(Panel(f"💾 Volcando directorio LDAP a: {snapshot_path}", style="blue"))
+    
+    try:
+        from agentesai.tools_base.ldap_connector import LDAPConnector
+        from agentesai.tools_base.ldap_snapshot import dump_snapshot
+        
+        # Sin caché: el volcado recorre el directorio una sola vez
+        with LDAPConnector(use_cache=False) as ldap_conn:
+            if not ldap_conn.is_connected:
+                console.print(Panel("❌ No se pudo conectar al servidor LDAP", style="red"))
+                return
+            resumen = dump_snapshot(ldap_conn, snapshot_path, base_dn=base_dn)
+        
+        console.print(Panel(
+            f"✅ Snapshot generado: {resumen['entries']} entradas ({resumen['bytes']} bytes)\n"
+            f"📄 LDIF: {resumen['path']}\n"
+            f"🗂️ Índice: {resumen['index']}\n\n"
+            f"Para usarlo: LDAP_SNAPSHOT_PATH={resumen['path']}",
+            style="green"
+        ))
+        
+    except Exception as e:
+        console.print(Panel(f"❌ Error generando snapshot: {str(e)}", style="red"))
+
+def _sync_snapshot(snapshot_path, base_dn):
+    """Sincroniza de forma incremental un snapshot local con el directorio LDAP real."""
+    console.print(Panel(f"🔄 Sincronizando snapshot: {snapshot_path}", style="blue"))
+    
+    try:
+        from agentesai.tools_base.ldap_connector import LDAPConnector
+        from agentesai.tools_base.ldap_sync import DirectorySync, FileSyncStore
+        
+        with LDAPConnector(use_cache=False) as ldap_conn:
+            if not ldap_conn.is_connected:
+                console.print(Panel("❌ No se pudo conectar al servidor LDAP", style="red"))
+                return
+            resumen = DirectorySync(ldap_conn, FileSyncStore(snapshot_path), base_dn=base_dn).refresh()
+        
+        emit_result(resumen)
+        console.print(Panel(
+            f"✅ Sincronización {resumen['mode']}: {resumen['updated']} actualizadas, "
+            f"{resumen['deleted']} eliminadas, {resumen['entries']} entradas ({resumen['elapsed_s']} s)\n\n"
+            f"Para usarlo: LDAP_SNAPSHOT_PATH={snapshot_path}",
+            style="green"
+        ))
+        
+    except Exception as e:
+        console.print(Panel(f"❌ Error sincronizando snapshot: {str(e)}", style="red"))
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
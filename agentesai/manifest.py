@@ -0,0 +1,225 @@
+"""
+Manifiestos declarativos de las herramientas y tabla de despacho.
+
+Cada paquete de herramientas declara en su módulo manifest.py qué herramientas
+ofrece: nombre, función (como "módulo:atributo"), patrones que la activan,
+prioridad, agente que la ejecuta, extractor de parámetros, función de
+visualización y clase de coste. El registro reúne los manifiestos al arrancar
+y de ellos salen el catálogo de intenciones del coordinador y la tabla de
+despacho (un diccionario) del sistema.
+
+Las funciones se referencian por su ruta, así que cargar los manifiestos no
+importa los módulos de las herramientas: cada uno se importa la primera vez
+que se ejecuta, se extraen parámetros o se visualiza su herramienta. Este
+módulo no depende de los agentes para que los paquetes de herramientas puedan
+declarar sus manifiestos sin importarlos.
+"""
+
+import importlib
+import logging
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Agentes que ejecutan las herramientas declaradas
+AGENT_EXECUTOR = "ejecutor"
+AGENT_OFFENSIVE = "ofensivo"
+
+# Clases de coste: sin red, operaciones contra el LDAP, procesos o red externos
+COST_LOCAL = "local"
+COST_LDAP = "ldap"
+COST_EXTERNAL = "externo"
+
+COST_CLASSES = (COST_LOCAL, COST_LDAP, COST_EXTERNAL)
+
+# Módulos con la lista MANIFESTS de cada paquete de herramientas
+DEFAULT_MANIFEST_MODULES = (
+    "agentesai.tools_base.manifest",
+    "agentesai.tools_offensive.manifest",
+)
+
+
+def resolve(ref: str) -> Callable:
+    """
+    Importa el objeto referenciado como "paquete.modulo:atributo".
+
+    Args:
+        ref (str): Referencia a la función
+
+    Returns:
+        Callable: Objeto referenciado
+
+    Raises:
+        ImportError: Si el módulo no existe
+        AttributeError: Si el módulo no define el atributo
+    """
+    modulo, _, atributo = ref.partition(":")
+    return getattr(importlib.import_module(modulo), atributo)
+
+
+class ToolManifest:
+    """
+    Declaración de una herramienta con carga perezosa.
+
+    El manifiesto es invocable: llamarlo importa la herramienta (solo la primera
+    vez) y la ejecuta con los mismos argumentos.
+
+    Atributos:
+        name (str): Nombre de la herramienta
+        entrypoint (str): Función de la herramienta ("módulo:función")
+        patterns (List[str]): Textos de la consulta que la activan
+        description (str): Qué responde la herramienta (ejemplo para el enrutamiento semántico)
+        priority (int): Prioridad en el enrutamiento (menor número = más prioritaria)
+        agent (str): Agente que la ejecuta (AGENT_EXECUTOR o AGENT_OFFENSIVE)
+        extractor (str): Función consulta → parámetros ("módulo:función" o None)
+        renderer (str): Función que muestra el resultado ("módulo:función" o None)
+        cost (str): Clase de coste (COST_LOCAL, COST_LDAP o COST_EXTERNAL)
+    """
+
+    def __init__(self, name: str, entrypoint: str, patterns: Iterable[str] = (), priority: int = 1000,
+                 agent: str = AGENT_EXECUTOR, extractor: Optional[str] = None,
+                 renderer: Optional[str] = None, cost: str = COST_LDAP, description: str = ""):
+        if cost not in COST_CLASSES:
+            raise ValueError(f"Clase de coste desconocida para {name}: {cost!r}")
+        self.name = name
+        self.entrypoint = entrypoint
+        self.patterns = list(patterns)
+        self.priority = priority
+        self.agent = agent
+        self.extractor = extractor
+        self.renderer = renderer
+        self.cost = cost
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f"ToolManifest({self.name!r}, {self.entrypoint!r})"
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.load()(*args, **kwargs)
+
+    @property
+    def loaded(self) -> bool:
+        """True si el módulo de la herramienta ya se importó."""
+        return self.entrypoint.partition(":")[0] in sys.modules
+
+    def load(self) -> Callable:
+        """Función de la herramienta (el módulo se importa en la primera llamada)."""
+        return resolve(self.entrypoint)
+
+    def extract_params(self, consulta: str) -> Dict[str, Any]:
+        """
+        Parámetros de la herramienta extraídos de la consulta.
+
+        Args:
+            consulta (str): Consulta del usuario
+
+        Returns:
+            Dict[str, Any]: Parámetros (vacío si la herramienta no declara extractor)
+        """
+        if not self.extractor:
+            return {}
+        return resolve(self.extractor)(consulta) or {}
+
+    def render(self, resultado: Dict[str, Any]) -> bool:
+        """
+        Muestra el resultado con la función de visualización de la herramienta.
+
+        Args:
+            resultado (Dict[str, Any]): Resultado devuelto por la herramienta
+
+        Returns:
+            bool: True si se mostró, False si no hay visualización o no se pudo importar
+        """
+        if not self.renderer:
+            return False
+        try:
+            renderer = resolve(self.renderer)
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"No se pudo importar la visualización de {self.name}: {e}")
+            return False
+        renderer(resultado)
+        return True
+
+
+class ManifestRegistry:
+    """
+    Manifiestos de todas las herramientas indexados por nombre.
+
+    Métodos principales:
+        - register(): Agrega manifiestos (los nombres no se pueden repetir)
+        - get(): Manifiesto de una herramienta en O(1)
+        - by_agent(): Herramientas de un agente (nombre → manifiesto)
+        - intent_rules(): Catálogo de intenciones para el coordinador
+    """
+
+    def __init__(self, manifests: Iterable[ToolManifest] = ()):
+        self._manifests: Dict[str, ToolManifest] = {}
+        self.register(manifests)
+
+    def __len__(self) -> int:
+        return len(self._manifests)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._manifests
+
+    def __iter__(self):
+        return iter(self._manifests.values())
+
+    def register(self, manifests: Iterable[ToolManifest]):
+        """
+        Agrega manifiestos al registro.
+
+        Args:
+            manifests (Iterable[ToolManifest]): Manifiestos a agregar
+
+        Raises:
+            ValueError: Si una herramienta ya está registrada
+        """
+        for manifest in manifests:
+            if manifest.name in self._manifests:
+                raise ValueError(f"Herramienta declarada dos veces: {manifest.name}")
+            self._manifests[manifest.name] = manifest
+
+    def get(self, name: str) -> Optional[ToolManifest]:
+        """Manifiesto de una herramienta (None si no está declarada)."""
+        return self._manifests.get(name)
+
+    def by_agent(self, agent: str) -> Dict[str, ToolManifest]:
+        """Herramientas que ejecuta un agente, en orden de declaración."""
+        return {m.name: m for m in self._manifests.values() if m.agent == agent}
+
+    def intent_rules(self) -> List[Tuple[str, int, List[str]]]:
+        """Catálogo (herramienta, prioridad, patrones) ordenado por prioridad."""
+        return sorted(((m.name, m.priority, m.patterns) for m in self._manifests.values() if m.patterns),
+                      key=lambda regla: regla[1])
+
+    @classmethod
+    def from_modules(cls, modules: Iterable[str] = DEFAULT_MANIFEST_MODULES) -> "ManifestRegistry":
+        """
+        Crea el registro con la lista MANIFESTS de cada módulo.
+
+        Args:
+            modules (Iterable[str], optional): Módulos de manifiestos a cargar
+
+        Returns:
+            ManifestRegistry: Registro con todos los manifiestos
+        """
+        registro = cls()
+        for modulo in modules:
+            registro.register(importlib.import_module(modulo).MANIFESTS)
+        return registro
+
+
+_registry: Optional[ManifestRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_manifest_registry() -> ManifestRegistry:
+    """Registro compartido con los manifiestos de los paquetes de herramientas."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ManifestRegistry.from_modules()
+        return _registry
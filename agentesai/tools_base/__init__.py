@@ -16,8 +16,46 @@ from .tools import (
     analyze_ldap_structure
 )
 
+# Variantes en streaming (un registro cada vez)
+from .tools import iter_all_users, iter_users_by_department, STREAMING_TOOLS
+
 # Conector LDAP para integración real
-from .ldap_connector import LDAPConnector
+from .ldap_connector import (
+    LDAPConnector,
+    SCOPE_BASE,
+    SCOPE_ONELEVEL,
+    SCOPE_SUBTREE,
+    NO_ATTRS,
+    ALL_USER_ATTRS,
+    ALL_OPERATIONAL_ATTRS
+)
+
+# Entrada LDAP con decodificación perezosa
+from .ldap_entry import LDAPEntry
+
+# Snapshot offline y fábrica de conectores (servidor real o snapshot)
+from .ldap_snapshot import SnapshotConnector, LDAPSnapshot, dump_snapshot, create_connector
+
+# Sincronización incremental con un almacén local
+from .ldap_sync import DirectorySync, SyncStore, FileSyncStore
+
+# Búsquedas de subárbol repartidas por OU
+from .ldap_fanout import iter_search_fanout, plan_partitions
+
+# Análisis de estructura por conteo
+from .ldap_structure import DirectoryStructure, get_directory_structure, invalidate_directory_structure
+
+# Modos de salida de las herramientas (rich, plain, json, none)
+from .output import OUTPUT_MODES, set_output_mode, get_output_mode, output_mode
+
+# Pool de conexiones compartido por el conector
+from .ldap_pool import LDAPConnectionPool, get_pool, close_all_pools
+
+# Índice inverso de pertenencia a grupos
+from .membership import MembershipIndex, get_membership_index, invalidate_membership_index
+
+# Caché de resultados de búsquedas de solo lectura
+from .ldap_cache import LDAPResultCache, get_result_cache, clear_result_cache
 
 __all__ = [
     # Herramientas obligatorias
@@ -30,6 +68,59 @@ __all__ = [
     'search_users_by_department',
     'analyze_ldap_structure',
 
+    # Herramientas en streaming
+    'iter_all_users',
+    'iter_users_by_department',
+    'STREAMING_TOOLS',
+
     # Conector LDAP
-    'LDAPConnector'
+    'LDAPConnector',
+    'SCOPE_BASE',
+    'SCOPE_ONELEVEL',
+    'SCOPE_SUBTREE',
+    'NO_ATTRS',
+    'ALL_USER_ATTRS',
+    'ALL_OPERATIONAL_ATTRS',
+    'LDAPEntry',
+
+    # Snapshot offline
+    'SnapshotConnector',
+    'LDAPSnapshot',
+    'dump_snapshot',
+    'create_connector',
+
+    # Sincronización incremental
+    'DirectorySync',
+    'SyncStore',
+    'FileSyncStore',
+
+    # Fan-out por OU
+    'iter_search_fanout',
+    'plan_partitions',
+
+    # Análisis de estructura
+    'DirectoryStructure',
+    'get_directory_structure',
+    'invalidate_directory_structure',
+
+    # Modos de salida
+    'OUTPUT_MODES',
+    'set_output_mode',
+    'get_output_mode',
+    'output_mode',
+
+    # Pool de conexiones
+    'LDAPConnectionPool',
+    'get_pool',
+    'close_all_pools',
+
+    # Índice de pertenencia
+    'MembershipIndex',
+    'get_membership_index',
+    'invalidate_membership_index',
+
+    # Caché de resultados
+    'LDAPResultCache',
+    'get_result_cache',
+    'clear_result_cache'
 ] 
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Caché de resultados de búsquedas LDAP de solo lectura (LRU + TTL).
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .ldap_entry import LDAPEntry
+from .membership import normalize_dn
+
+# Clave de caché: (servidor, identidad de bind, base, alcance, filtro, atributos, límite)
+CacheKey = Tuple[str, str, str, str, str, Tuple[str, ...], int]
+
+_FILTER_SPACES = re.compile(r"\s*([()&|!])\s*")
+_FILTER_ATTRS = re.compile(r"\(([A-Za-z0-9][\w;.-]*)(~=|>=|<=|:=|=)")
+
+
+class LDAPResultCache:
+    """
+    Caché thread-safe de resultados de búsqueda con expulsión LRU y TTL por entrada.
+
+    Las claves incluyen la identidad de bind, de modo que los resultados vistos por
+    un bind anónimo nunca se sirven a un bind administrativo ni al revés.
+
+    Atributos:
+        max_entries (int): Número máximo de búsquedas cacheadas
+        ttl (float): Segundos de vida de cada entrada
+        max_result_size (int): Máximo de entradas LDAP por resultado cacheable
+
+    Métodos principales:
+        - get(): Obtiene un resultado vigente (o None)
+        - put(): Guarda un resultado
+        - invalidate_subtree(): Descarta resultados afectados por una escritura
+        - clear(): Vacía la caché
+        - get_stats(): Contadores de aciertos, fallos y expulsiones
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0, max_result_size: int = 5000):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            max_entries (int, optional): Búsquedas cacheadas como máximo
+            ttl (float, optional): Tiempo de vida de cada resultado en segundos
+            max_result_size (int, optional): Resultados más grandes no se cachean
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_result_size = max_result_size
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Tuple[Dict[str, Any], ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene un resultado cacheado si sigue vigente.
+
+        Args:
+            key (CacheKey): Clave construida con make_key()
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Copia de las entradas o None si no hay acierto
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+
+            expires_at, entries = item
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+        # LDAPEntry es inmutable; los dicts se copian para que no se altere lo cacheado
+        return [entry if isinstance(entry, LDAPEntry) else dict(entry) for entry in entries]
+
+    def put(self, key: CacheKey, entries: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Guarda un resultado en la caché.
+
+        Args:
+            key (CacheKey): Clave construida con make_key()
+            entries (Iterable[Dict[str, Any]]): Entradas (LDAPEntry o diccionarios)
+
+        Returns:
+            bool: True si se cacheó, False si el resultado supera max_result_size
+        """
+        entries = tuple(entry if isinstance(entry, LDAPEntry) else dict(entry) for entry in entries)
+        if len(entries) > self.max_result_size:
+            return False
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entries)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return True
+
+    def invalidate_subtree(self, dn: str, server_url: str = None) -> int:
+        """
+        Descarta los resultados que una escritura sobre `dn` puede haber dejado obsoletos.
+
+        Se invalidan las búsquedas cuya base contiene al DN modificado (el DN está
+        en su alcance) y las que tienen su base dentro del DN modificado, para
+        todas las identidades de bind.
+
+        Args:
+            dn (str): DN escrito
+            server_url (str, optional): Limitar la invalidación a un servidor
+
+        Returns:
+            int: Número de resultados descartados
+        """
+        objetivo = normalize_dn(dn)
+
+        with self._lock:
+            afectadas = [
+                key for key in self._entries
+                if (server_url is None or key[0] == server_url)
+                and (_is_descendant(objetivo, key[2]) or _is_descendant(key[2], objetivo))
+            ]
+            for key in afectadas:
+                del self._entries[key]
+            self._stats["invalidations"] += len(afectadas)
+
+        return len(afectadas)
+
+    def clear(self):
+        """Vacía la caché conservando los contadores."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de uso de la caché.
+
+        Returns:
+            Dict[str, Any]: Contadores, tamaño actual y tasa de aciertos
+        """
+        with self._lock:
+            consultas = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hit_rate": round(self._stats["hits"] / consultas, 4) if consultas else 0.0
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def make_key(server_url: str, bind_dn: str, base_dn: str, scope: str, filter_str: str,
+             attributes: Optional[Iterable[str]], size_limit: int = 0) -> CacheKey:
+    """
+    Construye la clave de caché normalizada de una búsqueda.
+
+    Args:
+        server_url (str): URL del servidor LDAP
+        bind_dn (str): Identidad de bind ("" para anónimo)
+        base_dn (str): DN base de la búsqueda
+        scope (str): Alcance ('base', 'onelevel', 'subtree')
+        filter_str (str): Filtro LDAP
+        attributes (Iterable[str], optional): Atributos solicitados
+        size_limit (int, optional): Límite de tamaño de la búsqueda
+
+    Returns:
+        CacheKey: Clave hashable
+    """
+    attrs = tuple(sorted({a.lower() for a in attributes})) if attributes else ('*',)
+    return (
+        server_url,
+        (bind_dn or "").lower(),
+        normalize_dn(base_dn),
+        str(scope).lower(),
+        normalize_filter(filter_str),
+        attrs,
+        size_limit or 0
+    )
+
+
+def normalize_filter(filter_str: str) -> str:
+    """
+    Normaliza un filtro LDAP para que variantes equivalentes compartan clave.
+
+    Elimina espacios alrededor de los operadores, pasa a minúsculas los nombres de
+    atributo (los valores se conservan) y añade los paréntesis exteriores si faltan.
+
+    Args:
+        filter_str (str): Filtro LDAP
+
+    Returns:
+        str: Filtro normalizado
+    """
+    normalizado = _FILTER_SPACES.sub(r"\1", (filter_str or "").strip())
+    if not normalizado.startswith("("):
+        normalizado = f"({normalizado})"
+    return _FILTER_ATTRS.sub(lambda m: f"({m.group(1).lower()}{m.group(2)}", normalizado)
+
+
+def _is_descendant(dn: str, ancestor: str) -> bool:
+    """Indica si `dn` es igual a `ancestor` o está debajo de él (DNs normalizados)."""
+    if not ancestor:
+        return True
+    return dn == ancestor or dn.endswith("," + ancestor)
+
+
+# ============================================================================
+# CACHÉ COMPARTIDA POR TODOS LOS CONECTORES
+# ============================================================================
+
+_result_cache: Optional[LDAPResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """Indica si la caché está habilitada (variable LDAP_CACHE_ENABLED, por defecto sí)."""
+    return os.getenv("LDAP_CACHE_ENABLED", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_result_cache() -> LDAPResultCache:
+    """
+    Obtiene la caché de resultados compartida, creándola en el primer uso.
+
+    La configuración se lee de LDAP_CACHE_MAX_ENTRIES, LDAP_CACHE_TTL y
+    LDAP_CACHE_MAX_RESULT_SIZE.
+
+    Returns:
+        LDAPResultCache: Caché compartida
+    """
+    global _result_cache
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = LDAPResultCache(
+                max_entries=int(os.getenv("LDAP_CACHE_MAX_ENTRIES", "256")),
+                ttl=float(os.getenv("LDAP_CACHE_TTL", "60")),
+                max_result_size=int(os.getenv("LDAP_CACHE_MAX_RESULT_SIZE", "5000"))
+            )
+        return _result_cache
+
+
+def clear_result_cache():
+    """Vacía la caché de resultados compartida."""
+    with _result_cache_lock:
+        if _result_cache is not None:
+            _result_cache.clear()
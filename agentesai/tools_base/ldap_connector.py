@@ -3,13 +3,87 @@ Conector LDAP real para el servidor OpenLDAP activo.
 """
 
 import os
+import time
 import ldap
-from typing import Dict, Any, List, Optional
-from rich.console import Console
+import ldap.dn
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from ldap.controls import SimplePagedResultsControl
+from ldap.filter import escape_filter_chars
 from rich.panel import Panel
 from rich.table import Table
+from .output import console
 
-console = Console()
+from .ldap_pool import CONNECTION_ERRORS, get_pool, is_alive, pool_enabled
+from .membership import (
+    DEFAULT_DEPARTMENT,
+    GROUP_DEPT_MAPPING,
+    GROUPS_BASE_DN,
+    GROUPS_FILTER,
+    MembershipIndex,
+    get_membership_index,
+    groups_deciding,
+    groups_for_department,
+    invalidate_membership_index,
+    normalize_dn
+)
+from .ldap_cache import LDAPResultCache, cache_enabled, get_result_cache, make_key
+from .ldap_entry import LDAPEntry
+
+
+# Tamaño de página por defecto para búsquedas paginadas (RFC 2696)
+DEFAULT_PAGE_SIZE = 500
+
+# Alcances de búsqueda (se resuelven a las constantes de python-ldap en cada llamada)
+SCOPE_BASE = "base"
+SCOPE_ONELEVEL = "onelevel"
+SCOPE_SUBTREE = "subtree"
+
+# Selectores especiales de atributos (RFC 4511 / RFC 3673)
+NO_ATTRS = ['1.1']
+ALL_USER_ATTRS = '*'
+ALL_OPERATIONAL_ATTRS = '+'
+
+# Atributos que consumen los listados del conector
+USER_ATTRS = ['uid', 'displayName', 'mail', 'title']
+USER_DETAIL_ATTRS = USER_ATTRS + ['homeDirectory', 'loginShell', 'uidNumber', 'gidNumber']
+GROUP_ATTRS = ['cn', 'description', 'member']
+
+# Administrador por defecto si LDAP_ADMIN_DN / LDAP_ADMIN_PASSWORD no están definidas
+DEFAULT_ADMIN_DN = "CN=admin,DC=meli,DC=com"
+DEFAULT_ADMIN_PASSWORD = "itachi"
+
+# Base y filtro de los usuarios del directorio
+USERS_BASE_DN = "ou=users,dc=meli,dc=com"
+USERS_FILTER = "(objectClass=inetOrgPerson)"
+
+# Máximo de DNs resueltos por cada filtro OR al resolver miembros de grupos
+MEMBER_FILTER_BATCH = 200
+
+# Máximo de uids por filtro OR en get_users_info() (configurable con LDAP_UID_FILTER_BATCH)
+UID_FILTER_BATCH = 200
+
+# Segundos máximos para establecer la conexión TCP (configurable con LDAP_NETWORK_TIMEOUT)
+DEFAULT_NETWORK_TIMEOUT = 5
+
+# Segundos máximos de cada operación, incluida la espera de su respuesta
+# (configurable con LDAP_OPERATION_TIMEOUT; 0 = sin límite)
+DEFAULT_OPERATION_TIMEOUT = 30
+
+# TCP keepalive: inactividad antes del primer sondeo (LDAP_KEEPALIVE_IDLE; 0 lo
+# desactiva), sondeos sin respuesta tolerados y segundos entre sondeos
+DEFAULT_KEEPALIVE_IDLE = 60
+KEEPALIVE_PROBES = 3
+KEEPALIVE_INTERVAL = 10
+
+# Reconexión transparente: intentos (LDAP_RECONNECT_ATTEMPTS) y espera exponencial acotada
+DEFAULT_RECONNECT_ATTEMPTS = 3
+RECONNECT_BACKOFF = 0.2
+RECONNECT_BACKOFF_MAX = 2.0
+
+# Error de python-ldap cuando una respuesta no llega dentro de LDAP_OPERATION_TIMEOUT
+TIMEOUT_ERROR = ldap.TIMEOUT
 
 class LDAPConnector:
     """
@@ -24,18 +98,36 @@ class LDAPConnector:
         admin_dn (str): DN del administrador
         admin_password (str): Contraseña del administrador
         connection (object): Conexión LDAP activa
+        use_pool (bool): Si la conexión se toma prestada del pool compartido
+        bind_dn (str): Identidad con la que se autentica la conexión
+        cache (LDAPResultCache): Caché de resultados compartida (None si está deshabilitada)
         
     Métodos principales:
         - connect(): Establece conexión con el servidor LDAP
         - disconnect(): Cierra la conexión LDAP
+        - ping(): Verifica que la conexión siga viva (WhoAmI)
+        - reconnect(): Sustituye una conexión caída por otra nueva
         - search(): Realiza búsquedas en el directorio
+        - iter_search(): Recorre resultados página a página (Simple Paged Results)
+        - search_many(): Lanza varias búsquedas a la vez y recoge sus resultados
+        - clone(): Conector equivalente para repartir búsquedas entre conexiones
+        - modify(): Modifica una entrada e invalida los resultados cacheados afectados
         - get_user_info(): Obtiene información de un usuario específico
+        - get_users_info(): Obtiene información de varios usuarios por lotes
         - get_user_groups(): Obtiene grupos de un usuario
+        - get_group_members(): Obtiene los miembros de un grupo
+        - get_membership_index(): Índice inverso de pertenencia a grupos
         - list_all_users(): Lista todos los usuarios
+        - iter_all_users(): Recorre los usuarios en streaming
+        - list_users_by_department(): Lista los usuarios de un departamento
         - list_all_groups(): Lista todos los grupos
     """
     
-    def __init__(self, server_url: str = None, base_dn: str = None):
+    # Las búsquedas de subárbol se pueden repartir entre varias conexiones (ldap_fanout)
+    parallel_search = True
+    
+    def __init__(self, server_url: str = None, base_dn: str = None, use_pool: bool = None,
+                 use_cache: bool = None):
         """
         Inicializa el conector LDAP real.
         
@@ -44,13 +136,22 @@ class LDAPConnector:
                                       se toma de las variables de entorno.
             base_dn (str, optional): DN base del directorio. Si no se especifica,
                                    se toma de las variables de entorno.
+            use_pool (bool, optional): Reutilizar conexiones del pool compartido.
+                                     Por defecto se toma de LDAP_POOL_ENABLED.
+            use_cache (bool, optional): Cachear resultados de búsqueda de solo lectura.
+                                      Por defecto se toma de LDAP_CACHE_ENABLED.
         """
         self.server_url = server_url or os.getenv("LDAP_SERVER", "ldap://localhost:389")
         self.base_dn = base_dn or os.getenv("LDAP_BASE_DN", "dc=meli,dc=com")
-        self.admin_dn = os.getenv("LDAP_ADMIN_DN", "CN=admin,DC=meli,DC=com")
-        self.admin_password = os.getenv("LDAP_ADMIN_PASSWORD", "itachi")
+        self.admin_dn = os.getenv("LDAP_ADMIN_DN", DEFAULT_ADMIN_DN)
+        self.admin_password = os.getenv("LDAP_ADMIN_PASSWORD", DEFAULT_ADMIN_PASSWORD)
         self.connection = None
         self.is_connected = False
+        self.bind_dn = self.admin_dn
+        self.use_pool = pool_enabled() if use_pool is None else use_pool
+        self._pool = None
+        use_cache = cache_enabled() if use_cache is None else use_cache
+        self.cache: Optional[LDAPResultCache] = get_result_cache() if use_cache else None
         
         console.print(Panel(f"🔗 Conector LDAP REAL inicializado para: {self.server_url}", style="blue"))
     
@@ -58,22 +159,26 @@ class LDAPConnector:
         """
         Establece conexión real con el servidor LDAP.
         
+        Si el pool está habilitado, la conexión autenticada se toma prestada del
+        pool compartido (servidor, bind DN) y se devuelve en disconnect().
+        
         Returns:
             bool: True si la conexión fue exitosa, False en caso contrario
         """
         try:
-            console.print(Panel(f"🔌 Conectando a servidor LDAP REAL: {self.server_url}", style="yellow"))
+            # Liberar la conexión anterior para no filtrar sesiones al reconectar
+            if self.is_connected:
+                self._release_connection()
             
-            # Configurar LDAP
-            ldap.set_option(ldap.OPT_NETWORK_TIMEOUT, 10)
-            ldap.set_option(ldap.OPT_REFERRALS, 0)
+            console.print(Panel(f"🔌 Conectando a servidor LDAP REAL: {self.server_url}", style="yellow"))
             
-            # Crear conexión
-            self.connection = ldap.initialize(self.server_url)
-            self.connection.set_option(ldap.OPT_REFERRALS, 0)
+            factory = partial(_open_connection, self.server_url, self.bind_dn, self.admin_password)
             
-            # Autenticar como admin
-            self.connection.simple_bind_s(self.admin_dn, self.admin_password)
+            if self.use_pool:
+                self._pool = get_pool(self.server_url, self.bind_dn, factory)
+                self.connection = self._pool.checkout()
+            else:
+                self.connection = factory()
             
             self.is_connected = True
             console.print(Panel("✅ Conexión LDAP REAL establecida exitosamente", style="green"))
@@ -89,14 +194,16 @@ class LDAPConnector:
         """
         Cierra la conexión con el servidor LDAP.
         
+        Con el pool habilitado la conexión no se cierra: se devuelve al pool
+        para que la reutilice el siguiente conector.
+        
         Returns:
             bool: True si la desconexión fue exitosa, False en caso contrario
         """
         try:
             if self.is_connected and self.connection:
                 console.print(Panel("🔌 Desconectando del servidor LDAP...", style="yellow"))
-                self.connection.unbind_s()
-                self.is_connected = False
+                self._release_connection()
                 console.print(Panel("✅ Desconexión LDAP exitosa", style="green"))
                 return True
             return True
@@ -104,17 +211,125 @@ class LDAPConnector:
             console.print(Panel(f"❌ Error desconectando de LDAP: {str(e)}", style="red"))
             return False
     
-    def search(self, base_dn: str, filter_str: str, attributes: List[str] = None) -> List[Dict[str, Any]]:
+    def _release_connection(self):
+        """Devuelve la conexión al pool o la cierra si no se usa pool."""
+        connection, pool = self.connection, self._pool
+        self.connection = None
+        self._pool = None
+        self.is_connected = False
+        
+        if pool is not None:
+            pool.checkin(connection)
+        elif connection is not None:
+            connection.unbind_s()
+    
+    def ping(self) -> bool:
+        """
+        Verifica con una operación barata (WhoAmI o lectura del RootDSE) que la
+        conexión siga viva.
+        
+        Returns:
+            bool: True si el servidor respondió dentro del tiempo de operación
+        """
+        if not self.is_connected or self.connection is None:
+            return False
+        try:
+            return is_alive(self.connection)
+        except Exception:
+            return False
+    
+    def reconnect(self) -> bool:
+        """
+        Sustituye la conexión actual (caída) por una nueva autenticada.
+        
+        La conexión anterior se descarta sin devolverla al pool y la nueva se obtiene
+        con hasta LDAP_RECONNECT_ATTEMPTS intentos separados por una espera
+        exponencial acotada. Las búsquedas la usan de forma transparente cuando el
+        servidor cierra la conexión.
+        
+        Returns:
+            bool: True si se restableció la conexión
+        """
+        connection, pool = self.connection, self._pool
+        self.connection = None
+        if pool is not None and connection is not None:
+            pool.checkin(connection, discard=True)
+        elif connection is not None:
+            try:
+                connection.unbind_s()
+            except Exception:
+                pass
+        
+        factory = partial(_open_connection, self.server_url, self.bind_dn, self.admin_password)
+        if pool is None and self.use_pool:
+            pool = get_pool(self.server_url, self.bind_dn, factory)
+        
+        delay = RECONNECT_BACKOFF
+        error = None
+        for attempt in range(reconnect_attempts()):
+            if attempt:
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_BACKOFF_MAX)
+            try:
+                # Las conexiones inactivas pueden haber caído con esta: verificarlas siempre
+                self.connection = pool.checkout(verify=True) if pool is not None else factory()
+                self._pool = pool
+                self.is_connected = True
+                console.print(Panel("🔄 Conexión LDAP restablecida", style="yellow"))
+                return True
+            except Exception as e:
+                error = e
+        
+        self._pool = None
+        self.is_connected = False
+        console.print(Panel(f"❌ No se pudo restablecer la conexión LDAP: {str(error)}", style="red"))
+        return False
+    
+    def _with_reconnect(self, operation):
+        """
+        Ejecuta una operación de lectura y la repite una vez tras reconectar si la
+        conexión estaba caída.
+        
+        Si la respuesta no llega a tiempo se verifica la conexión: si sigue viva el
+        servidor solo es lento y el error se propaga sin repetir la operación.
+        """
+        try:
+            return operation()
+        except CONNECTION_ERRORS:
+            pass
+        except TIMEOUT_ERROR:
+            if self.ping():
+                raise
+        
+        if not self.reconnect():
+            raise ConnectionError("No se pudo restablecer la conexión LDAP")
+        return operation()
+    
+    def search(self, base_dn: str, filter_str: str, attributes: List[str] = None,
+               scope: str = SCOPE_SUBTREE, size_limit: int = 0,
+               time_limit: float = None) -> List[LDAPEntry]:
         """
         Realiza una búsqueda en el directorio LDAP.
         
+        Los límites de tamaño y tiempo se envían al servidor (search_ext), por lo que
+        solo viajan por la red las entradas que se van a usar. Si el servidor corta la
+        búsqueda por alguno de esos límites se devuelven los resultados parciales.
+        
+        La espera de la respuesta está acotada por LDAP_OPERATION_TIMEOUT y, si la
+        conexión estaba caída, la búsqueda se repite sobre una conexión nueva.
+        
         Args:
             base_dn (str): DN base para la búsqueda
             filter_str (str): Filtro LDAP
-            attributes (List[str], optional): Atributos a retornar
+            attributes (List[str], optional): Atributos a retornar. Admite '*' (atributos
+                                              de usuario), '+' (operacionales) y NO_ATTRS
+                                              (['1.1'], solo DNs)
+            scope (str, optional): 'base', 'onelevel' o 'subtree' (por defecto 'subtree')
+            size_limit (int, optional): Máximo de entradas a devolver (0 = sin límite)
+            time_limit (float, optional): Segundos máximos de búsqueda en el servidor
             
         Returns:
-            List[Dict[str, Any]]: Lista de resultados de la búsqueda
+            List[LDAPEntry]: Entradas encontradas (decodificadas al acceder a cada atributo)
         """
         if not self.is_connected:
             console.print(Panel("❌ No hay conexión LDAP activa", style="red"))
@@ -123,33 +338,402 @@ class LDAPConnector:
         try:
             if attributes is None:
                 attributes = ['*']
+            search_scope = _resolve_scope(scope)
             
-            # Realizar búsqueda
-            result = self.connection.search_s(
-                base_dn,
-                ldap.SCOPE_SUBTREE,
-                filter_str,
-                attributes
-            )
+            cache_key = self._cache_key(base_dn, search_scope, filter_str, attributes, size_limit)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
+            def run():
+                # Realizar búsqueda con límites aplicados por el servidor
+                msgid = self.connection.search_ext(
+                    base_dn,
+                    search_scope,
+                    filter_str,
+                    attributes,
+                    timeout=time_limit or -1,
+                    sizelimit=size_limit or 0
+                )
+                
+                # Procesar resultados (ignorando referencias sin DN)
+                return [LDAPEntry(dn, attrs) for dn, attrs in self._collect_results(msgid)]
+            
+            # Si la conexión estaba caída se reconecta y se repite la búsqueda
+            results = self._with_reconnect(run)
             
-            # Procesar resultados
-            processed_results = []
-            for dn, attrs in result:
-                if dn:  # Ignorar entradas de control
-                    processed_entry = {'dn': dn}
-                    for attr, values in attrs.items():
-                        if isinstance(values, list) and len(values) == 1:
-                            processed_entry[attr] = values[0].decode('utf-8') if isinstance(values[0], bytes) else values[0]
-                        else:
-                            processed_entry[attr] = [v.decode('utf-8') if isinstance(v, bytes) else v for v in values]
-                    processed_results.append(processed_entry)
+            if cache_key is not None:
+                self.cache.put(cache_key, results)
             
-            return processed_results
+            return results
             
         except Exception as e:
             console.print(Panel(f"❌ Error en búsqueda LDAP: {str(e)}", style="red"))
             return []
     
+    def search_many(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, List[LDAPEntry]]:
+        """
+        Realiza varias búsquedas independientes en paralelo sobre la misma conexión.
+        
+        Todas las búsquedas se envían al servidor con search_ext antes de leer ninguna
+        respuesta, por lo que el tiempo total se aproxima al de la búsqueda más lenta
+        en lugar de a la suma de todas. Las búsquedas cacheadas no se envían. Si la
+        conexión se cae, las búsquedas sin completar se reenvían una vez tras reconectar.
+        
+        Args:
+            requests (Dict[str, Dict[str, Any]]): Búsquedas indexadas por nombre. Cada una
+                acepta los mismos argumentos que search(): base_dn, filter_str, attributes,
+                scope, size_limit y time_limit.
+                
+        Returns:
+            Dict[str, List[LDAPEntry]]: Resultados por nombre (lista vacía si la
+                                             búsqueda falló)
+            
+        Example:
+            >>> resultados = conn.search_many({
+            ...     "usuarios": {"base_dn": "ou=users,dc=meli,dc=com", "filter_str": "(uid=*)"},
+            ...     "grupos": {"base_dn": "ou=groups,dc=meli,dc=com", "filter_str": "(cn=*)"}
+            ... })
+        """
+        results: Dict[str, List[LDAPEntry]] = {name: [] for name in requests}
+        
+        if not self.is_connected:
+            console.print(Panel("❌ No hay conexión LDAP activa", style="red"))
+            return results
+        
+        completed = set()
+        for attempt in range(2):
+            try:
+                self._run_searches(requests, results, completed)
+                break
+            except CONNECTION_ERRORS as e:
+                if attempt or not self.reconnect():
+                    console.print(Panel(f"❌ Conexión LDAP perdida en búsquedas en paralelo: {str(e)}",
+                                        style="red"))
+                    break
+                # Reenviar solo las búsquedas que no llegaron a completarse
+                requests = {name: request for name, request in requests.items() if name not in completed}
+        
+        return results
+    
+    def _run_searches(self, requests: Dict[str, Dict[str, Any]], results: Dict[str, List[LDAPEntry]],
+                      completed: set):
+        """
+        Envía las búsquedas de search_many() y recoge sus respuestas.
+        
+        Los errores de cada búsqueda se aíslan; solo se propaga la caída de la conexión.
+        
+        Args:
+            requests (Dict[str, Dict[str, Any]]): Búsquedas indexadas por nombre
+            results (Dict[str, List[LDAPEntry]]): Resultados a rellenar por nombre
+            completed (set): Nombres ya resueltos (con o sin error); se actualiza
+        """
+        # 1. Enviar todas las búsquedas no cacheadas sin esperar respuesta
+        pending = {}
+        for name, request in requests.items():
+            try:
+                attributes = request.get("attributes") or ['*']
+                search_scope = _resolve_scope(request.get("scope", SCOPE_SUBTREE))
+                size_limit = request.get("size_limit", 0)
+                
+                cache_key = self._cache_key(request["base_dn"], search_scope, request["filter_str"],
+                                            attributes, size_limit)
+                if cache_key is not None:
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        results[name] = cached
+                        completed.add(name)
+                        continue
+                
+                msgid = self.connection.search_ext(
+                    request["base_dn"],
+                    search_scope,
+                    request["filter_str"],
+                    attributes,
+                    timeout=request.get("time_limit") or -1,
+                    sizelimit=size_limit or 0
+                )
+                pending[name] = (msgid, cache_key)
+                
+            except CONNECTION_ERRORS:
+                raise
+            except Exception as e:
+                completed.add(name)
+                console.print(Panel(f"❌ Error en búsqueda LDAP '{name}': {str(e)}", style="red"))
+        
+        # 2. Recoger las respuestas (el servidor ya está procesando todas)
+        for name, (msgid, cache_key) in pending.items():
+            try:
+                entries = [LDAPEntry(dn, attrs) for dn, attrs in self._collect_results(msgid)]
+                results[name] = entries
+                if cache_key is not None:
+                    self.cache.put(cache_key, entries)
+                    
+            except CONNECTION_ERRORS:
+                raise
+            except Exception as e:
+                console.print(Panel(f"❌ Error en búsqueda LDAP '{name}': {str(e)}", style="red"))
+            completed.add(name)
+    
+    def _collect_results(self, msgid: int) -> List[tuple]:
+        """
+        Recoge las entradas de una búsqueda asíncrona conservando los resultados
+        parciales si el servidor alcanza el sizelimit o el timelimit.
+        
+        Args:
+            msgid (int): Identificador de la búsqueda devuelto por search_ext
+            
+        Returns:
+            List[tuple]: Pares (dn, atributos) de las entradas recibidas
+            
+        Raises:
+            ldap.TIMEOUT: Si la búsqueda completa no llega en LDAP_OPERATION_TIMEOUT
+        """
+        entries = []
+        deadline = _deadline()
+        try:
+            while True:
+                rtype, data, _, _ = self._result(msgid, deadline, all=0)
+                if rtype == ldap.RES_SEARCH_RESULT:
+                    break
+                if rtype == ldap.RES_SEARCH_ENTRY:
+                    entries.extend((dn, attrs) for dn, attrs in data if dn is not None)
+        except (ldap.SIZELIMIT_EXCEEDED, ldap.TIMELIMIT_EXCEEDED):
+            pass
+        return entries
+    
+    def _result(self, msgid: int, deadline: Optional[float], all: int = 1) -> tuple:
+        """
+        Espera la respuesta de una operación como mucho hasta `deadline`.
+        
+        Si el tiempo se agota la operación se abandona en el servidor para que no
+        siga ocupando la conexión.
+        
+        Args:
+            msgid (int): Identificador de la operación
+            deadline (float, optional): Instante límite (time.monotonic); None sin límite
+            all (int, optional): Esperar el resultado completo (1) o el siguiente mensaje (0)
+            
+        Returns:
+            tuple: Respuesta de result3
+        """
+        timeout = -1 if deadline is None else max(deadline - time.monotonic(), 0.001)
+        try:
+            return self.connection.result3(msgid, all=all, timeout=timeout)
+        except TIMEOUT_ERROR:
+            try:
+                self.connection.abandon(msgid)
+            except Exception:
+                pass
+            raise
+    
+    def iter_search(self, base_dn: str, filter_str: str, attributes: List[str] = None,
+                    page_size: int = None, scope: str = SCOPE_SUBTREE,
+                    size_limit: int = 0, raise_errors: bool = False) -> Iterator[LDAPEntry]:
+        """
+        Recorre una búsqueda LDAP página a página usando el control Simple Paged Results.
+        
+        A diferencia de search(), solo mantiene en memoria una página de resultados
+        y no se ve afectado por el sizelimit del servidor. Si el consumidor deja de
+        iterar antes de tiempo, la búsqueda paginada se cancela en el servidor.
+        
+        Los recorridos completos cuyo tamaño no supera el máximo de la caché se
+        guardan en ella y las siguientes llamadas iguales se sirven sin ir al servidor.
+        
+        Cada página espera como mucho LDAP_OPERATION_TIMEOUT. Si la conexión se cae
+        antes de la primera página la búsqueda se repite sobre una conexión nueva.
+        
+        Args:
+            base_dn (str): DN base para la búsqueda
+            filter_str (str): Filtro LDAP
+            attributes (List[str], optional): Atributos a retornar
+            page_size (int, optional): Entradas por página (por defecto LDAP_PAGE_SIZE)
+            scope (str, optional): 'base', 'onelevel' o 'subtree' (por defecto 'subtree')
+            size_limit (int, optional): Máximo de entradas a devolver (0 = sin límite)
+            raise_errors (bool, optional): Propagar los errores en lugar de terminar el
+                                           recorrido en silencio (para quien necesita
+                                           distinguir un recorrido completo de uno cortado)
+            
+        Yields:
+            LDAPEntry: Entradas con el mismo formato que search()
+        """
+        if not self.is_connected:
+            console.print(Panel("❌ No hay conexión LDAP activa", style="red"))
+            if raise_errors:
+                raise ConnectionError("No hay conexión LDAP activa")
+            return
+        
+        if attributes is None:
+            attributes = ['*']
+        if not page_size:
+            page_size = int(os.getenv("LDAP_PAGE_SIZE", DEFAULT_PAGE_SIZE))
+        if size_limit:
+            # No pedir al servidor una página mayor que lo que se va a consumir
+            page_size = min(page_size, size_limit)
+        
+        search_scope = _resolve_scope(scope)
+        
+        cache_key = self._cache_key(base_dn, search_scope, filter_str, attributes, size_limit)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from cached
+                return
+        # Copia de lo recorrido para cachear; se descarta si supera el máximo
+        buffer = [] if cache_key is not None else None
+        
+        control = SimplePagedResultsControl(True, size=page_size, cookie=b'')
+        cookie = b''
+        completed = False
+        returned = 0
+        retried = False
+        
+        try:
+            while True:
+                try:
+                    msgid = self.connection.search_ext(
+                        base_dn,
+                        search_scope,
+                        filter_str,
+                        attributes,
+                        serverctrls=[control]
+                    )
+                    _, data, _, response_controls = self._result(msgid, _deadline())
+                except CONNECTION_ERRORS:
+                    # La cookie pertenece a la conexión caída: solo se repite si aún no
+                    # se ha entregado ninguna página
+                    if returned or cookie or retried or not self.reconnect():
+                        raise
+                    retried = True
+                    continue
+                
+                # La cookie vacía indica que no quedan más páginas
+                cookie = next(
+                    (c.cookie for c in response_controls or []
+                     if c.controlType == SimplePagedResultsControl.controlType),
+                    b''
+                )
+                
+                for dn, attrs in data:
+                    if dn is None:  # Ignorar referencias
+                        continue
+                    entry = LDAPEntry(dn, attrs)
+                    if buffer is not None:
+                        buffer.append(entry)
+                        if len(buffer) > self.cache.max_result_size:
+                            buffer = None
+                    yield entry
+                    returned += 1
+                    if size_limit and returned >= size_limit:
+                        if buffer is not None:
+                            self.cache.put(cache_key, buffer)
+                        return
+                
+                if not cookie:
+                    completed = True
+                    if buffer is not None:
+                        self.cache.put(cache_key, buffer)
+                    return
+                control.cookie = cookie
+                
+        except Exception as e:
+            completed = True
+            console.print(Panel(f"❌ Error en búsqueda LDAP paginada: {str(e)}", style="red"))
+            if raise_errors:
+                raise
+        
+        finally:
+            if not completed and cookie:
+                self._abandon_paged_search(base_dn, search_scope, filter_str, cookie)
+    
+    def _abandon_paged_search(self, base_dn: str, scope: int, filter_str: str, cookie: bytes):
+        """Libera en el servidor una búsqueda paginada que no se recorrió completa."""
+        try:
+            # Una petición con tamaño 0 y la cookie pendiente cierra el resultado paginado
+            control = SimplePagedResultsControl(True, size=0, cookie=cookie)
+            msgid = self.connection.search_ext(
+                base_dn, scope, filter_str, NO_ATTRS, serverctrls=[control]
+            )
+            self.connection.result3(msgid)
+        except Exception:
+            pass
+    
+    @contextmanager
+    def uncached(self):
+        """
+        Desactiva temporalmente la caché de resultados de este conector.
+        
+        Para lecturas que deben reflejar el estado actual del servidor (por ejemplo
+        la sincronización incremental), sin afectar a otros conectores.
+        
+        Example:
+            >>> with conn.uncached():
+            ...     cambios = list(conn.iter_search(base, "(modifyTimestamp>=...)"))
+        """
+        cache, self.cache = self.cache, None
+        try:
+            yield self
+        finally:
+            self.cache = cache
+    
+    def clone(self) -> "LDAPConnector":
+        """
+        Crea un conector sin conectar con el mismo servidor, identidad, pool y caché.
+        
+        Permite repartir búsquedas entre varias conexiones (ver ldap_fanout).
+        
+        Returns:
+            LDAPConnector: Conector nuevo equivalente a este
+        """
+        clone = LDAPConnector(self.server_url, self.base_dn, use_pool=self.use_pool,
+                              use_cache=self.cache is not None)
+        clone.admin_dn = self.admin_dn
+        clone.admin_password = self.admin_password
+        clone.bind_dn = self.bind_dn
+        clone.cache = self.cache
+        return clone
+    
+    def _cache_key(self, base_dn: str, scope: int, filter_str: str,
+                   attributes: List[str], size_limit: int):
+        """Construye la clave de caché de una búsqueda (None si la caché está deshabilitada)."""
+        if self.cache is None:
+            return None
+        return make_key(self.server_url, self.bind_dn, base_dn, scope, filter_str,
+                        attributes, size_limit)
+    
+    def modify(self, dn: str, modlist: List[tuple]) -> bool:
+        """
+        Modifica una entrada del directorio e invalida los resultados cacheados afectados.
+        
+        Args:
+            dn (str): DN de la entrada a modificar
+            modlist (List[tuple]): Lista de modificaciones (op, atributo, valores) de python-ldap
+            
+        Returns:
+            bool: True si la modificación fue exitosa, False en caso contrario
+        """
+        if not self.is_connected:
+            console.print(Panel("❌ No hay conexión LDAP activa", style="red"))
+            return False
+        
+        try:
+            self.connection.modify_s(dn, modlist)
+            return True
+            
+        except Exception as e:
+            console.print(Panel(f"❌ Error modificando {dn}: {str(e)}", style="red"))
+            if isinstance(e, CONNECTION_ERRORS):
+                # La escritura no se repite (pudo aplicarse), pero la sesión queda lista
+                self.reconnect()
+            return False
+        
+        finally:
+            # Invalidar aunque falle: el servidor pudo aplicar el cambio antes del error
+            if self.cache is not None:
+                self.cache.invalidate_subtree(dn, self.server_url)
+            invalidate_membership_index(self.server_url)
+    
     def get_user_info(self, username: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene información completa de un usuario específico.
@@ -162,33 +746,90 @@ class LDAPConnector:
         """
         try:
             filter_str = f"(uid={username})"
-            results = self.search("ou=users,dc=meli,dc=com", filter_str)
+            results = self.search("ou=users,dc=meli,dc=com", filter_str,
+                                  attributes=USER_DETAIL_ATTRS, size_limit=1)
             
             if results:
                 user_info = results[0]
-                return {
-                    "username": user_info.get("uid", username),
-                    "full_name": user_info.get("displayName", ""),
-                    "email": user_info.get("mail", ""),
-                    "title": user_info.get("title", ""),
-                    "department": self._get_user_department(user_info),
-                    "status": "active",  # Asumimos activo si existe en LDAP
-                    "last_login": "N/A",  # No disponible en LDAP básico
-                    "home_directory": user_info.get("homeDirectory", ""),
-                    "shell": user_info.get("loginShell", ""),
-                    "uid_number": user_info.get("uidNumber", ""),
-                    "gid_number": user_info.get("gidNumber", "")
-                }
+                return _build_user_detail(user_info, self._get_user_department(user_info), username)
             return None
             
         except Exception as e:
             console.print(Panel(f"❌ Error obteniendo información del usuario {username}: {str(e)}", style="red"))
             return None
     
+    def get_users_info(self, usernames: Iterable[str], batch_size: int = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Obtiene la información de varios usuarios con pocas búsquedas.
+        
+        Los nombres se agrupan en filtros (|(uid=a)(uid=b)...) de hasta `batch_size`
+        uids que se envían a la vez con search_many(), y los departamentos de todo
+        el lote se resuelven con un único índice de pertenencia. Resolver 1000
+        usuarios cuesta 5 búsquedas en paralelo en lugar de 1000.
+        
+        Args:
+            usernames (Iterable[str]): Nombres de usuario (se ignoran vacíos y repetidos)
+            batch_size (int, optional): uids por filtro (por defecto LDAP_UID_FILTER_BATCH
+                                        o UID_FILTER_BATCH)
+            
+        Returns:
+            Dict[str, Optional[Dict[str, Any]]]: Información por nombre pedido, con el
+                mismo formato que get_user_info(). Los usuarios que no existen aparecen
+                con valor None.
+                
+        Example:
+            >>> info = conn.get_users_info(["john", "jane", "nadie"])
+            >>> faltan = [u for u, datos in info.items() if datos is None]
+        """
+        requested = list(dict.fromkeys(username for username in usernames if username))
+        users: Dict[str, Optional[Dict[str, Any]]] = {username: None for username in requested}
+        if not requested:
+            return users
+        
+        try:
+            batch_size = max(1, batch_size or int(os.getenv("LDAP_UID_FILTER_BATCH", UID_FILTER_BATCH)))
+            
+            requests = {}
+            for start in range(0, len(requested), batch_size):
+                batch = "".join(f"(uid={escape_filter_chars(username)})"
+                                for username in requested[start:start + batch_size])
+                requests[f"lote_{start // batch_size}"] = {
+                    "base_dn": USERS_BASE_DN,
+                    "filter_str": f"(|{batch})",
+                    "attributes": USER_DETAIL_ATTRS
+                }
+            entries = [entry for batch in self.search_many(requests).values() for entry in batch]
+            if not entries:
+                return users
+            
+            # uid no distingue mayúsculas en el servidor: mapear a los nombres pedidos
+            wanted: Dict[str, List[str]] = {}
+            for username in requested:
+                wanted.setdefault(username.lower(), []).append(username)
+            
+            index = self.get_membership_index()
+            for entry in entries:
+                department = None
+                for uid in entry.all("uid"):
+                    for username in wanted.get(uid.lower(), []):
+                        if users[username] is None:
+                            department = department or index.department_for(entry.dn)
+                            users[username] = _build_user_detail(entry, department, username)
+            
+        except Exception as e:
+            console.print(Panel(f"❌ Error obteniendo información de {len(requested)} usuarios: {str(e)}",
+                                style="red"))
+        
+        return users
+    
     def get_user_groups(self, username: str) -> List[str]:
         """
         Obtiene los grupos de un usuario específico.
         
+        Usa el índice de pertenencia compartido (una sola búsqueda de grupos
+        reutilizada hasta que expira su TTL). Incluye los grupos heredados por
+        anidamiento.
+        
         Args:
             username (str): Nombre de usuario
             
@@ -196,27 +837,46 @@ class LDAPConnector:
             List[str]: Lista de nombres de grupos
         """
         try:
-            groups = []
-            
-            # Buscar en todos los grupos
-            group_results = self.search("ou=groups,dc=meli,dc=com", "(objectClass=groupOfNames)")
+            user_dn = f"cn={username},ou=users,dc=meli,dc=com"
+            return sorted(self.get_membership_index().groups_for(user_dn))
             
-            for group in group_results:
-                members = group.get("member", [])
-                if isinstance(members, str):
-                    members = [members]
-                
-                # Verificar si el usuario es miembro
-                user_dn = f"cn={username},ou=users,dc=meli,dc=com"
-                if user_dn in members:
-                    groups.append(group.get("cn", ""))
+        except Exception as e:
+            console.print(Panel(f"❌ Error obteniendo grupos del usuario {username}: {str(e)}", style="red"))
+            return []
+    
+    def get_group_members(self, group: str, transitive: bool = True) -> List[str]:
+        """
+        Obtiene los miembros de un grupo, incluidos los de sus subgrupos.
+        
+        Se resuelve sobre el índice de pertenencia compartido, sin búsquedas
+        adicionales por cada nivel de anidamiento.
+        
+        Args:
+            group (str): CN o DN del grupo
+            transitive (bool, optional): Incluir los miembros de los grupos anidados
             
-            return groups
+        Returns:
+            List[str]: DNs normalizados de los miembros (sin los subgrupos)
+        """
+        try:
+            return sorted(self.get_membership_index().members_of(group, transitive=transitive))
             
         except Exception as e:
-            console.print(Panel(f"❌ Error obteniendo grupos del usuario {username}: {str(e)}", style="red"))
+            console.print(Panel(f"❌ Error obteniendo miembros del grupo {group}: {str(e)}", style="red"))
             return []
     
+    def get_membership_index(self, refresh: bool = False) -> MembershipIndex:
+        """
+        Obtiene el índice inverso de pertenencia (DN de miembro → grupos).
+        
+        Args:
+            refresh (bool, optional): Fuerza la reconstrucción del índice
+            
+        Returns:
+            MembershipIndex: Índice compartido para este servidor e identidad
+        """
+        return get_membership_index(self, refresh=refresh)
+    
     def list_all_users(self) -> List[Dict[str, Any]]:
         """
         Lista todos los usuarios del directorio.
@@ -225,27 +885,122 @@ class LDAPConnector:
             List[Dict[str, Any]]: Lista de todos los usuarios
         """
         try:
-            results = self.search("ou=users,dc=meli,dc=com", "(objectClass=inetOrgPerson)")
-            users = []
-            
-            for user in results:
-                user_info = {
-                    "username": user.get("uid", ""),
-                    "full_name": user.get("displayName", ""),
-                    "email": user.get("mail", ""),
-                    "title": user.get("title", ""),
-                    "department": self._get_user_department(user),
-                    "status": "active",
-                    "last_login": "N/A"
-                }
-                users.append(user_info)
-            
-            return users
+            return list(self.iter_all_users())
             
         except Exception as e:
             console.print(Panel(f"❌ Error listando usuarios: {str(e)}", style="red"))
             return []
     
+    def iter_all_users(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los usuarios del directorio a medida que llegan del servidor.
+        
+        Variante en streaming de list_all_users(): cada usuario se entrega en cuanto
+        se recibe su página, sin acumular el listado completo en memoria.
+        
+        Yields:
+            Dict[str, Any]: Usuario con el mismo formato que list_all_users()
+        """
+        for user in self.iter_search(USERS_BASE_DN, USERS_FILTER, attributes=USER_ATTRS):
+            yield _build_user_info(user, self._get_user_department(user))
+    
+    def list_users_by_department(self, department: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Lista los usuarios de un departamento sin recorrer todo el directorio.
+        
+        El departamento se traduce a sus grupos con GROUP_DEPT_MAPPING y se leen solo
+        esos grupos (más los de mayor prioridad, que pueden asignar a un miembro a
+        otro departamento) en una búsqueda. Si alguno contiene otros grupos se usa
+        el índice de pertenencia completo, que resuelve el anidamiento. Los miembros
+        se resuelven después con filtros OR por lotes enviados en paralelo, de modo
+        que el coste depende del tamaño del departamento y no del directorio.
+        
+        Args:
+            department (str): Nombre del departamento (sin distinguir mayúsculas)
+            
+        Returns:
+            Optional[List[Dict[str, Any]]]: Usuarios del departamento, o None si el
+                departamento no se puede resolver por grupos (DEFAULT_DEPARTMENT agrupa
+                precisamente a los usuarios sin grupo mapeado)
+        """
+        if department.strip().lower() == DEFAULT_DEPARTMENT.lower():
+            return None
+        
+        target_groups = groups_for_department(department)
+        if not target_groups:
+            return []
+        
+        try:
+            canonical = GROUP_DEPT_MAPPING[target_groups[0]]
+            
+            # 1. Una búsqueda con los grupos del departamento y los que tienen prioridad sobre él
+            group_filter = "".join(f"(cn={escape_filter_chars(group)})"
+                                   for group in groups_deciding(target_groups))
+            groups = self.search(GROUPS_BASE_DN, f"(&{GROUPS_FILTER}(|{group_filter}))",
+                                 attributes=['cn', 'member'])
+            index = MembershipIndex.from_groups(groups)
+            
+            # Con grupos anidados la búsqueda parcial no basta: usar el índice completo
+            groups_base = normalize_dn(GROUPS_BASE_DN)
+            if any(dn.endswith("," + groups_base) for members in index.group_members.values() for dn in members):
+                index = self.get_membership_index()
+            
+            # 2. Miembros (directos o heredados) cuyo departamento efectivo es el consultado
+            member_dns = {dn for group in target_groups for dn in index.members_of(group)}
+            member_dns = {dn for dn in member_dns if index.department_for(dn) == canonical}
+            
+            # 3. Resolver solo esos usuarios
+            return [_build_user_info(user, canonical)
+                    for user in self._resolve_member_dns(member_dns, USER_ATTRS)]
+            
+        except Exception as e:
+            console.print(Panel(f"❌ Error listando usuarios del departamento {department}: {str(e)}",
+                                style="red"))
+            return []
+    
+    def _resolve_member_dns(self, member_dns, attributes: List[str]) -> List[LDAPEntry]:
+        """
+        Obtiene las entradas de usuario de un conjunto de DNs con filtros OR por lotes.
+        
+        Cada lote combina hasta MEMBER_FILTER_BATCH RDNs en un único filtro y todos
+        los lotes se envían a la vez con search_many().
+        
+        Args:
+            member_dns (Iterable[str]): DNs normalizados de los usuarios
+            attributes (List[str]): Atributos a recuperar
+            
+        Returns:
+            List[LDAPEntry]: Entradas encontradas cuyo DN pertenece al conjunto
+        """
+        member_dns = set(member_dns)
+        rdn_filters = []
+        for dn in sorted(member_dns):
+            try:
+                attr, value, _ = ldap.dn.str2dn(dn)[0][0]
+            except Exception:
+                continue
+            rdn_filters.append(f"({attr}={escape_filter_chars(value)})")
+        
+        requests = {}
+        for start in range(0, len(rdn_filters), MEMBER_FILTER_BATCH):
+            batch = "".join(rdn_filters[start:start + MEMBER_FILTER_BATCH])
+            requests[f"lote_{start // MEMBER_FILTER_BATCH}"] = {
+                "base_dn": USERS_BASE_DN,
+                "filter_str": f"(&{USERS_FILTER}(|{batch}))",
+                "attributes": attributes
+            }
+        
+        if not requests:
+            return []
+        
+        # El RDN puede repetirse fuera del grupo: conservar solo los DNs pedidos
+        return [
+            entry
+            for entries in self.search_many(requests).values()
+            for entry in entries
+            if normalize_dn(entry.dn) in member_dns
+        ]
+    
     def list_all_groups(self) -> List[Dict[str, Any]]:
         """
         Lista todos los grupos del directorio.
@@ -254,15 +1009,16 @@ class LDAPConnector:
             List[Dict[str, Any]]: Lista de todos los grupos
         """
         try:
-            results = self.search("ou=groups,dc=meli,dc=com", "(objectClass=groupOfNames)")
+            results = self.iter_search("ou=groups,dc=meli,dc=com", "(objectClass=groupOfNames)",
+                                       attributes=GROUP_ATTRS)
             groups = []
             
             for group in results:
                 group_info = {
-                    "name": group.get("cn", ""),
-                    "description": group.get("description", ""),
-                    "members": group.get("member", []),
-                    "member_count": len(group.get("member", []))
+                    "name": group.first("cn", ""),
+                    "description": group.first("description", ""),
+                    "members": group.all("member"),
+                    "member_count": len(group.all("member"))
                 }
                 groups.append(group_info)
             
@@ -276,6 +1032,9 @@ class LDAPConnector:
         """
         Determina el departamento de un usuario basado en sus grupos.
         
+        Si varios grupos del usuario tienen departamento, gana el primero según
+        el orden de GROUP_DEPT_MAPPING.
+        
         Args:
             user_info (Dict[str, Any]): Información del usuario
             
@@ -287,25 +1046,10 @@ class LDAPConnector:
             if not username:
                 return "Unknown"
             
-            # Mapeo de grupos a departamentos
-            group_dept_mapping = {
-                "admins": "IT",
-                "developers": "Development",
-                "managers": "Management",
-                "hr": "Human Resources",
-                "finance": "Finance",
-                "qa": "Quality Assurance",
-                "it": "IT"
-            }
-            
-            user_groups = self.get_user_groups(username)
+            # Preferir el DN real de la entrada cuando está disponible
+            user_dn = user_info.get("dn") or f"cn={username},ou=users,dc=meli,dc=com"
             
-            # Buscar el primer grupo que tenga mapeo de departamento
-            for group in user_groups:
-                if group in group_dept_mapping:
-                    return group_dept_mapping[group]
-            
-            return "General"
+            return self.get_membership_index().department_for(user_dn)
             
         except Exception:
             return "Unknown"
@@ -314,38 +1058,18 @@ class LDAPConnector:
         """
         Obtiene la estructura completa del directorio LDAP.
         
+        Las cifras salen de un recorrido que solo pide objectClass (ver
+        ldap_structure): no se descargan usuarios ni grupos, y el análisis se
+        reutiliza durante LDAP_STRUCTURE_TTL segundos.
+        
         Returns:
-            Dict[str, Any]: Estructura del directorio
+            Dict[str, Any]: Estructura del directorio (OUs con sus entradas, totales,
+                            profundidad real, fan-out e histograma de objectClass)
         """
         try:
-            # Obtener unidades organizativas
-            ou_results = self.search(self.base_dn, "(objectClass=organizationalUnit)")
-            
-            # Obtener usuarios y grupos
-            users = self.list_all_users()
-            groups = self.list_all_groups()
-            
-            structure = {
-                "base_dn": self.base_dn,
-                "organizational_units": [],
-                "total_users": len(users),
-                "total_groups": len(groups),
-                "structure_depth": 3
-            }
-            
-            # Procesar unidades organizativas
-            for ou in ou_results:
-                if "ou" in ou:
-                    ou_name = ou.get("ou", "")
-                    if ou_name:
-                        structure["organizational_units"].append({
-                            "name": ou_name,
-                            "dn": ou.get("dn", ""),
-                            "description": f"Unidad organizativa: {ou_name}",
-                            "entry_count": len(users) if ou_name == "users" else len(groups) if ou_name == "groups" else 0
-                        })
+            from .ldap_structure import get_directory_structure
             
-            return structure
+            return get_directory_structure(self).to_dict()
             
         except Exception as e:
             console.print(Panel(f"❌ Error obteniendo estructura LDAP: {str(e)}", style="red"))
@@ -358,4 +1082,155 @@ class LDAPConnector:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.disconnect() 
\ No newline at end of file
+        self.disconnect() 
+
+
+def _open_connection(server_url: str, bind_dn: str, bind_password: str):
+    """
+    Abre y autentica una conexión LDAP nueva.
+    
+    Se usa como factory del pool y para conexiones sin pool.
+    
+    Args:
+        server_url (str): URL del servidor LDAP
+        bind_dn (str): DN para el bind simple
+        bind_password (str): Contraseña del bind
+        
+    Returns:
+        object: Conexión LDAP autenticada
+    """
+    # Crear conexión con opciones propias (sin tocar las globales de libldap)
+    connection = ldap.initialize(server_url)
+    connection.set_option(ldap.OPT_REFERRALS, 0)
+    connection.set_option(ldap.OPT_NETWORK_TIMEOUT, _env_number("LDAP_NETWORK_TIMEOUT", DEFAULT_NETWORK_TIMEOUT))
+    
+    # Límite de las operaciones síncronas (bind, WhoAmI, modify)
+    timeout = operation_timeout()
+    if timeout:
+        connection.set_option(ldap.OPT_TIMEOUT, timeout)
+    
+    _set_keepalive(connection)
+    
+    # Autenticar
+    connection.simple_bind_s(bind_dn, bind_password)
+    
+    return connection
+
+
+def _set_keepalive(connection):
+    """
+    Activa TCP keepalive en una conexión para que un socket muerto (cortafuegos,
+    reinicio del servidor) se detecte en sesiones largas en lugar de colgarse.
+    
+    Se omite si LDAP_KEEPALIVE_IDLE es 0 o si libldap no admite las opciones.
+    """
+    idle = _env_number("LDAP_KEEPALIVE_IDLE", DEFAULT_KEEPALIVE_IDLE)
+    if not idle:
+        return
+    
+    for name, value in (("OPT_X_KEEPALIVE_IDLE", idle),
+                        ("OPT_X_KEEPALIVE_PROBES", KEEPALIVE_PROBES),
+                        ("OPT_X_KEEPALIVE_INTERVAL", KEEPALIVE_INTERVAL)):
+        option = getattr(ldap, name, None)
+        if option is None:
+            continue
+        try:
+            connection.set_option(option, int(value))
+        except Exception:
+            pass
+
+
+def operation_timeout() -> float:
+    """Segundos máximos por operación (LDAP_OPERATION_TIMEOUT, por defecto 30; 0 = sin límite)."""
+    return _env_number("LDAP_OPERATION_TIMEOUT", DEFAULT_OPERATION_TIMEOUT)
+
+
+def reconnect_attempts() -> int:
+    """Intentos de reconexión tras una caída (LDAP_RECONNECT_ATTEMPTS, por defecto 3)."""
+    return max(1, int(_env_number("LDAP_RECONNECT_ATTEMPTS", DEFAULT_RECONNECT_ATTEMPTS)))
+
+
+def _deadline() -> Optional[float]:
+    """Instante límite (time.monotonic) de una operación que empieza ahora."""
+    timeout = operation_timeout()
+    return time.monotonic() + timeout if timeout else None
+
+
+def _env_number(name: str, default: float) -> float:
+    """Valor numérico de una variable de entorno (el valor por defecto si no es válido)."""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _build_user_info(user: LDAPEntry, department: str) -> Dict[str, Any]:
+    """
+    Construye el resumen de usuario que devuelven los listados del conector.
+    
+    Args:
+        user (LDAPEntry): Entrada del usuario con USER_ATTRS
+        department (str): Departamento ya resuelto
+        
+    Returns:
+        Dict[str, Any]: Información del usuario
+    """
+    return {
+        "username": user.first("uid", ""),
+        "full_name": user.first("displayName", ""),
+        "email": user.first("mail", ""),
+        "title": user.first("title", ""),
+        "department": department,
+        "status": "active",
+        "last_login": "N/A"
+    }
+
+
+def _build_user_detail(user: LDAPEntry, department: str, username: str = "") -> Dict[str, Any]:
+    """
+    Construye la ficha completa de usuario de get_user_info() y get_users_info().
+    
+    Args:
+        user (LDAPEntry): Entrada del usuario con USER_DETAIL_ATTRS
+        department (str): Departamento ya resuelto
+        username (str, optional): Nombre a usar si la entrada no trae uid
+        
+    Returns:
+        Dict[str, Any]: Información del usuario
+    """
+    return {
+        **_build_user_info(user, department),
+        "username": user.first("uid", username),
+        "home_directory": user.first("homeDirectory", ""),
+        "shell": user.first("loginShell", ""),
+        "uid_number": user.first("uidNumber", ""),
+        "gid_number": user.first("gidNumber", "")
+    }
+
+
+def _resolve_scope(scope) -> int:
+    """
+    Traduce un alcance de búsqueda ('base', 'onelevel', 'subtree') a la constante de python-ldap.
+    
+    Args:
+        scope (str | int): Nombre del alcance o constante ldap.SCOPE_* ya resuelta
+        
+    Returns:
+        int: Constante de alcance de python-ldap
+        
+    Raises:
+        ValueError: Si el alcance no es válido
+    """
+    if not isinstance(scope, str):
+        return scope
+    
+    scopes = {
+        SCOPE_BASE: ldap.SCOPE_BASE,
+        SCOPE_ONELEVEL: ldap.SCOPE_ONELEVEL,
+        SCOPE_SUBTREE: ldap.SCOPE_SUBTREE
+    }
+    try:
+        return scopes[scope.lower()]
+    except KeyError:
+        raise ValueError(f"Alcance de búsqueda no válido: {scope}")
+
@@ -0,0 +1,170 @@
+"""
+Entrada LDAP compacta con decodificación perezosa de valores.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# Valor decodificado: texto si es UTF-8 válido, bytes en caso contrario (jpegPhoto, certificados...)
+Value = Union[str, bytes]
+
+
+class LDAPEntry(Mapping):
+    """
+    Entrada LDAP inmutable que conserva los valores crudos y los decodifica al leerlos.
+
+    Los nombres de atributo se internan (se comparten entre todas las entradas) y los
+    valores se guardan como bytes tal como llegan de python-ldap. Cada atributo se
+    decodifica a UTF-8 solo la primera vez que se accede a él; los valores que no son
+    texto válido se devuelven como bytes.
+
+    Para compatibilidad con el formato anterior de search(), la entrada se comporta
+    como un diccionario de solo lectura con la clave 'dn' y los atributos aplanados
+    (str si hay un único valor, lista si hay varios). Para un acceso consistente
+    conviene usar first() y all(). Los nombres de atributo no distinguen mayúsculas.
+
+    Atributos:
+        dn (str): DN de la entrada
+
+    Métodos principales:
+        - first(): Primer valor de un atributo (o un valor por defecto)
+        - all(): Todos los valores de un atributo como lista
+        - raw(): Valores crudos en bytes
+        - to_dict(): Diccionario plano con el formato clásico
+    """
+
+    __slots__ = ("dn", "_raw", "_decoded")
+
+    def __init__(self, dn: str, attrs: Dict[str, List[bytes]]):
+        """
+        Inicializa la entrada sin decodificar ningún valor.
+
+        Args:
+            dn (str): DN de la entrada
+            attrs (Dict[str, List[bytes]]): Atributos tal como los devuelve python-ldap
+        """
+        self.dn = dn
+        self._raw = {sys.intern(name): values for name, values in attrs.items()}
+        self._decoded: Optional[Dict[str, List[Value]]] = None
+
+    # ------------------------------------------------------------------
+    # Accesores consistentes
+    # ------------------------------------------------------------------
+
+    def first(self, attr: str, default: Any = None) -> Any:
+        """
+        Obtiene el primer valor de un atributo.
+
+        Args:
+            attr (str): Nombre del atributo (sin distinguir mayúsculas)
+            default (Any, optional): Valor si el atributo no existe o está vacío
+
+        Returns:
+            Any: Primer valor decodificado o default
+        """
+        values = self.all(attr)
+        return values[0] if values else default
+
+    def all(self, attr: str) -> List[Value]:
+        """
+        Obtiene todos los valores de un atributo, siempre como lista.
+
+        Args:
+            attr (str): Nombre del atributo (sin distinguir mayúsculas)
+
+        Returns:
+            List[Value]: Valores decodificados (lista vacía si no existe)
+        """
+        name = self._resolve(attr)
+        if name is None:
+            return []
+
+        if self._decoded is None:
+            self._decoded = {}
+        values = self._decoded.get(name)
+        if values is None:
+            values = [_decode(value) for value in self._raw[name]]
+            self._decoded[name] = values
+        return list(values)
+
+    def raw(self, attr: str) -> List[bytes]:
+        """
+        Obtiene los valores crudos de un atributo sin decodificar.
+
+        Args:
+            attr (str): Nombre del atributo (sin distinguir mayúsculas)
+
+        Returns:
+            List[bytes]: Valores tal como llegaron del servidor
+        """
+        name = self._resolve(attr)
+        return list(self._raw[name]) if name is not None else []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convierte la entrada al diccionario plano usado históricamente por search().
+
+        Returns:
+            Dict[str, Any]: {'dn': ..., atributo: str | lista}
+        """
+        result: Dict[str, Any] = {'dn': self.dn}
+        for name in self._raw:
+            result[name] = self._flatten(name)
+        return result
+
+    # ------------------------------------------------------------------
+    # Protocolo Mapping (compatibilidad con el formato dict anterior)
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'dn':
+            return self.dn
+        name = self._resolve(key)
+        if name is None:
+            raise KeyError(key)
+        return self._flatten(name)
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'dn'
+        yield from self._raw
+
+    def __len__(self) -> int:
+        return len(self._raw) + 1
+
+    def __contains__(self, key: object) -> bool:
+        if key == 'dn':
+            return True
+        return isinstance(key, str) and self._resolve(key) is not None
+
+    def __repr__(self) -> str:
+        return f"LDAPEntry({self.dn!r}, attrs={list(self._raw)})"
+
+    # ------------------------------------------------------------------
+    # Helpers internos
+    # ------------------------------------------------------------------
+
+    def _resolve(self, attr: str) -> Optional[str]:
+        """Devuelve el nombre real del atributo ignorando mayúsculas (None si no existe)."""
+        if attr in self._raw:
+            return attr
+        lowered = attr.lower()
+        for name in self._raw:
+            if name.lower() == lowered:
+                return name
+        return None
+
+    def _flatten(self, name: str) -> Any:
+        """Aplana como el formato clásico: un único valor como escalar, varios como lista."""
+        values = self.all(name)
+        return values[0] if len(values) == 1 else values
+
+
+def _decode(value: Any) -> Value:
+    """Decodifica un valor a UTF-8 conservando los bytes si no es texto válido."""
+    if not isinstance(value, bytes):
+        return value
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return value
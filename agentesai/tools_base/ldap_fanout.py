@@ -0,0 +1,191 @@
+"""
+Búsquedas de subárbol repartidas por unidad organizativa (fan-out).
+
+Una búsqueda subtree desde la raíz la atiende el servidor de forma secuencial
+sobre una sola conexión. El fan-out la divide en particiones disjuntas:
+
+- la propia base (scope base)
+- sus hijos directos que no son OUs (scope onelevel)
+- el subárbol de cada OU hija (scope subtree, incluye la OU)
+
+Cada partición se recorre con iter_search() en su propia conexión del pool,
+con un máximo de particiones simultáneas (LDAP_FANOUT_PARALLELISM), y las
+entradas se entregan según llegan. El orden no es el del árbol.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich.panel import Panel
+from .output import OUTPUT_NONE, console, output_mode
+
+from .ldap_connector import (
+    LDAPConnector,
+    NO_ATTRS,
+    SCOPE_BASE,
+    SCOPE_ONELEVEL,
+    SCOPE_SUBTREE
+)
+from .ldap_entry import LDAPEntry
+
+
+# Particiones simultáneas por defecto (configurable con LDAP_FANOUT_PARALLELISM; 1 lo desactiva)
+DEFAULT_FANOUT_PARALLELISM = 4
+
+# Hijos de la base que se recorren como partición propia
+PARTITION_FILTER = "(|(objectClass=organizationalUnit)(objectClass=container))"
+
+# Entradas en tránsito entre las particiones y el consumidor
+QUEUE_SIZE = 1000
+
+# Espera máxima (s) de una partición con la cola llena antes de comprobar si se canceló
+_PUT_INTERVAL = 0.1
+
+
+class _PartitionDone:
+    """Marca de fin de una partición (con el error si falló)."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+def fanout_parallelism() -> int:
+    """Particiones simultáneas configuradas (LDAP_FANOUT_PARALLELISM)."""
+    try:
+        return max(1, int(os.getenv("LDAP_FANOUT_PARALLELISM", DEFAULT_FANOUT_PARALLELISM)))
+    except ValueError:
+        return DEFAULT_FANOUT_PARALLELISM
+
+
+def plan_partitions(ldap_conn: LDAPConnector, base_dn: str, filter_str: str) -> List[Dict[str, Any]]:
+    """
+    Divide una búsqueda subtree en particiones disjuntas por OU hija.
+
+    Args:
+        ldap_conn (LDAPConnector): Conector conectado
+        base_dn (str): Raíz de la búsqueda
+        filter_str (str): Filtro LDAP
+
+    Returns:
+        List[Dict[str, Any]]: Búsquedas (base_dn, filter_str, scope) cuya unión es
+            la búsqueda original; lista vacía si la base no tiene OUs hijas
+    """
+    ous = ldap_conn.search(base_dn, PARTITION_FILTER, attributes=NO_ATTRS, scope=SCOPE_ONELEVEL)
+    if not ous:
+        return []
+
+    if not filter_str.startswith("("):
+        filter_str = f"({filter_str})"
+
+    return [
+        {"base_dn": base_dn, "filter_str": filter_str, "scope": SCOPE_BASE},
+        {"base_dn": base_dn, "filter_str": f"(&{filter_str}(!{PARTITION_FILTER}))", "scope": SCOPE_ONELEVEL},
+        *({"base_dn": ou.dn, "filter_str": filter_str, "scope": SCOPE_SUBTREE} for ou in ous)
+    ]
+
+
+def iter_search_fanout(ldap_conn, base_dn: str, filter_str: str, attributes: List[str] = None,
+                       size_limit: int = 0, parallelism: int = None,
+                       raise_errors: bool = False) -> Iterator[LDAPEntry]:
+    """
+    Recorre una búsqueda subtree repartiéndola entre varias conexiones.
+
+    Devuelve las mismas entradas que ldap_conn.iter_search() pero en orden de
+    llegada. Si el conector no admite búsquedas en paralelo (p. ej. un snapshot),
+    la base no tiene OUs hijas o parallelism es 1, se usa iter_search() tal cual.
+
+    Si el consumidor deja de iterar (o se alcanza size_limit) se cancelan las
+    particiones pendientes y las búsquedas paginadas en curso.
+
+    Args:
+        ldap_conn: Conector conectado
+        base_dn (str): Raíz de la búsqueda
+        filter_str (str): Filtro LDAP
+        attributes (List[str], optional): Atributos a retornar
+        size_limit (int, optional): Máximo de entradas en total (0 = sin límite)
+        parallelism (int, optional): Particiones simultáneas (por defecto LDAP_FANOUT_PARALLELISM)
+        raise_errors (bool, optional): Propagar el error de una partición en lugar de
+                                       continuar con el resto
+
+    Yields:
+        LDAPEntry: Entradas encontradas
+    """
+    parallelism = parallelism or fanout_parallelism()
+
+    partitions = []
+    if (parallelism > 1 and isinstance(ldap_conn, LDAPConnector) and ldap_conn.parallel_search
+            and ldap_conn.is_connected):
+        partitions = plan_partitions(ldap_conn, base_dn, filter_str)
+
+    if not partitions:
+        yield from ldap_conn.iter_search(base_dn, filter_str, attributes=attributes,
+                                         size_limit=size_limit, raise_errors=raise_errors)
+        return
+
+    results: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=min(parallelism, len(partitions)),
+                                  thread_name_prefix="ldap-fanout")
+    for partition in partitions:
+        executor.submit(_run_partition, ldap_conn, partition, attributes, size_limit, results, stop)
+
+    pending = len(partitions)
+    returned = 0
+    try:
+        while pending:
+            item = results.get()
+            if isinstance(item, _PartitionDone):
+                pending -= 1
+                if item.error is not None:
+                    console.print(Panel(f"❌ Error en partición de búsqueda LDAP: {str(item.error)}", style="red"))
+                    if raise_errors:
+                        raise item.error
+                continue
+
+            yield item
+            returned += 1
+            if size_limit and returned >= size_limit:
+                return
+    finally:
+        # Cancelar lo pendiente y esperar a que cada partición devuelva su conexión
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_partition(ldap_conn: LDAPConnector, partition: Dict[str, Any], attributes: Optional[List[str]],
+                   size_limit: int, results: queue.Queue, stop: threading.Event):
+    """Recorre una partición en una conexión propia y encola sus entradas."""
+    error = None
+    try:
+        # Los paneles de cada conector auxiliar no aportan nada: los errores se muestran en el consumidor
+        with output_mode(OUTPUT_NONE), ldap_conn.clone() as worker:
+            if not worker.is_connected:
+                raise ConnectionError(f"No se pudo conectar para la partición {partition['base_dn']}")
+
+            entries = worker.iter_search(partition["base_dn"], partition["filter_str"], attributes=attributes,
+                                         scope=partition["scope"], size_limit=size_limit, raise_errors=True)
+            try:
+                for entry in entries:
+                    if not _put(results, entry, stop):
+                        return
+            finally:
+                entries.close()
+    except Exception as e:
+        error = e
+    _put(results, _PartitionDone(error), stop)
+
+
+def _put(results: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Encola respetando la cancelación; False si el consumidor ya no escucha."""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=_PUT_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
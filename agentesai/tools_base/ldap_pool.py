@@ -0,0 +1,366 @@
+"""
+Pool de conexiones LDAP autenticadas compartido por todas las herramientas.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import ldap
+
+logger = logging.getLogger(__name__)
+
+# Errores que indican que la conexión está caída y debe sustituirse
+CONNECTION_ERRORS = (ldap.SERVER_DOWN, ldap.CONNECT_ERROR)
+
+
+class LDAPConnectionPool:
+    """
+    Pool thread-safe de conexiones LDAP ya autenticadas.
+
+    Cada pool agrupa conexiones de un mismo servidor y una misma identidad de bind,
+    de modo que las herramientas que crean un LDAPConnector por llamada reutilizan
+    la conexión TCP y el bind en lugar de repetirlos.
+
+    Atributos:
+        factory (Callable): Función que crea una conexión nueva ya autenticada
+        min_size (int): Conexiones inactivas que se conservan aunque expiren
+        max_size (int): Máximo de conexiones (en uso + inactivas)
+        idle_timeout (float): Segundos de inactividad antes de descartar una conexión
+        checkout_timeout (float): Segundos máximos de espera cuando el pool está lleno
+        liveness_interval (float): Segundos de inactividad a partir de los que una
+                                   conexión se verifica antes de reutilizarla
+
+    Métodos principales:
+        - checkout(): Obtiene una conexión viva del pool (o crea una nueva)
+        - checkin(): Devuelve una conexión al pool
+        - prefill(): Abre conexiones hasta alcanzar min_size
+        - close(): Cierra todas las conexiones inactivas
+        - get_stats(): Estadísticas de uso del pool
+    """
+
+    def __init__(self, factory: Callable[[], Any], min_size: int = 0, max_size: int = 10,
+                 idle_timeout: float = 300.0, checkout_timeout: float = 10.0,
+                 liveness_check: Optional[Callable[[Any], bool]] = None,
+                 liveness_interval: float = 0.0):
+        """
+        Inicializa el pool sin abrir conexiones.
+
+        Args:
+            factory (Callable): Crea y autentica una conexión nueva
+            min_size (int, optional): Conexiones mínimas a conservar
+            max_size (int, optional): Conexiones máximas simultáneas
+            idle_timeout (float, optional): Tiempo máximo de inactividad en segundos
+            checkout_timeout (float, optional): Espera máxima por una conexión libre
+            liveness_check (Callable, optional): Verifica que una conexión siga viva.
+                                               Por defecto se usa is_alive() (WhoAmI).
+            liveness_interval (float, optional): Las conexiones devueltas hace menos de
+                                                 estos segundos se entregan sin verificar
+                                                 (0 = verificar siempre)
+        """
+        self.factory = factory
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.liveness_check = liveness_check or is_alive
+        self.liveness_interval = liveness_interval
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "reused": 0,
+            "discarded": 0,
+            "evicted": 0,
+            "waits": 0,
+            "probes": 0
+        }
+
+    @property
+    def size(self) -> int:
+        """Total de conexiones abiertas (en uso + inactivas)."""
+        with self._cond:
+            return self._in_use + len(self._idle)
+
+    def checkout(self, verify: bool = False):
+        """
+        Obtiene una conexión autenticada del pool.
+
+        Reutiliza la conexión inactiva más reciente tras verificar que sigue viva
+        (solo si lleva inactiva al menos liveness_interval, para no añadir una ida y
+        vuelta al servidor en cada uso); si no hay ninguna y queda capacidad, crea
+        una nueva con la factory.
+
+        Args:
+            verify (bool, optional): Verificar la conexión reutilizada aunque se haya
+                                     usado recientemente (p. ej. tras una caída)
+
+        Returns:
+            object: Conexión LDAP autenticada
+
+        Raises:
+            TimeoutError: Si el pool está lleno durante más de checkout_timeout
+            Exception: Cualquier error de la factory al crear la conexión
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+
+        while True:
+            conexion = None
+            crear = False
+
+            with self._cond:
+                self._evict_idle_locked()
+
+                while not self._idle and self._in_use >= self.max_size:
+                    restante = deadline - time.monotonic()
+                    if restante <= 0:
+                        raise TimeoutError(f"Pool LDAP agotado ({self.max_size} conexiones en uso)")
+                    self._stats["waits"] += 1
+                    self._cond.wait(restante)
+                    self._evict_idle_locked()
+
+                if self._idle:
+                    conexion, ultimo_uso = self._idle.pop()
+                    verificar = verify or time.monotonic() - ultimo_uso >= self.liveness_interval
+                else:
+                    crear = True
+                self._in_use += 1
+
+            if crear:
+                try:
+                    conexion = self.factory()
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+                return conexion
+
+            # Verificar que la conexión reutilizada siga viva antes de entregarla
+            if not verificar or self._is_alive(conexion):
+                with self._cond:
+                    self._stats["reused"] += 1
+                return conexion
+
+            _cerrar_silenciosamente(conexion)
+            with self._cond:
+                self._stats["discarded"] += 1
+            self._release_slot()
+
+    def checkin(self, conexion, discard: bool = False):
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            conexion (object): Conexión obtenida previamente con checkout()
+            discard (bool, optional): Si es True la conexión se cierra en lugar de reutilizarse
+        """
+        if conexion is None:
+            return
+
+        if discard:
+            _cerrar_silenciosamente(conexion)
+            with self._cond:
+                self._stats["discarded"] += 1
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            self._idle.append((conexion, time.monotonic()))
+            self._cond.notify()
+
+    def prefill(self) -> int:
+        """
+        Abre conexiones hasta alcanzar min_size.
+
+        Returns:
+            int: Número de conexiones abiertas
+        """
+        abiertas = 0
+        while True:
+            with self._cond:
+                if self._in_use + len(self._idle) >= self.min_size:
+                    return abiertas
+                self._in_use += 1
+            try:
+                conexion = self.factory()
+            except Exception as e:
+                self._release_slot()
+                logger.warning(f"No se pudo precalentar el pool LDAP: {e}")
+                return abiertas
+            with self._cond:
+                self._stats["created"] += 1
+            self.checkin(conexion)
+            abiertas += 1
+
+    def close(self):
+        """Cierra todas las conexiones inactivas del pool."""
+        with self._cond:
+            inactivas = [conexion for conexion, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for conexion in inactivas:
+            _cerrar_silenciosamente(conexion)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del pool.
+
+        Returns:
+            Dict[str, Any]: Contadores de uso y ocupación actual
+        """
+        with self._cond:
+            return {
+                **self._stats,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size
+            }
+
+    def _is_alive(self, conexion) -> bool:
+        """Ejecuta la verificación de vida sin propagar excepciones."""
+        with self._cond:
+            self._stats["probes"] += 1
+        try:
+            return bool(self.liveness_check(conexion))
+        except Exception:
+            return False
+
+    def _release_slot(self):
+        """Libera un hueco de conexión en uso y despierta a quien espere."""
+        with self._cond:
+            self._in_use = max(0, self._in_use - 1)
+            self._cond.notify()
+
+    def _evict_idle_locked(self):
+        """Descarta conexiones inactivas expiradas respetando min_size (requiere el lock)."""
+        if not self._idle or self.idle_timeout is None:
+            return
+
+        ahora = time.monotonic()
+        conservadas = []
+        expiradas = []
+        # Las más antiguas están al principio de la lista
+        for conexion, ultimo_uso in self._idle:
+            total = self._in_use + len(self._idle) - len(expiradas)
+            if ahora - ultimo_uso > self.idle_timeout and total > self.min_size:
+                expiradas.append(conexion)
+            else:
+                conservadas.append((conexion, ultimo_uso))
+
+        if expiradas:
+            self._idle = conservadas
+            self._stats["evicted"] += len(expiradas)
+            for conexion in expiradas:
+                _cerrar_silenciosamente(conexion)
+            self._cond.notify_all()
+
+
+def is_alive(conexion) -> bool:
+    """
+    Verificación de vida barata de una conexión autenticada.
+
+    Usa la operación extendida WhoAmI; si el servidor no la admite, lee el
+    RootDSE (búsqueda de alcance base sin atributos).
+
+    Args:
+        conexion (object): Conexión python-ldap
+
+    Returns:
+        bool: True si el servidor respondió
+
+    Raises:
+        Exception: Si la conexión está caída o no responde en el tiempo de operación
+    """
+    try:
+        conexion.whoami_s()
+    except CONNECTION_ERRORS + (ldap.TIMEOUT,):
+        raise
+    except ldap.LDAPError:
+        conexion.search_s("", ldap.SCOPE_BASE, "(objectClass=*)", ["1.1"])
+    return True
+
+
+def _cerrar_silenciosamente(conexion):
+    """Cierra una conexión ignorando errores (puede estar ya caída)."""
+    try:
+        conexion.unbind_s()
+    except Exception:
+        pass
+
+
+# ============================================================================
+# REGISTRO GLOBAL DE POOLS (uno por servidor + identidad de bind)
+# ============================================================================
+
+_pools: Dict[Tuple[str, str], LDAPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    """Indica si el pool está habilitado (variable LDAP_POOL_ENABLED, por defecto sí)."""
+    return os.getenv("LDAP_POOL_ENABLED", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_pool(server_url: str, bind_dn: str, factory: Callable[[], Any]) -> LDAPConnectionPool:
+    """
+    Obtiene (o crea) el pool compartido para un servidor y una identidad de bind.
+
+    La configuración se lee de las variables de entorno LDAP_POOL_MIN_SIZE,
+    LDAP_POOL_MAX_SIZE, LDAP_POOL_IDLE_TIMEOUT, LDAP_POOL_CHECKOUT_TIMEOUT y
+    LDAP_POOL_LIVENESS_INTERVAL.
+
+    Args:
+        server_url (str): URL del servidor LDAP
+        bind_dn (str): DN con el que se autentican las conexiones del pool
+        factory (Callable): Crea una conexión nueva ya autenticada
+
+    Returns:
+        LDAPConnectionPool: Pool compartido para la clave (server_url, bind_dn)
+    """
+    clave = (server_url, (bind_dn or "").lower())
+
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            pool = LDAPConnectionPool(
+                factory,
+                min_size=int(os.getenv("LDAP_POOL_MIN_SIZE", "0")),
+                max_size=int(os.getenv("LDAP_POOL_MAX_SIZE", "10")),
+                idle_timeout=float(os.getenv("LDAP_POOL_IDLE_TIMEOUT", "300")),
+                checkout_timeout=float(os.getenv("LDAP_POOL_CHECKOUT_TIMEOUT", "10")),
+                liveness_interval=float(os.getenv("LDAP_POOL_LIVENESS_INTERVAL", "5"))
+            )
+            _pools[clave] = pool
+
+    return pool
+
+
+def close_all_pools():
+    """Cierra las conexiones inactivas de todos los pools y los olvida."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+
+
+def get_pools_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene estadísticas de todos los pools activos.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Estadísticas indexadas por "servidor|bind_dn"
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+
+    return {f"{servidor}|{bind_dn}": pool.get_stats() for (servidor, bind_dn), pool in pools.items()}
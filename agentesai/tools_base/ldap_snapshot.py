@@ -0,0 +1,668 @@
+"""
+Snapshot offline del directorio LDAP (LDIF + índice binario) y conector que lo consulta.
+"""
+
+import os
+import re
+import mmap
+import base64
+import struct
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import ldap.dn
+from rich.panel import Panel
+from .output import console
+
+from .ldap_connector import (
+    LDAPConnector,
+    SCOPE_BASE,
+    SCOPE_ONELEVEL,
+    SCOPE_SUBTREE,
+    ALL_USER_ATTRS,
+    ALL_OPERATIONAL_ATTRS
+)
+from .ldap_entry import LDAPEntry
+from .membership import normalize_dn
+
+
+# Formato del índice: cabecera (magia, nº de entradas) y, por entrada,
+# (offset, longitud del registro LDIF, longitud del DN) seguido del DN normalizado
+INDEX_MAGIC = b"AGSNAP01"
+_INDEX_HEADER = struct.Struct("<8sI")
+_INDEX_RECORD = struct.Struct("<QIH")
+
+# Caracteres que obligan a codificar un valor en base64 (RFC 2849, SAFE-STRING)
+_UNSAFE_VALUE = re.compile(rb"[\x00\n\r\x80-\xff]|^[ :<]| $")
+
+_SCOPES = {
+    ldap.SCOPE_BASE: SCOPE_BASE,
+    ldap.SCOPE_ONELEVEL: SCOPE_ONELEVEL,
+    ldap.SCOPE_SUBTREE: SCOPE_SUBTREE
+}
+
+
+def index_path(snapshot_path: str) -> str:
+    """Ruta del índice binario asociado a un snapshot LDIF."""
+    return snapshot_path + ".idx"
+
+
+# ============================================================================
+# VOLCADO
+# ============================================================================
+
+def dump_snapshot(ldap_conn, snapshot_path: str, base_dn: str = None,
+                  filter_str: str = "(objectClass=*)", include_rootdse: bool = True) -> Dict[str, Any]:
+    """
+    Vuelca un subárbol del directorio a un snapshot local.
+
+    Las entradas se recorren con iter_search() y se escriben en LDIF a medida que
+    llegan, por lo que el volcado no mantiene el directorio en memoria. Junto al
+    LDIF se escribe un índice binario DN → (offset, longitud). Ambos ficheros se
+    escriben en temporales y se renombran al terminar, de modo que un volcado
+    interrumpido no deja un snapshot a medias.
+
+    Args:
+        ldap_conn (LDAPConnector): Conector conectado (conviene sin caché)
+        snapshot_path (str): Ruta del fichero LDIF a generar
+        base_dn (str, optional): Raíz del subárbol (por defecto la base del conector)
+        filter_str (str, optional): Filtro de las entradas a volcar
+        include_rootdse (bool, optional): Incluir el RootDSE como primera entrada
+
+    Returns:
+        Dict[str, Any]: Resumen del volcado (rutas, entradas y bytes escritos)
+    """
+    base_dn = base_dn if base_dn is not None else ldap_conn.base_dn
+
+    def entradas() -> Iterator[LDAPEntry]:
+        if include_rootdse:
+            yield from ldap_conn.search("", "(objectClass=*)",
+                                        attributes=[ALL_USER_ATTRS, ALL_OPERATIONAL_ATTRS],
+                                        scope=SCOPE_BASE)
+        yield from ldap_conn.iter_search(base_dn, filter_str, attributes=[ALL_USER_ATTRS])
+
+    resumen = write_snapshot(snapshot_path, entradas(), [
+        f"Snapshot LDAP de {ldap_conn.server_url}",
+        f"base: {base_dn}",
+        f"filtro: {filter_str}"
+    ])
+    return {**resumen, "base_dn": base_dn}
+
+
+def write_snapshot(snapshot_path: str, entries: Iterable[LDAPEntry],
+                   comments: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Escribe un snapshot (LDIF + índice) a partir de cualquier secuencia de entradas.
+
+    Las entradas se escriben a medida que se consumen. Ambos ficheros se escriben
+    en temporales y se renombran al terminar, de modo que una escritura
+    interrumpida no deja un snapshot a medias.
+
+    Args:
+        snapshot_path (str): Ruta del fichero LDIF a generar
+        entries (Iterable[LDAPEntry]): Entradas a escribir, en orden
+        comments (Iterable[str], optional): Líneas de comentario de la cabecera
+
+    Returns:
+        Dict[str, Any]: Resumen (rutas, entradas y bytes escritos)
+    """
+    idx_path = index_path(snapshot_path)
+    tmp_ldif, tmp_idx = snapshot_path + ".tmp", idx_path + ".tmp"
+
+    records: List[Tuple[int, int, bytes]] = []
+
+    try:
+        with open(tmp_ldif, "wb") as ldif:
+            cabecera = "".join(f"# {comment}\n" for comment in comments)
+            cabecera += f"# fecha: {datetime.now(timezone.utc).isoformat()}\nversion: 1\n\n"
+            ldif.write(cabecera.encode("utf-8"))
+
+            for entry in entries:
+                registro = _format_record(entry)
+                records.append((ldif.tell(), len(registro), normalize_dn(entry.dn).encode("utf-8")))
+                ldif.write(registro)
+
+        with open(tmp_idx, "wb") as idx:
+            idx.write(_INDEX_HEADER.pack(INDEX_MAGIC, len(records)))
+            for offset, length, dn in records:
+                idx.write(_INDEX_RECORD.pack(offset, length, len(dn)))
+                idx.write(dn)
+
+        os.replace(tmp_ldif, snapshot_path)
+        os.replace(tmp_idx, idx_path)
+    except BaseException:
+        for tmp in (tmp_ldif, tmp_idx):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+
+    return {
+        "path": snapshot_path,
+        "index": idx_path,
+        "entries": len(records),
+        "bytes": os.path.getsize(snapshot_path)
+    }
+
+
+def _format_record(entry: LDAPEntry) -> bytes:
+    """Serializa una entrada como registro LDIF (RFC 2849) terminado en línea vacía."""
+    lines = [_format_line("dn", entry.dn.encode("utf-8"))]
+    for name in entry:
+        if name == "dn":
+            continue
+        for value in entry.raw(name):
+            if isinstance(value, str):
+                value = value.encode("utf-8")
+            lines.append(_format_line(name, value))
+    lines.append(b"\n")
+    return b"".join(lines)
+
+
+def _format_line(attr: str, value: bytes) -> bytes:
+    """Línea 'atributo: valor', en base64 ('atributo:: ...') si el valor no es seguro."""
+    if _UNSAFE_VALUE.search(value):
+        return attr.encode("ascii") + b":: " + base64.b64encode(value) + b"\n"
+    return attr.encode("ascii") + b": " + value + b"\n"
+
+
+def _parse_record(data: bytes) -> Tuple[str, Dict[str, List[bytes]]]:
+    """
+    Convierte un registro LDIF en (dn, atributos) con valores en bytes.
+
+    Acepta líneas de continuación y comentarios para tolerar snapshots editados a mano.
+    """
+    lines: List[bytes] = []
+    for line in data.split(b"\n"):
+        if line.startswith(b" ") and lines:
+            lines[-1] += line[1:]
+        elif line and not line.startswith(b"#"):
+            lines.append(line.rstrip(b"\r"))
+
+    dn = ""
+    attrs: Dict[str, List[bytes]] = {}
+    for line in lines:
+        name, _, rest = line.partition(b":")
+        if rest.startswith(b":"):
+            value = base64.b64decode(rest[1:].strip())
+        else:
+            value = rest[1:] if rest.startswith(b" ") else rest
+        name = name.decode("ascii")
+        if name.lower() == "dn":
+            dn = value.decode("utf-8")
+        else:
+            attrs.setdefault(name, []).append(value)
+    return dn, attrs
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+class LDAPSnapshot:
+    """
+    Lector de un snapshot LDIF mediante memoria mapeada.
+
+    El índice se carga completo al abrir (DN normalizado y posición de cada
+    registro); las entradas se leen del LDIF mapeado solo cuando una búsqueda
+    las necesita, así que el coste de memoria no depende del tamaño del LDIF.
+
+    Atributos:
+        path (str): Ruta del fichero LDIF
+
+    Métodos principales:
+        - open() / close(): Mapea o libera los ficheros
+        - get(): Entrada por DN
+        - scan(): Entradas de un alcance (base, onelevel, subtree)
+    """
+
+    def __init__(self, path: str):
+        """
+        Inicializa el lector sin abrir los ficheros.
+
+        Args:
+            path (str): Ruta del fichero LDIF del snapshot
+        """
+        self.path = path
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._dns: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def open(self):
+        """Carga el índice y mapea el LDIF en memoria (solo lectura)."""
+        with open(index_path(self.path), "rb") as idx:
+            data = idx.read()
+
+        magic, count = _INDEX_HEADER.unpack_from(data, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Índice de snapshot no válido: {index_path(self.path)}")
+
+        pos = _INDEX_HEADER.size
+        for _ in range(count):
+            offset, length, dn_len = _INDEX_RECORD.unpack_from(data, pos)
+            pos += _INDEX_RECORD.size
+            dn = data[pos:pos + dn_len].decode("utf-8")
+            pos += dn_len
+
+            self._positions.setdefault(dn, len(self._dns))
+            self._offsets.append(offset)
+            self._lengths.append(length)
+            self._dns.append(dn)
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Libera el mapeo y el descriptor del LDIF."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get(self, dn: str) -> Optional[LDAPEntry]:
+        """
+        Obtiene una entrada por DN sin recorrer el snapshot.
+
+        Args:
+            dn (str): DN de la entrada (se normaliza)
+
+        Returns:
+            Optional[LDAPEntry]: Entrada o None si no existe
+        """
+        position = self._positions.get(normalize_dn(dn))
+        return self._read(position) if position is not None else None
+
+    def scan(self, base_dn: str, scope: str = SCOPE_SUBTREE) -> Iterator[LDAPEntry]:
+        """
+        Recorre las entradas dentro del alcance indicado en el orden del volcado.
+
+        El alcance se evalúa sobre los DNs del índice, así que solo se leen del
+        LDIF las entradas que caen dentro de él.
+
+        Args:
+            base_dn (str): DN base
+            scope (str, optional): 'base', 'onelevel' o 'subtree'
+
+        Yields:
+            LDAPEntry: Entradas del alcance
+        """
+        base = normalize_dn(base_dn)
+
+        if scope == SCOPE_BASE:
+            position = self._positions.get(base)
+            if position is not None:
+                yield self._read(position)
+            return
+
+        suffix = "," + base
+        for position, dn in enumerate(self._dns):
+            if not dn:
+                continue  # El RootDSE solo es visible con alcance base
+            if base and dn == base:
+                # La propia base forma parte del alcance subtree
+                if scope == SCOPE_SUBTREE:
+                    yield self._read(position)
+                continue
+            if base and not dn.endswith(suffix):
+                continue
+            if scope == SCOPE_ONELEVEL:
+                relative = dn[:-len(suffix)] if base else dn
+                if len(_str2dn(relative)) != 1:
+                    continue
+            yield self._read(position)
+
+    def _read(self, position: int) -> LDAPEntry:
+        """Lee y decodifica (en crudo) el registro LDIF de una posición del índice."""
+        offset = self._offsets[position]
+        dn, attrs = _parse_record(self._mmap[offset:offset + self._lengths[position]])
+        return LDAPEntry(dn, attrs)
+
+    def __len__(self) -> int:
+        return len(self._dns)
+
+
+def _str2dn(dn: str) -> list:
+    """Descompone un DN en RDNs (lista vacía si no es válido)."""
+    try:
+        return ldap.dn.str2dn(dn)
+    except Exception:
+        return []
+
+
+# ============================================================================
+# FILTROS (RFC 4515)
+# ============================================================================
+
+_FILTER_ITEM = re.compile(r"^([A-Za-z0-9][\w.;-]*)(~=|>=|<=|=)(.*)$", re.S)
+_FILTER_ESCAPE = re.compile(rb"\\([0-9a-fA-F]{2})")
+
+
+def parse_filter(filter_str: str) -> tuple:
+    """
+    Convierte un filtro LDAP en un árbol evaluable con match_filter().
+
+    Soporta &, |, !, igualdad, presencia, subcadenas, >=, <= y ~= (tratado como
+    igualdad). Los filtros extensibles (:=) no coinciden con ninguna entrada.
+
+    Args:
+        filter_str (str): Filtro LDAP
+
+    Returns:
+        tuple: Nodo raíz del árbol
+
+    Raises:
+        ValueError: Si el filtro está mal formado
+    """
+    text = (filter_str or "").strip() or "(objectClass=*)"
+    if not text.startswith("("):
+        text = f"({text})"
+    node, pos = _parse_node(text, 0)
+    if pos != len(text):
+        raise ValueError(f"Filtro LDAP mal formado: {filter_str}")
+    return node
+
+
+def _parse_node(text: str, pos: int) -> Tuple[tuple, int]:
+    """Analiza el filtro que empieza en `pos` y devuelve (nodo, posición siguiente)."""
+    try:
+        if text[pos] != "(":
+            raise ValueError
+        op = text[pos + 1]
+        if op in "&|":
+            children, pos = [], pos + 2
+            while text[pos] == "(":
+                child, pos = _parse_node(text, pos)
+                children.append(child)
+            node = (op, children)
+        elif op == "!":
+            child, pos = _parse_node(text, pos + 2)
+            node = ("!", child)
+        else:
+            end = text.index(")", pos)
+            node = _parse_item(text[pos + 1:end])
+            pos = end
+        if text[pos] != ")":
+            raise ValueError
+        return node, pos + 1
+    except (IndexError, ValueError):
+        raise ValueError(f"Filtro LDAP mal formado: {text}") from None
+
+
+def _parse_item(item: str) -> tuple:
+    """Analiza una comparación simple 'atributo op valor'."""
+    match = _FILTER_ITEM.match(item)
+    if not match:
+        return ("never",)
+
+    attr, op, value = match.groups()
+    attr = attr.split(";", 1)[0]
+    if op == "=" and value == "*":
+        return ("present", attr)
+    if op == "=" and "*" in value:
+        parts = [re.escape(_unescape(part)) for part in value.split("*")]
+        return ("substr", attr, re.compile("^" + ".*".join(parts) + "$", re.I | re.S))
+    kind = {"=": "eq", "~=": "eq", ">=": "ge", "<=": "le"}[op]
+    return (kind, attr, _unescape(value).casefold())
+
+
+def _unescape(value: str) -> str:
+    """Resuelve los escapes \\XX de un valor de filtro."""
+    raw = _FILTER_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), value.encode("utf-8"))
+    return raw.decode("utf-8", errors="replace")
+
+
+def match_filter(node: tuple, entry: LDAPEntry) -> bool:
+    """
+    Evalúa un filtro ya analizado contra una entrada.
+
+    Las comparaciones no distinguen mayúsculas, como las reglas caseIgnore que
+    usan la mayoría de atributos de texto; los valores binarios nunca coinciden.
+
+    Args:
+        node (tuple): Árbol devuelto por parse_filter()
+        entry (LDAPEntry): Entrada a evaluar
+
+    Returns:
+        bool: True si la entrada cumple el filtro
+    """
+    kind = node[0]
+    if kind == "&":
+        return all(match_filter(child, entry) for child in node[1])
+    if kind == "|":
+        return any(match_filter(child, entry) for child in node[1])
+    if kind == "!":
+        return not match_filter(node[1], entry)
+    if kind == "never":
+        return False
+    if kind == "present":
+        # Toda entrada tiene objectClass: (objectClass=*) es el filtro "todo"
+        return node[1].lower() == "objectclass" or node[1] in entry
+
+    values = [value for value in entry.all(node[1]) if isinstance(value, str)]
+    if kind == "substr":
+        return any(node[2].match(value) for value in values)
+
+    target = node[2]
+    values = [value.casefold() for value in values]
+    if kind == "eq":
+        return target in values
+    if kind == "ge":
+        return any(_ordered(value) >= _ordered(target) for value in values)
+    return any(_ordered(value) <= _ordered(target) for value in values)
+
+
+def _ordered(value: str):
+    """Clave de orden: numérica si el valor es un entero, textual en otro caso."""
+    try:
+        return (0, int(value), "")
+    except ValueError:
+        return (1, 0, value)
+
+
+# ============================================================================
+# CONECTOR
+# ============================================================================
+
+class SnapshotConnector(LDAPConnector):
+    """
+    Conector de solo lectura que responde desde un snapshot local.
+
+    Sustituye las primitivas de búsqueda de LDAPConnector (search, iter_search y
+    search_many) por lecturas del snapshot mapeado en memoria, de modo que
+    list_all_users(), list_all_groups(), get_user_groups() y el resto de métodos
+    heredados funcionan igual sin acceder al servidor.
+
+    Atributos:
+        snapshot_path (str): Ruta absoluta del LDIF del snapshot
+        connection (LDAPSnapshot): Snapshot abierto (None si no está conectado)
+    """
+
+    # El snapshot es local: repartir búsquedas entre copias no aporta nada
+    parallel_search = False
+
+    def __init__(self, snapshot_path: str = None, base_dn: str = None):
+        """
+        Inicializa el conector sin abrir el snapshot.
+
+        Args:
+            snapshot_path (str, optional): Ruta del LDIF. Por defecto LDAP_SNAPSHOT_PATH.
+            base_dn (str, optional): DN base del directorio. Por defecto LDAP_BASE_DN.
+        """
+        self.snapshot_path = os.path.abspath(snapshot_path or os.getenv("LDAP_SNAPSHOT_PATH", ""))
+        self.server_url = f"snapshot://{self.snapshot_path}"
+        self.base_dn = base_dn or os.getenv("LDAP_BASE_DN", "dc=meli,dc=com")
+        self.admin_dn = os.getenv("LDAP_ADMIN_DN", "CN=admin,DC=meli,DC=com")
+        self.admin_password = None
+        self.connection: Optional[LDAPSnapshot] = None
+        self.is_connected = False
+        self.bind_dn = self.admin_dn
+        self.use_pool = False
+        self._pool = None
+        self.cache = None
+
+        console.print(Panel(f"💾 Conector LDAP SNAPSHOT inicializado para: {self.snapshot_path}", style="blue"))
+
+    def connect(self) -> bool:
+        """
+        Abre el snapshot (índice en memoria y LDIF mapeado).
+
+        Returns:
+            bool: True si el snapshot se abrió correctamente
+        """
+        if self.is_connected:
+            return True
+        try:
+            snapshot = LDAPSnapshot(self.snapshot_path)
+            snapshot.open()
+            self.connection = snapshot
+            self.is_connected = True
+            console.print(Panel(f"✅ Snapshot LDAP cargado: {len(snapshot)} entradas", style="green"))
+            return True
+
+        except Exception as e:
+            console.print(Panel(f"❌ Error abriendo snapshot LDAP: {str(e)}", style="red"))
+            self.is_connected = False
+            return False
+
+    def disconnect(self) -> bool:
+        """
+        Cierra el snapshot.
+
+        Returns:
+            bool: Siempre True
+        """
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = None
+        self.is_connected = False
+        return True
+
+    def ping(self) -> bool:
+        """El snapshot es local: está vivo mientras esté abierto."""
+        return self.is_connected
+
+    def reconnect(self) -> bool:
+        """Vuelve a abrir el snapshot."""
+        self.disconnect()
+        return self.connect()
+
+    def clone(self) -> "SnapshotConnector":
+        """Conector sin abrir sobre el mismo snapshot (nunca sobre el servidor real)."""
+        return SnapshotConnector(self.snapshot_path, self.base_dn)
+
+    def search(self, base_dn: str, filter_str: str, attributes: List[str] = None,
+               scope: str = SCOPE_SUBTREE, size_limit: int = 0,
+               time_limit: float = None) -> List[LDAPEntry]:
+        """
+        Realiza una búsqueda sobre el snapshot con la misma firma que LDAPConnector.search().
+
+        Args:
+            base_dn (str): DN base para la búsqueda
+            filter_str (str): Filtro LDAP
+            attributes (List[str], optional): Atributos a retornar
+            scope (str, optional): 'base', 'onelevel' o 'subtree'
+            size_limit (int, optional): Máximo de entradas (0 = sin límite)
+            time_limit (float, optional): Ignorado (lectura local)
+
+        Returns:
+            List[LDAPEntry]: Entradas que cumplen el filtro
+        """
+        if not self.is_connected:
+            console.print(Panel("❌ No hay snapshot LDAP abierto", style="red"))
+            return []
+        try:
+            return list(self._scan(base_dn, filter_str, attributes, scope, size_limit))
+        except Exception as e:
+            console.print(Panel(f"❌ Error en búsqueda sobre snapshot: {str(e)}", style="red"))
+            return []
+
+    def iter_search(self, base_dn: str, filter_str: str, attributes: List[str] = None,
+                    page_size: int = None, scope: str = SCOPE_SUBTREE,
+                    size_limit: int = 0, raise_errors: bool = False) -> Iterator[LDAPEntry]:
+        """
+        Recorre una búsqueda sobre el snapshot entrada a entrada (page_size se ignora).
+
+        Yields:
+            LDAPEntry: Entradas que cumplen el filtro
+        """
+        if not self.is_connected:
+            console.print(Panel("❌ No hay snapshot LDAP abierto", style="red"))
+            if raise_errors:
+                raise ConnectionError("No hay snapshot LDAP abierto")
+            return
+        try:
+            yield from self._scan(base_dn, filter_str, attributes, scope, size_limit)
+        except Exception as e:
+            console.print(Panel(f"❌ Error en búsqueda sobre snapshot: {str(e)}", style="red"))
+            if raise_errors:
+                raise
+
+    def search_many(self, requests: Dict[str, Dict[str, Any]]) -> Dict[str, List[LDAPEntry]]:
+        """
+        Resuelve varias búsquedas sobre el snapshot (mismo formato que LDAPConnector).
+
+        Returns:
+            Dict[str, List[LDAPEntry]]: Resultados por nombre
+        """
+        return {name: self.search(**request) for name, request in requests.items()}
+
+    def modify(self, dn: str, modlist: List[tuple]) -> bool:
+        """
+        El snapshot es de solo lectura: las modificaciones se rechazan.
+
+        Returns:
+            bool: Siempre False
+        """
+        console.print(Panel(f"❌ Snapshot de solo lectura: no se puede modificar {dn}", style="red"))
+        return False
+
+    def _scan(self, base_dn: str, filter_str: str, attributes: Optional[List[str]],
+              scope, size_limit: int) -> Iterator[LDAPEntry]:
+        """Recorre el alcance, aplica el filtro, proyecta atributos y corta en size_limit."""
+        scope = _SCOPES.get(scope, scope)
+        if scope not in (SCOPE_BASE, SCOPE_ONELEVEL, SCOPE_SUBTREE):
+            raise ValueError(f"Alcance de búsqueda no válido: {scope}")
+
+        node = parse_filter(filter_str)
+        returned = 0
+        for entry in self.connection.scan(base_dn, scope):
+            if not match_filter(node, entry):
+                continue
+            yield _project(entry, attributes)
+            returned += 1
+            if size_limit and returned >= size_limit:
+                return
+
+
+def _project(entry: LDAPEntry, attributes: Optional[List[str]]) -> LDAPEntry:
+    """Reduce la entrada a los atributos solicitados ('*', '+' o None devuelven todos)."""
+    if not attributes or ALL_USER_ATTRS in attributes or ALL_OPERATIONAL_ATTRS in attributes:
+        return entry
+    wanted = {attr.lower() for attr in attributes}
+    return LDAPEntry(entry.dn, {
+        name: entry.raw(name) for name in entry if name != "dn" and name.lower() in wanted
+    })
+
+
+def create_connector(**kwargs) -> LDAPConnector:
+    """
+    Crea el conector adecuado según la configuración.
+
+    Si LDAP_SNAPSHOT_PATH está definida las consultas se responden desde ese
+    snapshot; en caso contrario se usa el servidor LDAP real.
+
+    Args:
+        **kwargs: Argumentos para LDAPConnector (ignorados con snapshot)
+
+    Returns:
+        LDAPConnector: SnapshotConnector o LDAPConnector
+    """
+    snapshot_path = os.getenv("LDAP_SNAPSHOT_PATH", "").strip()
+    if snapshot_path:
+        return SnapshotConnector(snapshot_path)
+    return LDAPConnector(**kwargs)
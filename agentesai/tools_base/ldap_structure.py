@@ -0,0 +1,286 @@
+"""
+Análisis de la estructura del directorio LDAP a partir de los DNs.
+
+Un único recorrido paginado (repartido por OU, ver ldap_fanout) que solo pide
+objectClass basta para obtener el número de entradas por OU, la profundidad
+real del árbol, su fan-out y el histograma de clases de objeto. No se
+descargan ni decodifican los atributos de usuarios y grupos.
+"""
+
+import os
+import time
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import ldap.dn
+
+from .ldap_connector import USERS_BASE_DN
+from .ldap_entry import LDAPEntry
+from .ldap_fanout import iter_search_fanout
+from .membership import GROUPS_BASE_DN, normalize_dn
+
+# Único atributo pedido por entrada (para el histograma de clases)
+STRUCTURE_ATTRS = ['objectClass']
+
+# Segundos que se reutiliza un análisis (configurable con LDAP_STRUCTURE_TTL)
+DEFAULT_STRUCTURE_TTL = 300
+
+# Clases contadas como usuarios, grupos y OUs (las de list_all_users/list_all_groups)
+USER_CLASS = "inetorgperson"
+GROUP_CLASS = "groupofnames"
+OU_CLASS = "organizationalunit"
+
+
+class DirectoryStructure:
+    """
+    Estructura del directorio calculada contando entradas.
+
+    Atributos:
+        base_dn (str): Raíz analizada
+        total_entries (int): Entradas del subárbol (incluida la base)
+        entries_by_depth (List[int]): Entradas por nivel (0 = la base)
+        children (Counter): DN normalizado → hijos directos
+        descendants (Counter): DN normalizado → entradas por debajo
+        object_classes (Counter): objectClass → entradas que la tienen
+        ous (List[Tuple[str, str]]): (DN, nombre) de cada unidad organizativa
+        total_users (int): Usuarios (inetOrgPerson bajo USERS_BASE_DN)
+        total_groups (int): Grupos (groupOfNames bajo GROUPS_BASE_DN)
+        built_at (float): Instante del análisis (time.monotonic)
+
+    Métodos principales:
+        - build(): Analiza el directorio con un recorrido paginado
+        - to_dict(): Resultado con el formato de get_ldap_structure()
+        - is_expired(): Indica si el análisis superó su TTL
+    """
+
+    __slots__ = ("base_dn", "total_entries", "entries_by_depth", "children", "descendants",
+                 "object_classes", "ous", "total_users", "total_groups", "built_at",
+                 "_base_levels", "_users_base", "_groups_base")
+
+    def __init__(self, base_dn: str):
+        self.base_dn = base_dn
+        self.total_entries = 0
+        self.entries_by_depth: List[int] = []
+        self.children: Counter = Counter()
+        self.descendants: Counter = Counter()
+        self.object_classes: Counter = Counter()
+        self.ous: List[Tuple[str, str]] = []
+        self.total_users = 0
+        self.total_groups = 0
+        self.built_at = time.monotonic()
+        self._base_levels = len(_rdns(base_dn))
+        self._users_base = normalize_dn(USERS_BASE_DN)
+        self._groups_base = normalize_dn(GROUPS_BASE_DN)
+
+    @classmethod
+    def build(cls, ldap_conn, base_dn: str = None) -> "DirectoryStructure":
+        """
+        Analiza el subárbol con un recorrido paginado que solo pide objectClass.
+
+        Args:
+            ldap_conn (LDAPConnector): Conector conectado
+            base_dn (str, optional): Raíz a analizar (por defecto la del conector)
+
+        Returns:
+            DirectoryStructure: Estructura calculada
+
+        Raises:
+            Exception: Si el recorrido falla (no se devuelven conteos parciales)
+        """
+        structure = cls(base_dn or ldap_conn.base_dn)
+        entries = iter_search_fanout(ldap_conn, structure.base_dn, "(objectClass=*)",
+                                     attributes=STRUCTURE_ATTRS, raise_errors=True)
+        for entry in entries:
+            structure.add(entry)
+        structure.built_at = time.monotonic()
+        return structure
+
+    def add(self, entry: LDAPEntry):
+        """Cuenta una entrada del subárbol."""
+        rdns = _rdns(entry.dn)
+        level = max(0, len(rdns) - self._base_levels)
+
+        self.total_entries += 1
+        if level >= len(self.entries_by_depth):
+            self.entries_by_depth.extend([0] * (level + 1 - len(self.entries_by_depth)))
+        self.entries_by_depth[level] += 1
+
+        if level:
+            self.children[_join(rdns[1:])] += 1
+        for i in range(1, level + 1):
+            self.descendants[_join(rdns[i:])] += 1
+
+        classes = entry.all("objectClass")
+        self.object_classes.update(classes)
+        lowered = {value.lower() for value in classes}
+
+        dn = _join(rdns)
+        if USER_CLASS in lowered and _is_within(dn, self._users_base):
+            self.total_users += 1
+        if GROUP_CLASS in lowered and _is_within(dn, self._groups_base):
+            self.total_groups += 1
+        if OU_CLASS in lowered:
+            self.ous.append((entry.dn, _rdn_value(entry.dn)))
+
+    @property
+    def depth(self) -> int:
+        """Niveles del árbol contando la base (0 si está vacío)."""
+        return len(self.entries_by_depth)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Resultado con el formato de LDAPConnector.get_ldap_structure().
+
+        Returns:
+            Dict[str, Any]: Estructura con OUs, totales, profundidad, fan-out e histograma
+        """
+        fanouts = list(self.children.values())
+        return {
+            "base_dn": self.base_dn,
+            "organizational_units": [
+                {
+                    "name": name,
+                    "dn": dn,
+                    "description": f"Unidad organizativa: {name}",
+                    "entry_count": self.descendants[normalize_dn(dn)],
+                    "children": self.children[normalize_dn(dn)]
+                }
+                for dn, name in self.ous
+            ],
+            "total_users": self.total_users,
+            "total_groups": self.total_groups,
+            "total_entries": self.total_entries,
+            "structure_depth": self.depth,
+            "entries_by_depth": list(self.entries_by_depth),
+            "max_fanout": max(fanouts, default=0),
+            "avg_fanout": round(sum(fanouts) / len(fanouts), 2) if fanouts else 0,
+            "object_classes": dict(self.object_classes.most_common())
+        }
+
+    def is_expired(self, ttl: float) -> bool:
+        """
+        Indica si el análisis superó su tiempo de vida.
+
+        Args:
+            ttl (float): Tiempo de vida en segundos
+
+        Returns:
+            bool: True si debe repetirse
+        """
+        return time.monotonic() - self.built_at > ttl
+
+
+def _rdns(dn: str) -> list:
+    """RDNs de un DN normalizado (de la hoja a la raíz)."""
+    if not dn:
+        return []
+    try:
+        return ldap.dn.str2dn(dn.lower())
+    except Exception:
+        return [part.strip() for part in dn.lower().split(",")]
+
+
+def _join(rdns: list) -> str:
+    """DN normalizado a partir de sus RDNs (el formato de normalize_dn)."""
+    if rdns and isinstance(rdns[0], str):
+        return ",".join(rdns)
+    return ldap.dn.dn2str(rdns)
+
+
+def _is_within(dn: str, base: str) -> bool:
+    """True si el DN normalizado es `base` o está por debajo."""
+    return dn == base or dn.endswith("," + base)
+
+
+def _rdn_value(dn: str) -> str:
+    """Valor del primer RDN (p. ej. 'users' en 'ou=users,dc=meli,dc=com')."""
+    try:
+        return ldap.dn.str2dn(dn)[0][0][1]
+    except Exception:
+        return dn.split(",", 1)[0].split("=", 1)[-1].strip()
+
+
+# ============================================================================
+# CACHÉ DE ANÁLISIS (uno por servidor + identidad de bind + base)
+# ============================================================================
+
+_structures: Dict[Tuple[str, str, str], DirectoryStructure] = {}
+_structures_lock = threading.Lock()
+
+# Un lock por clave: un recorrido no bloquea a otros servidores, identidades o bases
+_build_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+# Se incrementa al invalidar: un análisis hecho antes de la invalidación no se cachea
+_generation = 0
+
+
+def structure_ttl() -> float:
+    """Tiempo de vida del análisis en segundos (variable LDAP_STRUCTURE_TTL, por defecto 300)."""
+    return float(os.getenv("LDAP_STRUCTURE_TTL", DEFAULT_STRUCTURE_TTL))
+
+
+def get_directory_structure(ldap_conn, base_dn: str = None, refresh: bool = False) -> DirectoryStructure:
+    """
+    Obtiene el análisis de estructura compartido, repitiéndolo si expiró.
+
+    Se comparte entre conectores del mismo servidor e identidad de bind, ya que
+    distintas identidades pueden ver distintas entradas según las ACLs.
+
+    Args:
+        ldap_conn (LDAPConnector): Conector LDAP conectado
+        base_dn (str, optional): Raíz a analizar (por defecto la del conector)
+        refresh (bool, optional): Fuerza un análisis nuevo
+
+    Returns:
+        DirectoryStructure: Análisis vigente (vacío y sin cachear si no hay conexión)
+
+    Raises:
+        Exception: Si el recorrido falla (el error no se cachea)
+    """
+    base_dn = base_dn or ldap_conn.base_dn
+    if not ldap_conn.is_connected:
+        return DirectoryStructure(base_dn)
+
+    clave = (ldap_conn.server_url, (ldap_conn.bind_dn or "").lower(), normalize_dn(base_dn))
+
+    ttl = structure_ttl()
+
+    with _structures_lock:
+        anterior = _structures.get(clave)
+        if not refresh and anterior is not None and not anterior.is_expired(ttl):
+            return anterior
+        build_lock = _build_locks.setdefault(clave, threading.Lock())
+
+    # El recorrido se hace fuera del lock global; quien espera la misma clave
+    # reutiliza el análisis que hizo el primero
+    with build_lock:
+        with _structures_lock:
+            structure = _structures.get(clave)
+            generation = _generation
+        if structure is not None and structure is not anterior and not structure.is_expired(ttl):
+            return structure
+
+        structure = DirectoryStructure.build(ldap_conn, base_dn)
+        with _structures_lock:
+            if generation == _generation:
+                _structures[clave] = structure
+
+    return structure
+
+
+def invalidate_directory_structure(server_url: Optional[str] = None):
+    """
+    Descarta los análisis cacheados.
+
+    Args:
+        server_url (str, optional): Solo invalida los análisis de este servidor
+    """
+    global _generation
+    with _structures_lock:
+        _generation += 1
+        if server_url is None:
+            _structures.clear()
+        else:
+            for clave in [c for c in _structures if c[0] == server_url]:
+                del _structures[clave]
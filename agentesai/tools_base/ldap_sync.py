@@ -0,0 +1,363 @@
+"""
+Sincronización incremental del directorio LDAP con un almacén local.
+
+La primera sincronización lee el subárbol completo; las siguientes solo piden
+las entradas cuyo modifyTimestamp es igual o posterior al mayor visto. Si el
+servidor publica contextCSN (OpenLDAP con syncprov) y no ha cambiado desde la
+última vez, el refresco se resuelve con una única búsqueda base.
+
+Las bajas no dejan rastro en modifyTimestamp, así que se detectan con una pasada
+periódica de reconciliación que solo pide DNs (atributos '1.1').
+"""
+
+import os
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich.panel import Panel
+from .output import console
+
+from .ldap_connector import (
+    LDAPConnector,
+    SCOPE_BASE,
+    SCOPE_SUBTREE,
+    NO_ATTRS,
+    ALL_USER_ATTRS,
+    ALL_OPERATIONAL_ATTRS
+)
+from .ldap_entry import LDAPEntry
+from .ldap_snapshot import LDAPSnapshot, index_path, write_snapshot
+from .membership import normalize_dn
+
+
+# Segundos entre reconciliaciones de bajas (configurable con LDAP_SYNC_RECONCILE_INTERVAL)
+DEFAULT_RECONCILE_INTERVAL = 3600
+
+# Atributos pedidos por entrada: los de usuario más la marca de modificación
+SYNC_ATTRS = [ALL_USER_ATTRS, "modifyTimestamp"]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SyncStore:
+    """
+    Almacén local en memoria de las entradas sincronizadas.
+
+    Atributos:
+        entries (Dict[str, LDAPEntry]): Entradas por DN normalizado
+        rootdse (LDAPEntry): RootDSE del servidor (None si no se leyó)
+        state (Dict[str, Any]): Estado de la sincronización (marcas y fechas)
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, LDAPEntry] = {}
+        self.rootdse: Optional[LDAPEntry] = None
+        self.state: Dict[str, Any] = {}
+        # Hay entradas sin persistir
+        self.dirty = False
+
+    def put(self, entry: LDAPEntry):
+        """Añade o reemplaza una entrada."""
+        self.entries[normalize_dn(entry.dn)] = entry
+        self.dirty = True
+
+    def delete(self, dn: str) -> bool:
+        """Elimina una entrada; True si existía."""
+        removed = self.entries.pop(normalize_dn(dn), None) is not None
+        self.dirty = self.dirty or removed
+        return removed
+
+    def get(self, dn: str) -> Optional[LDAPEntry]:
+        """Entrada por DN (None si no está en el almacén)."""
+        return self.entries.get(normalize_dn(dn))
+
+    def clear(self):
+        """Vacía entradas, RootDSE y estado."""
+        self.entries.clear()
+        self.rootdse = None
+        self.state = {}
+        self.dirty = True
+
+    def load(self) -> bool:
+        """Carga el contenido persistido (el almacén en memoria no persiste nada)."""
+        return False
+
+    def save(self):
+        """Persiste el contenido (en memoria solo marca los cambios como guardados)."""
+        self.dirty = False
+
+    def __iter__(self) -> Iterator[LDAPEntry]:
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class FileSyncStore(SyncStore):
+    """
+    Almacén persistido como snapshot (LDIF + índice) y un fichero de estado JSON.
+
+    El LDIF es un snapshot normal: se puede servir con SnapshotConnector
+    (LDAP_SNAPSHOT_PATH) y cada refresco incremental lo mantiene al día sin
+    volver a leer el directorio.
+
+    Atributos:
+        path (str): Ruta del LDIF
+        state_path (str): Ruta del estado de sincronización (path + ".sync.json")
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.state_path = path + ".sync.json"
+
+    def load(self) -> bool:
+        """
+        Carga el snapshot y el estado si ambos existen.
+
+        Returns:
+            bool: True si había una sincronización previa
+        """
+        if not all(os.path.exists(p) for p in (self.path, index_path(self.path), self.state_path)):
+            return False
+
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        snapshot = LDAPSnapshot(self.path)
+        snapshot.open()
+        try:
+            self.clear()
+            self.rootdse = snapshot.get("")
+            for entry in snapshot.scan("", SCOPE_SUBTREE):
+                self.put(entry)
+        finally:
+            snapshot.close()
+
+        self.state = state
+        self.dirty = False
+        return True
+
+    def save(self):
+        """Reescribe el snapshot si hubo cambios y siempre el estado (ambos de forma atómica)."""
+        def entradas() -> Iterator[LDAPEntry]:
+            if self.rootdse is not None:
+                yield self.rootdse
+            yield from self.entries.values()
+
+        if self.dirty or not os.path.exists(self.path):
+            write_snapshot(self.path, entradas(), [
+                f"Snapshot LDAP sincronizado de {self.state.get('server_url', '')}",
+                f"base: {self.state.get('base_dn', '')}",
+                f"filtro: {self.state.get('filter', '')}"
+            ])
+            self.dirty = False
+
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.state_path)
+
+
+class DirectorySync:
+    """
+    Motor de sincronización incremental sobre un LDAPConnector.
+
+    Marcas que se guardan en el estado del almacén:
+        - modify_timestamp: mayor modifyTimestamp visto (base de los refrescos)
+        - context_csn: contextCSN de la base en la última sincronización
+        - last_reconcile: fecha de la última pasada de detección de bajas
+
+    Atributos:
+        ldap_conn (LDAPConnector): Conector conectado
+        store (SyncStore): Almacén local
+        base_dn (str): Raíz del subárbol sincronizado
+        filter_str (str): Filtro de las entradas sincronizadas
+        reconcile_interval (float): Segundos entre reconciliaciones
+
+    Métodos principales:
+        - refresh(): Sincroniza (completa la primera vez, incremental después)
+        - full_sync(): Relee el subárbol completo
+        - reconcile(): Elimina del almacén las entradas que ya no existen
+    """
+
+    def __init__(self, ldap_conn: LDAPConnector, store: SyncStore = None, base_dn: str = None,
+                 filter_str: str = "(objectClass=*)", reconcile_interval: float = None):
+        """
+        Args:
+            ldap_conn (LDAPConnector): Conector conectado
+            store (SyncStore, optional): Almacén (por defecto en memoria)
+            base_dn (str, optional): Raíz del subárbol (por defecto la base del conector)
+            filter_str (str, optional): Filtro de las entradas a sincronizar
+            reconcile_interval (float, optional): Segundos entre reconciliaciones
+                (por defecto LDAP_SYNC_RECONCILE_INTERVAL o DEFAULT_RECONCILE_INTERVAL)
+        """
+        self.ldap_conn = ldap_conn
+        self.store = store if store is not None else SyncStore()
+        self.base_dn = base_dn if base_dn is not None else ldap_conn.base_dn
+        self.filter_str = filter_str
+        if reconcile_interval is None:
+            reconcile_interval = float(os.getenv("LDAP_SYNC_RECONCILE_INTERVAL", DEFAULT_RECONCILE_INTERVAL))
+        self.reconcile_interval = reconcile_interval
+        self._loaded = False
+
+    def refresh(self, full: bool = False, reconcile: bool = None) -> Dict[str, Any]:
+        """
+        Sincroniza el almacén con el servidor.
+
+        Args:
+            full (bool, optional): Forzar una relectura completa
+            reconcile (bool, optional): Forzar (True) u omitir (False) la detección de
+                                        bajas; por defecto según reconcile_interval
+
+        Returns:
+            Dict[str, Any]: Resumen con mode ("full", "incremental" o "unchanged"),
+                updated, deleted, entries y elapsed_s
+
+        Raises:
+            ConnectionError: Si el conector no está conectado
+        """
+        start = time.perf_counter()
+        if not self.ldap_conn.is_connected:
+            raise ConnectionError("No hay conexión LDAP activa")
+
+        if not self._loaded:
+            self.store.load()
+            self._loaded = True
+
+        state = self.store.state
+        same_scope = state.get("base_dn") == self.base_dn and state.get("filter") == self.filter_str
+
+        with self.ldap_conn.uncached():
+            if full or not same_scope or not state.get("modify_timestamp"):
+                summary = self.full_sync()
+            else:
+                summary = self._incremental(reconcile)
+
+        summary["entries"] = len(self.store)
+        summary["elapsed_s"] = round(time.perf_counter() - start, 4)
+        return summary
+
+    def full_sync(self) -> Dict[str, Any]:
+        """
+        Relee el subárbol completo y reemplaza el contenido del almacén.
+
+        Returns:
+            Dict[str, Any]: Resumen de la sincronización
+        """
+        # Las marcas se leen antes del recorrido: lo que cambie durante él se vuelve a pedir
+        context_csn = self._context_csn()
+
+        self.store.clear()
+        rootdse = self.ldap_conn.search("", "(objectClass=*)",
+                                        attributes=[ALL_USER_ATTRS, ALL_OPERATIONAL_ATTRS], scope=SCOPE_BASE)
+        self.store.rootdse = rootdse[0] if rootdse else None
+
+        high_water = None
+        for entry in self.ldap_conn.iter_search(self.base_dn, self.filter_str, attributes=SYNC_ATTRS,
+                                                raise_errors=True):
+            self.store.put(entry)
+            high_water = _max_timestamp(high_water, entry)
+
+        now = _now()
+        self.store.state = {
+            "server_url": self.ldap_conn.server_url,
+            "base_dn": self.base_dn,
+            "filter": self.filter_str,
+            "modify_timestamp": high_water,
+            "context_csn": context_csn,
+            "last_full": now,
+            "last_reconcile": now,
+            "synced_at": now
+        }
+        self.store.save()
+
+        console.print(Panel(f"🔄 Sincronización completa: {len(self.store)} entradas", style="blue"))
+        return {"mode": "full", "updated": len(self.store), "deleted": 0}
+
+    def reconcile(self) -> int:
+        """
+        Detecta bajas comparando los DNs del servidor con los del almacén.
+
+        Solo se piden DNs (atributos '1.1'). Si el recorrido falla se propaga el
+        error y no se elimina nada.
+
+        Returns:
+            int: Entradas eliminadas del almacén
+        """
+        live = {
+            normalize_dn(entry.dn)
+            for entry in self.ldap_conn.iter_search(self.base_dn, self.filter_str, attributes=NO_ATTRS,
+                                                    raise_errors=True)
+        }
+        removed = [dn for dn in self.store.entries if dn not in live]
+        for dn in removed:
+            self.store.delete(dn)
+        self.store.state["last_reconcile"] = _now()
+        return len(removed)
+
+    def _incremental(self, reconcile: Optional[bool]) -> Dict[str, Any]:
+        """Aplica los cambios desde la última marca y, si toca, detecta bajas."""
+        state = self.store.state
+        context_csn = self._context_csn()
+
+        if context_csn and context_csn == state.get("context_csn"):
+            # contextCSN cambia con cualquier alta, modificación o baja: nada que aplicar,
+            # salvo una detección de bajas pedida explícitamente
+            deleted = 0
+            if reconcile is True:
+                deleted = self.reconcile()
+                self.store.save()
+            return {"mode": "unchanged", "updated": 0, "deleted": deleted}
+
+        high_water = state["modify_timestamp"]
+        updated = 0
+        # >= porque modifyTimestamp tiene resolución de segundos: se reaplica el borde
+        changes = f"(&{self.filter_str}(modifyTimestamp>={high_water}))"
+        for entry in self.ldap_conn.iter_search(self.base_dn, changes, attributes=SYNC_ATTRS,
+                                                raise_errors=True):
+            # Las entradas del segundo frontera suelen venir sin cambios: no contarlas
+            previous = self.store.get(entry.dn)
+            if previous is None or previous.to_dict() != entry.to_dict():
+                self.store.put(entry)
+                updated += 1
+            high_water = _max_timestamp(high_water, entry)
+
+        if reconcile is None:
+            reconcile = self._reconcile_due()
+        deleted = self.reconcile() if reconcile else 0
+
+        state.update({
+            "modify_timestamp": high_water,
+            "context_csn": context_csn,
+            "synced_at": _now()
+        })
+        self.store.save()
+
+        return {"mode": "incremental", "updated": updated, "deleted": deleted}
+
+    def _context_csn(self) -> Optional[List[str]]:
+        """contextCSN de la base (uno por servidor en multi-master), None si no se publica."""
+        entries = self.ldap_conn.search(self.base_dn, "(objectClass=*)", attributes=["contextCSN"],
+                                        scope=SCOPE_BASE)
+        values = entries[0].all("contextCSN") if entries else []
+        return sorted(values) or None
+
+    def _reconcile_due(self) -> bool:
+        last = self.store.state.get("last_reconcile")
+        if not last:
+            return True
+        elapsed = datetime.now(timezone.utc) - datetime.fromisoformat(last)
+        return elapsed.total_seconds() >= self.reconcile_interval
+
+
+def _max_timestamp(current: Optional[str], entry: LDAPEntry) -> Optional[str]:
+    """Mayor modifyTimestamp (GeneralizedTime, comparable como texto)."""
+    value = entry.first("modifyTimestamp")
+    if not value:
+        return current
+    return value if current is None or value > current else current
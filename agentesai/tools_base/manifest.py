@@ -0,0 +1,41 @@
+"""
+Manifiestos de las herramientas base.
+
+Declaran los patrones que enrutan una consulta a cada herramienta y su
+prioridad (ver agentesai.manifest). Los patrones se comparan normalizados
+(sin acentos ni puntuación) y cada uno pertenece a una sola herramienta.
+"""
+
+from ..manifest import AGENT_EXECUTOR, COST_LDAP, COST_LOCAL, ToolManifest
+
+_TOOLS = "agentesai.tools_base.tools"
+
+MANIFESTS = [
+    # Herramientas obligatorias (requeridas por el challenge)
+    ToolManifest("get_current_user_info", f"{_TOOLS}:get_current_user_info",
+                 ["quién soy", "quien soy", "who am i"],
+                 priority=10, agent=AGENT_EXECUTOR, cost=COST_LDAP,
+                 description="Información de mi propia cuenta: mi usuario, nombre y correo (my own account, current user)"),
+    ToolManifest("get_user_groups", f"{_TOOLS}:get_user_groups",
+                 ["qué grupos tengo", "que grupos tengo", "what groups"],
+                 priority=20, agent=AGENT_EXECUTOR, cost=COST_LDAP,
+                 description="Grupos a los que pertenezco y mis membresías (groups I belong to, my memberships)"),
+    ToolManifest("reset_system", f"{_TOOLS}:reset_system",
+                 ["reset", "reseteo", "reiniciar"],
+                 priority=30, agent=AGENT_EXECUTOR, cost=COST_LOCAL,
+                 description="Reinicia el sistema y limpia las cachés (restart the system, clear caches)"),
+
+    # Herramientas adicionales de seguridad ofensiva (datos reales del LDAP)
+    ToolManifest("list_all_users", f"{_TOOLS}:list_all_users",
+                 ["listar usuarios", "lista usuarios", "todos los usuarios", "list users", "all users"],
+                 priority=40, agent=AGENT_EXECUTOR, cost=COST_LDAP,
+                 description="Lista todas las cuentas de usuario del directorio (show every user account, all accounts)"),
+    ToolManifest("search_users_by_department", f"{_TOOLS}:search_users_by_department",
+                 ["buscar usuarios", "usuarios por departamento", "search users", "users by department"],
+                 priority=50, agent=AGENT_EXECUTOR, cost=COST_LDAP,
+                 description="Usuarios de un departamento o área (users in a department or team)"),
+    ToolManifest("analyze_ldap_structure", f"{_TOOLS}:analyze_ldap_structure",
+                 ["estructura ldap", "estructura del directorio", "ldap structure", "directory structure"],
+                 priority=60, agent=AGENT_EXECUTOR, cost=COST_LDAP,
+                 description="Organización del directorio: unidades organizativas, ramas y cantidad de objetos (directory tree, organizational units)"),
+]
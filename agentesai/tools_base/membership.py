@@ -0,0 +1,478 @@
+"""
+Índice inverso de pertenencia a grupos LDAP (DN de miembro → grupos).
+
+Incluye la pertenencia transitiva por grupos anidados, resuelta en memoria
+sobre el grafo de grupos leído en la misma búsqueda.
+"""
+
+import os
+import time
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import ldap.dn
+
+from .ldap_entry import LDAPEntry
+
+# Base y filtro de los grupos indexados
+GROUPS_BASE_DN = "ou=groups,dc=meli,dc=com"
+GROUPS_FILTER = "(objectClass=groupOfNames)"
+
+# Mapeo de grupos a departamentos. El orden define la prioridad cuando un
+# usuario pertenece a varios grupos con departamento asociado.
+GROUP_DEPT_MAPPING = {
+    "admins": "IT",
+    "developers": "Development",
+    "managers": "Management",
+    "hr": "Human Resources",
+    "finance": "Finance",
+    "qa": "Quality Assurance",
+    "it": "IT"
+}
+
+# Departamento asignado a usuarios sin ningún grupo mapeado
+DEFAULT_DEPARTMENT = "General"
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+class MembershipIndex:
+    """
+    Índice de pertenencia a grupos construido con una única búsqueda de grupos.
+
+    Asocia cada DN de miembro (normalizado) con el conjunto inmutable de CNs de
+    los grupos a los que pertenece, de modo que resolver los grupos de un usuario
+    es una consulta a un diccionario en lugar de una búsqueda LDAP.
+
+    Los grupos anidados (un grupo miembro de otro) se resuelven sobre el grafo de
+    grupos en memoria: el cierre transitivo de cada grupo se calcula la primera
+    vez que se necesita y se memoriza, y los ciclos se toleran (cada grupo se
+    visita una vez por recorrido).
+
+    Atributos:
+        memberships (Dict[str, FrozenSet[str]]): DN normalizado → CNs de grupos directos
+        group_members (Dict[str, FrozenSet[str]]): DN de grupo → DNs de miembros directos
+        group_cns (Dict[str, str]): DN de grupo → CN
+        total_groups (int): Número de grupos indexados
+        built_at (float): Instante de construcción (time.monotonic)
+
+    Métodos principales:
+        - build(): Construye el índice a partir de una conexión LDAP
+        - groups_for(): Grupos de un DN de miembro (incluidos los heredados)
+        - members_of(): Miembros de un grupo (incluidos los de subgrupos)
+        - department_for(): Departamento de un DN de miembro
+        - nested_groups(): Grupos que son miembros de otro grupo
+        - cyclic_groups(): Grupos que forman parte de un ciclo de anidamiento
+        - is_expired(): Indica si el índice superó su TTL
+    """
+
+    __slots__ = ("memberships", "group_members", "group_cns", "total_groups", "built_at",
+                 "_parents", "_member_groups", "_ancestors", "_descendants")
+
+    def __init__(self, memberships: Dict[str, FrozenSet[str]], total_groups: int = 0,
+                 built_at: float = None, group_members: Dict[str, FrozenSet[str]] = None,
+                 group_cns: Dict[str, str] = None):
+        """
+        Inicializa el índice con pertenencias ya calculadas.
+
+        Args:
+            memberships (Dict[str, FrozenSet[str]]): DN normalizado → CNs de grupos
+            total_groups (int, optional): Número de grupos indexados
+            built_at (float, optional): Instante de construcción (por defecto ahora)
+            group_members (Dict[str, FrozenSet[str]], optional): DN de grupo → miembros
+                                                                  directos (para el anidamiento)
+            group_cns (Dict[str, str], optional): DN de grupo → CN
+        """
+        self.memberships = memberships
+        self.group_members = group_members or {}
+        self.group_cns = group_cns or {}
+        self.total_groups = total_groups
+        self.built_at = time.monotonic() if built_at is None else built_at
+
+        # Aristas grupo → grupos que lo contienen (vacío si no hay anidamiento)
+        parents: Dict[str, set] = {}
+        for group_dn, members in self.group_members.items():
+            for member_dn in members:
+                if member_dn in self.group_cns:
+                    parents.setdefault(member_dn, set()).add(group_dn)
+        self._parents = {dn: frozenset(groups) for dn, groups in parents.items()}
+
+        # Memorias del cierre transitivo (se rellenan bajo demanda)
+        self._member_groups: Optional[Dict[str, FrozenSet[str]]] = None
+        self._ancestors: Dict[str, FrozenSet[str]] = {}
+        self._descendants: Dict[str, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_groups(cls, groups: Iterable[Dict[str, Any]]) -> "MembershipIndex":
+        """
+        Construye el índice a partir de entradas de grupo ya decodificadas.
+
+        Args:
+            groups (Iterable[Dict[str, Any]]): Entradas con 'cn', 'member' y su DN
+
+        Returns:
+            MembershipIndex: Índice construido
+        """
+        acumulado: Dict[str, set] = {}
+        group_members: Dict[str, FrozenSet[str]] = {}
+        group_cns: Dict[str, str] = {}
+        # Conjuntos compartidos entre miembros con los mismos grupos
+        internados: Dict[FrozenSet[str], FrozenSet[str]] = {}
+
+        for group in groups:
+            cns = _values(group, "cn")
+            if not cns:
+                continue
+            cn = cns[0]
+            group_dn = normalize_dn(_dn(group)) or f"cn={cn.lower()}"
+            group_cns[group_dn] = cn
+
+            members = {normalize_dn(member_dn) for member_dn in _values(group, "member")}
+            group_members[group_dn] = group_members.get(group_dn, frozenset()) | members
+            for member_dn in members:
+                acumulado.setdefault(member_dn, set()).add(cn)
+
+        memberships = {}
+        for dn, group_set in acumulado.items():
+            group_set = frozenset(group_set)
+            memberships[dn] = internados.setdefault(group_set, group_set)
+        return cls(memberships, len(group_cns), group_members=group_members, group_cns=group_cns)
+
+    @classmethod
+    def build(cls, ldap_conn) -> "MembershipIndex":
+        """
+        Construye el índice con una única búsqueda paginada de grupos.
+
+        Args:
+            ldap_conn (LDAPConnector): Conector LDAP conectado
+
+        Returns:
+            MembershipIndex: Índice construido
+
+        Raises:
+            Exception: Si el recorrido falla (no se devuelven índices parciales)
+        """
+        groups = ldap_conn.iter_search(GROUPS_BASE_DN, GROUPS_FILTER, attributes=['cn', 'member'],
+                                       raise_errors=True)
+        return cls.from_groups(groups)
+
+    @property
+    def has_nesting(self) -> bool:
+        """True si algún grupo es miembro de otro."""
+        return bool(self._parents)
+
+    def groups_for(self, member_dn: str, transitive: bool = True) -> FrozenSet[str]:
+        """
+        Obtiene los grupos de un DN de miembro.
+
+        Args:
+            member_dn (str): DN del usuario (o grupo) miembro
+            transitive (bool, optional): Incluir los grupos heredados por anidamiento
+
+        Returns:
+            FrozenSet[str]: CNs de los grupos a los que pertenece
+        """
+        dn = normalize_dn(member_dn)
+        direct = self.memberships.get(dn, _EMPTY)
+        if not transitive or not direct or not self._parents:
+            return direct
+
+        groups = set(direct)
+        for group_dn in self._direct_group_dns(dn):
+            groups.update(self.group_cns[ancestor] for ancestor in self._ancestors_of(group_dn))
+        return frozenset(groups)
+
+    def members_of(self, group: str, transitive: bool = True) -> FrozenSet[str]:
+        """
+        Obtiene los miembros de un grupo.
+
+        Args:
+            group (str): CN o DN del grupo
+            transitive (bool, optional): Incluir los miembros de los subgrupos (los
+                                         subgrupos en sí no se devuelven)
+
+        Returns:
+            FrozenSet[str]: DNs normalizados de los miembros (vacío si el grupo no existe)
+        """
+        members = set()
+        for group_dn in self._resolve_group(group):
+            if transitive:
+                members.update(self._descendants_of(group_dn))
+            else:
+                members.update(self.group_members.get(group_dn, _EMPTY))
+        return frozenset(members)
+
+    def department_for(self, member_dn: str) -> str:
+        """
+        Obtiene el departamento de un DN de miembro según GROUP_DEPT_MAPPING.
+
+        Los grupos heredados por anidamiento cuentan igual que los directos.
+
+        Args:
+            member_dn (str): DN del usuario
+
+        Returns:
+            str: Departamento del usuario (DEFAULT_DEPARTMENT si no hay grupo mapeado)
+        """
+        return department_for_groups(self.groups_for(member_dn))
+
+    def nested_groups(self) -> List[str]:
+        """
+        Grupos que son miembros de algún otro grupo.
+
+        Returns:
+            List[str]: CNs ordenados de los grupos anidados
+        """
+        return sorted(self.group_cns[dn] for dn in self._parents)
+
+    def cyclic_groups(self) -> List[str]:
+        """
+        Grupos que forman parte de un ciclo de anidamiento (A ∈ B ∈ ... ∈ A).
+
+        Returns:
+            List[str]: CNs ordenados de los grupos en algún ciclo
+        """
+        return sorted(self.group_cns[dn] for dn, parents in self._parents.items()
+                      if any(dn in self._ancestors_of(parent) for parent in parents))
+
+    def is_expired(self, ttl: float) -> bool:
+        """
+        Indica si el índice superó su tiempo de vida.
+
+        Args:
+            ttl (float): Tiempo de vida en segundos
+
+        Returns:
+            bool: True si debe reconstruirse
+        """
+        return time.monotonic() - self.built_at > ttl
+
+    def _direct_group_dns(self, member_dn: str) -> FrozenSet[str]:
+        """DNs de los grupos que contienen directamente a un miembro."""
+        if self._member_groups is None:
+            member_groups: Dict[str, set] = {}
+            for group_dn, members in self.group_members.items():
+                for dn in members:
+                    member_groups.setdefault(dn, set()).add(group_dn)
+            self._member_groups = {dn: frozenset(groups) for dn, groups in member_groups.items()}
+        return self._member_groups.get(member_dn, _EMPTY)
+
+    def _ancestors_of(self, group_dn: str) -> FrozenSet[str]:
+        """Cierre transitivo hacia arriba: el grupo y todos los que lo contienen (memorizado)."""
+        cached = self._ancestors.get(group_dn)
+        if cached is None:
+            cached = frozenset(_reachable(group_dn, self._parents))
+            self._ancestors[group_dn] = cached
+        return cached
+
+    def _descendants_of(self, group_dn: str) -> FrozenSet[str]:
+        """Miembros que no son grupos del grupo y de sus subgrupos (memorizado)."""
+        cached = self._descendants.get(group_dn)
+        if cached is None:
+            subgroups = _reachable(group_dn, self.group_members, only=self.group_cns)
+            cached = frozenset(member for dn in subgroups for member in self.group_members.get(dn, _EMPTY)
+                               if member not in self.group_cns)
+            self._descendants[group_dn] = cached
+        return cached
+
+    def _resolve_group(self, group: str) -> List[str]:
+        """DNs de grupo que corresponden a un CN o DN."""
+        if "=" in group:
+            dn = normalize_dn(group)
+            return [dn] if dn in self.group_cns else []
+        cn = group.strip().lower()
+        return [dn for dn, group_cn in self.group_cns.items() if group_cn.lower() == cn]
+
+    def __len__(self) -> int:
+        return len(self.memberships)
+
+    def __contains__(self, member_dn: str) -> bool:
+        return normalize_dn(member_dn) in self.memberships
+
+
+def _reachable(start: str, edges: Dict[str, FrozenSet[str]], only: Dict[str, Any] = None) -> set:
+    """
+    Nodos alcanzables desde `start` (incluido) siguiendo `edges`, sin repetir nodos.
+
+    Args:
+        start (str): Nodo inicial
+        edges (Dict[str, FrozenSet[str]]): Aristas por nodo
+        only (Dict[str, Any], optional): Si se indica, solo se recorren nodos de este conjunto
+
+    Returns:
+        set: Nodos visitados
+    """
+    visited = {start}
+    pending = [start]
+    while pending:
+        for node in edges.get(pending.pop(), _EMPTY):
+            if node not in visited and (only is None or node in only):
+                visited.add(node)
+                pending.append(node)
+    return visited
+
+
+def _dn(entry) -> str:
+    """DN de una entrada (LDAPEntry o diccionario con clave 'dn')."""
+    if isinstance(entry, LDAPEntry):
+        return entry.dn
+    dn = entry.get("dn", "")
+    return dn[0] if isinstance(dn, (list, tuple)) and dn else dn or ""
+
+
+def _values(entry, attr: str) -> list:
+    """Valores de un atributo siempre como lista (LDAPEntry o diccionario plano)."""
+    if isinstance(entry, LDAPEntry):
+        return entry.all(attr)
+    values = entry.get(attr, [])
+    return [values] if isinstance(values, str) else list(values)
+
+
+def department_for_groups(groups: Iterable[str]) -> str:
+    """
+    Determina el departamento a partir de un conjunto de grupos.
+
+    Args:
+        groups (Iterable[str]): CNs de grupos del usuario
+
+    Returns:
+        str: Primer departamento de GROUP_DEPT_MAPPING cuyo grupo esté presente
+    """
+    groups = groups if isinstance(groups, (set, frozenset)) else set(groups)
+    for group, department in GROUP_DEPT_MAPPING.items():
+        if group in groups:
+            return department
+    return DEFAULT_DEPARTMENT
+
+
+def groups_for_department(department: str) -> List[str]:
+    """
+    Obtiene los grupos asociados a un departamento en GROUP_DEPT_MAPPING.
+
+    Args:
+        department (str): Nombre del departamento (sin distinguir mayúsculas)
+
+    Returns:
+        List[str]: CNs de los grupos del departamento (vacía si no hay ninguno)
+    """
+    department = (department or "").strip().lower()
+    return [group for group, dept in GROUP_DEPT_MAPPING.items() if dept.lower() == department]
+
+
+def groups_deciding(groups: Iterable[str]) -> List[str]:
+    """
+    Grupos mapeados necesarios para decidir el departamento de los miembros de `groups`.
+
+    Incluye todos los grupos de GROUP_DEPT_MAPPING con igual o mayor prioridad que
+    el último de `groups`, ya que un miembro que además pertenezca a uno de ellos
+    puede acabar asignado a otro departamento.
+
+    Args:
+        groups (Iterable[str]): CNs de grupos mapeados
+
+    Returns:
+        List[str]: CNs en orden de prioridad
+    """
+    orden = list(GROUP_DEPT_MAPPING)
+    posiciones = [orden.index(group) for group in groups if group in GROUP_DEPT_MAPPING]
+    return orden[:max(posiciones) + 1] if posiciones else []
+
+
+def normalize_dn(dn: str) -> str:
+    """
+    Normaliza un DN para usarlo como clave (minúsculas y sin espacios entre RDNs).
+
+    Args:
+        dn (str): DN a normalizar
+
+    Returns:
+        str: DN normalizado
+    """
+    if not dn:
+        return ""
+    try:
+        return ldap.dn.dn2str(ldap.dn.str2dn(dn.lower()))
+    except Exception:
+        return ",".join(part.strip() for part in dn.lower().split(","))
+
+
+# ============================================================================
+# CACHÉ DE ÍNDICES (uno por servidor + identidad de bind)
+# ============================================================================
+
+_indexes: Dict[Tuple[str, str], MembershipIndex] = {}
+_indexes_lock = threading.Lock()
+
+# Un lock por clave: la reconstrucción de un índice no bloquea a otros servidores o identidades
+_build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+# Se incrementa al invalidar: un índice construido antes de la invalidación no se cachea
+_generation = 0
+
+
+def membership_ttl() -> float:
+    """Tiempo de vida del índice en segundos (variable LDAP_MEMBERSHIP_TTL, por defecto 60)."""
+    return float(os.getenv("LDAP_MEMBERSHIP_TTL", "60"))
+
+
+def get_membership_index(ldap_conn, refresh: bool = False) -> MembershipIndex:
+    """
+    Obtiene el índice de pertenencia compartido, reconstruyéndolo si expiró.
+
+    El índice se comparte entre conectores del mismo servidor e identidad de bind,
+    ya que distintas identidades pueden ver distintos grupos según las ACLs.
+
+    Args:
+        ldap_conn (LDAPConnector): Conector LDAP conectado
+        refresh (bool, optional): Fuerza la reconstrucción del índice
+
+    Returns:
+        MembershipIndex: Índice vigente (vacío y sin cachear si no hay conexión)
+
+    Raises:
+        Exception: Si la búsqueda de grupos falla (el error no se cachea)
+    """
+    if not ldap_conn.is_connected:
+        return MembershipIndex({})
+
+    clave = (ldap_conn.server_url, (ldap_conn.bind_dn or "").lower())
+    ttl = membership_ttl()
+
+    with _indexes_lock:
+        anterior = _indexes.get(clave)
+        if not refresh and anterior is not None and not anterior.is_expired(ttl):
+            return anterior
+        build_lock = _build_locks.setdefault(clave, threading.Lock())
+
+    # La búsqueda de grupos se hace fuera del lock global; quien espera la misma
+    # clave reutiliza el índice que construyó el primero
+    with build_lock:
+        with _indexes_lock:
+            index = _indexes.get(clave)
+            generation = _generation
+        if index is not None and index is not anterior and not index.is_expired(ttl):
+            return index
+
+        index = MembershipIndex.build(ldap_conn)
+        with _indexes_lock:
+            if generation == _generation:
+                _indexes[clave] = index
+
+    return index
+
+
+def invalidate_membership_index(server_url: Optional[str] = None):
+    """
+    Descarta los índices cacheados.
+
+    Args:
+        server_url (str, optional): Solo invalida los índices de este servidor
+    """
+    global _generation
+    with _indexes_lock:
+        _generation += 1
+        if server_url is None:
+            _indexes.clear()
+        else:
+            for clave in [c for c in _indexes if c[0] == server_url]:
+                del _indexes[clave]
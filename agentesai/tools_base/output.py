@@ -0,0 +1,236 @@
+"""
+Capa de presentación de las herramientas, separada de la obtención de datos.
+
+Las herramientas devuelven siempre su diccionario de resultado; lo que se
+muestra por pantalla depende del modo de salida:
+
+- rich:  tablas y paneles de Rich (modo interactivo, por defecto)
+- plain: texto plano separado por tabuladores, sin estilos ni tablas
+- json:  nada durante la ejecución; el llamador emite el resultado como JSON
+- none:  nada en absoluto
+
+El modo es global al proceso (set_output_mode, variable AGENTESAI_OUTPUT) y se
+puede sobrescribir para una llamada concreta con el context manager
+output_mode(). En los modos no interactivos no se construye ningún Table.
+"""
+
+import os
+import sys
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+OUTPUT_RICH = "rich"
+OUTPUT_PLAIN = "plain"
+OUTPUT_JSON = "json"
+OUTPUT_NONE = "none"
+OUTPUT_MODES = (OUTPUT_RICH, OUTPUT_PLAIN, OUTPUT_JSON, OUTPUT_NONE)
+
+# Columna de tabla: (título, estilo Rich)
+Column = Tuple[str, str]
+
+
+def _validate(mode: str) -> str:
+    mode = (mode or "").strip().lower()
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Modo de salida no válido: {mode!r} (opciones: {', '.join(OUTPUT_MODES)})")
+    return mode
+
+
+def _mode_from_env() -> str:
+    try:
+        return _validate(os.getenv("AGENTESAI_OUTPUT", OUTPUT_RICH))
+    except ValueError:
+        return OUTPUT_RICH
+
+
+# Se resuelve en el primer uso para respetar un .env cargado después de importar
+_process_mode: Optional[str] = None
+_call_mode: ContextVar[Optional[str]] = ContextVar("agentesai_output_mode", default=None)
+
+
+def set_output_mode(mode: str) -> str:
+    """
+    Fija el modo de salida de todo el proceso.
+
+    Args:
+        mode (str): Uno de OUTPUT_MODES
+
+    Returns:
+        str: Modo anterior
+
+    Raises:
+        ValueError: Si el modo no es válido
+    """
+    global _process_mode
+    previous = get_output_mode()
+    _process_mode = _validate(mode)
+    return previous
+
+
+def get_output_mode() -> str:
+    """Modo de salida efectivo (el de la llamada en curso o el del proceso)."""
+    global _process_mode
+    if _process_mode is None:
+        _process_mode = _mode_from_env()
+    return _call_mode.get() or _process_mode
+
+
+def is_rich_output() -> bool:
+    """True si la salida es interactiva (tablas y paneles de Rich)."""
+    return get_output_mode() == OUTPUT_RICH
+
+
+def is_rendering() -> bool:
+    """True si el modo actual muestra algo durante la ejecución (rich o plain)."""
+    return get_output_mode() in (OUTPUT_RICH, OUTPUT_PLAIN)
+
+
+@contextmanager
+def output_mode(mode: str) -> Iterator[str]:
+    """
+    Sobrescribe el modo de salida dentro del bloque (por llamada, seguro entre hilos).
+
+    Example:
+        >>> with output_mode("none"):
+        ...     usuarios = list_all_users()
+    """
+    token = _call_mode.set(_validate(mode))
+    try:
+        yield mode
+    finally:
+        _call_mode.reset(token)
+
+
+class ModeAwareConsole(Console):
+    """
+    Console de Rich que respeta el modo de salida.
+
+    En modo plain los paneles se imprimen como su texto sin marco ni estilos;
+    en json y none no se imprime nada.
+    """
+
+    def print(self, *objects: Any, **kwargs: Any) -> None:
+        mode = get_output_mode()
+        if mode == OUTPUT_RICH:
+            super().print(*objects, **kwargs)
+        elif mode == OUTPUT_PLAIN:
+            for obj in objects:
+                text = _plain_text(obj)
+                if text is None:
+                    super().print(obj, **kwargs)
+                else:
+                    _write_line(text)
+
+
+def _plain_text(obj: Any) -> Optional[str]:
+    """Texto plano de un objeto imprimible (None si no es texto ni panel)."""
+    if isinstance(obj, Panel):
+        obj = obj.renderable
+    if isinstance(obj, Text):
+        return obj.plain
+    if isinstance(obj, str):
+        try:
+            return Text.from_markup(obj).plain
+        except Exception:
+            return obj
+    return None
+
+
+def _write_line(text: str = ""):
+    sys.stdout.write(text + "\n")
+
+
+# Consola compartida por las herramientas y los agentes
+console = ModeAwareConsole()
+
+
+def render_table(title: str, columns: Sequence[Column], rows: Callable[[], Iterable[Sequence[Any]]]):
+    """
+    Muestra una tabla según el modo de salida.
+
+    Las filas se pasan como función para que en los modos json/none no se
+    recorra ni se formatee ningún dato.
+
+    Args:
+        title (str): Título de la tabla
+        columns (Sequence[Column]): Columnas como (título, estilo)
+        rows (Callable): Función que devuelve las filas
+    """
+    mode = get_output_mode()
+    if mode == OUTPUT_RICH:
+        table = Table(title=title)
+        for name, style in columns:
+            table.add_column(name, style=style)
+        for row in rows():
+            table.add_row(*(_cell(value) for value in row))
+        console.print(table)
+    elif mode == OUTPUT_PLAIN:
+        lines: List[str] = [Text.from_markup(title).plain, "\t".join(name for name, _ in columns)]
+        lines.extend("\t".join(_cell(value) for value in row) for row in rows())
+        _write_line("\n".join(lines))
+
+
+def _cell(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa LDAPEntry, bytes y otros tipos que json no conoce."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def to_json(result: Any, indent: Optional[int] = 2) -> str:
+    """Serializa un resultado de herramienta a JSON."""
+    return json.dumps(result, default=_json_default, ensure_ascii=False, indent=indent)
+
+
+def emit_result(result: Any):
+    """
+    Emite el resultado final por stdout si el modo es json.
+
+    En el resto de modos no hace nada: el resultado ya se mostró durante la ejecución.
+    """
+    if get_output_mode() == OUTPUT_JSON:
+        _write_line(to_json(result))
+
+
+def emit_ndjson(records: Iterable[Any]) -> int:
+    """
+    Escribe cada registro por stdout como una línea JSON en cuanto se produce.
+
+    Si el lector cierra la tubería (p. ej. `| head`) se deja de consumir
+    `records` y se cierra el generador, lo que cancela la búsqueda en curso.
+
+    Args:
+        records (Iterable[Any]): Registros a emitir (normalmente un generador)
+
+    Returns:
+        int: Número de registros escritos
+    """
+    written = 0
+    try:
+        for record in records:
+            sys.stdout.write(to_json(record, indent=None) + "\n")
+            sys.stdout.flush()
+            written += 1
+    except BrokenPipeError:
+        # Redirigir stdout para que el vaciado al salir no vuelva a fallar
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        close = getattr(records, "close", None)
+        if close is not None:
+            close()
+    return written
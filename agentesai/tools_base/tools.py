@@ -4,13 +4,33 @@ Herramientas consolidadas del sistema que usan datos reales del LDAP.
 
 import os
 import getpass
-from typing import Dict, Any, List
-from rich.console import Console
+from typing import Dict, Any, Iterator, List
 from rich.panel import Panel
-from rich.table import Table
-from .ldap_connector import LDAPConnector
+from .output import console, render_table
+from .ldap_snapshot import create_connector
+from .ldap_cache import clear_result_cache
+from .membership import invalidate_membership_index
 
-console = Console()
+# Columnas comunes de las tablas de usuarios: (título, estilo)
+USER_COLUMNS = [("Usuario", "cyan"), ("Nombre", "green"), ("Email", "yellow"), ("Título", "magenta")]
+
+
+def _user_rows(users: List[Dict[str, Any]], with_department: bool = False):
+    """Filas de una tabla de usuarios (solo se recorren si la tabla se muestra)."""
+    for user in users:
+        row = [user.get("username", ""), user.get("full_name", ""), user.get("email", ""), user.get("title", "")]
+        if with_department:
+            row.append(user.get("department", ""))
+        yield row
+
+
+def _group_rows(ldap_conn, groups: List[str]):
+    """Filas de la tabla de grupos con su descripción, reutilizando la misma conexión."""
+    for group_name in groups:
+        group_info = ldap_conn.search("ou=groups,dc=meli,dc=com", f"(cn={group_name})",
+                                      attributes=['description'], size_limit=1)
+        if group_info:
+            yield group_name, group_info[0].get("description", "Sin descripción")
 
 # ============================================================================
 # HERRAMIENTAS OBLIGATORIAS (requeridas por el challenge)
@@ -52,19 +72,15 @@ def get_current_user_info() -> Dict[str, Any]:
         import sys
         python_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
         
-        # Crear tabla de información
-        table = Table(title="👤 Información del Usuario Actual")
-        table.add_column("Propiedad", style="cyan")
-        table.add_column("Valor", style="green")
-        
-        table.add_row("Usuario", username)
-        table.add_row("Directorio Home", home_dir)
-        table.add_row("Directorio Actual", working_dir)
-        table.add_row("Shell", shell)
-        table.add_row("Sistema Operativo", str(os_info))
-        table.add_row("Versión Python", python_version)
-        
-        console.print(table)
+        # Mostrar tabla de información
+        render_table("👤 Información del Usuario Actual", [("Propiedad", "cyan"), ("Valor", "green")], lambda: [
+            ("Usuario", username),
+            ("Directorio Home", home_dir),
+            ("Directorio Actual", working_dir),
+            ("Shell", shell),
+            ("Sistema Operativo", str(os_info)),
+            ("Versión Python", python_version)
+        ])
         
         return {
             "username": username,
@@ -111,24 +127,13 @@ def get_user_groups(username: str = None) -> Dict[str, Any]:
         
         console.print(Panel(f"🔍 Obteniendo grupos del usuario: {username}", style="blue"))
         
-        with LDAPConnector() as ldap_conn:
+        with create_connector() as ldap_conn:
             groups = ldap_conn.get_user_groups(username)
             
             if groups:
-                # Crear tabla de grupos
-                table = Table(title=f"👥 Grupos del Usuario: {username}")
-                table.add_column("Grupo", style="cyan")
-                table.add_column("Descripción", style="green")
-                
-                # Obtener descripciones de grupos
-                with LDAPConnector() as ldap_conn2:
-                    for group_name in groups:
-                        group_info = ldap_conn2.search("ou=groups,dc=meli,dc=com", f"(cn={group_name})")
-                        if group_info:
-                            description = group_info[0].get("description", "Sin descripción")
-                            table.add_row(group_name, description)
-                
-                console.print(table)
+                # Las descripciones solo se buscan si la tabla se va a mostrar
+                render_table(f"👥 Grupos del Usuario: {username}", [("Grupo", "cyan"), ("Descripción", "green")],
+                             lambda: _group_rows(ldap_conn, groups))
                 
                 return {
                     "username": username,
@@ -175,6 +180,10 @@ def reset_system() -> Dict[str, Any]:
     try:
         console.print(Panel("🔄 Reseteando sistema...", style="yellow"))
         
+        # Descartar resultados LDAP cacheados para volver a leer el directorio
+        clear_result_cache()
+        invalidate_membership_index()
+        
         # TODO: Implementar limpieza de herramientas generadas dinámicamente
         # TODO: Limpiar caché de agentes
         # TODO: Restaurar estado inicial
@@ -224,28 +233,13 @@ def list_all_users() -> Dict[str, Any]:
     try:
         console.print(Panel("🔍 Listando usuarios desde LDAP real...", style="blue"))
         
-        with LDAPConnector() as ldap_conn:
+        with create_connector() as ldap_conn:
             users = ldap_conn.list_all_users()
             
             if users and isinstance(users, list):
-                # Crear tabla de usuarios
-                table = Table(title="👥 Usuarios del Sistema (desde LDAP)")
-                table.add_column("Usuario", style="cyan")
-                table.add_column("Nombre", style="green")
-                table.add_column("Email", style="yellow")
-                table.add_column("Título", style="magenta")
-                table.add_column("Departamento", style="blue")
-                
-                for user in users:
-                    table.add_row(
-                        user.get("username", ""),
-                        user.get("full_name", ""),
-                        user.get("email", ""),
-                        user.get("title", ""),
-                        user.get("department", "")
-                    )
-                
-                console.print(table)
+                # Mostrar tabla de usuarios
+                render_table("👥 Usuarios del Sistema (desde LDAP)", USER_COLUMNS + [("Departamento", "blue")],
+                             lambda: _user_rows(users, with_department=True))
                 
                 # Calcular estadísticas
                 departments = list(set(user.get("department", "") for user in users if user.get("department")))
@@ -292,21 +286,25 @@ def search_users_by_department(department: str) -> Dict[str, Any]:
     try:
         console.print(Panel(f"🔍 Buscando usuarios en departamento: {department}", style="blue"))
         
-        with LDAPConnector() as ldap_conn:
-            all_users = ldap_conn.list_all_users()
+        with create_connector() as ldap_conn:
+            # Plan dirigido: solo los grupos del departamento y sus miembros
+            department_users = ldap_conn.list_users_by_department(department)
             
-            if not all_users or not isinstance(all_users, list):
-                return {
-                    "error": True,
-                    "mensaje": "No se pudieron obtener usuarios desde LDAP",
-                    "department": department
-                }
-            
-            # Filtrar por departamento
-            department_users = [
-                user for user in all_users
-                if user.get("department", "").lower() == department.lower()
-            ]
+            if department_users is None:
+                # Departamento sin grupo asociado: requiere recorrer todos los usuarios
+                all_users = ldap_conn.list_all_users()
+                
+                if not all_users or not isinstance(all_users, list):
+                    return {
+                        "error": True,
+                        "mensaje": "No se pudieron obtener usuarios desde LDAP",
+                        "department": department
+                    }
+                
+                department_users = [
+                    user for user in all_users
+                    if user.get("department", "").lower() == department.lower()
+                ]
             
             if not department_users:
                 console.print(Panel(f"❌ No se encontraron usuarios en el departamento: {department}", style="yellow"))
@@ -317,22 +315,9 @@ def search_users_by_department(department: str) -> Dict[str, Any]:
                     "source": "LDAP_REAL"
                 }
             
-            # Crear tabla de usuarios del departamento
-            table = Table(title=f"👥 Usuarios del Departamento: {department}")
-            table.add_column("Usuario", style="cyan")
-            table.add_column("Nombre", style="green")
-            table.add_column("Email", style="yellow")
-            table.add_column("Título", style="magenta")
-            
-            for user in department_users:
-                table.add_row(
-                    user.get("username", ""),
-                    user.get("full_name", ""),
-                    user.get("email", ""),
-                    user.get("title", "")
-                )
-            
-            console.print(table)
+            # Mostrar tabla de usuarios del departamento
+            render_table(f"👥 Usuarios del Departamento: {department}", USER_COLUMNS,
+                         lambda: _user_rows(department_users))
             
             return {
                 "department": department,
@@ -363,7 +348,11 @@ def analyze_ldap_structure() -> Dict[str, Any]:
             - organizational_units: Unidades organizativas
             - total_users: Total de usuarios
             - total_groups: Total de grupos
-            - structure_depth: Profundidad de la estructura
+            - total_entries: Total de entradas del árbol
+            - structure_depth: Niveles del árbol (contando la base)
+            - entries_by_depth: Entradas por nivel
+            - max_fanout / avg_fanout: Hijos directos por entrada con hijos
+            - object_classes: Histograma de objectClass
             - source: Fuente de los datos
             
     Example:
@@ -373,40 +362,40 @@ def analyze_ldap_structure() -> Dict[str, Any]:
     try:
         console.print(Panel("🏗️ Analizando estructura del directorio LDAP...", style="blue"))
         
-        with LDAPConnector() as ldap_conn:
+        with create_connector() as ldap_conn:
             structure = ldap_conn.get_ldap_structure()
             
             if structure:
-                # Crear tabla de estructura
-                table = Table(title="🏗️ Estructura del Directorio LDAP")
-                table.add_column("Propiedad", style="cyan")
-                table.add_column("Valor", style="green")
-                
-                table.add_row("Base DN", structure.get("base_dn", ""))
-                table.add_row("Unidades Organizativas", str(len(structure.get("organizational_units", []))))
-                table.add_row("Total Usuarios", str(structure.get("total_users", 0)))
-                table.add_row("Total Grupos", str(structure.get("total_groups", 0)))
-                table.add_row("Profundidad", str(structure.get("structure_depth", 0)))
-                
-                console.print(table)
+                # Mostrar tabla de estructura
+                render_table("🏗️ Estructura del Directorio LDAP", [("Propiedad", "cyan"), ("Valor", "green")], lambda: [
+                    ("Base DN", structure.get("base_dn", "")),
+                    ("Unidades Organizativas", len(structure.get("organizational_units", []))),
+                    ("Total Usuarios", structure.get("total_users", 0)),
+                    ("Total Grupos", structure.get("total_groups", 0)),
+                    ("Total Entradas", structure.get("total_entries", 0)),
+                    ("Profundidad", structure.get("structure_depth", 0)),
+                    ("Fan-out Máximo", structure.get("max_fanout", 0)),
+                    ("Fan-out Medio", structure.get("avg_fanout", 0))
+                ])
                 
                 # Mostrar unidades organizativas
                 if structure.get("organizational_units"):
-                    ou_table = Table(title="📁 Unidades Organizativas")
-                    ou_table.add_column("Nombre", style="cyan")
-                    ou_table.add_column("DN", style="green")
-                    ou_table.add_column("Descripción", style="yellow")
-                    ou_table.add_column("Entradas", style="magenta")
-                    
-                    for ou in structure.get("organizational_units", []):
-                        ou_table.add_row(
-                            ou.get("name", ""),
-                            ou.get("dn", ""),
-                            ou.get("description", ""),
-                            str(ou.get("entry_count", 0))
+                    render_table(
+                        "📁 Unidades Organizativas",
+                        [("Nombre", "cyan"), ("DN", "green"), ("Descripción", "yellow"), ("Entradas", "magenta")],
+                        lambda: (
+                            (ou.get("name", ""), ou.get("dn", ""), ou.get("description", ""), ou.get("entry_count", 0))
+                            for ou in structure.get("organizational_units", [])
                         )
-                    
-                    console.print(ou_table)
+                    )
+                
+                # Mostrar histograma de clases de objeto
+                if structure.get("object_classes"):
+                    render_table(
+                        "🏷️ Clases de Objeto",
+                        [("objectClass", "cyan"), ("Entradas", "magenta")],
+                        lambda: structure["object_classes"].items()
+                    )
                 
                 return {
                     **structure,
@@ -425,4 +414,65 @@ def analyze_ldap_structure() -> Dict[str, Any]:
         return {
             "error": True,
             "mensaje": error_msg
-        } 
\ No newline at end of file
+        } 
+
+# ============================================================================
+# VARIANTES EN STREAMING (un registro cada vez, para NDJSON y scripts)
+# ============================================================================
+
+def iter_all_users() -> Iterator[Dict[str, Any]]:
+    """
+    Recorre todos los usuarios del LDAP real entregándolos uno a uno.
+    
+    Variante en streaming de list_all_users(): no construye tablas ni acumula
+    el listado, así que la memoria se mantiene constante con el tamaño del
+    directorio. Si el consumidor deja de iterar, la búsqueda paginada se
+    cancela en el servidor y la conexión se libera.
+    
+    Yields:
+        Dict[str, Any]: Usuario con el mismo formato que list_all_users()
+        
+    Raises:
+        ConnectionError: Si no se puede conectar al servidor LDAP
+        
+    Example:
+        >>> for usuario in iter_all_users():
+        ...     print(usuario["username"])
+    """
+    # Sin caché: un recorrido completo no debe quedarse copiado en memoria
+    with create_connector(use_cache=False) as ldap_conn:
+        if not ldap_conn.is_connected:
+            raise ConnectionError("No se pudo conectar al servidor LDAP")
+        yield from ldap_conn.iter_all_users()
+
+def iter_users_by_department(department: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre los usuarios de un departamento entregándolos uno a uno.
+    
+    Args:
+        department (str): Nombre del departamento a buscar
+        
+    Yields:
+        Dict[str, Any]: Usuario con el mismo formato que search_users_by_department()
+        
+    Raises:
+        ConnectionError: Si no se puede conectar al servidor LDAP
+    """
+    with create_connector(use_cache=False) as ldap_conn:
+        if not ldap_conn.is_connected:
+            raise ConnectionError("No se pudo conectar al servidor LDAP")
+        
+        department_users = ldap_conn.list_users_by_department(department)
+        if department_users is None:
+            # Departamento sin grupo asociado: filtrar el recorrido completo sobre la marcha
+            department_users = (
+                user for user in ldap_conn.iter_all_users()
+                if user.get("department", "").lower() == department.lower()
+            )
+        yield from department_users
+
+# Herramientas con variante en streaming: nombre de la herramienta → generador
+STREAMING_TOOLS = {
+    "list_all_users": iter_all_users,
+    "search_users_by_department": iter_users_by_department
+}
@@ -1,21 +1,29 @@
 """
 Módulo de herramientas ofensivas para análisis de seguridad LDAP
+
+Las herramientas exportadas son las que declaran los manifiestos del agente
+ofensivo (manifest.py), la única lista de herramientas del paquete. Cada una
+se importa al acceder a ella por primera vez.
 """
 
-from .rootdse_info import tool_rootdse_info
-from .anonymous_enum import tool_anonymous_enum
-from .starttls_test import tool_starttls_test
-from .simple_vs_sasl_bind import tool_simple_vs_sasl_bind
-from .acl_diff import tool_acl_diff
-from .self_password_change import tool_self_password_change
-from .ldap_nmap_nse import tool_ldap_nmap_nse
-
-__all__ = [
-    'tool_rootdse_info',
-    'tool_anonymous_enum',
-    'tool_starttls_test',
-    'tool_simple_vs_sasl_bind',
-    'tool_acl_diff',
-    'tool_self_password_change',
-    'tool_ldap_nmap_nse',
-] 
\ No newline at end of file
+from ..manifest import AGENT_OFFENSIVE, get_manifest_registry
+from .sessions import SessionManager, offensive_run  # noqa: F401 (reexportadas en __all__)
+
+
+def _herramientas():
+    """Manifiestos de las herramientas ofensivas (nombre → manifiesto)."""
+    # No se resuelve al importar el paquete: el registro importa manifest.py de este paquete
+    return get_manifest_registry().by_agent(AGENT_OFFENSIVE)
+
+
+def __getattr__(name):
+    if name == "__all__":
+        return [*_herramientas(), 'SessionManager', 'offensive_run']
+    manifest = _herramientas().get(name)
+    if manifest is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return manifest.load()
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_herramientas()))
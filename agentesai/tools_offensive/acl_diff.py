@@ -4,13 +4,26 @@ Herramienta ofensiva: Comparación de ACLs - Anónimo vs Admin LDAP
 
 import logging
 from typing import Dict, Any, List
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from .sessions import offensive_run
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Búsquedas comparadas entre el bind anónimo y el admin (categoría → filtro)
+CONSULTAS_ACL = {
+    "usuarios": "(objectClass=person)",
+    "grupos": "(objectClass=groupOfNames)",
+    "objetos_sistema": "(objectClass=*)",
+    "atributos_sensibles": "(|(userPassword=*)(shadowLastChange=*)(pwdLastSet=*))"
+}
+
+# Búsquedas adicionales solo para admin
+CONSULTAS_ACL_ADMIN = {
+    "configuracion": "(objectClass=olcGlobal)"
+}
+
 def tool_acl_diff(admin_username: str = None, admin_password: str = None, base_dn: str = None, max_results: int = 100) -> Dict[str, Any]:
     """
     Compara lo que ve un bind anónimo vs un bind autenticado admin para detectar diferencias en ACLs.
@@ -47,9 +60,6 @@ def tool_acl_diff(admin_username: str = None, admin_password: str = None, base_d
     try:
         console.print(Panel("🔴 Iniciando comparación de ACLs - Anónimo vs Admin LDAP", style="red"))
         
-        # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
-        
         # Verificar credenciales admin
         if not admin_username or not admin_password:
             return {
@@ -59,13 +69,15 @@ def tool_acl_diff(admin_username: str = None, admin_password: str = None, base_d
                 "tipo": "error_credenciales"
             }
         
-        # Test 1: Bind anónimo
-        console.print(Panel("🔓 Test 1: Bind Anónimo (permisos mínimos)", style="blue"))
-        resultado_anonimo = _test_bind_anonimo(admin_username, admin_password, base_dn, max_results)
-        
-        # Test 2: Bind admin
-        console.print(Panel("👑 Test 2: Bind Admin (permisos máximos)", style="blue"))
-        resultado_admin = _test_bind_admin(admin_username, admin_password, base_dn, max_results)
+        # Las dos identidades se autentican una vez por ejecución y se cierran al terminar
+        with offensive_run() as sesiones:
+            # Test 1: Bind anónimo
+            console.print(Panel("🔓 Test 1: Bind Anónimo (permisos mínimos)", style="blue"))
+            resultado_anonimo = _test_bind_anonimo(sesiones, base_dn, max_results)
+            
+            # Test 2: Bind admin
+            console.print(Panel("👑 Test 2: Bind Admin (permisos máximos)", style="blue"))
+            resultado_admin = _test_bind_admin(sesiones, admin_username, admin_password, base_dn, max_results)
         
         # Test 3: Análisis de diferencias
         console.print(Panel("⚖️ Test 3: Análisis de Diferencias ACL", style="blue"))
@@ -118,13 +130,12 @@ def tool_acl_diff(admin_username: str = None, admin_password: str = None, base_d
             "tipo": "error_ejecucion"
         }
 
-def _test_bind_anonimo(admin_username: str, admin_password: str, base_dn: str, max_results: int) -> Dict[str, Any]:
+def _test_bind_anonimo(sesiones, base_dn: str, max_results: int) -> Dict[str, Any]:
     """
     Test de bind anónimo para ver permisos mínimos.
     
     Args:
-        admin_username (str): Usuario admin (no usado en bind anónimo)
-        admin_password (str): Contraseña admin (no usado en bind anónimo)
+        sesiones (SessionManager): Sesiones de la ejecución
         base_dn (str): DN base para la búsqueda
         max_results (int): Número máximo de resultados
         
@@ -132,11 +143,10 @@ def _test_bind_anonimo(admin_username: str, admin_password: str, base_dn: str, m
         Dict[str, Any]: Resultado del test de bind anónimo
     """
     try:
-        # Crear conexión LDAP para bind anónimo
-        ldap_conn = _crear_conexion_ldap()
+        # Sesión del bind anónimo
+        ldap_conn = sesiones.anonymous()
         
-        # Intentar bind anónimo
-        if ldap_conn.connect():
+        if ldap_conn.is_connected:
             # Realizar búsquedas anónimas
             resultado_busqueda = _realizar_busquedas_anonimas(ldap_conn, base_dn, max_results)
             
@@ -177,11 +187,12 @@ def _test_bind_anonimo(admin_username: str, admin_password: str, base_dn: str, m
             "vulnerabilidad": f"Error en bind anónimo: {str(e)}"
         }
 
-def _test_bind_admin(admin_username: str, admin_password: str, base_dn: str, max_results: int) -> Dict[str, Any]:
+def _test_bind_admin(sesiones, admin_username: str, admin_password: str, base_dn: str, max_results: int) -> Dict[str, Any]:
     """
     Test de bind admin para ver permisos máximos.
     
     Args:
+        sesiones (SessionManager): Sesiones de la ejecución
         admin_username (str): Usuario admin para autenticación
         admin_password (str): Contraseña del usuario admin
         base_dn (str): DN base para la búsqueda
@@ -191,11 +202,10 @@ def _test_bind_admin(admin_username: str, admin_password: str, base_dn: str, max
         Dict[str, Any]: Resultado del test de bind admin
     """
     try:
-        # Crear conexión LDAP para bind admin
-        ldap_conn = _crear_conexion_ldap()
+        # Sesión autenticada con las credenciales admin
+        ldap_conn = sesiones.get(admin_username, admin_password)
         
-        # Intentar bind admin
-        if ldap_conn.connect(username=admin_username, password=admin_password):
+        if ldap_conn.is_connected:
             # Realizar búsquedas como admin
             resultado_busqueda = _realizar_busquedas_admin(ldap_conn, base_dn, max_results)
             
@@ -236,16 +246,6 @@ def _test_bind_admin(admin_username: str, admin_password: str, base_dn: str, max
             "vulnerabilidad": f"Error en bind admin: {str(e)}"
         }
 
-def _crear_conexion_ldap():
-    """
-    Crea una nueva conexión LDAP.
-    
-    Returns:
-        LDAPConnector: Instancia del conector LDAP
-    """
-    from ..tools_base.ldap_connector import LDAPConnector
-    return LDAPConnector()
-
 def _realizar_busquedas_anonimas(ldap_conn, base_dn: str, max_results: int) -> Dict[str, Any]:
     """
     Realiza búsquedas anónimas para evaluar permisos mínimos.
@@ -264,29 +264,8 @@ def _realizar_busquedas_anonimas(ldap_conn, base_dn: str, max_results: int) -> D
     resultados = {}
     
     try:
-        # Búsqueda de usuarios
-        usuarios = ldap_conn.search(base_dn, "(objectClass=person)")
-        if usuarios and len(usuarios) > max_results:
-            usuarios = usuarios[:max_results]
-        resultados["usuarios"] = usuarios or []
-        
-        # Búsqueda de grupos
-        grupos = ldap_conn.search(base_dn, "(objectClass=groupOfNames)")
-        if grupos and len(grupos) > max_results:
-            grupos = grupos[:max_results]
-        resultados["grupos"] = grupos or []
-        
-        # Búsqueda de objetos del sistema
-        objetos_sistema = ldap_conn.search(base_dn, "(objectClass=*)")
-        if objetos_sistema and len(objetos_sistema) > max_results:
-            objetos_sistema = objetos_sistema[:max_results]
-        resultados["objetos_sistema"] = objetos_sistema or []
-        
-        # Búsqueda de atributos sensibles
-        atributos_sensibles = ldap_conn.search(base_dn, "(|(userPassword=*)(shadowLastChange=*)(pwdLastSet=*))")
-        if atributos_sensibles and len(atributos_sensibles) > max_results:
-            atributos_sensibles = atributos_sensibles[:max_results]
-        resultados["atributos_sensibles"] = atributos_sensibles or []
+        # Las cuatro búsquedas se lanzan a la vez y se recogen al completarse
+        resultados = _buscar_visibles(ldap_conn, base_dn, CONSULTAS_ACL, max_results)
         
     except Exception as e:
         logger.error(f"Error en búsquedas anónimas: {e}")
@@ -317,35 +296,10 @@ def _realizar_busquedas_admin(ldap_conn, base_dn: str, max_results: int) -> Dict
     resultados = {}
     
     try:
-        # Búsqueda de usuarios (admin debería ver más)
-        usuarios = ldap_conn.search(base_dn, "(objectClass=person)")
-        if usuarios and len(usuarios) > max_results:
-            usuarios = usuarios[:max_results]
-        resultados["usuarios"] = usuarios or []
-        
-        # Búsqueda de grupos (admin debería ver más)
-        grupos = ldap_conn.search(base_dn, "(objectClass=groupOfNames)")
-        if grupos and len(grupos) > max_results:
-            grupos = grupos[:max_results]
-        resultados["grupos"] = grupos or []
-        
-        # Búsqueda de objetos del sistema (admin debería ver más)
-        objetos_sistema = ldap_conn.search(base_dn, "(objectClass=*)")
-        if objetos_sistema and len(objetos_sistema) > max_results:
-            objetos_sistema = objetos_sistema[:max_results]
-        resultados["objetos_sistema"] = objetos_sistema or []
-        
-        # Búsqueda de atributos sensibles (admin debería ver más)
-        atributos_sensibles = ldap_conn.search(base_dn, "(|(userPassword=*)(shadowLastChange=*)(pwdLastSet=*))")
-        if atributos_sensibles and len(atributos_sensibles) > max_results:
-            atributos_sensibles = atributos_sensibles[:max_results]
-        resultados["atributos_sensibles"] = atributos_sensibles or []
-        
-        # Búsquedas adicionales solo para admin
-        configuracion = ldap_conn.search(base_dn, "(objectClass=olcGlobal)")
-        if configuracion and len(configuracion) > max_results:
-            configuracion = configuracion[:max_results]
-        resultados["configuracion"] = configuracion or []
+        # Mismas búsquedas que el anónimo (admin debería ver más) más las de
+        # configuración, todas lanzadas a la vez
+        consultas = {**CONSULTAS_ACL, **CONSULTAS_ACL_ADMIN}
+        resultados = _buscar_visibles(ldap_conn, base_dn, consultas, max_results)
         
     except Exception as e:
         logger.error(f"Error en búsquedas admin: {e}")
@@ -359,6 +313,45 @@ def _realizar_busquedas_admin(ldap_conn, base_dn: str, max_results: int) -> Dict
     
     return resultados
 
+def _buscar_visibles(ldap_conn, base_dn: str, consultas: Dict[str, str], max_results: int) -> Dict[str, List[Dict]]:
+    """
+    Obtiene las entradas visibles para varios filtros sin descargar sus atributos.
+    
+    La comparación de ACLs solo cuenta objetos, así que se piden únicamente los DNs
+    ('1.1'), el servidor corta cada búsqueda en max_results y todas las búsquedas
+    se envían a la vez con search_many(). Sin límite (max_results=0) cada filtro
+    recorre el directorio completo, así que se reparte por OU entre varias
+    conexiones (iter_search_fanout).
+    
+    Args:
+        ldap_conn: Conexión LDAP
+        base_dn (str): DN base para la búsqueda
+        consultas (Dict[str, str]): Filtros LDAP indexados por categoría
+        max_results (int): Número máximo de resultados por categoría
+        
+    Returns:
+        Dict[str, List[Dict]]: Entradas encontradas (solo con su DN) por categoría
+    """
+    from ..tools_base.ldap_connector import NO_ATTRS
+    from ..tools_base.ldap_fanout import iter_search_fanout
+    
+    if not max_results:
+        return {
+            categoria: list(iter_search_fanout(ldap_conn, base_dn, filtro, attributes=NO_ATTRS))
+            for categoria, filtro in consultas.items()
+        }
+    
+    peticiones = {
+        categoria: {
+            "base_dn": base_dn,
+            "filter_str": filtro,
+            "attributes": NO_ATTRS,
+            "size_limit": max_results
+        }
+        for categoria, filtro in consultas.items()
+    }
+    return ldap_conn.search_many(peticiones)
+
 def _contar_total_objetos(resultados_busqueda: Dict[str, Any]) -> int:
     """
     Cuenta el total de objetos en los resultados de búsqueda.
@@ -3,14 +3,37 @@ Herramienta ofensiva: Enumeración anónima LDAP
 """
 
 import logging
-from typing import Dict, Any, List
-from rich.console import Console
+from typing import Any, Callable, Dict, Iterable, List
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
 
-console = Console()
 logger = logging.getLogger(__name__)
 
+# Atributos solicitados al servidor en cada categoría de la enumeración
+ATRIBUTOS_USUARIO = ['objectClass', 'uid', 'cn', 'sn', 'displayName', 'mail', 'title']
+ATRIBUTOS_GRUPO = ['objectClass', 'cn', 'description', 'member']
+ATRIBUTOS_SISTEMA = ['objectClass', 'cn', 'ou', 'description']
+
+# Atributos sensibles a buscar
+ATRIBUTOS_SENSIBLES = [
+    "userPassword", "shadowLastChange", "shadowMin", "shadowMax",
+    "shadowWarning", "shadowInactive", "shadowExpire", "shadowFlag",
+    "pwdLastSet", "pwdExpireDate", "pwdCanChange", "pwdMustChange"
+]
+
+# Clases de objeto que NO se consideran objetos del sistema
+CLASES_NO_SISTEMA = ['person', 'organizationalPerson', 'inetOrgPerson', 'groupOfNames', 'posixGroup']
+
+# Filtros de cada categoría (los objetos del sistema se filtran en el servidor)
+FILTRO_USUARIOS = "(objectClass=person)"
+FILTRO_GRUPOS = "(objectClass=groupOfNames)"
+FILTRO_SISTEMA = "(!(|" + "".join(f"(objectClass={clase})" for clase in CLASES_NO_SISTEMA) + "))"
+FILTRO_SENSIBLES = "(|(userPassword=*)(shadowLastChange=*)(pwdLastSet=*))"
+
+# Grupos cuyos miembros efectivos (incluidos los heredados por anidamiento) se revisan
+GRUPOS_PRIVILEGIADOS = ['admins', 'it']
+
 def tool_anonymous_enum(base_dn: str = None, max_results: int = 100) -> Dict[str, Any]:
     """
     Realiza enumeración anónima del directorio LDAP para extraer información sensible.
@@ -46,10 +69,11 @@ def tool_anonymous_enum(base_dn: str = None, max_results: int = 100) -> Dict[str
         console.print(Panel("🔴 Iniciando enumeración anónima LDAP", style="red"))
         
         # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
+        from ..tools_base.ldap_connector import SCOPE_BASE, NO_ATTRS
+        from ..tools_base.ldap_snapshot import create_connector
         
-        # Crear conexión LDAP
-        ldap_conn = LDAPConnector()
+        # Crear conexión LDAP (o snapshot offline si LDAP_SNAPSHOT_PATH está definida)
+        ldap_conn = create_connector()
         
         # Intentar conexión anónima
         console.print(Panel("🔓 Intentando bind anónimo...", style="yellow"))
@@ -67,7 +91,7 @@ def tool_anonymous_enum(base_dn: str = None, max_results: int = 100) -> Dict[str
             console.print(Panel("🔍 Verificando permisos de bind anónimo...", style="blue"))
             
             # Realizar búsqueda de prueba para verificar permisos
-            resultado_prueba = ldap_conn.search("", "(objectClass=*)")
+            resultado_prueba = ldap_conn.search("", "(objectClass=*)", attributes=NO_ATTRS, scope=SCOPE_BASE)
             
             if not resultado_prueba:
                 return {
@@ -140,27 +164,40 @@ def _realizar_enumeracion_completa(ldap_conn, base_dn: str, max_results: int) ->
     
     console.print(Panel(f"🔍 Enumerando desde: {base_dn}", style="blue"))
     
-    # Búsqueda de usuarios
-    console.print(Panel("👥 Enumerando usuarios...", style="cyan"))
-    usuarios = _enumerar_usuarios(ldap_conn, base_dn, max_results)
-    
-    # Búsqueda de grupos
-    console.print(Panel("👥 Enumerando grupos...", style="cyan"))
-    grupos = _enumerar_grupos(ldap_conn, base_dn, max_results)
-    
-    # Búsqueda de objetos del sistema
-    console.print(Panel("⚙️ Enumerando objetos del sistema...", style="cyan"))
-    objetos_sistema = _enumerar_objetos_sistema(ldap_conn, base_dn, max_results)
-    
-    # Búsqueda de atributos sensibles
-    console.print(Panel("🔐 Buscando atributos sensibles...", style="red"))
-    atributos_sensibles = _buscar_atributos_sensibles(ldap_conn, base_dn, max_results)
+    if max_results:
+        # Con límite, las cuatro búsquedas se lanzan a la vez (search_many)
+        console.print(Panel("👥 Enumerando usuarios, grupos, objetos del sistema y atributos sensibles...", style="cyan"))
+        categorias = _enumerar_en_paralelo(ldap_conn, base_dn, max_results)
+        usuarios = categorias["usuarios"]
+        grupos = categorias["grupos"]
+        objetos_sistema = categorias["objetos_sistema"]
+        atributos_sensibles = categorias["atributos_sensibles"]
+    else:
+        # Sin límite, cada categoría se recorre de forma paginada y repartida por OU
+        console.print(Panel("👥 Enumerando usuarios...", style="cyan"))
+        usuarios = _enumerar_usuarios(ldap_conn, base_dn, max_results)
+        
+        console.print(Panel("👥 Enumerando grupos...", style="cyan"))
+        grupos = _enumerar_grupos(ldap_conn, base_dn, max_results)
+        
+        console.print(Panel("⚙️ Enumerando objetos del sistema...", style="cyan"))
+        objetos_sistema = _enumerar_objetos_sistema(ldap_conn, base_dn, max_results)
+        
+        console.print(Panel("🔐 Buscando atributos sensibles...", style="red"))
+        atributos_sensibles = _buscar_atributos_sensibles(ldap_conn, base_dn, max_results)
+    
+    # Con grupos visibles, resolver el anidamiento sobre el índice de pertenencia
+    pertenencia_anidada = {}
+    if grupos:
+        console.print(Panel("🧬 Resolviendo pertenencia anidada a grupos...", style="cyan"))
+        pertenencia_anidada = _analizar_pertenencia_anidada(ldap_conn)
     
     return {
         "usuarios": usuarios,
         "grupos": grupos,
         "objetos_sistema": objetos_sistema,
         "atributos_sensibles": atributos_sensibles,
+        "pertenencia_anidada": pertenencia_anidada,
         "resumen": {
             "total_usuarios": len(usuarios),
             "total_grupos": len(grupos),
@@ -169,6 +206,44 @@ def _realizar_enumeracion_completa(ldap_conn, base_dn: str, max_results: int) ->
         }
     }
 
+def _enumerar_en_paralelo(ldap_conn, base_dn: str, max_results: int) -> Dict[str, List[Dict]]:
+    """
+    Enumera las cuatro categorías lanzando todas las búsquedas a la vez.
+    
+    Args:
+        ldap_conn: Conexión LDAP activa
+        base_dn (str): DN base para la búsqueda
+        max_results (int): Número máximo de resultados por categoría
+        
+    Returns:
+        Dict[str, List[Dict]]: Entradas limpias por categoría
+    """
+    consultas = {
+        "usuarios": (FILTRO_USUARIOS, ATRIBUTOS_USUARIO, None),
+        "grupos": (FILTRO_GRUPOS, ATRIBUTOS_GRUPO, None),
+        "objetos_sistema": (FILTRO_SISTEMA, ATRIBUTOS_SISTEMA, _es_objeto_sistema),
+        "atributos_sensibles": (FILTRO_SENSIBLES, ATRIBUTOS_SENSIBLES, _tiene_atributos_sensibles)
+    }
+    
+    try:
+        resultados = ldap_conn.search_many({
+            categoria: {
+                "base_dn": base_dn,
+                "filter_str": filtro,
+                "attributes": atributos,
+                "size_limit": max_results
+            }
+            for categoria, (filtro, atributos, _) in consultas.items()
+        })
+    except Exception as e:
+        logger.error(f"Error en enumeración paralela: {e}")
+        resultados = {}
+    
+    return {
+        categoria: _recolectar_entradas(resultados.get(categoria, []), max_results, criterio)
+        for categoria, (_, _, criterio) in consultas.items()
+    }
+
 def _enumerar_usuarios(ldap_conn, base_dn: str, max_results: int) -> List[Dict]:
     """
     Enumera usuarios del directorio LDAP.
@@ -182,22 +257,14 @@ def _enumerar_usuarios(ldap_conn, base_dn: str, max_results: int) -> List[Dict]:
         List[Dict]: Lista de usuarios encontrados
     """
     try:
-        # Búsqueda de usuarios (person)
-        filtro_usuarios = "(objectClass=person)"
-        usuarios = ldap_conn.search(base_dn, filtro_usuarios)
-        
-        # Procesar y limpiar resultados
-        usuarios_procesados = []
-        for usuario in usuarios:
-            usuario_limpio = _limpiar_entrada_ldap(usuario)
-            if usuario_limpio:
-                usuarios_procesados.append(usuario_limpio)
+        from ..tools_base.ldap_fanout import iter_search_fanout
         
-        # Limitar resultados si es necesario
-        if max_results and len(usuarios_procesados) > max_results:
-            usuarios_procesados = usuarios_procesados[:max_results]
+        # Búsqueda de usuarios (person)
+        usuarios = iter_search_fanout(ldap_conn, base_dn, FILTRO_USUARIOS,
+                                      attributes=ATRIBUTOS_USUARIO, size_limit=max_results)
         
-        return usuarios_procesados
+        # Procesar y limpiar resultados hasta alcanzar max_results
+        return _recolectar_entradas(usuarios, max_results)
         
     except Exception as e:
         logger.error(f"Error enumerando usuarios: {e}")
@@ -216,22 +283,14 @@ def _enumerar_grupos(ldap_conn, base_dn: str, max_results: int) -> List[Dict]:
         List[Dict]: Lista de grupos encontrados
     """
     try:
-        # Búsqueda de grupos
-        filtro_grupos = "(objectClass=groupOfNames)"
-        grupos = ldap_conn.search(base_dn, filtro_grupos)
-        
-        # Procesar y limpiar resultados
-        grupos_procesados = []
-        for grupo in grupos:
-            grupo_limpio = _limpiar_entrada_ldap(grupo)
-            if grupo_limpio:
-                grupos_procesados.append(grupo_limpio)
+        from ..tools_base.ldap_fanout import iter_search_fanout
         
-        # Limitar resultados si es necesario
-        if max_results and len(grupos_procesados) > max_results:
-            grupos_procesados = grupos_procesados[:max_results]
+        # Búsqueda de grupos
+        grupos = iter_search_fanout(ldap_conn, base_dn, FILTRO_GRUPOS,
+                                    attributes=ATRIBUTOS_GRUPO, size_limit=max_results)
         
-        return grupos_procesados
+        # Procesar y limpiar resultados hasta alcanzar max_results
+        return _recolectar_entradas(grupos, max_results)
         
     except Exception as e:
         logger.error(f"Error enumerando grupos: {e}")
@@ -250,22 +309,14 @@ def _enumerar_objetos_sistema(ldap_conn, base_dn: str, max_results: int) -> List
         List[Dict]: Lista de objetos del sistema encontrados
     """
     try:
-        # Búsqueda de objetos del sistema
-        filtro_sistema = "(objectClass=*)"
-        objetos = ldap_conn.search(base_dn, filtro_sistema)
+        from ..tools_base.ldap_fanout import iter_search_fanout
         
-        # Filtrar solo objetos del sistema (no usuarios ni grupos)
-        objetos_sistema = []
-        for obj in objetos:
-            obj_limpio = _limpiar_entrada_ldap(obj)
-            if obj_limpio and _es_objeto_sistema(obj_limpio):
-                objetos_sistema.append(obj_limpio)
-        
-        # Limitar resultados si es necesario
-        if max_results and len(objetos_sistema) > max_results:
-            objetos_sistema = objetos_sistema[:max_results]
+        # Búsqueda de objetos del sistema: el servidor descarta usuarios y grupos
+        objetos = iter_search_fanout(ldap_conn, base_dn, FILTRO_SISTEMA,
+                                     attributes=ATRIBUTOS_SISTEMA, size_limit=max_results)
         
-        return objetos_sistema
+        # Filtrar solo objetos del sistema (no usuarios ni grupos)
+        return _recolectar_entradas(objetos, max_results, _es_objeto_sistema)
         
     except Exception as e:
         logger.error(f"Error enumerando objetos del sistema: {e}")
@@ -284,34 +335,83 @@ def _buscar_atributos_sensibles(ldap_conn, base_dn: str, max_results: int) -> Li
         List[Dict]: Lista de entradas con atributos sensibles
     """
     try:
-        # Atributos sensibles a buscar
-        atributos_sensibles = [
-            "userPassword", "shadowLastChange", "shadowMin", "shadowMax",
-            "shadowWarning", "shadowInactive", "shadowExpire", "shadowFlag",
-            "pwdLastSet", "pwdExpireDate", "pwdCanChange", "pwdMustChange"
-        ]
+        from ..tools_base.ldap_fanout import iter_search_fanout
         
         # Búsqueda de objetos con atributos sensibles
-        filtro_sensibles = "(|(userPassword=*)(shadowLastChange=*)(pwdLastSet=*))"
-        objetos_sensibles = ldap_conn.search(base_dn, filtro_sensibles)
+        objetos_sensibles = iter_search_fanout(ldap_conn, base_dn, FILTRO_SENSIBLES,
+                                               attributes=ATRIBUTOS_SENSIBLES, size_limit=max_results)
         
         # Procesar y limpiar resultados
-        sensibles_procesados = []
-        for obj in objetos_sensibles:
-            obj_limpio = _limpiar_entrada_ldap(obj)
-            if obj_limpio and _tiene_atributos_sensibles(obj_limpio):
-                sensibles_procesados.append(obj_limpio)
-        
-        # Limitar resultados si es necesario
-        if max_results and len(sensibles_procesados) > max_results:
-            sensibles_procesados = sensibles_procesados[:max_results]
-        
-        return sensibles_procesados
+        return _recolectar_entradas(objetos_sensibles, max_results, _tiene_atributos_sensibles)
         
     except Exception as e:
         logger.error(f"Error buscando atributos sensibles: {e}")
         return []
 
+def _analizar_pertenencia_anidada(ldap_conn) -> Dict[str, Any]:
+    """
+    Resuelve la pertenencia transitiva a grupos con el índice de pertenencia.
+    
+    Una sola búsqueda de grupos (reutilizada si ya está en caché) basta para
+    conocer los grupos anidados, los ciclos y los miembros efectivos de los
+    grupos privilegiados.
+    
+    Args:
+        ldap_conn: Conexión LDAP activa
+        
+    Returns:
+        Dict[str, Any]: Grupos anidados, ciclos y miembros directos/heredados de
+            cada grupo privilegiado (vacío si no se pudo construir el índice)
+    """
+    try:
+        indice = ldap_conn.get_membership_index()
+        
+        privilegiados = {}
+        for grupo in GRUPOS_PRIVILEGIADOS:
+            directos = indice.members_of(grupo, transitive=False)
+            efectivos = indice.members_of(grupo)
+            if efectivos:
+                privilegiados[grupo] = {
+                    "directos": len(directos - set(indice.group_cns)),
+                    "efectivos": len(efectivos),
+                    "heredados": sorted(efectivos - directos)
+                }
+        
+        return {
+            "grupos_anidados": indice.nested_groups(),
+            "ciclos": indice.cyclic_groups(),
+            "grupos_privilegiados": privilegiados
+        }
+        
+    except Exception as e:
+        logger.error(f"Error resolviendo pertenencia anidada: {e}")
+        return {}
+
+def _recolectar_entradas(entradas: Iterable[Dict], max_results: int,
+                         criterio: Callable[[Dict], bool] = None) -> List[Dict]:
+    """
+    Limpia entradas LDAP consumiéndolas de forma perezosa.
+    
+    Deja de iterar en cuanto se alcanza max_results, de modo que con iter_search()
+    no se solicitan al servidor más páginas de las necesarias.
+    
+    Args:
+        entradas (Iterable[Dict]): Entradas LDAP (por ejemplo, de iter_search)
+        max_results (int): Número máximo de resultados (0 o None sin límite)
+        criterio (Callable, optional): Filtro adicional sobre la entrada limpia
+        
+    Returns:
+        List[Dict]: Entradas limpias que cumplen el criterio
+    """
+    procesadas = []
+    for entrada in entradas:
+        entrada_limpia = _limpiar_entrada_ldap(entrada)
+        if entrada_limpia and (criterio is None or criterio(entrada_limpia)):
+            procesadas.append(entrada_limpia)
+            if max_results and len(procesadas) >= max_results:
+                break
+    return procesadas
+
 def _limpiar_entrada_ldap(entrada: Dict) -> Dict:
     """
     Limpia y normaliza una entrada LDAP.
@@ -352,7 +452,7 @@ def _es_objeto_sistema(objeto: Dict) -> bool:
     object_classes = objeto.get('objectclass', [])
     
     # Objetos que NO son del sistema
-    no_sistema = ['person', 'organizationalperson', 'inetorgperson', 'groupofnames', 'posixgroup']
+    no_sistema = [clase.lower() for clase in CLASES_NO_SISTEMA]
     
     # Si tiene alguna clase que NO es del sistema, no es objeto del sistema
     for clase in object_classes:
@@ -430,6 +530,19 @@ def _analizar_seguridad_enum(resultado_enum: Dict[str, Any]) -> Dict[str, Any]:
         analisis["riesgos_detectados"].append(f"Objetos del sistema enumerados: {total_objetos}")
         analisis["recomendaciones"].append("Revisar permisos de acceso anónimo a objetos del sistema")
     
+    # Análisis de pertenencia anidada
+    anidada = resultado_enum.get("pertenencia_anidada", {})
+    heredados = sum(len(g["heredados"]) for g in anidada.get("grupos_privilegiados", {}).values())
+    if heredados > 0:
+        analisis["riesgos_detectados"].append(f"Miembros con privilegios heredados por anidamiento: {heredados}")
+        analisis["recomendaciones"].append("Revisar los grupos anidados dentro de grupos privilegiados")
+        if analisis["nivel_riesgo"] == "bajo":
+            analisis["nivel_riesgo"] = "medio"
+    if anidada.get("ciclos"):
+        analisis["vulnerabilidades_potenciales"].append(
+            f"Ciclos de anidamiento de grupos: {', '.join(anidada['ciclos'])}")
+        analisis["recomendaciones"].append("Eliminar los ciclos de anidamiento entre grupos")
+    
     # Recomendaciones generales
     if total_usuarios > 0 or total_grupos > 0:
         analisis["recomendaciones"].append("Considerar deshabilitar bind anónimo si no es necesario")
@@ -467,6 +580,19 @@ def mostrar_resultado_enum(resultado: Dict[str, Any]):
     
     console.print(table_resumen)
     
+    # Mostrar pertenencia efectiva a grupos privilegiados
+    anidada = enumeracion.get("pertenencia_anidada", {})
+    if anidada.get("grupos_privilegiados"):
+        table_anidada = Table(title="Pertenencia a Grupos Privilegiados")
+        table_anidada.add_column("Grupo", style="cyan")
+        table_anidada.add_column("Directos", style="green")
+        table_anidada.add_column("Efectivos", style="yellow")
+        
+        for grupo, datos in anidada["grupos_privilegiados"].items():
+            table_anidada.add_row(grupo, str(datos["directos"]), str(datos["efectivos"]))
+        
+        console.print(table_anidada)
+    
     # Mostrar análisis de seguridad
     console.print(Panel("🔒 Análisis de Seguridad", style="bold red"))
     
@@ -6,11 +6,10 @@ import logging
 import subprocess
 import re
 from typing import Dict, Any, List, Optional
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 def tool_ldap_nmap_nse(target: str = None, port: int = 389, scripts: str = None, 
@@ -124,6 +123,84 @@ def tool_ldap_nmap_nse(target: str = None, port: int = 389, scripts: str = None,
             "tipo": "error_ejecucion"
         }
 
+def extraer_parametros_nmap_nse(consulta: str) -> Dict[str, Any]:
+    """
+    Extrae parámetros para tool_ldap_nmap_nse desde la consulta CLI (extractor del manifiesto).
+    
+    Args:
+        consulta (str): Consulta del usuario
+        
+    Returns:
+        Dict[str, Any]: Parámetros extraídos
+    """
+    parametros = {}
+    
+    try:
+        # Buscar IP o hostname en la consulta
+        # Patrones para detectar IPs
+        ip_patterns = [
+            r'\b(?:\d{1,3}\.){3}\d{1,3}\b',  # IPv4
+            r'\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b',  # IPv6
+        ]
+        
+        # Patrones para detectar hostnames
+        hostname_patterns = [
+            r'\b(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}\b',  # Dominio
+            r'\b[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\b',  # Hostname simple
+        ]
+        
+        # Buscar IPs primero
+        for pattern in ip_patterns:
+            matches = re.findall(pattern, consulta)
+            if matches:
+                parametros["target"] = matches[0]
+                break
+        
+        # Si no se encontró IP, buscar hostname
+        if "target" not in parametros:
+            for pattern in hostname_patterns:
+                matches = re.findall(pattern, consulta)
+                if matches:
+                    # Filtrar palabras comunes que no son hostnames
+                    palabras_comunes = ["nmap", "nse", "ldap", "fingerprint", "scripts", "reconocimiento", "externo"]
+                    for match in matches:
+                        if match.lower() not in palabras_comunes and len(match) > 2:
+                            parametros["target"] = match
+                            break
+                    if "target" in parametros:
+                        break
+        
+        # Buscar puerto específico
+        puerto_match = re.search(r'\b(\d{3,5})\b', consulta)
+        if puerto_match:
+            puerto = int(puerto_match.group(1))
+            if puerto != 389:  # Solo cambiar si no es el puerto por defecto
+                parametros["port"] = puerto
+        
+        # Buscar scripts específicos
+        if "ldap-rootdse" in consulta or "rootdse" in consulta:
+            parametros["scripts"] = "ldap-rootdse"
+        elif "ldap-search" in consulta or "search" in consulta:
+            parametros["scripts"] = "ldap-search"
+        elif "ldap-brute" in consulta or "brute" in consulta:
+            parametros["scripts"] = "ldap-brute"
+        
+        # Buscar modo verbose
+        if "verbose" in consulta.lower() or "detallado" in consulta.lower():
+            parametros["verbose"] = True
+        
+        # Buscar timeout personalizado
+        timeout_match = re.search(r'timeout\s*(\d+)', consulta.lower())
+        if timeout_match:
+            parametros["timeout"] = int(timeout_match.group(1))
+        
+        console.print(f"   🔍 Parámetros extraídos: {parametros}")
+        
+    except Exception as e:
+        console.print(f"   ⚠️ Error extrayendo parámetros: {e}")
+    
+    return parametros
+
 def _obtener_target_por_defecto() -> str:
     """
     Obtiene el target por defecto desde configuración del sistema o usa localhost.
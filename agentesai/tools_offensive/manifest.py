@@ -0,0 +1,58 @@
+"""
+Manifiestos de las herramientas ofensivas.
+
+Además de los patrones y la prioridad declaran la función que muestra el
+resultado y, si la herramienta recibe parámetros de la consulta, su extractor.
+Los módulos de las herramientas solo se importan al usarlas por primera vez.
+"""
+
+from ..manifest import AGENT_OFFENSIVE, COST_EXTERNAL, COST_LDAP, ToolManifest
+
+_PKG = "agentesai.tools_offensive"
+
+MANIFESTS = [
+    ToolManifest("tool_rootdse_info", f"{_PKG}.rootdse_info:tool_rootdse_info",
+                 ["rootdse", "root dse", "rootdse info", "root dse info", "análisis rootdse", "analisis rootdse",
+                  "rootdse analysis", "información servidor", "server info", "ldap info", "ldap server info"],
+                 priority=70, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Información del servidor LDAP: versión, contextos de nombres y extensiones soportadas (naming contexts, supported extensions)",
+                 renderer=f"{_PKG}.rootdse_info:mostrar_resultado_rootdse"),
+    ToolManifest("tool_anonymous_enum", f"{_PKG}.anonymous_enum:tool_anonymous_enum",
+                 ["enumeración anónima", "enumeracion anonima", "anonymous enum", "bind anónimo", "bind anonimo",
+                  "anonymous bind", "usuarios anónimos", "usuarios anonimos", "anonymous users",
+                  "enumerar usuarios", "enumerar grupos", "list users groups"],
+                 priority=80, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Qué usuarios, grupos y atributos se pueden enumerar sin autenticarse (enumerate without credentials)",
+                 renderer=f"{_PKG}.anonymous_enum:mostrar_resultado_enum"),
+    ToolManifest("tool_starttls_test", f"{_PKG}.starttls_test:tool_starttls_test",
+                 ["starttls", "start tls", "tls test", "test tls", "test seguridad", "seguridad tls",
+                  "tls security", "downgrade tls", "tls downgrade", "handshake tls"],
+                 priority=90, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Cifrado de la conexión: STARTTLS, TLS forzado y degradación a texto plano (connection encryption)",
+                 renderer=f"{_PKG}.starttls_test:mostrar_resultado_starttls"),
+    ToolManifest("tool_simple_vs_sasl_bind", f"{_PKG}.simple_vs_sasl_bind:tool_simple_vs_sasl_bind",
+                 ["simple vs sasl", "simple vs sasl bind", "simple sasl", "ldapwhoami", "whoami ldap",
+                  "bind simple", "bind sasl", "comparar bind", "comparar autenticacion", "fallback bind"],
+                 priority=100, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Compara la autenticación simple, SASL y anónima del servidor (authentication methods)",
+                 renderer=f"{_PKG}.simple_vs_sasl_bind:mostrar_resultado_simple_vs_sasl"),
+    ToolManifest("tool_acl_diff", f"{_PKG}.acl_diff:tool_acl_diff",
+                 ["acl diff", "acls", "comparar acls", "comparar permisos", "anonimo vs admin", "anonimo admin",
+                  "permisos anonimo", "diferencia permisos", "control acceso", "escalacion privilegios"],
+                 priority=110, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Diferencias de visibilidad entre un usuario anónimo y un administrador (access control lists, permissions)",
+                 renderer=f"{_PKG}.acl_diff:mostrar_resultado_acl_diff"),
+    ToolManifest("tool_self_password_change", f"{_PKG}.self_password_change:tool_self_password_change",
+                 ["self password change", "cambiar contraseña", "password change", "by self write",
+                  "self write", "cambio contraseña", "privilege escalation", "low priv"],
+                 priority=120, agent=AGENT_OFFENSIVE, cost=COST_LDAP,
+                 description="Si un usuario sin privilegios puede cambiar su contraseña o la de otros (password change rights)",
+                 renderer=f"{_PKG}.self_password_change:mostrar_resultado_self_password_change"),
+    ToolManifest("tool_ldap_nmap_nse", f"{_PKG}.ldap_nmap_nse:tool_ldap_nmap_nse",
+                 ["ldap nmap nse", "nmap nse", "fingerprint nmap", "nse scripts", "ldap-rootdse", "ldap-search",
+                  "reconocimiento externo", "fingerprint externo"],
+                 priority=130, agent=AGENT_OFFENSIVE, cost=COST_EXTERNAL,
+                 description="Escaneo externo del puerto LDAP con los scripts NSE de nmap (port scan, service fingerprint)",
+                 extractor=f"{_PKG}.ldap_nmap_nse:extraer_parametros_nmap_nse",
+                 renderer=f"{_PKG}.ldap_nmap_nse:mostrar_resultado_ldap_nmap_nse"),
+]
@@ -4,11 +4,10 @@ Herramienta ofensiva: Análisis RootDSE LDAP
 
 import logging
 from typing import Dict, Any, List
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 def tool_rootdse_info(server: str = None, base_dn: str = None, username: str = None, password: str = None) -> Dict[str, Any]:
@@ -48,10 +47,11 @@ def tool_rootdse_info(server: str = None, base_dn: str = None, username: str = N
         console.print(Panel("🔴 Iniciando análisis RootDSE LDAP", style="red"))
         
         # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
+        from ..tools_base.ldap_connector import SCOPE_BASE, ALL_USER_ATTRS, ALL_OPERATIONAL_ATTRS
+        from ..tools_base.ldap_snapshot import create_connector
         
-        # Crear conexión LDAP
-        ldap_conn = LDAPConnector()
+        # Crear conexión LDAP (o snapshot offline si LDAP_SNAPSHOT_PATH está definida)
+        ldap_conn = create_connector()
         
         # Conectar al servidor
         if not ldap_conn.connect():
@@ -66,8 +66,12 @@ def tool_rootdse_info(server: str = None, base_dn: str = None, username: str = N
             # Consultar RootDSE (DN vacío o ".")
             console.print(Panel("🔍 Consultando RootDSE...", style="blue"))
             
-            # Realizar búsqueda en RootDSE
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            # Realizar búsqueda base sobre el RootDSE incluyendo atributos operacionales
+            resultado_busqueda = ldap_conn.search(
+                "", "(objectClass=*)",
+                attributes=[ALL_USER_ATTRS, ALL_OPERATIONAL_ATTRS],
+                scope=SCOPE_BASE
+            )
             
             if not resultado_busqueda:
                 return {
@@ -4,11 +4,11 @@ Herramienta ofensiva: Test de Cambio de Contraseña por Usuario - Validación "b
 
 import logging
 from typing import Dict, Any, List
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from .sessions import LIMITE_EVALUACION_PERMISOS, offensive_run
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 def tool_self_password_change(username: str = None, password: str = None, new_password: str = None, 
@@ -60,20 +60,21 @@ def tool_self_password_change(username: str = None, password: str = None, new_pa
         if not target_user:
             target_user = username  # Por defecto, intentar cambiar la propia contraseña
         
-        # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
-        
-        # Test 1: Verificar autenticación del usuario low-priv
-        console.print(Panel("🔍 Test 1: Verificación de Autenticación Low-Priv", style="blue"))
-        resultado_auth = _test_autenticacion_low_priv(username, password, base_dn)
-        
-        # Test 2: Intentar cambio de contraseña propia
-        console.print(Panel("🔐 Test 2: Cambio de Contraseña Propia", style="blue"))
-        resultado_self_change = _test_cambio_password_propia(username, password, new_password, base_dn)
-        
-        # Test 3: Intentar cambio de contraseña de otro usuario
-        console.print(Panel("⚠️ Test 3: Cambio de Contraseña de Otro Usuario", style="yellow"))
-        resultado_other_change = _test_cambio_password_otro(username, password, target_user, new_password, base_dn)
+        # Las tres pruebas comparten la sesión del usuario low-priv (un único bind):
+        # tras cambiar su propia contraseña la sesión sigue autenticada
+        with offensive_run() as sesiones:
+            # Test 1: Verificar autenticación del usuario low-priv
+            console.print(Panel("🔍 Test 1: Verificación de Autenticación Low-Priv", style="blue"))
+            resultado_auth = _test_autenticacion_low_priv(sesiones, username, password, base_dn)
+            
+            # Test 2: Intentar cambio de contraseña propia
+            console.print(Panel("🔐 Test 2: Cambio de Contraseña Propia", style="blue"))
+            resultado_self_change = _test_cambio_password_propia(sesiones, username, password, new_password, base_dn)
+            
+            # Test 3: Intentar cambio de contraseña de otro usuario
+            console.print(Panel("⚠️ Test 3: Cambio de Contraseña de Otro Usuario", style="yellow"))
+            resultado_other_change = _test_cambio_password_otro(sesiones, username, password, target_user,
+                                                                new_password, base_dn)
         
         # Test 4: Análisis de permisos y vulnerabilidades
         console.print(Panel("🚨 Test 4: Análisis de Permisos y Vulnerabilidades", style="red"))
@@ -125,11 +126,12 @@ def tool_self_password_change(username: str = None, password: str = None, new_pa
             "tipo": "error_ejecucion"
         }
 
-def _test_autenticacion_low_priv(username: str, password: str, base_dn: str) -> Dict[str, Any]:
+def _test_autenticacion_low_priv(sesiones, username: str, password: str, base_dn: str) -> Dict[str, Any]:
     """
     Test de autenticación del usuario low-priv.
     
     Args:
+        sesiones (SessionManager): Sesiones de la ejecución
         username (str): Usuario low-priv
         password (str): Contraseña del usuario
         base_dn (str): DN base para la búsqueda
@@ -138,11 +140,10 @@ def _test_autenticacion_low_priv(username: str, password: str, base_dn: str) ->
         Dict[str, Any]: Resultado del test de autenticación
     """
     try:
-        # Crear conexión LDAP
-        ldap_conn = _crear_conexion_ldap()
+        # Autenticarse (primer bind de la identidad en la ejecución)
+        ldap_conn = sesiones.get(username, password)
         
-        # Intentar autenticación
-        if ldap_conn.connect(username=username, password=password):
+        if ldap_conn.is_connected:
             # Realizar búsqueda para verificar permisos
             resultado_busqueda = _realizar_busqueda_low_priv(ldap_conn, base_dn)
             
@@ -174,11 +175,12 @@ def _test_autenticacion_low_priv(username: str, password: str, base_dn: str) ->
             "vulnerabilidad": f"Error en autenticación: {str(e)}"
         }
 
-def _test_cambio_password_propia(username: str, password: str, new_password: str, base_dn: str) -> Dict[str, Any]:
+def _test_cambio_password_propia(sesiones, username: str, password: str, new_password: str, base_dn: str) -> Dict[str, Any]:
     """
     Test de cambio de contraseña propia.
     
     Args:
+        sesiones (SessionManager): Sesiones de la ejecución
         username (str): Usuario que intenta cambiar su contraseña
         password (str): Contraseña actual
         new_password (str): Nueva contraseña
@@ -188,11 +190,10 @@ def _test_cambio_password_propia(username: str, password: str, new_password: str
         Dict[str, Any]: Resultado del test de cambio de contraseña propia
     """
     try:
-        # Crear conexión LDAP
-        ldap_conn = _crear_conexion_ldap()
+        # Sesión ya autenticada del usuario
+        ldap_conn = sesiones.get(username, password)
         
-        # Autenticarse como el usuario
-        if ldap_conn.connect(username=username, password=password):
+        if ldap_conn.is_connected:
             # Intentar cambiar la contraseña propia
             resultado_cambio = _intentar_cambio_password(ldap_conn, username, new_password, base_dn)
             
@@ -221,11 +222,12 @@ def _test_cambio_password_propia(username: str, password: str, new_password: str
             "vulnerabilidad": f"Error en cambio de contraseña propia: {str(e)}"
         }
 
-def _test_cambio_password_otro(username: str, password: str, target_user: str, new_password: str, base_dn: str) -> Dict[str, Any]:
+def _test_cambio_password_otro(sesiones, username: str, password: str, target_user: str, new_password: str, base_dn: str) -> Dict[str, Any]:
     """
     Test de cambio de contraseña de otro usuario.
     
     Args:
+        sesiones (SessionManager): Sesiones de la ejecución
         username (str): Usuario low-priv que intenta cambiar contraseña
         password (str): Contraseña del usuario low-priv
         target_user (str): Usuario objetivo para cambiar contraseña
@@ -236,11 +238,10 @@ def _test_cambio_password_otro(username: str, password: str, target_user: str, n
         Dict[str, Any]: Resultado del test de cambio de contraseña de otro usuario
     """
     try:
-        # Crear conexión LDAP
-        ldap_conn = _crear_conexion_ldap()
+        # Sesión ya autenticada del usuario low-priv
+        ldap_conn = sesiones.get(username, password)
         
-        # Autenticarse como el usuario low-priv
-        if ldap_conn.connect(username=username, password=password):
+        if ldap_conn.is_connected:
             # Intentar cambiar la contraseña del usuario objetivo
             resultado_cambio = _intentar_cambio_password(ldap_conn, target_user, new_password, base_dn)
             
@@ -272,16 +273,6 @@ def _test_cambio_password_otro(username: str, password: str, target_user: str, n
             "vulnerabilidad": f"Error en cambio de contraseña de otro usuario: {str(e)}"
         }
 
-def _crear_conexion_ldap():
-    """
-    Crea una nueva conexión LDAP.
-    
-    Returns:
-        LDAPConnector: Instancia del conector LDAP
-    """
-    from ..tools_base.ldap_connector import LDAPConnector
-    return LDAPConnector()
-
 def _realizar_busqueda_low_priv(ldap_conn, base_dn: str) -> List:
     """
     Realiza búsqueda con usuario low-priv para evaluar permisos.
@@ -297,8 +288,10 @@ def _realizar_busqueda_low_priv(ldap_conn, base_dn: str) -> List:
         base_dn = "dc=meli,dc=com"  # TODO: obtener de configuración
     
     try:
-        # Búsqueda básica para evaluar permisos
-        resultado = ldap_conn.search(base_dn, "(objectClass=person)")
+        # Búsqueda básica para evaluar permisos (solo DNs, hasta el umbral más alto)
+        from ..tools_base.ldap_connector import NO_ATTRS
+        resultado = ldap_conn.search(base_dn, "(objectClass=person)", attributes=NO_ATTRS,
+                                     size_limit=LIMITE_EVALUACION_PERMISOS)
         return resultado or []
     except Exception as e:
         logger.error(f"Error en búsqueda low-priv: {e}")
@@ -350,7 +343,8 @@ def _intentar_cambio_password(ldap_conn, target_user: str, new_password: str, ba
         
         # Filtro para encontrar el usuario
         filtro = f"(uid={target_user})"
-        resultado = ldap_conn.search(base_dn, filtro)
+        from ..tools_base.ldap_connector import NO_ATTRS
+        resultado = ldap_conn.search(base_dn, filtro, attributes=NO_ATTRS, size_limit=1)
         
         if resultado:
             # Simular intento de cambio de contraseña
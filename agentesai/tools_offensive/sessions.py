@@ -0,0 +1,234 @@
+"""
+Sesiones LDAP compartidas por las herramientas ofensivas durante una ejecución.
+
+Cada prueba pide la sesión de una identidad (anónima, administrador o un usuario
+concreto) en lugar de crear y autenticar su propio conector. La primera petición
+hace el bind y las siguientes reutilizan la misma conexión; una prueba que
+necesita precisamente un bind nuevo lo pide con fresh=True. Al terminar la
+ejecución todas las sesiones se cierran, de modo que una auditoría no deja
+conexiones abiertas en el servidor.
+
+Las herramientas abren su ejecución con offensive_run(). Si ya hay una activa
+(por ejemplo, una auditoría que encadena varias herramientas) la reutilizan y
+las sesiones se comparten entre todas.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import ldap.dn
+from rich.panel import Panel
+from ..tools_base.output import console
+
+logger = logging.getLogger(__name__)
+
+# Identidad del bind anónimo (DN y contraseña vacíos)
+ANONYMOUS = ("", "")
+
+# Clave de la identidad de administrador de la configuración (LDAP_ADMIN_DN)
+ADMIN = None
+
+# Entradas que piden las herramientas para clasificar los permisos de una sesión:
+# el umbral más alto de sus clasificaciones es "más de 100"
+LIMITE_EVALUACION_PERMISOS = 101
+
+
+class SessionManager:
+    """
+    Sesiones LDAP autenticadas, una por identidad, durante una ejecución.
+
+    Atributos:
+        server_url (str): Servidor LDAP (por defecto el de LDAP_SERVER)
+        base_dn (str): DN base del directorio (por defecto el de LDAP_BASE_DN)
+
+    Métodos principales:
+        - get(): Sesión conectada de una identidad (reutilizada o nueva)
+        - anonymous(): Sesión del bind anónimo
+        - close(): Cierra todas las sesiones abiertas
+        - get_stats(): Binds realizados y sesiones reutilizadas
+    """
+
+    def __init__(self, server_url: str = None, base_dn: str = None):
+        """
+        Inicializa el gestor sin abrir conexiones.
+
+        Args:
+            server_url (str, optional): Servidor LDAP
+            base_dn (str, optional): DN base del directorio
+        """
+        self.server_url = server_url
+        self.base_dn = base_dn
+        self._sessions: Dict[Optional[Tuple[str, str]], object] = {}
+        self._fresh: List[object] = []
+        self._lock = threading.Lock()
+        self._stats = {"binds": 0, "reused": 0, "failed": 0, "closed": 0}
+
+    def get(self, username: str = None, password: str = None, fresh: bool = False):
+        """
+        Obtiene una sesión conectada para una identidad.
+
+        Sin usuario se usa la identidad de administrador de la configuración.
+        El usuario puede ser un DN o un nombre (se resuelve bajo ou=users, salvo el
+        del administrador configurado en LDAP_ADMIN_DN).
+
+        Args:
+            username (str, optional): Usuario o DN con el que autenticarse
+            password (str, optional): Contraseña del usuario
+            fresh (bool, optional): Abrir una conexión nueva aunque ya exista una
+                                    sesión para la identidad (se cierra igualmente
+                                    al terminar la ejecución)
+
+        Returns:
+            LDAPConnector: Conector de la identidad; is_connected indica si el bind
+                tuvo éxito (los binds fallidos no se guardan y se reintentan)
+        """
+        clave = self._identity(username, password)
+
+        with self._lock:
+            sesion = self._sessions.get(clave)
+            if sesion is not None and not fresh:
+                if sesion.is_connected:
+                    self._stats["reused"] += 1
+                    return sesion
+                del self._sessions[clave]
+
+        sesion = self._open(clave, fresh)
+
+        with self._lock:
+            if not sesion.is_connected:
+                self._stats["failed"] += 1
+            elif fresh:
+                self._fresh.append(sesion)
+            else:
+                self._sessions[clave] = sesion
+        return sesion
+
+    def anonymous(self, fresh: bool = False):
+        """
+        Obtiene la sesión del bind anónimo.
+
+        Args:
+            fresh (bool, optional): Abrir una conexión anónima nueva
+
+        Returns:
+            LDAPConnector: Conector anónimo (is_connected indica si se permitió el bind)
+        """
+        return self.get(*ANONYMOUS, fresh=fresh)
+
+    def close(self) -> int:
+        """
+        Cierra todas las sesiones de la ejecución.
+
+        Returns:
+            int: Número de sesiones cerradas
+        """
+        with self._lock:
+            sesiones = list(self._sessions.values()) + self._fresh
+            self._sessions.clear()
+            self._fresh = []
+
+        for sesion in sesiones:
+            try:
+                sesion.disconnect()
+            except Exception as e:
+                logger.warning(f"Error cerrando sesión LDAP: {e}")
+
+        with self._lock:
+            self._stats["closed"] += len(sesiones)
+        return len(sesiones)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Obtiene las estadísticas de la ejecución.
+
+        Returns:
+            Dict[str, int]: Binds realizados, sesiones reutilizadas, binds fallidos,
+                sesiones cerradas y sesiones abiertas
+        """
+        with self._lock:
+            return {**self._stats, "open": len(self._sessions) + len(self._fresh)}
+
+    def _identity(self, username: Optional[str], password: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        (bind DN, contraseña) de una identidad; ADMIN si no se indica usuario.
+
+        Un nombre sin DN igual al RDN del administrador configurado (LDAP_ADMIN_DN)
+        es ese administrador, que no cuelga de ou=users; con la contraseña de la
+        configuración (o sin contraseña) se usa directamente la sesión ADMIN.
+        """
+        if username is None:
+            return ADMIN
+        if username and "=" not in username:
+            from ..tools_base.ldap_connector import DEFAULT_ADMIN_DN, DEFAULT_ADMIN_PASSWORD, USERS_BASE_DN
+            admin_dn = os.getenv("LDAP_ADMIN_DN", DEFAULT_ADMIN_DN)
+            admin_rdn = ldap.dn.explode_dn(admin_dn, notypes=True)[0] if ldap.dn.is_dn(admin_dn) else None
+            if admin_rdn and username.lower() == admin_rdn.lower():
+                if not password or password == os.getenv("LDAP_ADMIN_PASSWORD", DEFAULT_ADMIN_PASSWORD):
+                    return ADMIN
+                return (admin_dn, password)
+            username = f"cn={username},{USERS_BASE_DN}"
+        return (username, password or "")
+
+    def _open(self, clave: Optional[Tuple[str, str]], fresh: bool):
+        """Crea y conecta el conector de una identidad."""
+        from ..tools_base.ldap_connector import LDAPConnector
+
+        # Solo el administrador comparte el pool del resto de herramientas; las demás
+        # identidades (y los binds nuevos pedidos a propósito) usan su propia conexión.
+        # Sin caché: la auditoría debe reflejar lo que el servidor permite ahora.
+        sesion = LDAPConnector(self.server_url, self.base_dn,
+                               use_pool=None if clave is ADMIN and not fresh else False, use_cache=False)
+        if clave is not ADMIN:
+            sesion.bind_dn, sesion.admin_password = clave
+
+        with self._lock:
+            self._stats["binds"] += 1
+        sesion.connect()
+        return sesion
+
+
+_current_run: ContextVar[Optional[SessionManager]] = ContextVar("agentesai_offensive_run", default=None)
+
+
+@contextmanager
+def offensive_run(server_url: str = None, base_dn: str = None) -> Iterator[SessionManager]:
+    """
+    Abre una ejecución de herramientas ofensivas (o se une a la que ya esté activa).
+
+    Las sesiones se cierran al salir de la ejecución más externa.
+
+    Args:
+        server_url (str, optional): Servidor LDAP
+        base_dn (str, optional): DN base del directorio
+
+    Yields:
+        SessionManager: Gestor de sesiones de la ejecución
+
+    Example:
+        >>> with offensive_run():
+        ...     tool_acl_diff()
+        ...     tool_simple_vs_sasl_bind()  # reutiliza los binds de tool_acl_diff
+    """
+    actual = _current_run.get()
+    if actual is not None:
+        yield actual
+        return
+
+    sesiones = SessionManager(server_url, base_dn)
+    token = _current_run.set(sesiones)
+    try:
+        yield sesiones
+    finally:
+        _current_run.reset(token)
+        cerradas = sesiones.close()
+        if cerradas:
+            console.print(Panel(f"🔌 {cerradas} sesiones LDAP de la ejecución cerradas", style="yellow"))
+
+
+def current_run() -> Optional[SessionManager]:
+    """Gestor de sesiones de la ejecución activa (None si no hay ninguna)."""
+    return _current_run.get()
@@ -4,11 +4,11 @@ Herramienta ofensiva: Comparación Simple vs SASL Bind LDAP
 
 import logging
 from typing import Dict, Any, List
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from .sessions import LIMITE_EVALUACION_PERMISOS, offensive_run
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 def tool_simple_vs_sasl_bind(server: str = None, base_dn: str = None, username: str = None, password: str = None) -> Dict[str, Any]:
@@ -46,19 +46,15 @@ def tool_simple_vs_sasl_bind(server: str = None, base_dn: str = None, username:
     try:
         console.print(Panel("🔴 Iniciando comparación Simple vs SASL Bind LDAP", style="red"))
         
-        # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
-        
-        # Crear conexión LDAP
-        ldap_conn = LDAPConnector()
-        
-        # Test 1: Bind simple (ldapwhoami normal)
-        console.print(Panel("🔍 Test 1: Bind Simple (ldapwhoami normal)", style="blue"))
-        resultado_simple = _test_bind_simple(ldap_conn, username, password)
-        
-        # Test 2: Bind anónimo (ldapwhoami -x)
-        console.print(Panel("🔓 Test 2: Bind Anónimo (ldapwhoami -x)", style="blue"))
-        resultado_anonimo = _test_bind_anonimo(ldap_conn)
+        # Cada identidad (usuario y anónimo) hace un único bind en la ejecución
+        with offensive_run(server, base_dn) as sesiones:
+            # Test 1: Bind simple (ldapwhoami normal)
+            console.print(Panel("🔍 Test 1: Bind Simple (ldapwhoami normal)", style="blue"))
+            resultado_simple = _test_bind_simple(sesiones, username, password)
+            
+            # Test 2: Bind anónimo (ldapwhoami -x)
+            console.print(Panel("🔓 Test 2: Bind Anónimo (ldapwhoami -x)", style="blue"))
+            resultado_anonimo = _test_bind_anonimo(sesiones)
         
         # Test 3: Comparación de permisos
         console.print(Panel("⚖️ Test 3: Comparación de Permisos", style="blue"))
@@ -109,12 +105,12 @@ def tool_simple_vs_sasl_bind(server: str = None, base_dn: str = None, username:
             "tipo": "error_ejecucion"
         }
 
-def _test_bind_simple(ldap_conn, username: str = None, password: str = None) -> Dict[str, Any]:
+def _test_bind_simple(sesiones, username: str = None, password: str = None) -> Dict[str, Any]:
     """
     Test de bind simple (ldapwhoami normal).
     
     Args:
-        ldap_conn: Conexión LDAP
+        sesiones (SessionManager): Sesiones de la ejecución
         username (str, optional): Usuario para autenticación
         password (str, optional): Contraseña para autenticación
         
@@ -125,8 +121,9 @@ def _test_bind_simple(ldap_conn, username: str = None, password: str = None) ->
         # Intentar bind simple
         if username and password:
             # Bind con credenciales específicas
-            if ldap_conn.connect(username=username, password=password):
-                resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            ldap_conn = sesiones.get(username, password)
+            if ldap_conn.is_connected:
+                resultado_busqueda = _buscar_entradas_visibles(ldap_conn)
                 return {
                     "estado": "exitoso",
                     "tipo_bind": "simple_con_credenciales",
@@ -150,8 +147,9 @@ def _test_bind_simple(ldap_conn, username: str = None, password: str = None) ->
                 }
         else:
             # Bind simple sin credenciales (intenta SASL/GSSAPI)
-            if ldap_conn.connect():
-                resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            ldap_conn = sesiones.get()
+            if ldap_conn.is_connected:
+                resultado_busqueda = _buscar_entradas_visibles(ldap_conn)
                 return {
                     "estado": "exitoso",
                     "tipo_bind": "simple_sin_credenciales",
@@ -186,21 +184,22 @@ def _test_bind_simple(ldap_conn, username: str = None, password: str = None) ->
             "vulnerabilidad": f"Error en bind simple: {str(e)}"
         }
 
-def _test_bind_anonimo(ldap_conn) -> Dict[str, Any]:
+def _test_bind_anonimo(sesiones) -> Dict[str, Any]:
     """
     Test de bind anónimo (ldapwhoami -x).
     
     Args:
-        ldap_conn: Conexión LDAP
+        sesiones (SessionManager): Sesiones de la ejecución
         
     Returns:
         Dict[str, Any]: Resultado del test de bind anónimo
     """
     try:
         # Intentar bind anónimo
-        if ldap_conn.connect():
+        ldap_conn = sesiones.anonymous()
+        if ldap_conn.is_connected:
             # Realizar búsqueda anónima
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            resultado_busqueda = _buscar_entradas_visibles(ldap_conn)
             
             return {
                 "estado": "exitoso",
@@ -236,6 +235,23 @@ def _test_bind_anonimo(ldap_conn) -> Dict[str, Any]:
             "vulnerabilidad": f"Error en bind anónimo: {str(e)}"
         }
 
+def _buscar_entradas_visibles(ldap_conn) -> List[Dict]:
+    """
+    Obtiene las entradas visibles con la identidad actual sin descargar atributos.
+    
+    _evaluar_permisos() solo cuenta entradas y su umbral más alto es 100, así que
+    basta con pedir los DNs ('1.1') y cortar la búsqueda en el servidor.
+    
+    Args:
+        ldap_conn: Conexión LDAP
+        
+    Returns:
+        List[Dict]: Entradas encontradas (solo con su DN)
+    """
+    from ..tools_base.ldap_connector import NO_ATTRS
+    
+    return ldap_conn.search("", "(objectClass=*)", attributes=NO_ATTRS, size_limit=LIMITE_EVALUACION_PERMISOS)
+
 def _evaluar_permisos(resultado_busqueda: List) -> str:
     """
     Evalúa los permisos basándose en los resultados de búsqueda.
@@ -4,11 +4,11 @@ Herramienta ofensiva: Test de seguridad STARTTLS LDAP
 
 import logging
 from typing import Dict, Any, List
-from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from ..tools_base.output import console
+from .sessions import offensive_run
 
-console = Console()
 logger = logging.getLogger(__name__)
 
 def tool_starttls_test(server: str = None, base_dn: str = None, username: str = None, password: str = None) -> Dict[str, Any]:
@@ -42,27 +42,25 @@ def tool_starttls_test(server: str = None, base_dn: str = None, username: str =
     try:
         console.print(Panel("🔴 Iniciando test de seguridad STARTTLS LDAP", style="red"))
         
-        # Importar el conector LDAP
-        from ..tools_base.ldap_connector import LDAPConnector
-        
-        # Crear conexión LDAP
-        ldap_conn = LDAPConnector()
-        
-        # Test 1: Conexión normal (sin TLS)
-        console.print(Panel("🔍 Test 1: Conexión normal sin TLS", style="blue"))
-        resultado_normal = _test_conexion_normal(ldap_conn)
-        
-        # Test 2: Conexión con STARTTLS (-Z)
-        console.print(Panel("🔒 Test 2: Conexión con STARTTLS (-Z)", style="blue"))
-        resultado_starttls = _test_starttls(ldap_conn)
-        
-        # Test 3: Conexión forzada TLS (-ZZ)
-        console.print(Panel("🔐 Test 3: Conexión forzada TLS (-ZZ)", style="blue"))
-        resultado_tls_forzado = _test_tls_forzado(ldap_conn)
-        
-        # Test 4: Test de downgrade TLS
-        console.print(Panel("⚠️ Test 4: Test de downgrade TLS", style="yellow"))
-        resultado_downgrade = _test_downgrade_tls(ldap_conn)
+        # Una única sesión (un solo bind) compartida por las cuatro pruebas
+        with offensive_run(server, base_dn) as sesiones:
+            ldap_conn = sesiones.get(username, password)
+            
+            # Test 1: Conexión normal (sin TLS)
+            console.print(Panel("🔍 Test 1: Conexión normal sin TLS", style="blue"))
+            resultado_normal = _test_conexion_normal(ldap_conn)
+            
+            # Test 2: Conexión con STARTTLS (-Z)
+            console.print(Panel("🔒 Test 2: Conexión con STARTTLS (-Z)", style="blue"))
+            resultado_starttls = _test_starttls(ldap_conn)
+            
+            # Test 3: Conexión forzada TLS (-ZZ)
+            console.print(Panel("🔐 Test 3: Conexión forzada TLS (-ZZ)", style="blue"))
+            resultado_tls_forzado = _test_tls_forzado(ldap_conn)
+            
+            # Test 4: Test de downgrade TLS
+            console.print(Panel("⚠️ Test 4: Test de downgrade TLS", style="yellow"))
+            resultado_downgrade = _test_downgrade_tls(ldap_conn)
         
         # Análisis de seguridad
         analisis_seguridad = _analizar_seguridad_starttls(
@@ -105,6 +103,20 @@ def tool_starttls_test(server: str = None, base_dn: str = None, username: str =
             "tipo": "error_ejecucion"
         }
 
+def _sondear_rootdse(ldap_conn) -> List[Dict]:
+    """
+    Verifica que la conexión responde con una búsqueda base sobre el RootDSE sin atributos.
+    
+    Args:
+        ldap_conn: Conexión LDAP
+        
+    Returns:
+        List[Dict]: Entrada del RootDSE (solo DN) o lista vacía
+    """
+    from ..tools_base.ldap_connector import SCOPE_BASE, NO_ATTRS
+    
+    return ldap_conn.search("", "(objectClass=*)", attributes=NO_ATTRS, scope=SCOPE_BASE)
+
 def _test_conexion_normal(ldap_conn) -> Dict[str, Any]:
     """
     Test de conexión normal sin TLS.
@@ -116,10 +128,10 @@ def _test_conexion_normal(ldap_conn) -> Dict[str, Any]:
         Dict[str, Any]: Resultado del test
     """
     try:
-        # Intentar conexión normal
-        if ldap_conn.connect():
+        # La sesión de la ejecución ya hizo el bind en texto claro
+        if ldap_conn.is_connected:
             # Realizar búsqueda simple para verificar funcionalidad
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            resultado_busqueda = _sondear_rootdse(ldap_conn)
             
             return {
                 "estado": "exitoso",
@@ -157,11 +169,11 @@ def _test_starttls(ldap_conn) -> Dict[str, Any]:
         Dict[str, Any]: Resultado del test
     """
     try:
-        # Intentar conexión con STARTTLS
-        if ldap_conn.connect():
+        # Reutilizar la sesión de la ejecución (sin nuevo bind)
+        if ldap_conn.is_connected:
             # Simular STARTTLS (en la implementación real se usaría ldap.start_tls_s())
             # Por ahora, verificamos si la conexión está activa
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            resultado_busqueda = _sondear_rootdse(ldap_conn)
             
             return {
                 "estado": "exitoso",
@@ -202,9 +214,9 @@ def _test_tls_forzado(ldap_conn) -> Dict[str, Any]:
     try:
         # Intentar conexión forzada TLS
         # En la implementación real, esto forzaría TLS desde el inicio
-        if ldap_conn.connect():
+        if ldap_conn.is_connected:
             # Simular verificación TLS forzado
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            resultado_busqueda = _sondear_rootdse(ldap_conn)
             
             return {
                 "estado": "exitoso",
@@ -246,9 +258,9 @@ def _test_downgrade_tls(ldap_conn) -> Dict[str, Any]:
         # Simular test de downgrade
         # En la implementación real, esto intentaría forzar texto claro después de TLS
         
-        if ldap_conn.connect():
+        if ldap_conn.is_connected:
             # Intentar búsqueda para ver si la conexión sigue funcionando
-            resultado_busqueda = ldap_conn.search("", "(objectClass=*)")
+            resultado_busqueda = _sondear_rootdse(ldap_conn)
             
             return {
                 "estado": "simulado",
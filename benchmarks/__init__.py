@@ -0,0 +1,6 @@
+"""
+Benchmarks de las herramientas LDAP sobre un directorio sintético en memoria.
+
+Uso:
+    python -m benchmarks.run --sizes 100,1000,10000
+"""
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Generador de carga: muchos analistas consultando el sistema de agentes a la vez.
+
+Cada cliente ejecuta SistemaAgentes.procesar_consulta() con una mezcla
+configurable de consultas (herramientas base, herramientas ofensivas y
+consultas desconocidas que obligan a generar una herramienta). LDAP y Gemini
+son backends sintéticos locales con latencia configurable.
+
+En modo "threads" todos los clientes comparten un único SistemaAgentes, de modo
+que la contención en el estado del coordinador, el ejecutor y el registry (y en
+pools y cachés) aparece en la latencia. En modo "processes" cada proceso tiene
+su propio sistema y sus propios backends, como varias instancias del agente.
+
+Se informa del throughput, la latencia p50/p95/p99 por herramienta, la tasa de
+errores y las conexiones LDAP abiertas.
+
+Ejemplos:
+    python -m benchmarks.load
+    python -m benchmarks.load --clients 16 --requests 500 --ldap-latency-ms 2 --gemini-latency-ms 300
+    python -m benchmarks.load --mode processes --mix base=6,offensive=3,generated=1 --json load.json
+"""
+
+import io
+import os
+import logging
+import sys
+import json
+import math
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Tuple
+from unittest.mock import patch
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from agentesai.manifest import get_manifest_registry
+from agentesai.tools_base.ldap_pool import get_pools_stats
+from agentesai.tools_base.output import OUTPUT_NONE, get_output_mode, set_output_mode
+
+from .run import _reset_state
+from .synthetic_gemini import GeminiStats, synthetic_gemini
+from .synthetic_ldap import OperationStats, SyntheticDirectory, synthetic_server
+
+console = Console()
+
+# Consultas por categoría de la mezcla; {n} se sustituye por un número para que
+# las consultas desconocidas no se repitan
+QUERY_MIX: Dict[str, List[str]] = {
+    "base": [
+        "¿quién soy?",
+        "¿qué grupos tengo?",
+        "listar usuarios",
+        "estructura ldap"
+    ],
+    "offensive": [
+        "rootdse info",
+        "enumeración anónima",
+        "test starttls",
+        "simple vs sasl bind"
+    ],
+    "generated": [
+        "¿cuántos usuarios activos hay en la sede {n}?",
+        "¿qué impresoras hay en la oficina {n}?"
+    ]
+}
+
+DEFAULT_MIX = "base=5,offensive=3,generated=2"
+
+# Etiqueta de las consultas que terminaron generando una herramienta
+GENERATED_LABEL = "<generada>"
+
+# Etiqueta de las consultas respondidas con una herramienta generada antes
+REUSED_LABEL = "<reutilizada>"
+
+# Una muestra: (etiqueta de herramienta, latencia en segundos, error)
+Sample = Tuple[str, float, bool]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Interpreta una mezcla "categoría=peso,...".
+
+    Args:
+        mix (str): Pesos por categoría de QUERY_MIX (p. ej. "base=5,offensive=3,generated=2")
+
+    Returns:
+        Dict[str, float]: Peso por categoría
+
+    Raises:
+        ValueError: Si una categoría no existe o los pesos no son válidos
+    """
+    weights = {}
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERY_MIX:
+            raise ValueError(f"Categoría desconocida: {name!r} (opciones: {', '.join(QUERY_MIX)})")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0 or min(weights.values()) < 0:
+        raise ValueError(f"Mezcla no válida: {mix!r}")
+    return weights
+
+
+def build_schedule(requests: int, weights: Dict[str, float], seed: int = 42) -> List[str]:
+    """
+    Genera la secuencia de consultas de una ejecución (reproducible con la semilla).
+
+    Args:
+        requests (int): Número de consultas
+        weights (Dict[str, float]): Peso por categoría (ver parse_mix)
+        seed (int, optional): Semilla
+
+    Returns:
+        List[str]: Consultas a enviar, en orden
+    """
+    rng = random.Random(seed)
+    categories = list(weights)
+    schedule = []
+    for n in range(requests):
+        category = rng.choices(categories, weights=[weights[c] for c in categories])[0]
+        schedule.append(rng.choice(QUERY_MIX[category]).format(n=n))
+    return schedule
+
+
+def _label(resultado: Dict[str, Any]) -> str:
+    """Herramienta que respondió la consulta (las generadas y las reutilizadas se agrupan)."""
+    if resultado.get("tipo") in ("herramienta_generada", "error_generacion"):
+        return GENERATED_LABEL
+    herramienta = resultado.get("herramienta")
+    if resultado.get("tipo") == "herramienta_reutilizada" or \
+            (herramienta and resultado.get("tipo") == "herramienta_existente" and herramienta not in get_manifest_registry()):
+        return REUSED_LABEL
+    return herramienta or "<error>"
+
+
+def _is_error(resultado: Dict[str, Any]) -> bool:
+    """True si la consulta o la herramienta que la respondió devolvieron error."""
+    if resultado.get("error"):
+        return True
+    for clave in ("resultado", "resultado_ejecucion"):
+        interno = resultado.get(clave)
+        if isinstance(interno, dict) and interno.get("error"):
+            return True
+        # Las herramientas ofensivas van envueltas por el agente ofensivo
+        if isinstance(interno, dict) and isinstance(interno.get("resultado"), dict) \
+                and interno["resultado"].get("error"):
+            return True
+    return False
+
+
+def _timed_query(sistema, consulta: str) -> Sample:
+    start = time.perf_counter()
+    try:
+        resultado = sistema.procesar_consulta(consulta)
+        label, error = _label(resultado), _is_error(resultado)
+    except Exception:
+        label, error = "<excepcion>", True
+    return label, time.perf_counter() - start, error
+
+
+def _new_system(registry_path: str):
+    """SistemaAgentes sin salida por pantalla y con el registry en un fichero temporal."""
+    from agentesai.agent.sistema import SistemaAgentes
+
+    return SistemaAgentes(output_mode=OUTPUT_NONE, archivo_registro=registry_path)
+
+
+def _pool_totals() -> Dict[str, int]:
+    """Suma de los contadores de todos los pools LDAP."""
+    totals: Counter = Counter()
+    for stats in get_pools_stats().values():
+        totals.update({k: v for k, v in stats.items() if k in ("created", "reused", "waits", "discarded")})
+    return dict(totals)
+
+
+def _run_clients(schedule: List[str], clients: int, directory: SyntheticDirectory,
+                 ldap_latency: float, gemini_latency: float) -> Dict[str, Any]:
+    """Ejecuta la carga con `clients` hilos sobre un único SistemaAgentes."""
+    previous_mode = get_output_mode()
+    # El agente ofensivo audita cada operación con un warning; bajo carga solo interesan los errores
+    logging.disable(logging.WARNING)
+    _reset_state()
+    ldap_stats, gemini_stats = OperationStats(), GeminiStats()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {"LDAP_SNAPSHOT_PATH": ""}), \
+                redirect_stdout(io.StringIO()), \
+                synthetic_server(directory, ldap_latency, ldap_stats), \
+                synthetic_gemini(gemini_latency, gemini_stats):
+            sistema = _new_system(os.path.join(tmp, "tools_registry.json"))
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients, thread_name_prefix="cliente") as executor:
+                samples = list(executor.map(lambda consulta: _timed_query(sistema, consulta), schedule))
+            elapsed = time.perf_counter() - start
+
+            pools = _pool_totals()
+    finally:
+        set_output_mode(previous_mode)
+        logging.disable(logging.NOTSET)
+        _reset_state()
+
+    return {
+        "samples": samples,
+        "elapsed": elapsed,
+        "ldap_operations": dict(ldap_stats.operations),
+        "gemini_requests": gemini_stats.requests,
+        "pools": pools
+    }
+
+
+def _process_worker(schedule: List[str], directory_args: Dict[str, Any], ldap_latency: float,
+                    gemini_latency: float) -> Dict[str, Any]:
+    """Proceso cliente: su propio sistema y backends (ejecutado por ProcessPoolExecutor)."""
+    return _run_clients(schedule, 1, SyntheticDirectory(**directory_args), ldap_latency, gemini_latency)
+
+
+def run_load(clients: int = 8, requests: int = 200, mix: str = DEFAULT_MIX, mode: str = "threads",
+             users: int = 1000, groups: int = 20, ldap_latency: float = 0.0,
+             gemini_latency: float = 0.0, seed: int = 42) -> Dict[str, Any]:
+    """
+    Ejecuta una prueba de carga y agrega sus métricas.
+
+    Args:
+        clients (int, optional): Clientes concurrentes (hilos o procesos)
+        requests (int, optional): Consultas totales
+        mix (str, optional): Pesos por categoría (ver parse_mix)
+        mode (str, optional): "threads" (un sistema compartido) o "processes" (uno por proceso)
+        users (int, optional): Usuarios del directorio sintético
+        groups (int, optional): Grupos del directorio sintético
+        ldap_latency (float, optional): Latencia por operación LDAP en segundos
+        gemini_latency (float, optional): Latencia por petición a Gemini en segundos
+        seed (int, optional): Semilla de la secuencia de consultas
+
+    Returns:
+        Dict[str, Any]: Throughput, latencias por herramienta, tasa de errores y conexiones
+    """
+    if mode not in ("threads", "processes"):
+        raise ValueError(f"Modo no válido: {mode!r} (opciones: threads, processes)")
+    clients = max(1, clients)
+    schedule = build_schedule(requests, parse_mix(mix), seed)
+    directory_args = {"users": users, "groups": groups}
+
+    start = time.perf_counter()
+    if mode == "threads":
+        runs = [_run_clients(schedule, clients, SyntheticDirectory(**directory_args), ldap_latency, gemini_latency)]
+    else:
+        chunks = [schedule[i::clients] for i in range(clients) if schedule[i::clients]]
+        with ProcessPoolExecutor(max_workers=len(chunks) or 1) as executor:
+            runs = list(executor.map(_process_worker, chunks, [directory_args] * len(chunks),
+                                     [ldap_latency] * len(chunks), [gemini_latency] * len(chunks)))
+    elapsed = max([run["elapsed"] for run in runs], default=0.0) if mode == "processes" \
+        else time.perf_counter() - start
+
+    return _summarize(runs, elapsed, {
+        "mode": mode, "clients": clients, "requests": requests, "mix": mix, "users": users,
+        "groups": groups, "ldap_latency_ms": ldap_latency * 1000, "gemini_latency_ms": gemini_latency * 1000
+    })
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentil q (0-100) por rango más cercano; 0 si no hay valores."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _summarize(runs: List[Dict[str, Any]], elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    samples: List[Sample] = [sample for run in runs for sample in run["samples"]]
+    by_tool: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_tool[sample[0]].append(sample)
+
+    ldap_operations: Counter = Counter()
+    pools: Counter = Counter()
+    for run in runs:
+        ldap_operations.update(run["ldap_operations"])
+        pools.update(run["pools"])
+
+    errors = sum(1 for _, _, error in samples if error)
+    return {
+        **config,
+        "completed": len(samples),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_qps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "latency_ms": _latencies([latency for _, latency, _ in samples]),
+        "tools": {
+            tool: {
+                "count": len(tool_samples),
+                "errors": sum(1 for _, _, error in tool_samples if error),
+                **_latencies([latency for _, latency, _ in tool_samples])
+            }
+            for tool, tool_samples in sorted(by_tool.items())
+        },
+        "ldap_connections": ldap_operations["connect"],
+        "ldap_binds": ldap_operations["bind"],
+        "ldap_operations": sum(ldap_operations.values()),
+        "pools": dict(pools),
+        "gemini_requests": sum(run["gemini_requests"] for run in runs)
+    }
+
+
+def _latencies(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(max(values, default=0.0) * 1000, 2)
+    }
+
+
+def _print_report(report: Dict[str, Any]):
+    table = Table(title=f"🚦 Carga: {report['clients']} clientes ({report['mode']}), {report['completed']} consultas")
+    table.add_column("Herramienta", style="cyan")
+    table.add_column("Consultas", justify="right")
+    table.add_column("Errores", justify="right", style="red")
+    table.add_column("p50 (ms)", justify="right", style="green")
+    table.add_column("p95 (ms)", justify="right", style="yellow")
+    table.add_column("p99 (ms)", justify="right", style="magenta")
+
+    for tool, stats in report["tools"].items():
+        table.add_row(tool, str(stats["count"]), str(stats["errors"]), f"{stats['p50_ms']:.1f}",
+                      f"{stats['p95_ms']:.1f}", f"{stats['p99_ms']:.1f}")
+    total = report["latency_ms"]
+    table.add_row("TOTAL", str(report["completed"]), str(report["errors"]), f"{total['p50_ms']:.1f}",
+                  f"{total['p95_ms']:.1f}", f"{total['p99_ms']:.1f}", style="bold")
+    console.print(table)
+
+    console.print(f"⚡ Throughput: {report['throughput_qps']:.2f} consultas/s en {report['elapsed_s']:.2f} s")
+    console.print(f"❌ Tasa de errores: {report['error_rate'] * 100:.2f}%")
+    console.print(f"🔌 Conexiones LDAP: {report['ldap_connections']} (binds: {report['ldap_binds']}, "
+                  f"operaciones: {report['ldap_operations']}, pool: {report['pools']})")
+    console.print(f"🤖 Peticiones a Gemini: {report['gemini_requests']}")
+
+
+@click.command()
+@click.option('--clients', default=8, show_default=True, help='Clientes concurrentes')
+@click.option('--requests', 'requests_', default=200, show_default=True, help='Consultas totales')
+@click.option('--mix', default=DEFAULT_MIX, show_default=True,
+              help=f'Pesos por categoría ({", ".join(QUERY_MIX)})')
+@click.option('--mode', type=click.Choice(["threads", "processes"]), default="threads", show_default=True,
+              help='Hilos sobre un sistema compartido o un proceso (y sistema) por cliente')
+@click.option('--users', default=1000, show_default=True, help='Usuarios del directorio sintético')
+@click.option('--groups', default=20, show_default=True, help='Grupos del directorio sintético')
+@click.option('--ldap-latency-ms', default=1.0, show_default=True, help='Latencia por operación LDAP (ms)')
+@click.option('--gemini-latency-ms', default=200.0, show_default=True, help='Latencia por petición a Gemini (ms)')
+@click.option('--seed', default=42, show_default=True, help='Semilla de la secuencia de consultas')
+@click.option('--json', 'json_path', type=click.Path(dir_okay=False), help='Guardar el informe en JSON')
+@click.option('--max-error-rate', type=float, default=None, help='Falla si la tasa de errores supera este valor (0-1)')
+def main(clients, requests_, mix, mode, users, groups, ldap_latency_ms, gemini_latency_ms, seed, json_path,
+         max_error_rate):
+    """Prueba de carga del sistema de agentes con backends LDAP y Gemini sintéticos."""
+    try:
+        parse_mix(mix)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--mix")
+
+    console.print(f"🚦 {requests_} consultas con {clients} clientes ({mode})...")
+    report = run_load(clients, requests_, mix, mode, users, groups, ldap_latency_ms / 1000.0,
+                      gemini_latency_ms / 1000.0, seed)
+    _print_report(report)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        console.print(f"💾 Informe guardado en {json_path}")
+
+    if max_error_rate is not None and report["error_rate"] > max_error_rate:
+        console.print(f"❌ Tasa de errores {report['error_rate']:.2%} por encima de {max_error_rate:.2%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
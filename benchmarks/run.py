@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Ejecuta los benchmarks de herramientas LDAP a varios tamaños de directorio.
+
+Para cada herramienta y tamaño se mide el tiempo de pared, las operaciones LDAP
+enviadas, los bytes servidos por el "servidor", los bytes decodificados por
+LDAPEntry y el pico de memoria (tracemalloc). Cada ejecución parte de cachés,
+índices y pools vacíos.
+
+Ejemplos:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000,10000 --latency-ms 2 --json bench.json
+    python -m benchmarks.run --max-ops-per-entry 0.05   # falla ante patrones N+1
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from agentesai.tools_base import ldap_entry
+from agentesai.tools_base.ldap_cache import clear_result_cache
+from agentesai.tools_base.ldap_connector import LDAPConnector
+from agentesai.tools_base.ldap_pool import close_all_pools
+from agentesai.tools_base.ldap_structure import invalidate_directory_structure
+from agentesai.tools_base.membership import invalidate_membership_index
+
+from .synthetic_ldap import OperationStats, SyntheticDirectory, synthetic_server
+
+console = Console()
+
+
+def _list_all_users(max_results: int):
+    with LDAPConnector() as ldap_conn:
+        return ldap_conn.list_all_users()
+
+
+def _get_ldap_structure(max_results: int):
+    with LDAPConnector() as ldap_conn:
+        return ldap_conn.get_ldap_structure()
+
+
+def _tool_anonymous_enum(max_results: int):
+    from agentesai.tools_offensive.anonymous_enum import tool_anonymous_enum
+    return tool_anonymous_enum(max_results=max_results)
+
+
+def _tool_acl_diff(max_results: int):
+    from agentesai.tools_offensive.acl_diff import tool_acl_diff
+    return tool_acl_diff("admin", "benchmark", max_results=max_results)
+
+
+# Herramientas medidas: nombre → función(max_results)
+SCENARIOS: Dict[str, Callable[[int], Any]] = {
+    "list_all_users": _list_all_users,
+    "get_ldap_structure": _get_ldap_structure,
+    "tool_anonymous_enum": _tool_anonymous_enum,
+    "tool_acl_diff": _tool_acl_diff
+}
+
+
+def _reset_state():
+    """Deja cachés, índices y pools vacíos para medir siempre en frío."""
+    clear_result_cache()
+    invalidate_membership_index()
+    invalidate_directory_structure()
+    close_all_pools()
+
+
+def run_scenario(name: str, directory: SyntheticDirectory, latency: float = 0.0,
+                 max_results: int = 100, repeat: int = 1) -> Dict[str, Any]:
+    """
+    Mide una herramienta sobre un directorio sintético.
+
+    El tiempo es el mejor de `repeat` ejecuciones sin tracemalloc; operaciones,
+    bytes y memoria se miden en una ejecución adicional instrumentada.
+
+    Args:
+        name (str): Herramienta de SCENARIOS
+        directory (SyntheticDirectory): Directorio a servir
+        latency (float, optional): Latencia por operación en segundos
+        max_results (int, optional): max_results para las herramientas ofensivas
+        repeat (int, optional): Repeticiones para el tiempo de pared
+
+    Returns:
+        Dict[str, Any]: Métricas de la ejecución
+    """
+    scenario = SCENARIOS[name]
+    decoded = {"bytes": 0}
+    original_decode = ldap_entry._decode
+
+    def counting_decode(value):
+        if isinstance(value, bytes):
+            decoded["bytes"] += len(value)
+        return original_decode(value)
+
+    with patch.dict(os.environ, {"LDAP_SNAPSHOT_PATH": ""}), redirect_stdout(io.StringIO()):
+        wall_times = []
+        for _ in range(max(1, repeat)):
+            _reset_state()
+            with synthetic_server(directory, latency):
+                start = time.perf_counter()
+                scenario(max_results)
+                wall_times.append(time.perf_counter() - start)
+
+        _reset_state()
+        stats = OperationStats()
+        with synthetic_server(directory, latency, stats), \
+                patch.object(ldap_entry, "_decode", counting_decode):
+            tracemalloc.start()
+            try:
+                scenario(max_results)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        _reset_state()
+
+    entries = len(directory.entries)
+    return {
+        "tool": name,
+        "users": directory.users,
+        "groups": directory.groups,
+        "entries": entries,
+        "wall_time_s": round(min(wall_times), 4),
+        "operations": stats.total_operations,
+        "searches": stats.searches,
+        "operations_by_type": dict(stats.operations),
+        "ops_per_entry": round(stats.total_operations / entries, 4),
+        "bytes_sent": stats.bytes_sent,
+        "bytes_decoded": decoded["bytes"],
+        "peak_memory_bytes": peak
+    }
+
+
+def _print_results(results: List[Dict[str, Any]]):
+    table = Table(title="📊 Benchmarks LDAP (directorio sintético)")
+    table.add_column("Herramienta", style="cyan")
+    table.add_column("Usuarios", justify="right")
+    table.add_column("Tiempo (s)", justify="right", style="green")
+    table.add_column("Ops LDAP", justify="right", style="yellow")
+    table.add_column("Búsquedas", justify="right")
+    table.add_column("KB servidos", justify="right")
+    table.add_column("KB decodificados", justify="right")
+    table.add_column("Memoria pico (KB)", justify="right", style="magenta")
+
+    for r in results:
+        table.add_row(
+            r["tool"], str(r["users"]), f"{r['wall_time_s']:.4f}", str(r["operations"]),
+            str(r["searches"]), f"{r['bytes_sent'] / 1024:.1f}", f"{r['bytes_decoded'] / 1024:.1f}",
+            f"{r['peak_memory_bytes'] / 1024:.1f}"
+        )
+    console.print(table)
+
+
+@click.command()
+@click.option('--sizes', default="100,1000,10000", help='Tamaños de directorio (usuarios), separados por comas')
+@click.option('--groups', default=20, show_default=True, help='Número de grupos')
+@click.option('--density', default=0.1, show_default=True, help='Probabilidad de pertenencia usuario-grupo')
+@click.option('--attr-size', default=32, show_default=True, help='Bytes de relleno por usuario')
+@click.option('--latency-ms', default=0.0, show_default=True, help='Latencia por operación LDAP (ms)')
+@click.option('--max-results', default=100, show_default=True, help='max_results de las herramientas ofensivas')
+@click.option('--repeat', default=1, show_default=True, help='Repeticiones para el tiempo de pared')
+@click.option('--tools', 'tools', default=",".join(SCENARIOS), help='Herramientas a medir, separadas por comas')
+@click.option('--json', 'json_path', type=click.Path(dir_okay=False), help='Guardar resultados en JSON')
+@click.option('--max-ops-per-entry', type=float, default=None,
+              help='Falla si alguna herramienta supera estas operaciones LDAP por entrada del directorio')
+def main(sizes, groups, density, attr_size, latency_ms, max_results, repeat, tools, json_path,
+         max_ops_per_entry):
+    """Benchmarks de herramientas LDAP sobre un directorio sintético en memoria."""
+    tool_names = [t.strip() for t in tools.split(",") if t.strip()]
+    unknown = [t for t in tool_names if t not in SCENARIOS]
+    if unknown:
+        raise click.BadParameter(f"Herramientas desconocidas: {', '.join(unknown)}", param_hint="--tools")
+
+    results = []
+    for size in [int(s) for s in sizes.split(",") if s.strip()]:
+        directory = SyntheticDirectory(users=size, groups=groups, density=density, attr_size=attr_size)
+        for name in tool_names:
+            console.print(f"⏱️  {name} con {size} usuarios...")
+            results.append(run_scenario(name, directory, latency_ms / 1000.0, max_results, repeat))
+
+    _print_results(results)
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        console.print(f"💾 Resultados guardados en {json_path}")
+
+    if max_ops_per_entry is not None:
+        regresiones = [r for r in results if r["ops_per_entry"] > max_ops_per_entry]
+        for r in regresiones:
+            console.print(f"[red]❌ {r['tool']} ({r['users']} usuarios): {r['operations']} operaciones "
+                          f"({r['ops_per_entry']} por entrada > {max_ops_per_entry})[/red]")
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
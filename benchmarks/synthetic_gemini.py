@@ -0,0 +1,110 @@
+"""
+Backend de Gemini sintético para benchmarks.
+
+Sustituye el módulo google.generativeai por uno falso que responde tras una
+latencia fija con una herramienta ya escrita: una consulta LDAP pequeña si el
+prompt es de tipo ldap_query y una respuesta de texto en otro caso. Así se
+mide el flujo de generación (prompt, extracción, exec y registro) sin red ni
+API key real.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from unittest.mock import patch
+
+# Herramienta devuelta para consultas LDAP (cuenta usuarios sin pedir atributos)
+CODIGO_LDAP = '''
+def get_consulta_sintetica():
+    """Herramienta generada por el backend sintético"""
+    from agentesai.tools_base.ldap_connector import LDAPConnector, NO_ATTRS
+    with LDAPConnector() as ldap_conn:
+        usuarios = ldap_conn.search("ou=users,dc=meli,dc=com", "(objectClass=inetOrgPerson)", attributes=NO_ATTRS)
+        return f"Usuarios encontrados: {len(usuarios)}"
+'''
+
+# Herramienta devuelta para el resto de consultas
+CODIGO_GENERICO = '''
+def get_consulta_sintetica():
+    """Herramienta generada por el backend sintético"""
+    return "Respuesta sintética"
+'''
+
+
+class GeminiStats:
+    """Contadores de peticiones servidas por el backend sintético."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_bytes = 0
+
+    def record(self, prompt: str):
+        with self._lock:
+            self.requests += 1
+            self.prompt_bytes += len(prompt.encode("utf-8"))
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _GenerativeModel:
+    def __init__(self, stats: GeminiStats, latency: float, model_name: str = ""):
+        self.stats = stats
+        self.latency = latency
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str) -> _Response:
+        self.stats.record(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        codigo = CODIGO_LDAP if "LDAPConnector" in prompt else CODIGO_GENERICO
+        return _Response(f"```python\n{codigo.strip()}\n```")
+
+
+@contextmanager
+def synthetic_gemini(latency: float = 0.0, stats: Optional[GeminiStats] = None) -> Iterator[GeminiStats]:
+    """
+    Redirige google.generativeai a un modelo falso y define GEMINI_API_KEY.
+
+    Los AgenteGenerador deben crearse dentro del bloque: leen la API key al inicializarse.
+
+    Args:
+        latency (float, optional): Latencia por petición en segundos
+        stats (GeminiStats, optional): Contadores a usar (se crean si no se pasan)
+
+    Yields:
+        GeminiStats: Contadores compartidos por todos los modelos creados
+    """
+    stats = stats or GeminiStats()
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = lambda model_name="", **kwargs: _GenerativeModel(stats, latency, model_name)
+
+    modules = {"google.generativeai": genai}
+    if "google" not in sys.modules:
+        try:
+            importlib.import_module("google")
+        except ImportError:
+            modules["google"] = types.ModuleType("google")
+
+    with patch.dict(sys.modules, modules), \
+            patch.dict(os.environ, {"GEMINI_API_KEY": os.getenv("GEMINI_API_KEY") or "synthetic"}):
+        google = sys.modules["google"]
+        previous = getattr(google, "generativeai", None)
+        google.generativeai = genai
+        try:
+            yield stats
+        finally:
+            if previous is None:
+                del google.generativeai
+            else:
+                google.generativeai = previous
@@ -0,0 +1,356 @@
+"""
+Directorio LDAP sintético y conexión python-ldap falsa para benchmarks.
+
+La conexión falsa implementa la parte de la API de python-ldap que usan
+LDAPConnector y el pool (bind, search_ext/result3 con Simple Paged Results,
+abandono, modify, whoami) y cuenta cada operación enviada al "servidor".
+"""
+
+import random
+import string
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from unittest.mock import patch
+
+import ldap
+from ldap.controls import SimplePagedResultsControl
+
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.ldap_snapshot import match_filter, parse_filter
+from agentesai.tools_base.membership import GROUP_DEPT_MAPPING, normalize_dn
+
+BASE_DN = "dc=meli,dc=com"
+USERS_DN = f"ou=users,{BASE_DN}"
+GROUPS_DN = f"ou=groups,{BASE_DN}"
+
+Entry = Tuple[str, Dict[str, List[bytes]]]
+
+
+class SyntheticDirectory:
+    """
+    Árbol LDAP generado de forma determinista.
+
+    Atributos:
+        users (int): Número de usuarios
+        groups (int): Número de grupos (los primeros son los de GROUP_DEPT_MAPPING)
+        density (float): Probabilidad de que un usuario pertenezca a cada grupo
+        attr_size (int): Longitud del atributo de relleno 'description' de cada usuario
+        entries (List[Entry]): Entradas en orden de árbol (sin el RootDSE)
+    """
+
+    def __init__(self, users: int = 1000, groups: int = 20, density: float = 0.1,
+                 attr_size: int = 32, seed: int = 42):
+        """
+        Genera el directorio.
+
+        Args:
+            users (int, optional): Número de usuarios
+            groups (int, optional): Número de grupos
+            density (float, optional): Densidad de pertenencia (0-1)
+            attr_size (int, optional): Tamaño en bytes del relleno por usuario
+            seed (int, optional): Semilla para que el árbol sea reproducible
+        """
+        self.users = users
+        self.groups = groups
+        self.density = density
+        self.attr_size = attr_size
+
+        rng = random.Random(seed)
+        self.entries: List[Entry] = []
+        self.rootdse: Entry = ("", _attrs(
+            objectClass=["top", "OpenLDAProotDSE"],
+            namingContexts=[BASE_DN],
+            supportedLDAPVersion=["3"],
+            supportedControl=[SimplePagedResultsControl.controlType],
+            supportedSASLMechanisms=["PLAIN", "EXTERNAL"],
+            vendorName=["synthetic"]
+        ))
+
+        self._add(BASE_DN, objectClass=["top", "dcObject", "organization"], dc=["meli"], o=["meli"])
+        self._add(USERS_DN, objectClass=["organizationalUnit"], ou=["users"])
+        self._add(GROUPS_DN, objectClass=["organizationalUnit"], ou=["groups"])
+
+        user_dns = []
+        for i in range(users):
+            name = f"user{i:06d}"
+            dn = f"cn={name},{USERS_DN}"
+            user_dns.append(dn)
+            self._add(
+                dn,
+                objectClass=["top", "person", "organizationalPerson", "inetOrgPerson"],
+                cn=[name], sn=[name], uid=[name],
+                displayName=[f"User {i}"],
+                mail=[f"{name}@meli.com"],
+                title=[rng.choice(["Engineer", "Manager", "Analyst", "Director"])],
+                description=["".join(rng.choices(string.ascii_letters, k=attr_size))],
+                uidNumber=[str(10000 + i)], gidNumber=["10000"],
+                homeDirectory=[f"/home/{name}"], loginShell=["/bin/bash"]
+            )
+
+        names = list(GROUP_DEPT_MAPPING)[:groups] + [f"group{j:04d}" for j in range(max(0, groups - len(GROUP_DEPT_MAPPING)))]
+        for name in names:
+            members = [dn for dn in user_dns if rng.random() < density] or user_dns[:1]
+            self._add(
+                f"cn={name},{GROUPS_DN}",
+                objectClass=["top", "groupOfNames"],
+                cn=[name], description=[f"Grupo {name}"],
+                member=members
+            )
+
+        self._normalized = [normalize_dn(dn) for dn, _ in self.entries]
+
+    def _add(self, dn: str, **attrs):
+        self.entries.append((dn, _attrs(**attrs)))
+
+    def scan(self, base_dn: str, scope: int) -> Iterator[Entry]:
+        """Entradas dentro del alcance de una búsqueda (el RootDSE solo con base '')."""
+        base = normalize_dn(base_dn)
+        if not base and scope == ldap.SCOPE_BASE:
+            yield self.rootdse
+            return
+
+        suffix = "," + base
+        for entry, dn in zip(self.entries, self._normalized):
+            if dn == base:
+                if scope in (ldap.SCOPE_BASE, ldap.SCOPE_SUBTREE):
+                    yield entry
+                continue
+            if scope == ldap.SCOPE_BASE or (base and not dn.endswith(suffix)):
+                continue
+            if scope == ldap.SCOPE_ONELEVEL and "," in (dn[:-len(suffix)] if base else dn):
+                continue
+            yield entry
+
+
+def _attrs(**attrs) -> Dict[str, List[bytes]]:
+    """Convierte valores de texto a la representación en bytes de python-ldap."""
+    return {name: [value.encode("utf-8") for value in values] for name, values in attrs.items()}
+
+
+class _ServerEntry(LDAPEntry):
+    """Entrada usada por el "servidor" para evaluar filtros sin pasar por el _decode medido."""
+
+    __slots__ = ()
+
+    def all(self, attr: str) -> List[str]:
+        name = self._resolve(attr)
+        return [value.decode("utf-8", "replace") for value in self._raw[name]] if name else []
+
+
+@lru_cache(maxsize=256)
+def _compiled_filter(filter_str: str) -> tuple:
+    return parse_filter(filter_str)
+
+
+class OperationStats:
+    """Contadores de operaciones y bytes servidos por las conexiones falsas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations: Counter = Counter()
+        self.entries_sent = 0
+        self.bytes_sent = 0
+        self.restarts = 0
+
+    def simulate_restart(self):
+        """Simula un reinicio del servidor: las conexiones abiertas hasta ahora quedan caídas."""
+        with self._lock:
+            self.restarts += 1
+
+    def record(self, operation: str):
+        with self._lock:
+            self.operations[operation] += 1
+
+    def sent(self, entries: List[Entry]):
+        with self._lock:
+            self.entries_sent += len(entries)
+            self.bytes_sent += sum(len(value) for _, attrs in entries
+                                   for values in attrs.values() for value in values)
+
+    @property
+    def total_operations(self) -> int:
+        return sum(self.operations.values())
+
+    @property
+    def searches(self) -> int:
+        return self.operations["search"]
+
+
+class FakeLDAPConnection:
+    """
+    Conexión python-ldap falsa sobre un SyntheticDirectory.
+
+    La latencia se aplica por mensaje: una respuesta está disponible `latency`
+    segundos después de enviar la petición, así que las búsquedas en paralelo
+    (search_many) se solapan igual que contra un servidor real. Tras
+    OperationStats.simulate_restart() sus operaciones fallan con SERVER_DOWN.
+    """
+
+    def __init__(self, directory: SyntheticDirectory, stats: OperationStats, latency: float = 0.0):
+        self.directory = directory
+        self.stats = stats
+        self.latency = latency
+        self.bind_dn = ""
+        self._generation = stats.restarts
+        self._messages: Dict[int, dict] = {}
+        self._next_msgid = 1
+
+    # ------------------------------------------------------------------
+    # Operaciones síncronas
+    # ------------------------------------------------------------------
+
+    def set_option(self, option, value):
+        pass
+
+    def get_option(self, option):
+        return None
+
+    def simple_bind_s(self, who: str = "", cred: str = ""):
+        self._sync("bind")
+        self.bind_dn = who or ""
+        return (ldap.RES_BIND, [], 0, [])
+
+    def whoami_s(self) -> str:
+        self._sync("whoami")
+        return f"dn:{self.bind_dn}" if self.bind_dn else ""
+
+    def start_tls_s(self):
+        self._sync("starttls")
+
+    def modify_s(self, dn: str, modlist):
+        self._sync("modify")
+        return (ldap.RES_MODIFY, [], 0, [])
+
+    def search_s(self, base: str, scope: int, filterstr: str = "(objectClass=*)", attrlist=None,
+                 attrsonly: int = 0):
+        self._sync("search")
+        entries = self._select(base, scope, filterstr, attrlist)
+        self.stats.sent(entries)
+        return entries
+
+    def unbind_s(self):
+        self.stats.record("unbind")
+
+    def unbind_ext_s(self, *args, **kwargs):
+        self.unbind_s()
+
+    # ------------------------------------------------------------------
+    # Operaciones asíncronas
+    # ------------------------------------------------------------------
+
+    def search_ext(self, base: str, scope: int, filterstr: str = "(objectClass=*)", attrlist=None,
+                   attrsonly: int = 0, serverctrls=None, clientctrls=None, timeout: float = -1,
+                   sizelimit: int = 0) -> int:
+        self._check_alive()
+        self.stats.record("search")
+        entries = self._select(base, scope, filterstr, attrlist)
+
+        truncated = False
+        response_controls = []
+        paged = next((c for c in serverctrls or []
+                      if c.controlType == SimplePagedResultsControl.controlType), None)
+        if paged is not None:
+            offset = int(paged.cookie or b"0")
+            end = offset + paged.size
+            cookie = str(end).encode() if paged.size and end < len(entries) else b""
+            entries = entries[offset:end] if paged.size else []
+            response_controls.append(SimplePagedResultsControl(True, size=paged.size, cookie=cookie))
+        elif sizelimit and len(entries) > sizelimit:
+            entries, truncated = entries[:sizelimit], True
+
+        msgid = self._next_msgid
+        self._next_msgid += 1
+        self._messages[msgid] = {
+            "entries": entries,
+            "truncated": truncated,
+            "controls": response_controls,
+            "ready_at": time.perf_counter() + self.latency
+        }
+        return msgid
+
+    def result3(self, msgid: int = ldap.RES_ANY, all: int = 1, timeout: float = None):
+        self._check_alive()
+        if msgid == ldap.RES_ANY:
+            msgid = next(iter(self._messages))
+        message = self._messages[msgid]
+
+        delay = message["ready_at"] - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        entries = message["entries"]
+        if all or not entries:
+            del self._messages[msgid]
+            self.stats.sent(entries)
+            if message["truncated"]:
+                raise ldap.SIZELIMIT_EXCEEDED({"desc": "Size limit exceeded"})
+            return (ldap.RES_SEARCH_RESULT, entries if all else [], msgid, message["controls"])
+
+        entry = entries.pop(0)
+        self.stats.sent([entry])
+        return (ldap.RES_SEARCH_ENTRY, [entry], msgid, [])
+
+    def abandon_ext(self, msgid: int, *args, **kwargs):
+        self.stats.record("abandon")
+        self._messages.pop(msgid, None)
+
+    def abandon(self, msgid: int):
+        self.abandon_ext(msgid)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _check_alive(self):
+        if self._generation != self.stats.restarts:
+            raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+
+    def _sync(self, operation: str):
+        self._check_alive()
+        self.stats.record(operation)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _select(self, base: str, scope: int, filterstr: str, attrlist) -> List[Entry]:
+        node = _compiled_filter(filterstr or "(objectClass=*)")
+        return [
+            (dn, _project(attrs, attrlist))
+            for dn, attrs in self.directory.scan(base, scope)
+            if match_filter(node, _ServerEntry(dn, attrs))
+        ]
+
+
+def _project(attrs: Dict[str, List[bytes]], attrlist) -> Dict[str, List[bytes]]:
+    """Aplica la proyección de atributos de la petición."""
+    if not attrlist or "*" in attrlist or "+" in attrlist:
+        return attrs
+    wanted = {attr.lower() for attr in attrlist}
+    return {name: values for name, values in attrs.items() if name.lower() in wanted}
+
+
+@contextmanager
+def synthetic_server(directory: SyntheticDirectory, latency: float = 0.0,
+                     stats: Optional[OperationStats] = None) -> Iterator[OperationStats]:
+    """
+    Redirige ldap.initialize() a conexiones falsas sobre `directory`.
+
+    Args:
+        directory (SyntheticDirectory): Directorio a servir
+        latency (float, optional): Latencia por operación en segundos
+        stats (OperationStats, optional): Contadores a usar (se crean si no se pasan)
+
+    Yields:
+        OperationStats: Contadores compartidos por todas las conexiones abiertas
+    """
+    stats = stats or OperationStats()
+
+    def initialize(uri, *args, **kwargs):
+        stats.record("connect")
+        return FakeLDAPConnection(directory, stats, latency)
+
+    with patch("ldap.initialize", side_effect=initialize):
+        yield stats
@@ -0,0 +1,23 @@
+"""
+Fixtures compartidas de los tests unitarios.
+"""
+
+import pytest
+from benchmarks.synthetic_ldap import SyntheticDirectory, synthetic_server
+from agentesai.tools_base.ldap_pool import close_all_pools
+
+
+@pytest.fixture
+def servidor(request):
+    """
+    Servidor sintético con pools limpios antes y después.
+
+    El tamaño del directorio (usuarios, grupos) es por defecto (20, 2) y se cambia
+    con parametrización indirecta:
+        @pytest.mark.parametrize("servidor", [(120, 6)], indirect=True)
+    """
+    usuarios, grupos = getattr(request, "param", (20, 2))
+    close_all_pools()
+    with synthetic_server(SyntheticDirectory(users=usuarios, groups=grupos)) as stats:
+        yield stats
+    close_all_pools()
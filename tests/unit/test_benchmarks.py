@@ -0,0 +1,84 @@
+"""
+Tests unitarios para el backend sintético de benchmarks y guardas de regresión.
+"""
+
+import pytest
+from benchmarks.synthetic_ldap import SyntheticDirectory, synthetic_server
+from benchmarks.run import run_scenario
+from benchmarks.load import GENERATED_LABEL, build_schedule, parse_mix, percentile, run_load
+from agentesai.tools_base.ldap_connector import LDAPConnector
+
+
+class TestSyntheticDirectory:
+    """Tests unitarios para el directorio sintético."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_generacion_determinista(self):
+        """Test: la misma semilla genera el mismo árbol."""
+        a = SyntheticDirectory(users=50, groups=5, density=0.3)
+        b = SyntheticDirectory(users=50, groups=5, density=0.3)
+
+        assert a.entries == b.entries
+        assert len(a.entries) == 3 + 50 + 5
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_conector_sobre_servidor_sintetico(self):
+        """Test: LDAPConnector pagina y respeta size_limit contra la conexión falsa."""
+        directory = SyntheticDirectory(users=30, groups=3)
+
+        with synthetic_server(directory) as stats:
+            with LDAPConnector(use_pool=False, use_cache=False) as conn:
+                usuarios = list(conn.iter_search("ou=users,dc=meli,dc=com", "(objectClass=inetOrgPerson)",
+                                                 attributes=["uid"], page_size=10))
+                limitados = conn.search("ou=users,dc=meli,dc=com", "(uid=*)", size_limit=5)
+
+        assert len(usuarios) == 30
+        assert len(limitados) == 5
+        assert stats.searches == 3 + 1
+
+
+class TestBenchmarkRegressions:
+    """Guardas de regresión: el número de búsquedas no debe crecer con el directorio."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    @pytest.mark.parametrize("tool", ["list_all_users", "get_ldap_structure"])
+    def test_busquedas_no_escalan_con_usuarios(self, tool):
+        """Test: sin patrones N+1, 20x más usuarios no multiplica las búsquedas."""
+        pequeno = run_scenario(tool, SyntheticDirectory(users=20, groups=5))
+        grande = run_scenario(tool, SyntheticDirectory(users=400, groups=5))
+
+        assert grande["searches"] == pequeno["searches"]
+        assert grande["bytes_decoded"] <= grande["bytes_sent"]
+
+
+class TestLoadGenerator:
+    """Tests del generador de carga multi-cliente."""
+
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_mezcla_y_percentiles(self):
+        """Test: la secuencia es reproducible, respeta la mezcla y los percentiles son por rango."""
+        schedule = build_schedule(50, parse_mix("base=1,generated=0"), seed=7)
+
+        assert schedule == build_schedule(50, parse_mix("base=1,generated=0"), seed=7)
+        assert not any("sede" in consulta or "oficina" in consulta for consulta in schedule)
+        assert percentile([0.3, 0.1, 0.2, 0.4], 50) == 0.2
+        assert percentile([0.3, 0.1, 0.2, 0.4], 99) == 0.4
+        with pytest.raises(ValueError):
+            parse_mix("desconocida=1")
+
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_carga_concurrente_sobre_sistema_compartido(self):
+        """Test: varios hilos sobre un mismo SistemaAgentes completan todas las consultas sin errores."""
+        informe = run_load(clients=4, requests=30, users=30, groups=4)
+
+        assert informe["completed"] == 30
+        assert informe["error_rate"] == 0
+        assert sum(tool["count"] for tool in informe["tools"].values()) == 30
+        assert informe["gemini_requests"] == informe["tools"].get(GENERATED_LABEL, {}).get("count", 0) > 0
+        assert 0 < informe["ldap_connections"] <= informe["ldap_binds"]
+        assert informe["latency_ms"]["p50_ms"] <= informe["latency_ms"]["p99_ms"]
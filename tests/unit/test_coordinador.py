@@ -2,9 +2,12 @@
 Tests unitarios para el agente coordinador.
 """
 
+import threading
 import pytest
 from unittest.mock import Mock, patch
-from agentesai.agent.coordinador import AgenteCoordinador
+from agentesai.agent.coordinador import AgenteCoordinador, INTENCIONES, normalizar_consulta
+from agentesai.agent.intent_matcher import IntentMatcher
+from agentesai.agent.semantic_router import DEFAULT_SEMANTIC_THRESHOLD, SemanticRouter, literals
 
 
 class TestAgenteCoordinador:
@@ -193,4 +196,251 @@ class TestAgenteCoordinador:
         
         # Verificar estadísticas
         estadisticas = coordinador.obtener_estadisticas()
-        assert estadisticas["consultas_procesadas"] == len(consultas) 
\ No newline at end of file
+        assert estadisticas["consultas_procesadas"] == len(consultas) 
+
+
+class TestCacheDecisiones:
+    """Tests de la caché de decisiones de enrutamiento."""
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_normalizar_consulta(self):
+        """Test: acentos, mayúsculas, puntuación y espacios se normalizan."""
+        assert normalizar_consulta("¿Quién   SOY?") == "quien soy"
+        assert normalizar_consulta("  ﬁltrar\tusuarios...") == "filtrar usuarios"
+        assert normalizar_consulta("NSE ldap-search, -v") == "nse ldap-search v"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_guion_de_scripts_nse_es_significativo(self):
+        """Test: "ldap rootdse" / "ldap search" no lanzan el escaneo nmap; "ldap-rootdse" sí."""
+        coordinador = AgenteCoordinador()
+        
+        assert coordinador.analizar_consulta("analiza el ldap rootdse")["herramienta"] == "tool_rootdse_info"
+        for consulta in ["ldap search de usuarios activos", "haz un ldap search de la sede 3"]:
+            assert coordinador.analizar_consulta(consulta).get("herramienta") != "tool_ldap_nmap_nse"
+        assert coordinador.analizar_consulta("nmap ldap-search 10.0.0.1")["herramienta"] == "tool_ldap_nmap_nse"
+        assert coordinador.analizar_consulta("LDAP-RootDSE")["herramienta"] == "tool_ldap_nmap_nse"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_consultas_equivalentes_comparten_decision(self):
+        """Test: variantes de la misma consulta reutilizan la decisión cacheada."""
+        coordinador = AgenteCoordinador()
+        
+        primera = coordinador.analizar_consulta("¿Quién soy?")
+        segunda = coordinador.analizar_consulta("quien   soy")
+        
+        assert primera["herramienta"] == segunda["herramienta"] == "get_current_user_info"
+        assert segunda["consulta"] == "quien   soy"
+        cache = coordinador.obtener_estadisticas()["cache_decisiones"]
+        assert (cache["hits"], cache["misses"], cache["entradas"]) == (1, 1, 1)
+        assert cache["hit_rate"] == 0.5
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_expulsion_lru(self):
+        """Test: al llenarse se expulsa la decisión usada hace más tiempo."""
+        coordinador = AgenteCoordinador(max_decisiones=2)
+        
+        coordinador.analizar_consulta("quién soy")
+        coordinador.analizar_consulta("listar usuarios")
+        coordinador.analizar_consulta("quién soy")
+        coordinador.analizar_consulta("estructura ldap")
+        coordinador.analizar_consulta("quién soy")
+        coordinador.analizar_consulta("listar usuarios")
+        
+        cache = coordinador.obtener_estadisticas()["cache_decisiones"]
+        assert (cache["hits"], cache["misses"], cache["evictions"]) == (2, 4, 2)
+        assert cache["entradas"] == 2
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_registrar_herramienta_invalida(self):
+        """Test: registrar una herramienta vacía la caché."""
+        coordinador = AgenteCoordinador()
+        coordinador.analizar_consulta("quién soy")
+        
+        coordinador.registrar_herramienta("get_nueva")
+        coordinador.analizar_consulta("quién soy")
+        
+        cache = coordinador.obtener_estadisticas()["cache_decisiones"]
+        assert (cache["hits"], cache["misses"], cache["invalidations"]) == (0, 2, 1)
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_cache_desactivada(self):
+        """Test: con tamaño 0 no se guardan decisiones."""
+        coordinador = AgenteCoordinador(max_decisiones=0)
+        
+        coordinador.analizar_consulta("quién soy")
+        resultado = coordinador.analizar_consulta("quién soy")
+        
+        assert resultado["herramienta"] == "get_current_user_info"
+        assert coordinador.obtener_estadisticas()["cache_decisiones"]["entradas"] == 0
+
+
+class TestIntentMatcher:
+    """Tests unitarios para el matcher de intenciones compilado."""
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_prioridad_explicita(self):
+        """Test: con patrones de varias herramientas gana la de menor prioridad."""
+        matcher = IntentMatcher(INTENCIONES)
+        
+        assert matcher.match("listar usuarios y decime quién soy") == "get_current_user_info"
+        assert matcher.match("escalacion privilegios de un usuario low priv") == "tool_acl_diff"
+        assert matcher.match("consulta desconocida") is None
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_patron_mas_largo_prevalece(self):
+        """Test: un patrón contenido en otro más largo no decide el enrutamiento."""
+        matcher = IntentMatcher(INTENCIONES)
+        
+        assert matcher.match("list users groups") == "tool_anonymous_enum"
+        assert matcher.match("ejecutar ldap-rootdse") == "tool_ldap_nmap_nse"
+        assert matcher.match("list users") == "list_all_users"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_apariciones_solapadas(self):
+        """Test: find_all devuelve todas las apariciones, incluso solapadas."""
+        matcher = IntentMatcher([("a", 1, ["he", "she", "hers"]), ("b", 2, ["his"])])
+        
+        apariciones = sorted((inicio, fin, tool) for inicio, fin, _, tool in matcher.find_all("ushers his"))
+        
+        assert apariciones == [(1, 4, "a"), (2, 4, "a"), (2, 6, "a"), (7, 10, "b")]
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_patron_duplicado(self):
+        """Test: un mismo patrón no puede enrutar a dos herramientas."""
+        with pytest.raises(ValueError):
+            IntentMatcher([("a", 1, ["reset"]), ("b", 2, ["RESET"])])
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_catalogo_grande(self):
+        """Test: un catálogo de cientos de herramientas se compila y enruta correctamente."""
+        reglas = list(INTENCIONES) + [(f"tool_{i}", 1000 + i, [f"consulta especial {i};"]) for i in range(500)]
+        matcher = IntentMatcher(reglas)
+        
+        assert matcher.match("necesito la consulta especial 417; ahora") == "tool_417"
+        assert matcher.match("¿quién soy?") == "get_current_user_info"
+
+
+class TestSemanticRouter:
+    """Tests del enrutamiento semántico de consultas sin patrones."""
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_parafrasis_de_herramienta_existente(self):
+        """Test: una paráfrasis sin patrones se ejecuta con la herramienta más parecida."""
+        coordinador = AgenteCoordinador()
+        
+        resultado = coordinador.analizar_consulta("show me every account")
+        
+        assert resultado["accion"] == "ejecutar"
+        assert resultado["herramienta"] == "list_all_users"
+        assert resultado["similitud"] >= coordinador.router.threshold
+        assert coordinador.obtener_estadisticas()["enrutamiento_semantico"]["enrutadas"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_consultas_nuevas_se_generan(self):
+        """Test: las consultas sin herramienta parecida siguen yendo al generador."""
+        coordinador = AgenteCoordinador()
+        
+        for consulta in ["¿cuántos grupos hay?", "usuarios sin departamento", "what is the capital of france"]:
+            assert coordinador.analizar_consulta(consulta)["accion"] == "generar"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_parecidas_de_otro_objeto_o_alcance_se_generan(self):
+        """Test: un texto parecido sobre otro objeto, otro alcance o una herramienta ofensiva no se reutiliza."""
+        coordinador = AgenteCoordinador()
+        
+        for consulta in ["todos los grupos", "list groups", "show me every group", "who is the admin",
+                         "enumerate anonymously", "scan ldap ports", "check tls", "grupos vacíos"]:
+            decision = coordinador.analizar_consulta(consulta)
+            assert decision["accion"] == "generar", (consulta, decision.get("herramienta"))
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_herramientas_ofensivas_fuera_del_enrutador(self):
+        """Test: las herramientas ofensivas solo se eligen por sus patrones, nunca por similitud."""
+        from agentesai.manifest import AGENT_OFFENSIVE, get_manifest_registry
+        
+        coordinador = AgenteCoordinador(umbral_semantico=0.0)
+        ofensivas = set(get_manifest_registry().by_agent(AGENT_OFFENSIVE))
+        
+        for consulta in ["anonymous enumeration of the directory", "nmap scan of the ldap server"]:
+            assert not ofensivas & {tool for tool, _ in coordinador.router.nearest(normalizar_consulta(consulta), k=20)}
+        assert coordinador.analizar_consulta("anonymous enum")["herramienta"] == "tool_anonymous_enum"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_literales_de_objeto_y_alcance(self):
+        """Test: el tipo de objeto y la cuenta propia deben coincidir, también los heredados de la descripción."""
+        router = SemanticRouter(threshold=0.1, margin=0.0)
+        router.add("usuarios", ["todos los usuarios"])
+        router.add("mis_grupos", ["what groups"], literals("groups i belong to"))
+        
+        assert router.route("todos los usuarios ahora")[0] == "usuarios"
+        assert router.route("todos los grupos") is None
+        assert router.route("list groups") is None
+        assert router.route("what groups am i in")[0] == "mis_grupos"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_consulta_de_herramienta_generada(self):
+        """Test: una herramienta generada atiende las paráfrasis de su consulta, no las de otros números."""
+        coordinador = AgenteCoordinador()
+        coordinador.registrar_herramienta("get_impresoras_abc", "¿Qué impresoras hay en la oficina 3?")
+        
+        assert coordinador.analizar_consulta("que impresoras hay en oficina 3")["herramienta"] == "get_impresoras_abc"
+        assert coordinador.analizar_consulta("¿qué impresoras hay en la oficina 4?")["accion"] == "generar"
+        
+        coordinador.reset_herramientas()
+        assert coordinador.analizar_consulta("que impresoras hay en oficina 3")["accion"] == "generar"
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_umbral_mal_configurado(self):
+        """Test: un AGENTESAI_SEMANTIC_THRESHOLD inválido usa el umbral por defecto."""
+        with patch.dict('os.environ', {"AGENTESAI_SEMANTIC_THRESHOLD": "alto"}):
+            coordinador = AgenteCoordinador()
+        
+        assert coordinador.router.threshold == DEFAULT_SEMANTIC_THRESHOLD
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_contador_semantico_entre_hilos(self):
+        """Test: las consultas enrutadas por similitud se cuentan todas con varios hilos."""
+        coordinador = AgenteCoordinador(max_decisiones=0)
+        
+        def consultar():
+            for _ in range(50):
+                coordinador.analizar_consulta("show me every account")
+        
+        hilos = [threading.Thread(target=consultar) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        assert coordinador.obtener_estadisticas()["enrutamiento_semantico"]["enrutadas"] == 200
+    
+    @pytest.mark.unit
+    @pytest.mark.agent
+    def test_margen_entre_herramientas(self):
+        """Test: si dos herramientas se parecen casi igual la consulta se considera nueva."""
+        router = SemanticRouter(threshold=0.1, margin=0.1)
+        router.add("a", ["usuarios activos"])
+        router.add("b", ["usuarios activas"])
+        
+        assert [tool for tool, _ in router.nearest("usuarios activos", k=2)] == ["a", "b"]
+        assert router.route("usuarios activ") is None
+        assert SemanticRouter(threshold=1).route("usuarios activos") is None
@@ -0,0 +1,138 @@
+"""
+Tests unitarios para la caché de resultados LDAP.
+"""
+
+import pytest
+from unittest.mock import Mock
+import ldap
+from agentesai.tools_base.ldap_cache import LDAPResultCache, make_key, normalize_filter
+from agentesai.tools_base.ldap_connector import LDAPConnector
+
+
+def _key(base="ou=users,dc=meli,dc=com", filtro="(uid=*)", bind_dn="cn=admin,dc=meli,dc=com"):
+    """Clave de caché de prueba."""
+    return make_key("ldap://cache-test:389", bind_dn, base, "subtree", filtro, ["uid"])
+
+
+class TestLDAPResultCache:
+    """Tests unitarios para LDAPResultCache."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_hit_y_miss(self):
+        """Test: un resultado guardado se sirve y se contabilizan aciertos y fallos."""
+        cache = LDAPResultCache(max_entries=4)
+
+        assert cache.get(_key()) is None
+        cache.put(_key(), [{"dn": "uid=a,ou=users,dc=meli,dc=com", "uid": "a"}])
+        resultado = cache.get(_key())
+
+        assert resultado == [{"dn": "uid=a,ou=users,dc=meli,dc=com", "uid": "a"}]
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_resultado_devuelto_es_copia(self):
+        """Test: modificar el resultado devuelto no altera la caché."""
+        cache = LDAPResultCache()
+        cache.put(_key(), [{"uid": "a"}])
+
+        cache.get(_key())[0]["uid"] = "modificado"
+
+        assert cache.get(_key()) == [{"uid": "a"}]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_expulsion_lru(self):
+        """Test: al superar max_entries se expulsa la entrada menos usada."""
+        cache = LDAPResultCache(max_entries=2)
+        cache.put(_key(filtro="(uid=a)"), [])
+        cache.put(_key(filtro="(uid=b)"), [])
+        cache.get(_key(filtro="(uid=a)"))
+        cache.put(_key(filtro="(uid=c)"), [])
+
+        assert cache.get(_key(filtro="(uid=b)")) is None
+        assert cache.get(_key(filtro="(uid=a)")) == []
+        assert cache.get_stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_expiracion_ttl(self):
+        """Test: una entrada expirada cuenta como fallo y se descarta."""
+        cache = LDAPResultCache(ttl=0)
+        cache.put(_key(), [{"uid": "a"}])
+
+        assert cache.get(_key()) is None
+        assert cache.get_stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_invalidacion_de_subarbol(self):
+        """Test: una escritura invalida las búsquedas cuya base contiene al DN escrito."""
+        cache = LDAPResultCache()
+        cache.put(_key(base="ou=users,dc=meli,dc=com"), [])
+        cache.put(_key(base="dc=meli,dc=com"), [])
+        cache.put(_key(base="ou=groups,dc=meli,dc=com"), [])
+        cache.put(_key(base="ou=users,dc=meli,dc=com", bind_dn=""), [])
+
+        descartadas = cache.invalidate_subtree("uid=john,ou=users,dc=meli,dc=com")
+
+        assert descartadas == 3
+        assert cache.get(_key(base="ou=groups,dc=meli,dc=com")) == []
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_clave_separa_identidades_y_normaliza_filtro(self):
+        """Test: la clave distingue el bind y normaliza el filtro."""
+        assert _key(bind_dn="") != _key(bind_dn="cn=admin,dc=meli,dc=com")
+        assert _key(filtro="( UID=john )") == _key(filtro="(uid=john)")
+        assert normalize_filter("(& (objectClass=person) (cn=John) )") == "(&(objectclass=person)(cn=John))"
+
+
+class TestLDAPConnectorCache:
+    """Tests de integración entre LDAPConnector y la caché."""
+
+    @pytest.fixture
+    def connector(self):
+        """Conector conectado con una caché propia y una conexión mock."""
+        connector = LDAPConnector(server_url="ldap://cache-test:389", use_pool=False, use_cache=False)
+        connector.cache = LDAPResultCache()
+        connector.connection = Mock()
+        connector.is_connected = True
+        connector.connection.result3.side_effect = lambda *args, **kwargs: (ldap.RES_SEARCH_RESULT, [], 1, [])
+        return connector
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_repetida_no_va_al_servidor(self, connector):
+        """Test: la segunda búsqueda idéntica se sirve desde la caché."""
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)", attributes=["uid"])
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)", attributes=["uid"])
+
+        assert connector.connection.search_ext.call_count == 1
+        assert connector.cache.get_stats()["hits"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_identidades_no_comparten_resultados(self, connector):
+        """Test: un bind distinto no reutiliza resultados de otra identidad."""
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)")
+        connector.bind_dn = ""
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)")
+
+        assert connector.connection.search_ext.call_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_modify_invalida_subarbol(self, connector):
+        """Test: modify() descarta los resultados cacheados bajo el DN modificado."""
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)")
+
+        assert connector.modify("uid=john,ou=users,dc=meli,dc=com", [(2, "userPassword", [b"x"])]) is True
+        connector.search("ou=users,dc=meli,dc=com", "(uid=*)")
+
+        connector.connection.modify_s.assert_called_once()
+        assert connector.connection.search_ext.call_count == 2
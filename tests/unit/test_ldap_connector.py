@@ -4,7 +4,19 @@ Tests unitarios para el conector LDAP real.
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from agentesai.tools_base.ldap_connector import LDAPConnector
+import ldap
+from ldap.controls import SimplePagedResultsControl
+from agentesai.tools_base.ldap_connector import LDAPConnector, NO_ATTRS, SCOPE_BASE, _open_connection
+from agentesai.tools_base.ldap_entry import LDAPEntry
+
+
+@pytest.fixture
+def connected_connector():
+    """Conector marcado como conectado con una conexión mock (sin pool ni caché)."""
+    connector = LDAPConnector(use_pool=False, use_cache=False)
+    connector.connection = Mock()
+    connector.is_connected = True
+    return connector
 
 
 class TestLDAPConnector:
@@ -282,6 +294,345 @@ class TestLDAPConnector:
         assert ldap_connector._get_user_department([]) == "Unknown"
 
 
+class TestLDAPConnectorPagedSearch:
+    """Tests unitarios para la búsqueda paginada (iter_search)."""
+    
+    @staticmethod
+    def _page(entries, cookie):
+        """Construye la respuesta de result3 para una página."""
+        control = SimplePagedResultsControl(True, size=0, cookie=cookie)
+        return (101, entries, 1, [control])
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_iter_search_recorre_todas_las_paginas(self, connected_connector):
+        """Test: iter_search sigue la cookie hasta la última página."""
+        connection = connected_connector.connection
+        connection.result3.side_effect = [
+            self._page([("cn=a,dc=meli,dc=com", {"cn": [b"a"]})], b"page2"),
+            self._page([("cn=b,dc=meli,dc=com", {"cn": [b"b"]}), (None, ["ldap://ref"])], b"")
+        ]
+        
+        result = list(connected_connector.iter_search("dc=meli,dc=com", "(cn=*)", page_size=1))
+        
+        assert [entry["cn"] for entry in result] == ["a", "b"]
+        assert connection.search_ext.call_count == 2
+        segundo_control = connection.search_ext.call_args_list[1].kwargs["serverctrls"][0]
+        assert segundo_control.cookie == b"page2"
+        assert segundo_control.size == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_iter_search_es_perezoso_y_cancela_paginacion(self, connected_connector):
+        """Test: al dejar de iterar no se piden más páginas y se libera la búsqueda."""
+        connection = connected_connector.connection
+        connection.result3.side_effect = [
+            self._page([("cn=a,dc=meli,dc=com", {"cn": [b"a"]}),
+                        ("cn=b,dc=meli,dc=com", {"cn": [b"b"]})], b"page2"),
+            self._page([], b"")
+        ]
+        
+        resultados = connected_connector.iter_search("dc=meli,dc=com", "(cn=*)", page_size=2)
+        primero = next(resultados)
+        resultados.close()
+        
+        assert primero["cn"] == "a"
+        assert connection.search_ext.call_count == 2
+        control_cancelacion = connection.search_ext.call_args_list[1].kwargs["serverctrls"][0]
+        assert control_cancelacion.size == 0
+        assert control_cancelacion.cookie == b"page2"
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_iter_search_sin_conexion(self):
+        """Test: sin conexión iter_search no produce resultados."""
+        connector = LDAPConnector(use_pool=False, use_cache=False)
+        
+        assert list(connector.iter_search("dc=meli,dc=com", "(cn=*)")) == []
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_list_all_users_consume_iter_search(self, connected_connector):
+        """Test: list_all_users construye el listado a partir de iter_search."""
+        usuarios = [LDAPEntry("uid=john,ou=users,dc=meli,dc=com", {"uid": [b"john"], "mail": [b"john@meli.com"]})]
+        
+        with patch.object(connected_connector, "iter_search", side_effect=lambda *a, **k: iter(usuarios)) as mock_iter, \
+             patch('agentesai.tools_base.membership._indexes', {}):
+            result = connected_connector.list_all_users()
+        
+        bases = [llamada.args[:2] for llamada in mock_iter.call_args_list]
+        assert ("ou=users,dc=meli,dc=com", "(objectClass=inetOrgPerson)") in bases
+        assert result[0]["username"] == "john"
+        assert result[0]["email"] == "john@meli.com"
+
+
+class TestLDAPConnectorSearchOptions:
+    """Tests unitarios para alcance, proyección de atributos y límites de búsqueda."""
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_envia_alcance_atributos_y_limites(self, connected_connector):
+        """Test: search() pasa alcance, atributos y límites al servidor vía search_ext."""
+        connection = connected_connector.connection
+        connection.result3.side_effect = [
+            (ldap.RES_SEARCH_ENTRY, [("", {})], 1, []),
+            (ldap.RES_SEARCH_RESULT, [], 1, [])
+        ]
+        
+        result = connected_connector.search("", "(objectClass=*)", attributes=NO_ATTRS,
+                                            scope=SCOPE_BASE, size_limit=1, time_limit=5)
+        
+        connection.search_ext.assert_called_once_with(
+            "", ldap.SCOPE_BASE, "(objectClass=*)", ['1.1'], timeout=5, sizelimit=1
+        )
+        # La entrada del RootDSE tiene DN vacío y no debe descartarse
+        assert result == [{"dn": ""}]
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_devuelve_parciales_al_superar_sizelimit(self, connected_connector):
+        """Test: si el servidor corta por sizelimit se conservan las entradas recibidas."""
+        connection = connected_connector.connection
+        connection.result3.side_effect = [
+            (ldap.RES_SEARCH_ENTRY, [("uid=a,ou=users,dc=meli,dc=com", {"uid": [b"a"]})], 1, []),
+            (ldap.RES_SEARCH_ENTRY, [("uid=b,ou=users,dc=meli,dc=com", {"uid": [b"b"]})], 1, []),
+            ldap.SIZELIMIT_EXCEEDED({"desc": "Size limit exceeded"})
+        ]
+        
+        result = connected_connector.search("ou=users,dc=meli,dc=com", "(uid=*)", size_limit=2)
+        
+        assert [entry["uid"] for entry in result] == ["a", "b"]
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_alcance_invalido(self, connected_connector):
+        """Test: un alcance desconocido no lanza excepción y retorna lista vacía."""
+        result = connected_connector.search("dc=meli,dc=com", "(cn=*)", scope="children")
+        
+        assert result == []
+        connected_connector.connection.search_ext.assert_not_called()
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_iter_search_size_limit_reduce_pagina(self, connected_connector):
+        """Test: iter_search con size_limit no pide páginas mayores que el límite."""
+        connection = connected_connector.connection
+        control = SimplePagedResultsControl(True, size=0, cookie=b"")
+        connection.result3.return_value = (
+            101, [("cn=a,dc=meli,dc=com", {"cn": [b"a"]}), ("cn=b,dc=meli,dc=com", {"cn": [b"b"]})], 1, [control]
+        )
+        
+        result = list(connected_connector.iter_search("dc=meli,dc=com", "(cn=*)", size_limit=1))
+        
+        assert len(result) == 1
+        assert connection.search_ext.call_args.kwargs["serverctrls"][0].size == 1
+
+
+class TestLDAPConnectorSearchMany:
+    """Tests unitarios para las búsquedas en paralelo (search_many)."""
+    
+    @pytest.fixture
+    def connected_connector(self, connected_connector):
+        """Conector conectado cuya conexión responde por msgid."""
+        connector = connected_connector
+        
+        respuestas = {
+            1: [("uid=a,ou=users,dc=meli,dc=com", {"uid": [b"a"]})],
+            2: [("cn=devs,ou=groups,dc=meli,dc=com", {"cn": [b"devs"]})]
+        }
+        pendientes = {}
+        
+        def search_ext(*args, **kwargs):
+            msgid = len(pendientes) + 1
+            pendientes[msgid] = list(respuestas.get(msgid, []))
+            return msgid
+        
+        def result3(msgid, all=1, timeout=None):
+            if pendientes[msgid]:
+                return (ldap.RES_SEARCH_ENTRY, [pendientes[msgid].pop(0)], msgid, [])
+            return (ldap.RES_SEARCH_RESULT, [], msgid, [])
+        
+        connector.connection.search_ext.side_effect = search_ext
+        connector.connection.result3.side_effect = result3
+        return connector
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_many_envia_todo_antes_de_leer(self, connected_connector):
+        """Test: todas las búsquedas se envían antes de recoger la primera respuesta."""
+        connection = connected_connector.connection
+        
+        result = connected_connector.search_many({
+            "usuarios": {"base_dn": "ou=users,dc=meli,dc=com", "filter_str": "(uid=*)"},
+            "grupos": {"base_dn": "ou=groups,dc=meli,dc=com", "filter_str": "(cn=*)", "size_limit": 5}
+        })
+        
+        llamadas = [llamada[0] for llamada in connection.method_calls]
+        assert llamadas[:2] == ["search_ext", "search_ext"]
+        assert result["usuarios"][0]["uid"] == "a"
+        assert result["grupos"][0]["cn"] == "devs"
+        assert connection.search_ext.call_args_list[1].kwargs["sizelimit"] == 5
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_many_aisla_errores(self, connected_connector):
+        """Test: una búsqueda que falla no impide obtener las demás."""
+        result = connected_connector.search_many({
+            "usuarios": {"base_dn": "ou=users,dc=meli,dc=com", "filter_str": "(uid=*)"},
+            "invalida": {"base_dn": "dc=meli,dc=com", "filter_str": "(cn=*)", "scope": "children"}
+        })
+        
+        assert len(result["usuarios"]) == 1
+        assert result["invalida"] == []
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_search_many_sin_conexion(self):
+        """Test: sin conexión cada búsqueda devuelve lista vacía."""
+        connector = LDAPConnector(use_pool=False, use_cache=False)
+        
+        result = connector.search_many({"usuarios": {"base_dn": "dc=meli,dc=com", "filter_str": "(uid=*)"}})
+        
+        assert result == {"usuarios": []}
+
+
+class TestLDAPConnectorUsersInfo:
+    """Tests unitarios para la consulta de usuarios por lotes (get_users_info)."""
+    
+    @pytest.fixture
+    def connector(self):
+        """Conector cuyo search_many responde con las entradas de los uids pedidos."""
+        connector = LDAPConnector(use_pool=False, use_cache=False)
+        directorio = {
+            f"user{i}": LDAPEntry(f"cn=user{i},ou=users,dc=meli,dc=com", {
+                "uid": [f"user{i}".encode()], "displayName": [f"User {i}".encode()],
+                "uidNumber": [str(1000 + i).encode()]
+            })
+            for i in range(10)
+        }
+        
+        def search_many(requests):
+            return {
+                name: [directorio[uid] for uid in directorio if f"(uid={uid})" in request["filter_str"].lower()]
+                for name, request in requests.items()
+            }
+        
+        index = Mock()
+        index.department_for.side_effect = lambda dn: "Development" if "user1," in dn else "General"
+        connector.search_many = Mock(side_effect=search_many)
+        connector.get_membership_index = Mock(return_value=index)
+        return connector
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_lotes_y_un_solo_indice(self, connector):
+        """Test: los uids se agrupan en filtros OR y el índice se obtiene una vez."""
+        result = connector.get_users_info([f"user{i}" for i in range(10)], batch_size=4)
+        
+        requests = connector.search_many.call_args.args[0]
+        assert connector.search_many.call_count == 1
+        assert len(requests) == 3
+        assert requests["lote_0"]["filter_str"] == "(|(uid=user0)(uid=user1)(uid=user2)(uid=user3))"
+        connector.get_membership_index.assert_called_once()
+        
+        assert result["user1"]["department"] == "Development"
+        assert result["user7"]["uid_number"] == "1007"
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_faltantes_y_mayusculas(self, connector):
+        """Test: los usuarios inexistentes aparecen con None y se respeta el nombre pedido."""
+        result = connector.get_users_info(["USER2", "nadie", "USER2", ""])
+        
+        assert list(result) == ["USER2", "nadie"]
+        assert result["nadie"] is None
+        assert result["USER2"]["username"] == "user2"
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_escapa_filtro(self, connector):
+        """Test: los caracteres especiales de los nombres se escapan en el filtro."""
+        connector.get_users_info(["a*)(uid=*"])
+        
+        filtro = connector.search_many.call_args.args[0]["lote_0"]["filter_str"]
+        assert filtro == "(|(uid=a\\2a\\29\\28uid=\\2a))"
+
+
+class TestLDAPConnectorReconnect:
+    """Tests de keepalive, tiempos por operación y reconexión transparente."""
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    @pytest.mark.parametrize("servidor", [(30, 3)], indirect=True)
+    def test_busquedas_sobreviven_a_reinicio_del_servidor(self, servidor):
+        """Test: tras una caída las búsquedas se repiten sobre una conexión nueva."""
+        with LDAPConnector(use_cache=False) as conn:
+            assert len(conn.search("ou=users,dc=meli,dc=com", "(uid=*)", attributes=NO_ATTRS)) == 30
+            
+            servidor.simulate_restart()
+            assert len(conn.search("ou=users,dc=meli,dc=com", "(uid=*)", attributes=NO_ATTRS)) == 30
+            
+            servidor.simulate_restart()
+            assert len(list(conn.iter_search("ou=groups,dc=meli,dc=com", "(cn=*)", page_size=2))) == 3
+            
+            servidor.simulate_restart()
+            resultados = conn.search_many({
+                "usuarios": {"base_dn": "ou=users,dc=meli,dc=com", "filter_str": "(uid=*)"},
+                "grupos": {"base_dn": "ou=groups,dc=meli,dc=com", "filter_str": "(cn=*)"}
+            })
+            assert (len(resultados["usuarios"]), len(resultados["grupos"])) == (30, 3)
+            assert conn.ping()
+        
+        assert servidor.operations["connect"] == 4
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_timeout_con_servidor_vivo_no_reconecta(self):
+        """Test: si la respuesta no llega a tiempo pero el servidor responde, no se reconecta."""
+        connector = LDAPConnector(use_pool=False, use_cache=False)
+        connector.connection = Mock()
+        connector.is_connected = True
+        connector.connection.result3.side_effect = ldap.TIMEOUT("timeout")
+        
+        with patch.object(connector, "reconnect") as reconnect:
+            assert connector.search("dc=meli,dc=com", "(uid=*)") == []
+        
+        reconnect.assert_not_called()
+        connector.connection.abandon.assert_called_once()
+        assert connector.connection.result3.call_args.kwargs["timeout"] > 0
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_reconexion_fallida_con_backoff(self):
+        """Test: la reconexión se reintenta con espera creciente y acaba desconectando."""
+        connector = LDAPConnector(use_pool=False, use_cache=False)
+        connector.connection = Mock()
+        connector.is_connected = True
+        connector.connection.search_ext.side_effect = ldap.SERVER_DOWN("down")
+        
+        with patch('agentesai.tools_base.ldap_connector._open_connection', side_effect=ldap.SERVER_DOWN("down")), \
+             patch('agentesai.tools_base.ldap_connector.time.sleep') as sleep, \
+             patch.dict('os.environ', {"LDAP_RECONNECT_ATTEMPTS": "4"}):
+            assert connector.search("dc=meli,dc=com", "(uid=*)") == []
+        
+        assert [llamada.args[0] for llamada in sleep.call_args_list] == [0.2, 0.4, 0.8]
+        assert connector.is_connected is False
+    
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_opciones_por_conexion(self):
+        """Test: keepalive y tiempos se configuran en la conexión, no de forma global."""
+        with patch('agentesai.tools_base.ldap_connector.ldap') as mock_ldap:
+            conexion = mock_ldap.initialize.return_value
+            _open_connection("ldap://keepalive-test:389", "cn=admin,dc=meli,dc=com", "secreto")
+        
+        mock_ldap.set_option.assert_not_called()
+        opciones = {llamada.args[0]: llamada.args[1] for llamada in conexion.set_option.call_args_list}
+        assert opciones[mock_ldap.OPT_X_KEEPALIVE_IDLE] == 60
+        assert opciones[mock_ldap.OPT_NETWORK_TIMEOUT] == 5
+        assert opciones[mock_ldap.OPT_TIMEOUT] == 30
+
+
 class TestLDAPConnectorIntegration:
     """Tests de integración para el conector LDAP."""
     
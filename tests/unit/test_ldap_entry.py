@@ -0,0 +1,96 @@
+"""
+Tests unitarios para la entrada LDAP con decodificación perezosa.
+"""
+
+import pytest
+from agentesai.tools_base.ldap_entry import LDAPEntry
+
+
+def _entrada():
+    """Entrada de prueba con atributos mono y multivaluados y un valor binario."""
+    return LDAPEntry("uid=john,ou=users,dc=meli,dc=com", {
+        "uid": [b"john"],
+        "mail": [b"john@meli.com", b"j.doe@meli.com"],
+        "jpegPhoto": [b"\xff\xd8\xff\xe0"]
+    })
+
+
+class TestLDAPEntry:
+    """Tests unitarios para LDAPEntry."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_decodificacion_perezosa(self):
+        """Test: ningún valor se decodifica hasta que se accede al atributo."""
+        entrada = _entrada()
+        assert entrada._decoded is None
+
+        assert entrada.first("uid") == "john"
+        assert list(entrada._decoded) == ["uid"]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_valor_binario_se_conserva_en_bytes(self):
+        """Test: los valores que no son UTF-8 válido se devuelven como bytes."""
+        entrada = _entrada()
+
+        assert entrada.first("jpegPhoto") == b"\xff\xd8\xff\xe0"
+        assert entrada.raw("uid") == [b"john"]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_first_y_all_consistentes(self):
+        """Test: first() y all() se comportan igual con uno o varios valores."""
+        entrada = _entrada()
+
+        assert entrada.all("uid") == ["john"]
+        assert entrada.all("mail") == ["john@meli.com", "j.doe@meli.com"]
+        assert entrada.first("mail") == "john@meli.com"
+        assert entrada.all("title") == []
+        assert entrada.first("title", "N/A") == "N/A"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_all_devuelve_copia(self):
+        """Test: modificar la lista devuelta no altera la entrada."""
+        entrada = _entrada()
+        entrada.all("mail").append("otro@meli.com")
+
+        assert len(entrada.all("mail")) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_nombres_sin_distinguir_mayusculas(self):
+        """Test: los atributos se resuelven sin distinguir mayúsculas."""
+        entrada = _entrada()
+
+        assert entrada.first("UID") == "john"
+        assert entrada.first("jpegphoto") == b"\xff\xd8\xff\xe0"
+        assert "MAIL" in entrada
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_compatibilidad_con_formato_dict(self):
+        """Test: la entrada equivale al diccionario plano que devolvía search()."""
+        entrada = _entrada()
+        esperado = {
+            "dn": "uid=john,ou=users,dc=meli,dc=com",
+            "uid": "john",
+            "mail": ["john@meli.com", "j.doe@meli.com"],
+            "jpegPhoto": b"\xff\xd8\xff\xe0"
+        }
+
+        assert entrada.to_dict() == esperado
+        assert entrada == esperado
+        assert entrada["dn"] == esperado["dn"]
+        assert entrada.get("title", "N/A") == "N/A"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_nombres_internados(self):
+        """Test: los nombres de atributo se comparten entre entradas."""
+        nombre = "".join(["display", "Name"])
+        a = LDAPEntry("uid=a,dc=meli,dc=com", {nombre: [b"A"]})
+        b = LDAPEntry("uid=b,dc=meli,dc=com", {"".join(["display", "Name"]): [b"B"]})
+
+        assert next(iter(a._raw)) is next(iter(b._raw))
@@ -0,0 +1,111 @@
+"""
+Tests unitarios para el fan-out de búsquedas por unidad organizativa.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from agentesai.tools_base.ldap_connector import LDAPConnector
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.ldap_fanout import PARTITION_FILTER, iter_search_fanout, plan_partitions
+from agentesai.tools_base.ldap_snapshot import SnapshotConnector
+
+
+BASE_DN = "dc=meli,dc=com"
+
+
+class TestPlanPartitions:
+    """Tests del reparto de una búsqueda en particiones."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_particiones_disjuntas(self):
+        """Test: base, hijos que no son OU y un subárbol por OU."""
+        ldap_conn = Mock()
+        ldap_conn.search.return_value = [LDAPEntry(f"ou=users,{BASE_DN}", {}),
+                                         LDAPEntry(f"ou=groups,{BASE_DN}", {})]
+
+        particiones = plan_partitions(ldap_conn, BASE_DN, "uid=*")
+
+        assert [(p["base_dn"], p["scope"]) for p in particiones] == [
+            (BASE_DN, "base"), (BASE_DN, "onelevel"),
+            (f"ou=users,{BASE_DN}", "subtree"), (f"ou=groups,{BASE_DN}", "subtree")
+        ]
+        assert particiones[1]["filter_str"] == f"(&(uid=*)(!{PARTITION_FILTER}))"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_sin_ous_no_hay_particiones(self):
+        """Test: una base sin OUs hijas no se reparte."""
+        ldap_conn = Mock()
+        ldap_conn.search.return_value = []
+
+        assert plan_partitions(ldap_conn, BASE_DN, "(uid=*)") == []
+
+
+# Directorio de los tests que usan el servidor sintético
+DIRECTORIO = pytest.mark.parametrize("servidor", [(120, 6)], indirect=True)
+
+
+class TestIterSearchFanout:
+    """Tests del recorrido repartido entre conexiones."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    @DIRECTORIO
+    def test_mismas_entradas_que_iter_search(self, servidor):
+        """Test: el fan-out devuelve exactamente las entradas de la búsqueda subtree."""
+        with LDAPConnector(use_cache=False) as conn:
+            directas = [e.dn for e in conn.iter_search(BASE_DN, "(objectClass=*)", attributes=["1.1"])]
+            repartidas = [e.dn for e in iter_search_fanout(conn, BASE_DN, "(objectClass=*)",
+                                                           attributes=["1.1"], parallelism=3)]
+
+        assert len(repartidas) == len(directas) == 3 + 120 + 6
+        assert sorted(repartidas) == sorted(directas)
+        assert servidor.operations["connect"] > 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    @DIRECTORIO
+    def test_size_limit_total(self, servidor):
+        """Test: size_limit limita el total y las particiones pendientes se cancelan."""
+        with LDAPConnector(use_cache=False) as conn:
+            entradas = list(iter_search_fanout(conn, BASE_DN, "(objectClass=inetOrgPerson)",
+                                               attributes=["uid"], size_limit=7, parallelism=2))
+
+        assert len(entradas) == 7
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    @DIRECTORIO
+    def test_error_de_particion(self, servidor):
+        """Test: con raise_errors el fallo de una partición llega al consumidor."""
+        with LDAPConnector(use_cache=False) as conn, \
+                patch.object(LDAPConnector, "clone", side_effect=RuntimeError("sin conexiones")):
+            with pytest.raises(RuntimeError):
+                list(iter_search_fanout(conn, BASE_DN, "(uid=*)", raise_errors=True, parallelism=2))
+
+            assert list(iter_search_fanout(conn, BASE_DN, "(uid=*)", parallelism=2)) == []
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_otros_conectores_usan_iter_search(self):
+        """Test: un conector que no es LDAPConnector (p. ej. snapshot) no se reparte."""
+        ldap_conn = Mock()
+        ldap_conn.iter_search.side_effect = lambda *args, **kwargs: iter([LDAPEntry(BASE_DN, {})])
+
+        assert [e.dn for e in iter_search_fanout(ldap_conn, BASE_DN, "(objectClass=*)")] == [BASE_DN]
+        ldap_conn.search.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_snapshot_no_se_reparte(self, tmp_path):
+        """Test: un SnapshotConnector recorre su fichero y nunca abre conexiones al servidor."""
+        snapshot = SnapshotConnector(str(tmp_path / "no-existe.ldif"))
+        snapshot.is_connected = True
+        with patch.object(SnapshotConnector, "iter_search", return_value=iter([])) as iter_search, \
+                patch.object(LDAPConnector, "search") as search:
+            assert list(iter_search_fanout(snapshot, BASE_DN, "(uid=*)", parallelism=4)) == []
+
+        iter_search.assert_called_once()
+        search.assert_not_called()
+        assert isinstance(snapshot.clone(), SnapshotConnector)
@@ -0,0 +1,167 @@
+"""
+Tests unitarios para el pool de conexiones LDAP.
+"""
+
+import time
+import threading
+import ldap
+import pytest
+from unittest.mock import Mock, patch
+from agentesai.tools_base.ldap_pool import LDAPConnectionPool, is_alive
+from agentesai.tools_base.ldap_connector import LDAPConnector
+
+
+class TestLDAPConnectionPool:
+    """Tests unitarios para LDAPConnectionPool."""
+
+    @pytest.fixture
+    def factory(self):
+        """Factory que crea conexiones mock distintas en cada llamada."""
+        return Mock(side_effect=lambda: Mock())
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_checkout_reutiliza_conexion(self, factory):
+        """Test: una conexión devuelta se reutiliza en el siguiente checkout."""
+        pool = LDAPConnectionPool(factory, max_size=2)
+
+        conexion = pool.checkout()
+        pool.checkin(conexion)
+
+        assert pool.checkout() is conexion
+        assert factory.call_count == 1
+        assert pool.get_stats()["reused"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_checkout_descarta_conexion_muerta(self, factory):
+        """Test: una conexión que no pasa el liveness check se reemplaza."""
+        pool = LDAPConnectionPool(factory, max_size=2)
+
+        conexion = pool.checkout()
+        conexion.whoami_s.side_effect = Exception("server down")
+        pool.checkin(conexion)
+
+        nueva = pool.checkout()
+
+        assert nueva is not conexion
+        assert factory.call_count == 2
+        assert pool.get_stats()["discarded"] == 1
+        conexion.unbind_s.assert_called_once()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_conexion_reciente_no_se_verifica(self, factory):
+        """Test: dentro de liveness_interval la conexión se entrega sin WhoAmI salvo que se pida."""
+        pool = LDAPConnectionPool(factory, max_size=2, liveness_interval=60)
+
+        conexion = pool.checkout()
+        pool.checkin(conexion)
+        assert pool.checkout() is conexion
+        conexion.whoami_s.assert_not_called()
+
+        pool.checkin(conexion)
+        assert pool.checkout(verify=True) is conexion
+        conexion.whoami_s.assert_called_once()
+        assert pool.get_stats()["probes"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_liveness_lee_rootdse_sin_whoami(self, factory):
+        """Test: si el servidor no admite WhoAmI la verificación lee el RootDSE."""
+        conexion = Mock()
+        conexion.whoami_s.side_effect = ldap.UNWILLING_TO_PERFORM("no whoami")
+
+        assert is_alive(conexion) is True
+        conexion.search_s.assert_called_once_with("", ldap.SCOPE_BASE, "(objectClass=*)", ["1.1"])
+
+        conexion.whoami_s.side_effect = ldap.SERVER_DOWN("down")
+        with pytest.raises(ldap.SERVER_DOWN):
+            is_alive(conexion)
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_checkout_respeta_max_size(self, factory):
+        """Test: el pool no supera max_size y falla por timeout cuando está lleno."""
+        pool = LDAPConnectionPool(factory, max_size=1, checkout_timeout=0.05)
+
+        pool.checkout()
+
+        with pytest.raises(TimeoutError):
+            pool.checkout()
+        assert factory.call_count == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_checkout_espera_conexion_liberada(self, factory):
+        """Test: un checkout bloqueado recibe la conexión devuelta por otro hilo."""
+        pool = LDAPConnectionPool(factory, max_size=1, checkout_timeout=2)
+        conexion = pool.checkout()
+
+        temporizador = threading.Timer(0.05, pool.checkin, args=(conexion,))
+        temporizador.start()
+
+        assert pool.checkout() is conexion
+        temporizador.join()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_idle_eviction_respeta_min_size(self, factory):
+        """Test: las conexiones inactivas expiran pero se conserva min_size."""
+        pool = LDAPConnectionPool(factory, min_size=1, max_size=3, idle_timeout=0.01)
+
+        conexiones = [pool.checkout() for _ in range(3)]
+        for conexion in conexiones:
+            pool.checkin(conexion)
+        time.sleep(0.02)
+
+        pool.checkout()
+
+        stats = pool.get_stats()
+        assert stats["evicted"] == 2
+        assert stats["in_use"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_factory_fallida_libera_hueco(self):
+        """Test: un error de la factory no consume capacidad del pool."""
+        factory = Mock(side_effect=Exception("bind failed"))
+        pool = LDAPConnectionPool(factory, max_size=1)
+
+        with pytest.raises(Exception):
+            pool.checkout()
+
+        assert pool.size == 0
+
+
+class TestLDAPConnectorPool:
+    """Tests de integración entre LDAPConnector y el pool."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_connectors_comparten_conexion(self):
+        """Test: dos conectores consecutivos reutilizan la misma conexión autenticada."""
+        with patch('agentesai.tools_base.ldap_connector.ldap') as mock_ldap, \
+             patch('agentesai.tools_base.ldap_pool._pools', {}):
+            mock_ldap.initialize.return_value = Mock()
+
+            with LDAPConnector(server_url="ldap://pool-test:389") as primero:
+                conexion = primero.connection
+            with LDAPConnector(server_url="ldap://pool-test:389") as segundo:
+                assert segundo.connection is conexion
+
+            mock_ldap.initialize.assert_called_once_with("ldap://pool-test:389")
+            conexion.unbind_s.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_connector_sin_pool_cierra_conexion(self):
+        """Test: con use_pool=False disconnect() cierra la conexión."""
+        with patch('agentesai.tools_base.ldap_connector.ldap') as mock_ldap:
+            conexion = Mock()
+            mock_ldap.initialize.return_value = conexion
+
+            with LDAPConnector(use_pool=False):
+                pass
+
+            conexion.unbind_s.assert_called_once()
@@ -0,0 +1,157 @@
+"""
+Tests unitarios para el snapshot offline del directorio LDAP.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.ldap_connector import LDAPConnector
+from agentesai.tools_base.ldap_snapshot import (
+    SnapshotConnector,
+    create_connector,
+    dump_snapshot,
+    index_path,
+    match_filter,
+    parse_filter
+)
+
+
+ROOTDSE = LDAPEntry("", {"namingContexts": [b"dc=meli,dc=com"], "supportedLDAPVersion": [b"3"]})
+
+ENTRADAS = [
+    LDAPEntry("dc=meli,dc=com", {"objectClass": [b"top", b"organization"], "dc": [b"meli"]}),
+    LDAPEntry("ou=users,dc=meli,dc=com", {"objectClass": [b"organizationalUnit"], "ou": [b"users"]}),
+    LDAPEntry("ou=groups,dc=meli,dc=com", {"objectClass": [b"organizationalUnit"], "ou": [b"groups"]}),
+    LDAPEntry("cn=john,ou=users,dc=meli,dc=com", {
+        "objectClass": [b"inetOrgPerson"], "uid": [b"john"], "displayName": [b"John Doe"],
+        "mail": [b"john@meli.com"], "jpegPhoto": [b"\xff\xd8\xff\xe0"]}),
+    LDAPEntry("cn=jane,ou=users,dc=meli,dc=com", {
+        "objectClass": [b"inetOrgPerson"], "uid": [b"jane"], "displayName": [" Jane Núñez".encode()],
+        "mail": [b"jane@meli.com"]}),
+    LDAPEntry("cn=developers,ou=groups,dc=meli,dc=com", {
+        "objectClass": [b"groupOfNames"], "cn": [b"developers"],
+        "member": [b"cn=john,ou=users,dc=meli,dc=com", b"cn=jane,ou=users,dc=meli,dc=com"]}),
+    LDAPEntry("cn=managers,ou=groups,dc=meli,dc=com", {
+        "objectClass": [b"groupOfNames"], "cn": [b"managers"],
+        "member": [b"cn=jane,ou=users,dc=meli,dc=com"]})
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Snapshot generado a partir de un conector mock."""
+    ldap_conn = Mock(server_url="ldap://snapshot-test:389", base_dn="dc=meli,dc=com")
+    ldap_conn.search.return_value = [ROOTDSE]
+    ldap_conn.iter_search.side_effect = lambda *args, **kwargs: iter(ENTRADAS)
+
+    path = str(tmp_path / "directorio.ldif")
+    resumen = dump_snapshot(ldap_conn, path)
+    assert resumen["entries"] == len(ENTRADAS) + 1
+    return path
+
+
+@pytest.fixture
+def connector(snapshot_path):
+    """Conector abierto sobre el snapshot de prueba."""
+    with patch('agentesai.tools_base.membership._indexes', {}):
+        with SnapshotConnector(snapshot_path) as conn:
+            yield conn
+
+
+class TestSnapshotDump:
+    """Tests del volcado a LDIF + índice."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_volcado_genera_ldif_e_indice(self, snapshot_path, tmp_path):
+        """Test: se generan ambos ficheros y no quedan temporales."""
+        contenido = open(snapshot_path, "rb").read()
+
+        assert b"dn: cn=john,ou=users,dc=meli,dc=com\n" in contenido
+        assert b"jpegPhoto:: /9j/4A==\n" in contenido
+        assert b"displayName:: " in contenido  # No ASCII y espacio inicial van en base64
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["directorio.ldif", "directorio.ldif.idx"]
+        assert open(index_path(snapshot_path), "rb").read(8) == b"AGSNAP01"
+
+
+class TestSnapshotConnector:
+    """Tests de SnapshotConnector sobre un snapshot real en disco."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_valores_se_conservan(self, connector):
+        """Test: los valores binarios y no ASCII sobreviven al volcado."""
+        john = connector.connection.get("CN=John, OU=users, DC=meli, DC=com")
+
+        assert john.first("jpegPhoto") == b"\xff\xd8\xff\xe0"
+        assert connector.search("ou=users,dc=meli,dc=com", "(uid=jane)")[0].first("displayName") == " Jane Núñez"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_alcance_proyeccion_y_limite(self, connector):
+        """Test: search() respeta alcance, atributos solicitados y size_limit."""
+        ous = connector.search("dc=meli,dc=com", "(objectClass=*)", attributes=["ou"], scope="onelevel")
+        assert [entrada.dn for entrada in ous] == ["ou=users,dc=meli,dc=com", "ou=groups,dc=meli,dc=com"]
+        assert list(ous[0]) == ["dn", "ou"]
+
+        assert [e.dn for e in connector.search("", "(objectClass=*)", scope="base")] == [""]
+        assert len(connector.search("dc=meli,dc=com", "(objectClass=*)")) == len(ENTRADAS)
+        assert len(connector.search("dc=meli,dc=com", "(objectClass=*)", size_limit=2)) == 2
+        assert list(connector.search("ou=users,dc=meli,dc=com", "(uid=john)", attributes=["1.1"])[0]) == ["dn"]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_metodos_heredados(self, connector):
+        """Test: los listados del conector funcionan sobre el snapshot."""
+        usuarios = connector.list_all_users()
+
+        assert [(u["username"], u["department"]) for u in usuarios] == [
+            ("john", "Development"), ("jane", "Development")
+        ]
+        assert connector.get_user_groups("jane") == ["developers", "managers"]
+        assert {g["name"]: g["member_count"] for g in connector.list_all_groups()} == {
+            "developers": 2, "managers": 1
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_modify_rechazado(self, connector):
+        """Test: el snapshot es de solo lectura."""
+        assert connector.modify("cn=john,ou=users,dc=meli,dc=com", []) is False
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_create_connector_segun_entorno(self, snapshot_path, monkeypatch):
+        """Test: la fábrica usa el snapshot solo si LDAP_SNAPSHOT_PATH está definida."""
+        monkeypatch.setenv("LDAP_SNAPSHOT_PATH", snapshot_path)
+        assert isinstance(create_connector(), SnapshotConnector)
+
+        monkeypatch.setenv("LDAP_SNAPSHOT_PATH", "")
+        conector = create_connector(use_pool=False, use_cache=False)
+        assert type(conector) is LDAPConnector
+
+
+class TestSnapshotFilters:
+    """Tests del evaluador de filtros LDAP."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_operadores(self):
+        """Test: igualdad, presencia, subcadenas, negación y comparaciones."""
+        entrada = LDAPEntry("uid=john,dc=meli,dc=com", {
+            "objectClass": [b"inetOrgPerson"], "uid": [b"John"], "uidNumber": [b"1500"]
+        })
+
+        assert match_filter(parse_filter("(uid=john)"), entrada)
+        assert match_filter(parse_filter("(&(objectClass=inetorgperson)(uid=j*n))"), entrada)
+        assert match_filter(parse_filter("(|(uid=jane)(mail=*)(uidNumber>=1000))"), entrada)
+        assert not match_filter(parse_filter("(!(uid=john))"), entrada)
+        assert not match_filter(parse_filter("(uidNumber<=999)"), entrada)
+        assert match_filter(parse_filter("uid=\\4a*"), entrada)
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_filtro_mal_formado(self):
+        """Test: un filtro mal formado lanza ValueError."""
+        with pytest.raises(ValueError):
+            parse_filter("(&(uid=john)")
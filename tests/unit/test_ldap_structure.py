@@ -0,0 +1,148 @@
+"""
+Tests unitarios para el análisis de estructura por conteo de entradas.
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock
+from benchmarks.synthetic_ldap import SyntheticDirectory, synthetic_server
+from agentesai.tools_base.ldap_connector import LDAPConnector
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.ldap_pool import close_all_pools
+from agentesai.tools_base.ldap_structure import (
+    STRUCTURE_ATTRS,
+    DirectoryStructure,
+    get_directory_structure,
+    invalidate_directory_structure
+)
+
+
+ENTRADAS = [
+    LDAPEntry("dc=meli,dc=com", {"objectClass": [b"top", b"organization"]}),
+    LDAPEntry("ou=users,dc=meli,dc=com", {"objectClass": [b"organizationalUnit"]}),
+    LDAPEntry("ou=groups,dc=meli,dc=com", {"objectClass": [b"organizationalUnit"]}),
+    LDAPEntry("ou=contractors,ou=users,dc=meli,dc=com", {"objectClass": [b"organizationalUnit"]}),
+    LDAPEntry("cn=john,ou=users,dc=meli,dc=com", {"objectClass": [b"inetOrgPerson"]}),
+    LDAPEntry("cn=jane,ou=contractors,ou=users,dc=meli,dc=com", {"objectClass": [b"inetOrgPerson"]}),
+    LDAPEntry("cn=developers,ou=groups,dc=meli,dc=com", {"objectClass": [b"groupOfNames"]})
+]
+
+
+@pytest.fixture
+def ldap_conn():
+    """Conector mock cuyo recorrido devuelve un árbol de cuatro niveles."""
+    invalidate_directory_structure()
+    conn = Mock(server_url="ldap://structure-test:389", base_dn="dc=meli,dc=com",
+                bind_dn="cn=admin,dc=meli,dc=com", is_connected=True)
+    conn.iter_search.side_effect = lambda *args, **kwargs: iter(ENTRADAS)
+    yield conn
+    invalidate_directory_structure()
+
+
+class TestDirectoryStructure:
+    """Tests del análisis a partir de DNs y objectClass."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_conteos_profundidad_y_fanout(self, ldap_conn):
+        """Test: la estructura se calcula sin pedir más atributo que objectClass."""
+        estructura = DirectoryStructure.build(ldap_conn).to_dict()
+
+        assert ldap_conn.iter_search.call_args.kwargs["attributes"] == STRUCTURE_ATTRS
+        assert estructura["total_entries"] == 7
+        assert estructura["total_users"] == 2
+        assert estructura["total_groups"] == 1
+        assert estructura["structure_depth"] == 4
+        assert estructura["entries_by_depth"] == [1, 2, 3, 1]
+        assert estructura["max_fanout"] == 2
+        assert estructura["object_classes"]["organizationalUnit"] == 3
+
+        ous = {ou["name"]: ou for ou in estructura["organizational_units"]}
+        assert (ous["users"]["entry_count"], ous["users"]["children"]) == (3, 2)
+        assert ous["contractors"]["entry_count"] == 1
+        assert ous["groups"]["entry_count"] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_cache_por_servidor(self, ldap_conn):
+        """Test: el análisis se reutiliza hasta que se refresca o se invalida."""
+        primero = get_directory_structure(ldap_conn)
+        assert get_directory_structure(ldap_conn) is primero
+        assert ldap_conn.iter_search.call_count == 1
+
+        get_directory_structure(ldap_conn, refresh=True)
+        invalidate_directory_structure("ldap://structure-test:389")
+        get_directory_structure(ldap_conn)
+        assert ldap_conn.iter_search.call_count == 3
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_recorrido_no_bloquea_otras_claves(self, ldap_conn):
+        """Test: mientras se analiza un servidor, los análisis de otros siguen disponibles."""
+        empezado, liberar = threading.Event(), threading.Event()
+
+        def lento(*args, **kwargs):
+            empezado.set()
+            liberar.wait(5)
+            return iter(ENTRADAS)
+
+        lento_conn = Mock(server_url="ldap://structure-lento:389", base_dn="dc=meli,dc=com",
+                          bind_dn="cn=admin,dc=meli,dc=com", is_connected=True)
+        lento_conn.iter_search.side_effect = lento
+        resultados = []
+
+        hilos = [threading.Thread(target=lambda: resultados.append(get_directory_structure(lento_conn)))
+                 for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        assert empezado.wait(5)
+
+        # Otro servidor no espera al recorrido en curso
+        assert get_directory_structure(ldap_conn).total_entries == 7
+
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(5)
+
+        # Dos peticiones concurrentes de la misma clave comparten un solo recorrido
+        assert lento_conn.iter_search.call_count == 1
+        assert resultados[0] is resultados[1]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_recorrido_fallido_no_se_cachea(self, ldap_conn):
+        """Test: un recorrido que falla no deja un análisis parcial en caché."""
+        ldap_conn.iter_search.side_effect = TimeoutError("página 2")
+        with pytest.raises(TimeoutError):
+            get_directory_structure(ldap_conn)
+
+        ldap_conn.iter_search.side_effect = lambda *args, **kwargs: iter(ENTRADAS)
+        assert get_directory_structure(ldap_conn).total_entries == 7
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_sin_conexion(self, ldap_conn):
+        """Test: sin conexión se devuelve una estructura vacía que no se cachea."""
+        ldap_conn.is_connected = False
+
+        estructura = get_directory_structure(ldap_conn).to_dict()
+
+        assert estructura["base_dn"] == "dc=meli,dc=com"
+        assert estructura["total_users"] == estructura["structure_depth"] == 0
+        ldap_conn.iter_search.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_get_ldap_structure_sobre_servidor_sintetico(self):
+        """Test: get_ldap_structure cuenta usuarios y grupos sin listarlos."""
+        close_all_pools()
+        invalidate_directory_structure()
+        with synthetic_server(SyntheticDirectory(users=40, groups=4)) as stats:
+            with LDAPConnector(use_cache=False) as conn:
+                estructura = conn.get_ldap_structure()
+        close_all_pools()
+        invalidate_directory_structure()
+
+        assert (estructura["total_users"], estructura["total_groups"]) == (40, 4)
+        assert estructura["structure_depth"] == 3
+        assert stats.bytes_sent < 40 * 200
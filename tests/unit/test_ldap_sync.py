@@ -0,0 +1,157 @@
+"""
+Tests unitarios para la sincronización incremental del directorio LDAP.
+"""
+
+import pytest
+from contextlib import nullcontext
+from unittest.mock import MagicMock
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.ldap_snapshot import SnapshotConnector, match_filter, parse_filter
+from agentesai.tools_base.ldap_sync import DirectorySync, FileSyncStore, SyncStore
+
+
+BASE_DN = "dc=meli,dc=com"
+
+
+def _entrada(dn, timestamp, **attrs):
+    raw = {name: [value.encode()] for name, value in attrs.items()}
+    raw["modifyTimestamp"] = [timestamp.encode()]
+    return LDAPEntry(dn, raw)
+
+
+class DirectorioFalso:
+    """Conector mínimo que evalúa los filtros sobre una lista de entradas en memoria."""
+
+    def __init__(self):
+        self.server_url = "ldap://sync-test:389"
+        self.base_dn = BASE_DN
+        self.is_connected = True
+        self.context_csn = [b"20240101000000.000000Z#000000#000#000000"]
+        self.entries = {
+            "cn=john": _entrada(f"cn=john,ou=users,{BASE_DN}", "20240101000000Z", uid="john", mail="john@meli.com"),
+            "cn=jane": _entrada(f"cn=jane,ou=users,{BASE_DN}", "20240101000000Z", uid="jane", mail="jane@meli.com")
+        }
+        self.busquedas = []
+        self.fallar = False
+        self.uncached = MagicMock(side_effect=nullcontext)
+
+    def search(self, base_dn, filter_str, attributes=None, scope=None):
+        if base_dn == "":
+            return [LDAPEntry("", {"namingContexts": [BASE_DN.encode()]})]
+        return [LDAPEntry(base_dn, {"contextCSN": list(self.context_csn)})]
+
+    def iter_search(self, base_dn, filter_str, attributes=None, raise_errors=False):
+        self.busquedas.append(filter_str)
+        if self.fallar:
+            raise RuntimeError("Servidor no disponible")
+        nodo = parse_filter(filter_str)
+        return iter([e for e in self.entries.values() if match_filter(nodo, e)])
+
+    def cambiar(self):
+        self.context_csn = [b"20240102000000.000000Z#000000#000#000000"]
+
+
+@pytest.fixture
+def directorio():
+    return DirectorioFalso()
+
+
+class TestDirectorySync:
+    """Tests del motor de sincronización."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_completa_y_sin_cambios_por_context_csn(self, directorio):
+        """Test: la primera vez se lee todo; con el mismo contextCSN no se busca nada."""
+        sync = DirectorySync(directorio)
+
+        resumen = sync.refresh()
+        assert resumen["mode"] == "full"
+        assert resumen["entries"] == 2
+        assert sync.store.rootdse is not None
+
+        directorio.busquedas.clear()
+        assert sync.refresh()["mode"] == "unchanged"
+        assert directorio.busquedas == []
+        assert directorio.uncached.call_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_reconciliacion_forzada_sin_cambios(self, directorio):
+        """Test: reconcile=True detecta bajas aunque contextCSN no haya cambiado."""
+        sync = DirectorySync(directorio)
+        sync.refresh()
+        del directorio.entries["cn=jane"]
+
+        assert sync.refresh()["deleted"] == 0
+        resumen = sync.refresh(reconcile=True)
+
+        assert (resumen["mode"], resumen["deleted"], resumen["entries"]) == ("unchanged", 1, 1)
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_incremental_aplica_solo_cambios(self, directorio):
+        """Test: el refresco pide desde la marca y cuenta solo las entradas que cambian."""
+        sync = DirectorySync(directorio, reconcile_interval=3600)
+        sync.refresh()
+
+        directorio.entries["cn=jane"] = _entrada(f"cn=jane,ou=users,{BASE_DN}", "20240102000000Z",
+                                                 uid="jane", mail="jane.n@meli.com")
+        directorio.entries["cn=ana"] = _entrada(f"cn=ana,ou=users,{BASE_DN}", "20240102000000Z", uid="ana")
+        directorio.cambiar()
+        directorio.busquedas.clear()
+
+        resumen = sync.refresh()
+
+        assert resumen == {**resumen, "mode": "incremental", "updated": 2, "deleted": 0, "entries": 3}
+        assert directorio.busquedas == ["(&(objectClass=*)(modifyTimestamp>=20240101000000Z))"]
+        assert sync.store.get(f"CN=Jane,ou=users,{BASE_DN}").first("mail") == "jane.n@meli.com"
+        assert sync.store.state["modify_timestamp"] == "20240102000000Z"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_reconciliacion_elimina_bajas(self, directorio):
+        """Test: las bajas se detectan al reconciliar y un error no borra nada."""
+        sync = DirectorySync(directorio)
+        sync.refresh()
+
+        del directorio.entries["cn=john"]
+        directorio.cambiar()
+        directorio.fallar = True
+        with pytest.raises(RuntimeError):
+            sync.refresh(reconcile=True)
+        assert len(sync.store) == 2
+
+        directorio.fallar = False
+        resumen = sync.refresh(reconcile=True)
+        assert resumen["deleted"] == 1
+        assert sync.store.get(f"cn=john,ou=users,{BASE_DN}") is None
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_sin_conexion(self, directorio):
+        """Test: sin conexión se lanza ConnectionError."""
+        directorio.is_connected = False
+        with pytest.raises(ConnectionError):
+            DirectorySync(directorio, SyncStore()).refresh()
+
+
+class TestFileSyncStore:
+    """Tests del almacén persistido como snapshot."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_persistencia_y_snapshot_utilizable(self, directorio, tmp_path):
+        """Test: el estado se recupera de disco y el LDIF se sirve con SnapshotConnector."""
+        path = str(tmp_path / "sync.ldif")
+        DirectorySync(directorio, FileSyncStore(path)).refresh()
+
+        directorio.busquedas.clear()
+        sync = DirectorySync(directorio, FileSyncStore(path))
+        assert sync.refresh()["mode"] == "unchanged"
+        assert len(sync.store) == 2
+        assert directorio.busquedas == []
+
+        with SnapshotConnector(path) as conn:
+            usuarios = conn.search(BASE_DN, "(uid=jane)")
+        assert [u.first("mail") for u in usuarios] == ["jane@meli.com"]
@@ -0,0 +1,135 @@
+"""
+Tests unitarios para los manifiestos de herramientas y la tabla de despacho.
+"""
+
+import subprocess
+import sys
+import pytest
+from unittest.mock import Mock, patch
+from agentesai.manifest import (
+    AGENT_EXECUTOR,
+    AGENT_OFFENSIVE,
+    COST_EXTERNAL,
+    ManifestRegistry,
+    ToolManifest,
+    get_manifest_registry,
+)
+from agentesai.agent.coordinador import INTENCIONES
+from agentesai.agent.sistema import SistemaAgentes
+
+
+class TestToolManifest:
+    """Tests de la declaración perezosa de una herramienta."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_carga_perezosa(self):
+        """Test: el módulo de la herramienta se importa al usarla por primera vez."""
+        manifest = ToolManifest("tool_hsv", "colorsys:rgb_to_hsv", ["a hsv"], extractor="json:loads")
+
+        with patch.dict(sys.modules):
+            sys.modules.pop("colorsys", None)
+            assert not manifest.loaded
+            assert manifest(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+            assert manifest.loaded
+        assert manifest.extract_params('{"port": 636}') == {"port": 636}
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_visualizacion_no_importable(self):
+        """Test: una visualización que no existe no rompe la ejecución."""
+        sin_renderer = ToolManifest("a", "json:dumps")
+        roto = ToolManifest("b", "json:dumps", renderer="agentesai.no_existe:mostrar")
+
+        assert sin_renderer.render({}) is False
+        assert roto.render({}) is False
+        assert sin_renderer.extract_params("consulta") == {}
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_coste_desconocido(self):
+        """Test: la clase de coste debe ser una de las declaradas."""
+        with pytest.raises(ValueError):
+            ToolManifest("a", "json:dumps", cost="caro")
+
+
+class TestManifestRegistry:
+    """Tests del registro de manifiestos."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_nombres_unicos(self):
+        """Test: una herramienta no se puede declarar dos veces."""
+        with pytest.raises(ValueError):
+            ManifestRegistry([ToolManifest("a", "json:dumps"), ToolManifest("a", "json:loads")])
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_catalogo_de_intenciones(self):
+        """Test: el catálogo del coordinador sale de los manifiestos, ordenado por prioridad."""
+        registro = get_manifest_registry()
+
+        assert INTENCIONES == registro.intent_rules()
+        assert [prioridad for _, prioridad, _ in INTENCIONES] == sorted(p for _, p, _ in INTENCIONES)
+        assert len(registro.by_agent(AGENT_EXECUTOR)) == 6
+        assert len(registro.by_agent(AGENT_OFFENSIVE)) == 7
+        assert registro.get("tool_ldap_nmap_nse").cost == COST_EXTERNAL
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_manifiestos_no_importan_herramientas(self):
+        """Test: arrancar el sistema no importa los módulos de las herramientas ofensivas."""
+        codigo = (
+            "import sys\n"
+            "from agentesai.agent.sistema import SistemaAgentes\n"
+            "SistemaAgentes(output_mode='none')\n"
+            "print(sorted(m for m in sys.modules if m.startswith('agentesai.tools_offensive.')))\n"
+        )
+        salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+
+        assert salida.stdout.strip() == "['agentesai.tools_offensive.manifest', 'agentesai.tools_offensive.sessions']"
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_exportaciones_ofensivas_desde_manifiestos(self):
+        """Test: el paquete ofensivo exporta exactamente las herramientas de sus manifiestos."""
+        import agentesai.tools_offensive as ofensivas
+        from agentesai.tools_offensive.acl_diff import tool_acl_diff
+
+        declaradas = list(get_manifest_registry().by_agent(AGENT_OFFENSIVE))
+
+        assert ofensivas.__all__ == declaradas + ['SessionManager', 'offensive_run']
+        assert ofensivas.tool_acl_diff is tool_acl_diff
+        with pytest.raises(AttributeError):
+            ofensivas.tool_inexistente
+
+
+class TestDespachoPorManifiesto:
+    """Tests del despacho de SistemaAgentes a través de los manifiestos."""
+
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_herramienta_ofensiva_con_extractor(self):
+        """Test: una herramienta ofensiva recibe los parámetros de su extractor."""
+        sistema = SistemaAgentes(output_mode="none")
+        sistema.ofensivo.ejecutar_herramienta_ofensiva = Mock(return_value={"error": False, "resultado": {}})
+
+        sistema.procesar_consulta("nmap nse 10.0.0.7 timeout 5")
+
+        sistema.ofensivo.ejecutar_herramienta_ofensiva.assert_called_once_with(
+            "tool_ldap_nmap_nse", target="10.0.0.7", timeout=5)
+
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_visualizacion_recibe_resultado_de_la_herramienta(self):
+        """Test: en modo rich se muestra el resultado de la herramienta con su visualización."""
+        sistema = SistemaAgentes(output_mode="none")
+        resultado_herramienta = {"error": False, "resultado": {"tests": {}}}
+        sistema.ofensivo.ejecutar_herramienta_ofensiva = Mock(
+            return_value={"error": False, "herramienta": "tool_acl_diff", "resultado": resultado_herramienta})
+
+        with patch("agentesai.agent.sistema.is_rich_output", return_value=True), \
+                patch("agentesai.tools_offensive.acl_diff.mostrar_resultado_acl_diff") as mostrar:
+            sistema.procesar_consulta("comparar acls")
+
+        mostrar.assert_called_once_with(resultado_herramienta)
@@ -0,0 +1,290 @@
+"""
+Tests unitarios para el índice inverso de pertenencia a grupos.
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from agentesai.tools_base.membership import (
+    MembershipIndex,
+    get_membership_index,
+    department_for_groups,
+    groups_for_department,
+    groups_deciding
+)
+from agentesai.tools_base.ldap_connector import LDAPConnector
+from agentesai.tools_base.ldap_entry import LDAPEntry
+
+
+GRUPOS = [
+    {"dn": "cn=developers,ou=groups,dc=meli,dc=com", "cn": "developers",
+     "member": ["cn=john,ou=users,dc=meli,dc=com", "cn=jane,ou=users,dc=meli,dc=com"]},
+    {"dn": "cn=managers,ou=groups,dc=meli,dc=com", "cn": "managers",
+     "member": "cn=jane,ou=users,dc=meli,dc=com"},
+    {"dn": "cn=vpn,ou=groups,dc=meli,dc=com", "cn": "vpn",
+     "member": ["CN=John, OU=users, DC=meli, DC=com"]}
+]
+
+
+class TestMembershipIndex:
+    """Tests unitarios para MembershipIndex."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_from_groups_invierte_pertenencias(self):
+        """Test: cada DN de miembro apunta al conjunto inmutable de sus grupos."""
+        index = MembershipIndex.from_groups(GRUPOS)
+
+        assert index.groups_for("cn=john,ou=users,dc=meli,dc=com") == frozenset({"developers", "vpn"})
+        assert index.groups_for("cn=jane,ou=users,dc=meli,dc=com") == frozenset({"developers", "managers"})
+        assert isinstance(index.groups_for("cn=john,ou=users,dc=meli,dc=com"), frozenset)
+        assert index.total_groups == 3
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_groups_for_miembro_desconocido(self):
+        """Test: un DN sin grupos devuelve un conjunto vacío."""
+        index = MembershipIndex.from_groups(GRUPOS)
+
+        assert index.groups_for("cn=nadie,ou=users,dc=meli,dc=com") == frozenset()
+        assert index.department_for("cn=nadie,ou=users,dc=meli,dc=com") == "General"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_department_respeta_prioridad_del_mapeo(self):
+        """Test: con varios grupos mapeados gana el primero del mapeo."""
+        assert department_for_groups({"managers", "developers"}) == "Development"
+        assert department_for_groups({"qa", "admins"}) == "IT"
+        assert department_for_groups(["vpn"]) == "General"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_grupos_de_un_departamento(self):
+        """Test: un departamento se traduce a sus grupos y a los que deciden sobre ellos."""
+        assert groups_for_department("it") == ["admins", "it"]
+        assert groups_for_department("Management") == ["managers"]
+        assert groups_for_department("General") == []
+        assert groups_deciding(["managers"]) == ["admins", "developers", "managers"]
+        assert groups_deciding([]) == []
+
+
+GRUPOS_ANIDADOS = [
+    {"dn": "cn=admins,ou=groups,dc=meli,dc=com", "cn": "admins",
+     "member": ["cn=root,ou=users,dc=meli,dc=com", "CN=Ops, OU=groups, DC=meli, DC=com"]},
+    {"dn": "cn=ops,ou=groups,dc=meli,dc=com", "cn": "ops",
+     "member": ["cn=bob,ou=users,dc=meli,dc=com", "cn=oncall,ou=groups,dc=meli,dc=com"]},
+    {"dn": "cn=oncall,ou=groups,dc=meli,dc=com", "cn": "oncall",
+     "member": ["cn=eve,ou=users,dc=meli,dc=com", "cn=ops,ou=groups,dc=meli,dc=com"]},
+    {"dn": "cn=developers,ou=groups,dc=meli,dc=com", "cn": "developers",
+     "member": ["cn=eve,ou=users,dc=meli,dc=com"]}
+]
+
+
+class TestNestedMembership:
+    """Tests de la pertenencia transitiva por grupos anidados."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_grupos_heredados_por_anidamiento(self):
+        """Test: un usuario hereda los grupos que contienen a los suyos, con DNs normalizados."""
+        index = MembershipIndex.from_groups(GRUPOS_ANIDADOS)
+
+        assert index.groups_for("cn=eve,ou=users,dc=meli,dc=com") == frozenset(
+            {"developers", "oncall", "ops", "admins"})
+        assert index.groups_for("cn=eve,ou=users,dc=meli,dc=com", transitive=False) == frozenset(
+            {"developers", "oncall"})
+        assert index.department_for("cn=bob,ou=users,dc=meli,dc=com") == "IT"
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_miembros_de_un_grupo(self):
+        """Test: los miembros efectivos incluyen los de los subgrupos pero no los subgrupos."""
+        index = MembershipIndex.from_groups(GRUPOS_ANIDADOS)
+
+        assert index.members_of("admins") == frozenset({
+            "cn=root,ou=users,dc=meli,dc=com", "cn=bob,ou=users,dc=meli,dc=com", "cn=eve,ou=users,dc=meli,dc=com"})
+        assert index.members_of("CN=Admins,OU=groups,DC=meli,DC=com", transitive=False) == frozenset({
+            "cn=root,ou=users,dc=meli,dc=com", "cn=ops,ou=groups,dc=meli,dc=com"})
+        assert index.members_of("inexistente") == frozenset()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_ciclos_no_cuelgan_y_se_detectan(self):
+        """Test: un ciclo ops ↔ oncall se recorre una vez y se informa."""
+        index = MembershipIndex.from_groups(GRUPOS_ANIDADOS)
+
+        assert index.members_of("ops") == index.members_of("oncall") == frozenset(
+            {"cn=bob,ou=users,dc=meli,dc=com", "cn=eve,ou=users,dc=meli,dc=com"})
+        assert index.cyclic_groups() == ["oncall", "ops"]
+        assert index.nested_groups() == ["oncall", "ops"]
+        assert MembershipIndex.from_groups(GRUPOS).cyclic_groups() == []
+
+
+class TestMembershipCache:
+    """Tests del índice compartido entre llamadas del conector."""
+
+    @pytest.fixture
+    def connector(self):
+        """Conector conectado cuyo iter_search devuelve grupos fijos."""
+        connector = LDAPConnector(server_url="ldap://membership-test:389", use_pool=False, use_cache=False)
+        connector.connection = Mock()
+        connector.is_connected = True
+        connector.iter_search = Mock(side_effect=lambda *args, **kwargs: iter(GRUPOS))
+        return connector
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_indice_se_reutiliza_hasta_expirar(self, connector):
+        """Test: el índice se construye una vez y se reconstruye al expirar el TTL."""
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            primero = get_membership_index(connector)
+            segundo = get_membership_index(connector)
+            assert primero is segundo
+            assert connector.iter_search.call_count == 1
+
+            with patch.dict('os.environ', {"LDAP_MEMBERSHIP_TTL": "0"}):
+                primero.built_at -= 1
+                tercero = get_membership_index(connector)
+
+            assert tercero is not primero
+            assert connector.iter_search.call_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_recorrido_cortado_no_se_cachea(self, connector):
+        """Test: si la búsqueda de grupos falla a mitad no queda un índice parcial en caché."""
+        def cortado(*args, **kwargs):
+            assert kwargs.get("raise_errors") is True
+            yield GRUPOS[0]
+            raise TimeoutError("página 2")
+
+        connector.iter_search = Mock(side_effect=cortado)
+
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            with pytest.raises(TimeoutError):
+                get_membership_index(connector)
+            assert connector.get_user_groups("jane") == []
+
+            connector.iter_search = Mock(side_effect=lambda *args, **kwargs: iter(GRUPOS))
+            assert connector.get_user_groups("jane") == ["developers", "managers"]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_reconstruccion_no_bloquea_otras_claves(self, connector):
+        """Test: mientras se construye un índice, los de otros servidores siguen disponibles."""
+        empezada, liberar = threading.Event(), threading.Event()
+
+        def lento(*args, **kwargs):
+            empezada.set()
+            liberar.wait(5)
+            return iter(GRUPOS)
+
+        lento_conn = LDAPConnector(server_url="ldap://membership-lento:389", use_pool=False, use_cache=False)
+        lento_conn.is_connected = True
+        lento_conn.iter_search = Mock(side_effect=lento)
+        resultados = []
+
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            hilos = [threading.Thread(target=lambda: resultados.append(get_membership_index(lento_conn)))
+                     for _ in range(2)]
+            for hilo in hilos:
+                hilo.start()
+            assert empezada.wait(5)
+
+            # Otro servidor no espera a la reconstrucción en curso
+            assert get_membership_index(connector).total_groups == 3
+
+            liberar.set()
+            for hilo in hilos:
+                hilo.join(5)
+
+        # Dos peticiones concurrentes de la misma clave comparten una sola construcción
+        assert lento_conn.iter_search.call_count == 1
+        assert resultados[0] is resultados[1]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_list_all_users_usa_dos_busquedas(self, connector):
+        """Test: listar N usuarios cuesta una búsqueda de usuarios y una de grupos."""
+        usuarios = [
+            LDAPEntry("cn=john,ou=users,dc=meli,dc=com", {"uid": [b"john"]}),
+            LDAPEntry("cn=jane,ou=users,dc=meli,dc=com", {"uid": [b"jane"]}),
+            LDAPEntry("cn=bob,ou=users,dc=meli,dc=com", {"uid": [b"bob"]})
+        ]
+
+        def fake_iter_search(base_dn, *args, **kwargs):
+            return iter(usuarios if base_dn.startswith("ou=users") else GRUPOS)
+
+        connector.iter_search = Mock(side_effect=fake_iter_search)
+
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            result = connector.list_all_users()
+
+        assert connector.iter_search.call_count == 2
+        assert [user["department"] for user in result] == ["Development", "Development", "General"]
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_get_user_groups_desde_indice(self, connector):
+        """Test: get_user_groups resuelve los grupos sin búsquedas adicionales."""
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            assert connector.get_user_groups("jane") == ["developers", "managers"]
+            assert connector.get_user_groups("john") == ["developers", "vpn"]
+
+        assert connector.iter_search.call_count == 1
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_usuarios_por_departamento_sin_recorrer_directorio(self, connector):
+        """Test: solo se leen los grupos relevantes y sus miembros en un filtro OR."""
+        grupos = [
+            LDAPEntry("cn=developers,ou=groups,dc=meli,dc=com", {
+                "cn": [b"developers"],
+                "member": [b"cn=john,ou=users,dc=meli,dc=com", b"cn=jane,ou=users,dc=meli,dc=com"]}),
+            LDAPEntry("cn=managers,ou=groups,dc=meli,dc=com", {
+                "cn": [b"managers"],
+                "member": [b"cn=jane,ou=users,dc=meli,dc=com", b"cn=bob,ou=users,dc=meli,dc=com"]})
+        ]
+        connector.search = Mock(return_value=grupos)
+        connector.search_many = Mock(side_effect=lambda requests: {
+            name: [LDAPEntry("cn=bob,ou=users,dc=meli,dc=com", {"uid": [b"bob"]})] for name in requests
+        })
+
+        result = connector.list_users_by_department("management")
+
+        filtro_grupos = connector.search.call_args.args[1]
+        assert "(cn=admins)" in filtro_grupos and "(cn=hr)" not in filtro_grupos
+        peticion = next(iter(connector.search_many.call_args.args[0].values()))
+        assert peticion["filter_str"] == "(&(objectClass=inetOrgPerson)(|(cn=bob)))"
+        assert [(user["username"], user["department"]) for user in result] == [("bob", "Management")]
+        connector.iter_search.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_departamento_general_requiere_listado_completo(self, connector):
+        """Test: el departamento por defecto no se resuelve por grupos."""
+        connector.search = Mock()
+
+        assert connector.list_users_by_department("General") is None
+        assert connector.list_users_by_department("Marketing") == []
+        connector.search.assert_not_called()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_departamento_con_grupos_anidados(self, connector):
+        """Test: si un grupo contiene otros, el departamento se resuelve con el índice completo."""
+        connector.search = Mock(return_value=[
+            LDAPEntry("cn=admins,ou=groups,dc=meli,dc=com", {
+                "cn": [b"admins"], "member": [b"cn=ops,ou=groups,dc=meli,dc=com"]})
+        ])
+        connector.iter_search = Mock(side_effect=lambda *args, **kwargs: iter(GRUPOS_ANIDADOS))
+        connector._resolve_member_dns = Mock(side_effect=lambda dns, attrs: [
+            LDAPEntry(dn, {"uid": [dn.split(",")[0][3:].encode()]}) for dn in sorted(dns)])
+
+        with patch('agentesai.tools_base.membership._indexes', {}):
+            result = connector.list_users_by_department("IT")
+            assert connector.get_group_members("ops") == [
+                "cn=bob,ou=users,dc=meli,dc=com", "cn=eve,ou=users,dc=meli,dc=com"]
+
+        assert [user["username"] for user in result] == ["bob", "eve", "root"]
+        assert connector.iter_search.call_count == 1
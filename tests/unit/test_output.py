@@ -0,0 +1,165 @@
+"""
+Tests unitarios para la capa de presentación (modos de salida).
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from agentesai.cli import main
+from agentesai.tools_base.ldap_entry import LDAPEntry
+from agentesai.tools_base.output import (
+    emit_ndjson,
+    emit_result,
+    get_output_mode,
+    output_mode,
+    render_table,
+    set_output_mode,
+    to_json
+)
+from agentesai.tools_base.tools import get_user_groups, iter_all_users, list_all_users
+
+
+USUARIOS = [
+    {"username": "john", "full_name": "John Doe", "email": "john@meli.com",
+     "title": "Engineer", "department": "Development"},
+    {"username": "jane", "full_name": "Jane Smith", "email": "jane@meli.com",
+     "title": "Manager", "department": "Management"}
+]
+
+
+@pytest.fixture(autouse=True)
+def modo_rich():
+    """Cada test parte del modo rich y lo restaura al terminar."""
+    anterior = set_output_mode("rich")
+    yield
+    set_output_mode(anterior)
+
+
+@pytest.fixture
+def conector():
+    """Conector mock devuelto por create_connector()."""
+    ldap_conn = MagicMock()
+    ldap_conn.__enter__.return_value = ldap_conn
+    ldap_conn.list_all_users.return_value = USUARIOS
+    ldap_conn.iter_all_users.side_effect = lambda: iter(USUARIOS)
+    ldap_conn.get_user_groups.return_value = ["developers", "admins"]
+    ldap_conn.search.return_value = [LDAPEntry("cn=developers,ou=groups,dc=meli,dc=com",
+                                               {"description": [b"Desarrolladores"]})]
+    with patch("agentesai.tools_base.tools.create_connector", return_value=ldap_conn):
+        yield ldap_conn
+
+
+class TestOutputMode:
+    """Tests de la selección del modo de salida."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_modo_por_llamada(self):
+        """Test: output_mode() sobrescribe el modo solo dentro del bloque."""
+        with output_mode("none"):
+            assert get_output_mode() == "none"
+        assert get_output_mode() == "rich"
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_modo_invalido(self):
+        """Test: un modo desconocido lanza ValueError."""
+        with pytest.raises(ValueError):
+            set_output_mode("html")
+
+
+class TestRendering:
+    """Tests del renderizado de tablas según el modo."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    @pytest.mark.parametrize("modo", ["plain", "json", "none"])
+    def test_sin_tablas_en_modos_no_interactivos(self, modo, conector):
+        """Test: fuera del modo rich no se construye ningún Table."""
+        with patch("agentesai.tools_base.output.Table") as tabla, output_mode(modo):
+            resultado = list_all_users()
+
+        tabla.assert_not_called()
+        assert resultado["total_users"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_plain_separado_por_tabuladores(self, capsys):
+        """Test: el modo plain imprime cabecera y filas separadas por tabuladores."""
+        with output_mode("plain"):
+            render_table("Usuarios", [("Usuario", "cyan"), ("Email", "yellow")],
+                         lambda: [("john", "john@meli.com")])
+
+        assert capsys.readouterr().out.splitlines() == ["Usuarios", "Usuario\tEmail", "john\tjohn@meli.com"]
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_descripciones_solo_si_se_muestran(self, conector):
+        """Test: get_user_groups no busca descripciones de grupos si no hay tabla."""
+        with output_mode("none"):
+            resultado = get_user_groups("john")
+        assert resultado["total_groups"] == 2
+        conector.search.assert_not_called()
+
+        get_user_groups("john")
+        assert conector.search.call_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_json_solo_emite_resultado(self, conector, capsys):
+        """Test: en modo json la salida es únicamente el resultado serializado."""
+        with output_mode("json"):
+            resultado = list_all_users()
+            emit_result(resultado)
+
+        assert json.loads(capsys.readouterr().out)["total_users"] == 2
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_json_serializa_entradas_ldap(self):
+        """Test: LDAPEntry y bytes se serializan a JSON."""
+        entrada = LDAPEntry("uid=john,dc=meli,dc=com", {"uid": [b"john"]})
+
+        assert json.loads(to_json({"entrada": entrada, "raw": b"x"}, indent=None)) == {
+            "entrada": {"dn": "uid=john,dc=meli,dc=com", "uid": "john"}, "raw": "x"
+        }
+
+
+class TestStreaming:
+    """Tests de la salida NDJSON en streaming."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_emit_ndjson_una_linea_por_registro(self, capsys):
+        """Test: cada registro es una línea JSON independiente."""
+        total = emit_ndjson(iter(USUARIOS))
+
+        lineas = capsys.readouterr().out.splitlines()
+        assert total == 2
+        assert [json.loads(linea)["username"] for linea in lineas] == ["john", "jane"]
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_iter_all_users_libera_conexion_al_cortar(self, conector):
+        """Test: dejar de iterar cierra el conector sin recorrer el resto."""
+        usuarios = iter_all_users()
+        assert next(usuarios)["username"] == "john"
+
+        conector.__exit__.assert_not_called()
+        usuarios.close()
+        conector.__exit__.assert_called_once()
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_cli_ndjson(self, conector):
+        """Test: --format ndjson emite solo los usuarios, uno por línea."""
+        sistema = MagicMock()
+        sistema.coordinador.analizar_consulta.return_value = {"accion": "ejecutar", "herramienta": "list_all_users"}
+
+        with patch("agentesai.agent.sistema.SistemaAgentes", return_value=sistema):
+            resultado = CliRunner().invoke(main, ["--format", "ndjson", "listar usuarios"])
+
+        assert resultado.exit_code == 0
+        assert [json.loads(linea) for linea in resultado.output.splitlines()] == USUARIOS
+        sistema.procesar_consulta.assert_not_called()
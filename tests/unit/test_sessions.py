@@ -0,0 +1,93 @@
+"""
+Tests unitarios para las sesiones compartidas de las herramientas ofensivas.
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from agentesai.tools_offensive.sessions import SessionManager, current_run, offensive_run
+from agentesai.tools_offensive.starttls_test import tool_starttls_test
+from agentesai.tools_offensive.acl_diff import tool_acl_diff
+
+
+class TestSessionManager:
+    """Tests de la reutilización de sesiones por identidad."""
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_un_bind_por_identidad(self, servidor):
+        """Test: pedir varias veces la misma identidad reutiliza la sesión."""
+        sesiones = SessionManager()
+
+        admin = sesiones.get()
+        assert sesiones.get() is admin
+        usuario = sesiones.get("john", "secreto")
+        assert sesiones.get("cn=john,ou=users,dc=meli,dc=com", "secreto") is usuario
+        assert sesiones.anonymous() is sesiones.anonymous()
+
+        estadisticas = sesiones.get_stats()
+        assert (estadisticas["binds"], estadisticas["reused"], estadisticas["open"]) == (3, 3, 3)
+        assert usuario.bind_dn == "cn=john,ou=users,dc=meli,dc=com"
+        sesiones.close()
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_fresh_y_close(self, servidor):
+        """Test: fresh abre un bind nuevo y close() cierra todas las sesiones."""
+        sesiones = SessionManager()
+
+        primera = sesiones.get("john", "secreto")
+        nueva = sesiones.get("john", "secreto", fresh=True)
+
+        assert nueva is not primera
+        assert sesiones.get("john", "secreto") is primera
+        assert sesiones.close() == 2
+        assert not primera.is_connected and not nueva.is_connected
+        assert sesiones.get_stats()["open"] == 0
+
+
+    @pytest.mark.unit
+    @pytest.mark.ldap
+    def test_nombre_del_admin_configurado(self, servidor):
+        """Test: el nombre del administrador se resuelve a LDAP_ADMIN_DN y no bajo ou=users."""
+        sesiones = SessionManager()
+
+        assert sesiones.get("admin") is sesiones.get()
+        assert sesiones.get("ADMIN", "otra").bind_dn == "CN=admin,DC=meli,DC=com"
+        with patch.dict(os.environ, {"LDAP_ADMIN_DN": "cn=root,dc=example,dc=com"}):
+            assert sesiones.get("root", "otra").bind_dn == "cn=root,dc=example,dc=com"
+            assert sesiones.get("admin", "otra").bind_dn == "cn=admin,ou=users,dc=meli,dc=com"
+        sesiones.close()
+
+
+class TestOffensiveRun:
+    """Tests de la ejecución que comparte las sesiones entre herramientas."""
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_ejecucion_anidada_comparte_sesiones(self, servidor):
+        """Test: una ejecución anidada se une a la externa y solo esta cierra."""
+        with offensive_run() as externa:
+            with offensive_run() as interna:
+                assert interna is externa
+                sesion = interna.get()
+            assert sesion.is_connected
+            assert current_run() is externa
+
+        assert current_run() is None
+        assert not sesion.is_connected
+
+    @pytest.mark.unit
+    @pytest.mark.tools
+    def test_herramientas_reutilizan_binds(self, servidor):
+        """Test: dos herramientas en la misma ejecución no repiten binds ni dejan sesiones abiertas."""
+        with offensive_run() as sesiones:
+            assert tool_starttls_test()["error"] is False
+            resultado = tool_acl_diff("admin", "secreto")
+            estadisticas = sesiones.get_stats()
+
+        assert resultado["error"] is False
+        assert resultado["resultado"]["tests"]["bind_anonimo"]["usuario"] == "anonymous"
+        # Admin de la configuración, anónimo y el admin indicado a acl_diff (su propia contraseña)
+        assert estadisticas["binds"] == 3
+        assert sesiones.get_stats()["open"] == 0
@@ -11,9 +11,9 @@ class TestSistemaAgentes:
     """Tests unitarios para el sistema principal de agentes."""
     
     @pytest.fixture
-    def sistema_agentes(self):
-        """Instancia del sistema de agentes para testing."""
-        return SistemaAgentes()
+    def sistema_agentes(self, tmp_path):
+        """Instancia del sistema de agentes para testing (registry aislado por test)."""
+        return SistemaAgentes(archivo_registro=str(tmp_path / "tools_registry.json"))
     
     @pytest.mark.unit
     @pytest.mark.system
@@ -237,6 +237,90 @@ class TestSistemaAgentes:
             sistema_agentes.procesar_consulta.assert_called_once_with("¿quién soy?")
 
 
+class TestReutilizacionHerramientas:
+    """Tests de la reutilización de herramientas generadas entre consultas y ejecuciones."""
+    
+    CODIGO = "def get_grupos_count(): return '5 grupos'"
+    
+    def _generar(self, sistema):
+        """Genera (con Gemini simulado) la herramienta de "¿Cuántos grupos hay?"."""
+        sistema.generador.generar_herramienta = Mock(return_value={
+            "error": False,
+            "nombre": "get_cuantos_grupos_hay",
+            "funcion": lambda: "5 grupos",
+            "codigo": self.CODIGO,
+            "tipo": "ldap_query"
+        })
+        resultado = sistema.procesar_consulta("¿Cuántos grupos hay?")
+        assert resultado["tipo"] == "herramienta_generada"
+    
+    def _sin_gemini(self, sistema):
+        sistema.generador.generar_herramienta = Mock(side_effect=AssertionError("no debe generar"))
+        return sistema.generador.generar_herramienta
+    
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_consulta_equivalente_en_otra_ejecucion(self, tmp_path):
+        """Test: una consulta equivalente reutiliza la herramienta guardada sin llamar a Gemini."""
+        registro = str(tmp_path / "tools_registry.json")
+        self._generar(SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="exact"))
+        
+        sistema = SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="exact")
+        self._sin_gemini(sistema)
+        resultado = sistema.procesar_consulta("cuantos grupos hay")
+        
+        assert resultado["tipo"] == "herramienta_reutilizada"
+        assert resultado["herramienta"] == "get_cuantos_grupos_hay"
+        assert resultado["resultado"]["resultado"] == "5 grupos"
+        assert sistema.registry.obtener_herramienta("get_cuantos_grupos_hay")["uso_count"] == 1
+    
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_parafrasis_se_enruta_a_herramienta_guardada(self, tmp_path):
+        """Test: en modo similar las consultas guardadas enrutan sus paráfrasis al arrancar."""
+        registro = str(tmp_path / "tools_registry.json")
+        self._generar(SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="similar"))
+        
+        sistema = SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="similar")
+        self._sin_gemini(sistema)
+        resultado = sistema.procesar_consulta("dime cuántos grupos existen")
+        
+        assert resultado["tipo"] == "herramienta_existente"
+        assert resultado["herramienta"] == "get_cuantos_grupos_hay"
+        assert resultado["resultado"]["resultado"] == "5 grupos"
+    
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_modo_off_regenera(self, tmp_path):
+        """Test: sin reutilización cada ejecución vuelve a generar la herramienta."""
+        registro = str(tmp_path / "tools_registry.json")
+        self._generar(SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="off"))
+        
+        sistema = SistemaAgentes(output_mode="none", archivo_registro=registro, reutilizacion="off")
+        self._generar(sistema)
+        sistema.generador.generar_herramienta.assert_called_once()
+    
+    @pytest.mark.unit
+    @pytest.mark.system
+    def test_registry_busca_por_consulta_tras_recargar(self, tmp_path):
+        """Test: el índice de consultas del registry se reconstruye al cargar el archivo."""
+        from agentesai.agent.registry import RegistryTools
+        
+        registro = str(tmp_path / "tools_registry.json")
+        RegistryTools(registro).registrar_herramienta("get_cuantos_grupos_hay", {
+            "consulta_original": "¿Cuántos grupos hay?",
+            "codigo_generado": self.CODIGO
+        })
+        
+        recargado = RegistryTools(registro)
+        assert recargado.buscar_por_consulta("CUANTOS grupos hay!!") == "get_cuantos_grupos_hay"
+        assert recargado.buscar_por_consulta("cuantos usuarios hay") is None
+        assert recargado.consultas_activas() == {"get_cuantos_grupos_hay": "¿Cuántos grupos hay?"}
+        
+        recargado.desregistrar_herramienta("get_cuantos_grupos_hay")
+        assert recargado.buscar_por_consulta("¿Cuántos grupos hay?") is None
+
+
 class TestSistemaAgentesIntegration:
     """Tests de integración para el sistema de agentes."""
     